@@ -0,0 +1,6 @@
+"""
+TubeHarvester benchmarks.
+
+Scripts that measure startup and download performance offline. Run them from
+the project root with ``python -m benchmarks.<name>``.
+"""
@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import platform
+import threading
+import contextlib
+from unittest.mock import patch
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def percentile(values, fraction):
+    """
+    Computes a percentile with linear interpolation between the nearest values.
+
+    Args:
+        values (list): Numbers in any order.
+        fraction (float): The percentile as a fraction, e.g. 0.9.
+
+    Returns:
+        float: The percentile, or None if there are no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def summarize(values, digits=4):
+    """
+    Summarizes a latency sample.
+
+    Args:
+        values (list): Numbers, e.g. seconds per item.
+        digits (int): Decimal places kept (default: 4).
+
+    Returns:
+        dict: {'count', 'mean', 'p50', 'p90', 'p99', 'max'}; all but count are None without values.
+    """
+    def rounded(value):
+        return None if value is None else round(value, digits)
+
+    return {
+        'count': len(values),
+        'mean': rounded(sum(values) / len(values) if values else None),
+        'p50': rounded(percentile(values, 0.5)),
+        'p90': rounded(percentile(values, 0.9)),
+        'p99': rounded(percentile(values, 0.99)),
+        'max': rounded(max(values) if values else None),
+    }
+
+def cpuSeconds():
+    """
+    Gets the CPU time used by this process so far.
+
+    Returns:
+        float: User plus system seconds of all threads.
+    """
+    times = os.times()
+    return times.user + times.system
+
+def peakRssBytes():
+    """
+    Gets the peak resident memory of this process.
+
+    Returns:
+        int: Bytes, or None where the ``resource`` module is missing.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def currentRssBytes():
+    """
+    Gets the resident memory of this process now.
+
+    Returns:
+        int: Bytes, or None where ``/proc`` is not available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class RssSampler:
+    """
+    Tracks the peak resident memory of this process during a measurement.
+
+    ``peakRssBytes`` only knows the peak of the whole process, so a
+    background thread polls the current value to get the peak of one case.
+    """
+
+    def __init__(self, interval=0.02):
+        """
+        Initializes the RssSampler.
+
+        Args:
+            interval (float): Seconds between two samples (default: 0.02).
+        """
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        """
+        Records the current resident memory if it is a new peak.
+        """
+        rss = currentRssBytes()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def run(self):
+        """
+        Samples until stopped.
+        """
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def growthBytes(self):
+        """
+        Gets how far the memory rose above its value at the start.
+
+        Returns:
+            int: Bytes, or None where the current memory cannot be read.
+        """
+        if self.baseline is None or self.peak is None:
+            return None
+        return self.peak - self.baseline
+
+    def __enter__(self):
+        self.baseline = currentRssBytes()
+        self.peak = self.baseline
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_event.set()
+        self.thread.join()
+        self.sample()
+
+def environment():
+    """
+    Describes the machine and the versions a benchmark ran with.
+
+    Returns:
+        dict: {'python', 'implementation', 'platform', 'machine', 'cpu_count', 'yt_dlp'}.
+    """
+    try:
+        from yt_dlp.version import __version__ as yt_dlp_version
+    except ImportError:
+        yt_dlp_version = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'yt_dlp': yt_dlp_version,
+    }
+
+@contextlib.contextmanager
+def isolatedRun(work_dir):
+    """
+    Runs a benchmark offline in ``work_dir`` with yt-dlp's console output discarded.
+
+    ``CookieManager`` is given no browsers to extract cookies from, and the
+    empty working directory holds no cookie file, so runs neither start
+    browser extractions nor depend on the cookies of the current user.
+
+    Args:
+        work_dir (str): Directory that becomes the working directory.
+    """
+    from src.CookieManager import CookieManager
+    previous = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        with patch.object(CookieManager, 'BROWSERS', []), open(os.devnull, 'w') as devnull, \
+             contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            yield
+    finally:
+        os.chdir(previous)
+
+def writeReport(report, path=None):
+    """
+    Writes a benchmark report as JSON.
+
+    Args:
+        report (dict): The report.
+        path (str, optional): Output file. Defaults to stdout.
+    """
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
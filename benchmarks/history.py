@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import hashlib
+import platform
+import statistics
+import subprocess
+from .common import environment
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Local, untracked store of all benchmark runs, one JSON object per line
+HISTORY_FILE = os.path.join(ROOT, '.benchmarks', 'history.jsonl')
+
+# Metrics whose values get better as they grow; all others are times or costs
+HIGHER_IS_BETTER = ('_per_second',)
+
+# Changes smaller than this fraction are never reported
+MIN_CHANGE = 0.05
+
+# A change must also exceed this many times the relative spread of the samples
+NOISE_FACTOR = 3
+
+def cpuModel():
+    """
+    Gets the name of the CPU.
+
+    Returns:
+        str: The model name from ``/proc/cpuinfo``, or what ``platform`` knows elsewhere.
+    """
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+def fingerprint():
+    """
+    Describes the environment a run is measured in.
+
+    Runs are only comparable on the same hardware and versions, so the
+    fingerprint holds the CPU, Python and yt-dlp versions and a short hash
+    over them.
+
+    Returns:
+        dict: ``environment()`` plus 'cpu' and 'hash'.
+    """
+    info = environment()
+    info['cpu'] = cpuModel()
+    key = [info['cpu'], info['cpu_count'], info['machine'], info['implementation'], info['python'], info['yt_dlp']]
+    info['hash'] = hashlib.sha1(json.dumps(key).encode()).hexdigest()[:12]
+    return info
+
+def gitRevision():
+    """
+    Gets the commit the working tree is on.
+
+    Returns:
+        str: Short commit hash with a '+' if there are uncommitted changes, or None outside a git checkout.
+    """
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('+' if dirty else '')
+
+def createRun(suites, metrics, label=None):
+    """
+    Builds a history record for measured metrics.
+
+    Args:
+        suites (list): Names of the suites that ran.
+        metrics (dict): Metric name to its list of samples.
+        label (str, optional): Name to select the run by later, e.g. 'v1.4'.
+
+    Returns:
+        dict: {'id', 'timestamp', 'label', 'git', 'fingerprint', 'suites', 'metrics'}.
+    """
+    now = time.time()
+    return {
+        'id': time.strftime('%Y%m%d-%H%M%S', time.localtime(now)),
+        'timestamp': now,
+        'label': label,
+        'git': gitRevision(),
+        'fingerprint': fingerprint(),
+        'suites': list(suites),
+        'metrics': metrics,
+    }
+
+def loadHistory(path=HISTORY_FILE):
+    """
+    Reads all stored runs.
+
+    Args:
+        path (str): History file (default: HISTORY_FILE).
+
+    Returns:
+        list: Runs, oldest first; empty if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def appendRun(run, path=HISTORY_FILE):
+    """
+    Adds a run to the history file.
+
+    Args:
+        run (dict): Record from ``createRun``.
+        path (str): History file (default: HISTORY_FILE).
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+
+def findBaseline(history, current, selector=None):
+    """
+    Picks the stored run to compare a new run against.
+
+    Args:
+        history (list): Stored runs, oldest first.
+        current (dict): The new run, which is not part of ``history``.
+        selector (str, optional): Run ID or label. Defaults to the latest run
+            with the same fingerprint and at least one suite in common.
+
+    Returns:
+        dict: The baseline run, or None if there is none.
+
+    Raises:
+        ValueError: If no run has the given ID or label.
+    """
+    if selector:
+        for run in reversed(history):
+            if selector in (run['id'], run.get('label')):
+                return run
+        raise ValueError(f"No benchmark run with ID or label '{selector}'")
+    for run in reversed(history):
+        if run['fingerprint']['hash'] == current['fingerprint']['hash'] and set(run['suites']) & set(current['suites']):
+            return run
+    return None
+
+def relativeSpread(samples):
+    """
+    Measures the noise of repeated samples.
+
+    Args:
+        samples (list): Values of one metric.
+
+    Returns:
+        float: Median absolute deviation divided by the median; 0 with fewer than two samples.
+    """
+    if len(samples) < 2:
+        return 0.0
+    median = statistics.median(samples)
+    if not median:
+        return 0.0
+    return statistics.median(abs(value - median) for value in samples) / abs(median)
+
+def compareRuns(baseline, current, min_change=MIN_CHANGE, noise_factor=NOISE_FACTOR):
+    """
+    Compares the metrics of two runs.
+
+    The medians are compared. A difference only counts when it is larger
+    than ``min_change`` and than ``noise_factor`` times the spread of the
+    noisier of the two runs.
+
+    Args:
+        baseline (dict): The baseline run.
+        current (dict): The new run.
+        min_change (float): Smallest relative change reported (default: MIN_CHANGE).
+        noise_factor (float): Multiple of the sample spread a change must exceed (default: NOISE_FACTOR).
+
+    Returns:
+        list: One dict per metric, sorted by name, with 'metric', 'baseline',
+              'current', 'change' (relative, or None), 'threshold' and
+              'verdict': 'regression', 'improvement', 'unchanged', 'new' or 'missing'.
+    """
+    rows = []
+    before, after = baseline['metrics'], current['metrics']
+    shared_suites = set(baseline['suites']) & set(current['suites'])
+    for name in sorted(set(before) | set(after)):
+        if name.split('.')[0] not in shared_suites:
+            continue
+        row = {'metric': name, 'baseline': None, 'current': None, 'change': None, 'threshold': None}
+        if name not in before:
+            row.update(current=statistics.median(after[name]), verdict='new')
+        elif name not in after:
+            row.update(baseline=statistics.median(before[name]), verdict='missing')
+        else:
+            old, new = statistics.median(before[name]), statistics.median(after[name])
+            threshold = max(min_change, noise_factor * max(relativeSpread(before[name]), relativeSpread(after[name])))
+            row.update(baseline=old, current=new, threshold=threshold, verdict='unchanged')
+            if old:
+                change = (new - old) / abs(old)
+                row['change'] = change
+                if abs(change) > threshold:
+                    worse = change < 0 if name.endswith(HIGHER_IS_BETTER) else change > 0
+                    row['verdict'] = 'regression' if worse else 'improvement'
+        rows.append(row)
+    return rows
+
+def formatDiff(rows):
+    """
+    Renders a comparison as a text table.
+
+    Args:
+        rows (list): Result of ``compareRuns``.
+
+    Returns:
+        str: One line per metric below a header.
+    """
+    def number(value):
+        return '-' if value is None else f"{value:.4g}"
+
+    width = max([len(row['metric']) for row in rows] + [len('metric')])
+    lines = [f"{'metric':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}  {'noise':>7}  verdict"]
+    for row in rows:
+        change = '-' if row['change'] is None else f"{row['change'] * 100:+.1f}%"
+        threshold = '-' if row['threshold'] is None else f"±{row['threshold'] * 100:.1f}%"
+        verdict = '' if row['verdict'] == 'unchanged' else row['verdict']
+        lines.append(f"{row['metric']:<{width}}  {number(row['baseline']):>10}  {number(row['current']):>10}  "
+                     f"{change:>8}  {threshold:>7}  {verdict}".rstrip())
+    return "\n".join(lines)
+
+def fingerprintChanges(baseline, current):
+    """
+    Lists how the environments of two runs differ.
+
+    Args:
+        baseline (dict): The baseline run.
+        current (dict): The new run.
+
+    Returns:
+        list: Messages such as "python: 3.11.4 -> 3.12.1".
+    """
+    keys = ('cpu', 'cpu_count', 'machine', 'implementation', 'python', 'yt_dlp')
+    old, new = baseline['fingerprint'], current['fingerprint']
+    return [f"{key}: {old.get(key)} -> {new.get(key)}" for key in keys if old.get(key) != new.get(key)]
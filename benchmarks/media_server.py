@@ -0,0 +1,508 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import threading
+import multiprocessing
+import urllib.request
+from urllib.parse import parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PLUGIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plugins')
+
+# Tells the playlist and channel extractors where the server runs; their
+# youtube.com URLs do not contain it
+SERVER_ENV = 'TUBEHARVESTER_BENCH_SERVER'
+
+# Media bytes repeat this block; they only need to be the right length
+BLOCK = random.Random(0).randbytes(64 * 1024)
+CHUNK_SIZE = 64 * 1024
+
+# IDs carry their sizes, so the server needs no fixture registry:
+# items are '<size>-<tag>', playlists 'PLBENCH<entries>x<tag>' and
+# channels 'UCBENCH<playlists>x<entries>x<tag>'
+ITEM_ID = re.compile(r'(?P<size>\d+)-[\w-]+')
+PLAYLIST_ID = re.compile(r'PLBENCH(?P<entries>\d+)x[\w-]+')
+CHANNEL_ID = re.compile(r'UCBENCH(?P<playlists>\d+)x(?P<entries>\d+)x[\w-]+')
+
+# Entries per listing page, like a YouTube continuation
+PAGE_SIZE = 100
+
+def installExtractor(base_url=None):
+    """
+    Makes yt-dlp use the ``benchmedia`` extractor plugins for server URLs.
+
+    yt-dlp loads plugins from ``sys.path`` once per process, so they are
+    loaded again if that already happened before the plugin path was added.
+
+    Args:
+        base_url (str, optional): Server the playlist and channel extractors list from.
+    """
+    if base_url:
+        os.environ[SERVER_ENV] = base_url
+    if PLUGIN_PATH not in sys.path:
+        sys.path.insert(0, PLUGIN_PATH)
+    from yt_dlp.globals import plugin_ies, all_plugins_loaded
+    from yt_dlp.plugins import load_all_plugins
+    if not all_plugins_loaded.value or 'BenchMediaIE' not in plugin_ies.value:
+        load_all_plugins()
+
+def itemUrl(base_url, size, tag):
+    """
+    Builds the watch URL of a synthetic item.
+
+    Args:
+        base_url (str): URL returned by ``MediaServer.start``.
+        size (int): Size of the item's media file in bytes.
+        tag (str): Makes the ID unique, e.g. the run and item number.
+
+    Returns:
+        str: A URL handled by the ``benchmedia`` extractor.
+    """
+    return f"{base_url}/watch?v={size}-{tag}"
+
+def playlistUrl(entries, tag):
+    """
+    Builds the URL of a synthetic playlist.
+
+    Args:
+        entries (int): Number of videos in the playlist.
+        tag (str): Makes the ID unique.
+
+    Returns:
+        str: A youtube.com playlist URL handled by the ``benchmedia:playlist`` extractor.
+    """
+    return f"https://www.youtube.com/playlist?list=PLBENCH{entries}x{tag}"
+
+def channelUrl(playlists, entries, tag):
+    """
+    Builds the URL of a synthetic channel.
+
+    Args:
+        playlists (int): Number of playlists on the channel.
+        entries (int): Videos per playlist and on the videos tab.
+        tag (str): Makes the ID unique.
+
+    Returns:
+        str: A youtube.com channel URL handled by the ``benchmedia:channel`` extractor.
+    """
+    return f"https://www.youtube.com/channel/UCBENCH{playlists}x{entries}x{tag}"
+
+def entryTitle(index):
+    """
+    Gets the title of a synthetic video.
+
+    Titles contain characters that ``sanitizeFilename`` removes, so the
+    benchmarks pay for a realistic amount of sanitizing.
+
+    Args:
+        index (int): Position of the video in its list.
+
+    Returns:
+        str: The title.
+    """
+    return f"Vid\u00e9o {index}: \"Part {index % 10}\" <live>? | mix/{index % 7} \u2013 final"
+
+def videoEntry(video_id, index):
+    """
+    Builds a flat playlist entry the way the YouTube extractors return it.
+
+    Args:
+        video_id (str): The video ID.
+        index (int): Position of the video in its list.
+
+    Returns:
+        dict: A yt-dlp 'url' result.
+    """
+    return {
+        '_type': 'url',
+        'ie_key': 'Youtube',
+        'id': video_id,
+        'url': f"https://www.youtube.com/watch?v={video_id}",
+        'title': entryTitle(index),
+        'duration': 60 + index % 600,
+    }
+
+def listingPage(list_id, title, count, page, entry, channel=None):
+    """
+    Cuts one page out of a listing.
+
+    Args:
+        list_id (str): ID of the playlist or channel.
+        title (str): Title of the listing.
+        count (int): Number of entries in the listing.
+        page (int): Page number, starting at 0.
+        entry (callable): Called with a position; returns the entry there.
+        channel (str, optional): Channel name reported with the listing.
+
+    Returns:
+        dict: {'id', 'title', 'channel', 'entries', 'next'}; 'next' is True while more pages follow.
+    """
+    start = page * PAGE_SIZE
+    return {
+        'id': list_id,
+        'title': title,
+        'channel': channel,
+        'entries': [entry(index) for index in range(start, min(start + PAGE_SIZE, count))],
+        'next': start + PAGE_SIZE < count,
+    }
+
+def playlistPage(list_id, page):
+    """
+    Gets one page of a synthetic playlist.
+
+    Args:
+        list_id (str): A 'PLBENCH<entries>x<tag>' playlist ID.
+        page (int): Page number, starting at 0.
+
+    Returns:
+        dict: See ``listingPage``, or None if the ID is not a benchmark playlist.
+    """
+    match = PLAYLIST_ID.fullmatch(list_id)
+    if not match:
+        return None
+    return listingPage(list_id, f"Playlist {list_id}", int(match.group('entries')), page,
+                       lambda index: videoEntry(f"{list_id}-{index}", index))
+
+def channelPage(channel_id, tab, page):
+    """
+    Gets one page of a tab of a synthetic channel.
+
+    The home tab links to the videos tab, the playlists tab lists the
+    channel's playlists and the videos tab its uploads.
+
+    Args:
+        channel_id (str): A 'UCBENCH<playlists>x<entries>x<tag>' channel ID.
+        tab (str): 'home', 'playlists' or 'videos'.
+        page (int): Page number, starting at 0.
+
+    Returns:
+        dict: See ``listingPage``, or None if the ID or tab is unknown.
+    """
+    match = CHANNEL_ID.fullmatch(channel_id)
+    if not match or tab not in ('home', 'playlists', 'videos'):
+        return None
+    playlists, entries = int(match.group('playlists')), int(match.group('entries'))
+    name = f"Benchmark channel {channel_id}"
+    channel_url = f"https://www.youtube.com/channel/{channel_id}"
+    if tab == 'home':
+        return listingPage(channel_id, name, 1, page, lambda index: {
+            '_type': 'url', 'ie_key': 'YoutubeTab', 'url': f"{channel_url}/videos", 'title': f"{name} - Videos"
+        }, name)
+    if tab == 'playlists':
+        tag = channel_id[len('UCBENCH'):]
+        return listingPage(channel_id, f"{name} - Playlists", playlists, page, lambda index: {
+            '_type': 'url',
+            'ie_key': 'YoutubeTab',
+            'id': f"PLBENCH{entries}x{tag}-{index}",
+            'url': f"https://www.youtube.com/playlist?list=PLBENCH{entries}x{tag}-{index}",
+            'title': f"Playlist {index}",
+        }, name)
+    return listingPage(channel_id, f"{name} - Videos", entries, page,
+                       lambda index: videoEntry(f"{channel_id}-{index}", index), name)
+
+def parseSize(text):
+    """
+    Parses a byte size with an optional K, M or G suffix (powers of 1024).
+
+    Args:
+        text (str): E.g. '512K', '16M' or '1048576'.
+
+    Returns:
+        int: The size in bytes.
+
+    Raises:
+        ValueError: If the text is not a size.
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*', text, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    exponent = ' KMG'.index(match.group(2).upper() or ' ')
+    return int(float(match.group(1)) * 1024 ** exponent)
+
+class TokenBucket:
+    """
+    Paces a byte stream to a fixed rate.
+
+    Each caller reserves the time its bytes take at the configured rate and
+    sleeps until then, so a bucket shared by several connections limits
+    their total rate.
+    """
+
+    def __init__(self, rate):
+        """
+        Initializes the TokenBucket.
+
+        Args:
+            rate (float): Bytes per second.
+        """
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.next_free = time.monotonic()
+
+    def take(self, size):
+        """
+        Waits until ``size`` more bytes may be sent.
+
+        Args:
+            size (int): Number of bytes about to be sent.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.next_free = max(now, self.next_free) + size / self.rate
+            delay = self.next_free - now
+        if delay > 0:
+            time.sleep(delay)
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves item info, media bytes with Range support, listing pages and request counters.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """
+        Answers a GET request.
+        """
+        self.handleRequest(send_body=True)
+
+    def do_HEAD(self):
+        """
+        Answers a HEAD request with the headers of the matching GET.
+        """
+        self.handleRequest(send_body=False)
+
+    def log_message(self, format, *args):
+        """
+        Keeps request logging off stderr.
+        """
+
+    def handleRequest(self, send_body):
+        """
+        Routes a request to the info, media, listing or stats response.
+
+        Args:
+            send_body (bool): False for HEAD requests.
+        """
+        server = self.server
+        path, _, query = self.path.partition('?')
+        if path == '/stats':
+            self.sendJson(dict(server.stats), send_body)
+            return
+
+        if server.latency:
+            time.sleep(server.latency)
+        params = parse_qs(query)
+        page = int(params.get('page', ['0'])[0])
+        match = re.fullmatch(r'/(info|media|playlist|channel)/([\w-]+)\.(?:json|mp4)', path)
+        kind = match.group(1) if match else None
+        if kind in ('info', 'media'):
+            item = ITEM_ID.fullmatch(match.group(2))
+            data = item and int(item.group('size'))
+        elif kind == 'playlist':
+            data = playlistPage(match.group(2), page)
+        elif kind == 'channel':
+            data = channelPage(match.group(2), params.get('tab', ['home'])[0], page)
+        else:
+            data = None
+        if not data:
+            self.send_error(404)
+            return
+
+        with server.stats_lock:
+            server.stats[f"{kind}_requests"] += 1
+        if kind == 'media':
+            self.sendMedia(data, send_body)
+        elif kind == 'info':
+            self.sendJson(self.itemInfo(match.group(2), data), send_body)
+        else:
+            self.sendJson(data, send_body)
+
+    def itemInfo(self, video_id, size):
+        """
+        Builds the info of an item as an extractor would return it.
+
+        Args:
+            video_id (str): The item ID.
+            size (int): Size of the media file in bytes.
+
+        Returns:
+            dict: Info with one muxed MP4 format.
+        """
+        base = f"http://{self.headers['Host']}"
+        return {
+            'id': video_id,
+            'title': f"Benchmark item {video_id}",
+            'duration': 60,
+            'formats': [{
+                'format_id': '22',
+                'url': f"{base}/media/{video_id}.mp4",
+                'ext': 'mp4',
+                'vcodec': 'avc1.64001F',
+                'acodec': 'mp4a.40.2',
+                'width': 1280,
+                'height': 720,
+                'filesize': size,
+            }],
+        }
+
+    def sendJson(self, data, send_body):
+        """
+        Sends a JSON response.
+
+        Args:
+            data (dict): The response data.
+            send_body (bool): False for HEAD requests.
+        """
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def sendMedia(self, size, send_body):
+        """
+        Sends the media bytes of an item, or the requested range of them.
+
+        Args:
+            size (int): Size of the media file in bytes.
+            send_body (bool): False for HEAD requests.
+        """
+        start, end = 0, size - 1
+        range_header = self.headers.get('Range')
+        if range_header:
+            match = re.fullmatch(r'bytes=(\d*)-(\d*)', range_header.strip())
+            if not match or not match.group(1) or int(match.group(1)) >= size:
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{size}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(end, int(match.group(2)))
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        if not send_body:
+            return
+
+        connection = TokenBucket(self.server.rate) if self.server.rate else None
+        position = start
+        while position <= end:
+            offset = position % len(BLOCK)
+            chunk = BLOCK[offset:offset + min(CHUNK_SIZE, end + 1 - position)]
+            if connection:
+                connection.take(len(chunk))
+            if self.server.link:
+                self.server.link.take(len(chunk))
+            # Count before writing, so the client never sees bytes the stats do not include yet
+            with self.server.stats_lock:
+                self.server.stats['bytes_sent'] += len(chunk)
+            try:
+                self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                with self.server.stats_lock:
+                    self.server.stats['bytes_sent'] -= len(chunk)
+                return
+            position += len(chunk)
+
+def serveMedia(connection, latency, rate, link_rate):
+    """
+    Runs the media server until the process is terminated.
+
+    Args:
+        connection (multiprocessing.connection.Connection): Receives the bound port.
+        latency (float): Seconds added before every info and media response.
+        rate (float): Bytes per second per connection, or None for unlimited.
+        link_rate (float): Bytes per second over all connections, or None for unlimited.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MediaRequestHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.rate = rate
+    server.link = TokenBucket(link_rate) if link_rate else None
+    server.stats = {'info_requests': 0, 'media_requests': 0, 'playlist_requests': 0, 'channel_requests': 0, 'bytes_sent': 0}
+    server.stats_lock = threading.Lock()
+    connection.send(server.server_address[1])
+    server.serve_forever()
+
+class MediaServer:
+    """
+    Local HTTP stand-in for YouTube serving synthetic benchmark items.
+
+    The server runs in a child process so its CPU time and memory are not
+    counted as the downloader's. Every item is one muxed MP4 format whose
+    size is part of its ID. Playlists and channel tabs are served as pages
+    of flat entries. Responses can be slowed down by a fixed latency,
+    a per-connection rate and a rate shared by all connections.
+    """
+
+    def __init__(self, latency=0, rate=None, link_rate=None):
+        """
+        Initializes the MediaServer.
+
+        Args:
+            latency (float): Seconds added before every info and media response (default: 0).
+            rate (float, optional): Bytes per second per connection. Unlimited by default.
+            link_rate (float, optional): Bytes per second over all connections. Unlimited by default.
+        """
+        self.latency = latency
+        self.rate = rate
+        self.link_rate = link_rate
+        self.process = None
+        self.base_url = None
+
+    def start(self):
+        """
+        Starts the server process.
+
+        Returns:
+            str: The base URL, e.g. 'http://127.0.0.1:40123'.
+        """
+        context = multiprocessing.get_context('spawn')
+        receiver, sender = context.Pipe(duplex=False)
+        self.process = context.Process(target=serveMedia, args=(sender, self.latency, self.rate, self.link_rate), daemon=True)
+        self.process.start()
+        if not receiver.poll(30):
+            self.stop()
+            raise RuntimeError("Media server did not start")
+        self.base_url = f"http://127.0.0.1:{receiver.recv()}"
+        return self.base_url
+
+    def stats(self):
+        """
+        Gets the request counters of the server.
+
+        Returns:
+            dict: Requests per kind ('info', 'media', 'playlist' and 'channel'
+                  '_requests') and 'bytes_sent' of media.
+        """
+        with urllib.request.urlopen(f"{self.base_url}/stats", timeout=10) as response:
+            return json.load(response)
+
+    def stop(self):
+        """
+        Terminates the server process.
+        """
+        if self.process:
+            self.process.terminate()
+            self.process.join(5)
+            self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,64 @@
+"""
+yt-dlp extractor plugins for the benchmark media server.
+
+yt-dlp loads them when ``benchmarks/plugins`` is on ``sys.path``; see
+``benchmarks.media_server.installExtractor``. Plugin extractors are tried
+before the built-in ones, so the playlist and channel extractors take over
+youtube.com URLs whose IDs start with PLBENCH or UCBENCH.
+"""
+import os
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils import ExtractorError
+
+SERVER_ENV = 'TUBEHARVESTER_BENCH_SERVER'
+
+
+class BenchMediaIE(InfoExtractor):
+    IE_NAME = 'benchmedia'
+    IE_DESC = False
+    _VALID_URL = r'(?P<base>http://127\.0\.0\.1:\d+)/watch\?v=(?P<id>[\w-]+)'
+
+    def _real_extract(self, url):
+        base, video_id = self._match_valid_url(url).group('base', 'id')
+        # One request per item, like the watch page fetch of a real extraction
+        return self._download_json(f'{base}/info/{video_id}.json', video_id)
+
+
+class _BenchListingIE(InfoExtractor):
+    def _listing(self, path, list_id, query):
+        server = os.environ.get(SERVER_ENV)
+        if not server:
+            raise ExtractorError(f'{SERVER_ENV} is not set', expected=True)
+        first = self._download_json(f'{server}/{path}', list_id, query=dict(query, page=0))
+
+        def entries():
+            # Later pages are fetched while the entries are consumed, like YouTube continuations
+            data, page = first, 0
+            while True:
+                yield from data['entries']
+                if not data['next']:
+                    return
+                page += 1
+                data = self._download_json(f'{server}/{path}', list_id, note=False, query=dict(query, page=page))
+
+        return self.playlist_result(entries(), list_id, first['title'], channel=first['channel'])
+
+
+class BenchPlaylistIE(_BenchListingIE):
+    IE_NAME = 'benchmedia:playlist'
+    IE_DESC = False
+    _VALID_URL = r'https?://(?:www\.)?youtube\.com/playlist\?list=(?P<id>PLBENCH[\w-]+)'
+
+    def _real_extract(self, url):
+        list_id = self._match_id(url)
+        return self._listing(f'playlist/{list_id}.json', list_id, {})
+
+
+class BenchChannelIE(_BenchListingIE):
+    IE_NAME = 'benchmedia:channel'
+    IE_DESC = False
+    _VALID_URL = r'https?://(?:www\.)?youtube\.com/channel/(?P<id>UCBENCH[\w-]+)(?:/(?P<tab>playlists|videos))?/?$'
+
+    def _real_extract(self, url):
+        channel_id, tab = self._match_valid_url(url).group('id', 'tab')
+        return self._listing(f'channel/{channel_id}.json', channel_id, {'tab': tab or 'home'})
@@ -0,0 +1,459 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import threading
+import contextlib
+import subprocess
+from unittest.mock import patch
+from .common import summarize, environment, writeReport
+
+# Milliseconds between two probes of the main loop
+PROBE_INTERVAL = 10
+
+# A probe arriving this much later than scheduled counts as a frozen window
+STALL_MS = 100
+
+# Limits checked by ``checkThresholds``, in milliseconds
+THRESHOLDS = {
+    'jitter_p99_ms': 50,
+    'max_stall_ms': 250,
+    'frame_p99_ms': 25,
+}
+
+class FakeBatchDownloader:
+    """
+    Stands in for ``BatchDownloader`` and floods the GUI callbacks.
+
+    Every worker thread sends log lines, progress percentages and transfer
+    stats at a fixed rate, like many yt-dlp progress hooks would, but
+    downloads nothing.
+    """
+
+    def __init__(self, threads=8, line_rate=200, duration=10.0, progress_callback=None,
+                 log_callback=None, stats_callback=None, **options):
+        """
+        Initializes the FakeBatchDownloader.
+
+        Args:
+            threads (int): Worker threads sending updates (default: 8).
+            line_rate (float): Log lines per second and thread; each line comes with a progress and stats update (default: 200).
+            duration (float): Seconds the batch runs (default: 10.0).
+            progress_callback (callable, optional): Called with overall progress percentage.
+            log_callback (callable, optional): Called with log messages.
+            stats_callback (callable, optional): Called with a ``ProgressAggregator`` style snapshot.
+            **options: Other ``BatchDownloader`` arguments, ignored.
+        """
+        self.threads = threads
+        self.line_rate = line_rate
+        self.duration = duration
+        self.progress_callback = progress_callback
+        self.log_callback = log_callback
+        self.stats_callback = stats_callback
+        self.cancel_event = threading.Event()
+        self.finished = threading.Event()
+        self.lines_sent = 0
+        self.lock = threading.Lock()
+
+    def work(self, worker, total_items, started):
+        """
+        Sends updates until the batch time is over or it is cancelled.
+
+        Args:
+            worker (int): Number of the thread, used in the log lines.
+            total_items (int): Items in the batch.
+            started (float): ``time.monotonic`` value at the start of the batch.
+        """
+        pause = 1 / self.line_rate
+        sent = 0
+        while not self.cancel_event.is_set():
+            elapsed = time.monotonic() - started
+            if elapsed >= self.duration:
+                break
+            fraction = elapsed / self.duration
+            item = int(fraction * total_items)
+            if self.log_callback:
+                self.log_callback(f"[worker {worker}] item {item + 1}/{total_items}: "
+                                  f"{fraction * 100:5.1f}% of 48.20MiB at 3.14MiB/s ETA 00:{59 - sent % 60:02d}")
+            if self.progress_callback:
+                self.progress_callback(int(fraction * 100))
+            if self.stats_callback:
+                self.stats_callback({
+                    'percent': fraction * 100,
+                    'done_bytes': int(fraction * total_items * 48 * 1024 ** 2),
+                    'total_bytes': total_items * 48 * 1024 ** 2,
+                    'speed': 3.14 * 1024 ** 2 * self.threads,
+                    'eta': self.duration - elapsed,
+                    'done_items': item,
+                    'total_items': total_items,
+                })
+            sent += 1
+            self.cancel_event.wait(pause)
+        with self.lock:
+            self.lines_sent += sent
+
+    def downloadBatch(self, video_list, format_type, base_path, quality="highest"):
+        """
+        Runs the worker threads and reports every item as downloaded.
+
+        Args:
+            video_list (list): Items of the batch; only their number is used.
+            format_type (str): Ignored.
+            base_path (str): Ignored.
+            quality (str): Ignored.
+
+        Returns:
+            dict: Results in the ``BatchDownloader.downloadBatch`` format.
+        """
+        started = time.monotonic()
+        workers = [threading.Thread(target=self.work, args=(index, len(video_list), started), daemon=True)
+                   for index in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.finished.set()
+        return {'successful': len(video_list), 'failed': 0, 'bytes': 0, 'skipped_bytes': 0, 'errors': [], 'error_kinds': {}}
+
+    def cancelDownload(self):
+        """
+        Stops the worker threads.
+        """
+        self.cancel_event.set()
+
+class FakePlaylistScraper:
+    """
+    Stands in for ``PlaylistScraper`` and returns a synthetic playlist at once.
+    """
+
+    def __init__(self, videos=500, **options):
+        """
+        Initializes the FakePlaylistScraper.
+
+        Args:
+            videos (int): Entries in the playlist (default: 500).
+            **options: Other ``PlaylistScraper`` arguments, ignored.
+        """
+        self.videos = videos
+
+    def scrapePlaylist(self, playlist_url, max_videos=200, progress_callback=None):
+        """
+        Lists the synthetic playlist, reporting progress for every entry.
+
+        Args:
+            playlist_url (str): Ignored.
+            max_videos (int): Maximum number of videos to return.
+            progress_callback (callable, optional): Called with (current, total, percentage).
+
+        Returns:
+            list: Video entries with 'url', 'title' and 'duration'.
+        """
+        count = min(self.videos, max_videos)
+        videos = []
+        for index in range(count):
+            videos.append({'url': f"https://www.youtube.com/watch?v=bench{index:06d}",
+                           'title': f"Benchmark video {index}", 'duration': 60})
+            if progress_callback:
+                progress_callback(index + 1, count, int((index + 1) / count * 100))
+        return videos
+
+    def getPlaylistTitle(self, playlist_url):
+        """
+        Gets the title of the synthetic playlist.
+
+        Args:
+            playlist_url (str): Ignored.
+
+        Returns:
+            str: The title.
+        """
+        return "Responsiveness benchmark"
+
+def summarizeProbe(gaps, interval=PROBE_INTERVAL, stall_ms=STALL_MS):
+    """
+    Turns the gaps between main-loop probes into jitter and stall figures.
+
+    Args:
+        gaps (list): Milliseconds between consecutive probes.
+        interval (float): Milliseconds the probes were scheduled apart (default: PROBE_INTERVAL).
+        stall_ms (float): Lateness from which a probe counts as a stall (default: STALL_MS).
+
+    Returns:
+        dict: {'jitter_ms': latency summary of the lateness, 'stalls': {'count', 'total_ms', 'max_ms'}}.
+    """
+    lateness = [max(0.0, gap - interval) for gap in gaps]
+    stalls = [late for late in lateness if late >= stall_ms]
+    return {
+        'jitter_ms': summarize(lateness, digits=2),
+        'stalls': {
+            'count': len(stalls),
+            'total_ms': round(sum(stalls), 1),
+            'max_ms': round(max(lateness), 1) if lateness else 0.0,
+        },
+    }
+
+class LoopProbe:
+    """
+    Measures how late the Tk main loop runs its ``after`` callbacks.
+
+    The probe reschedules itself every ``interval`` milliseconds and records
+    the time between two runs. While the main loop is busy, e.g. writing log
+    lines, the next probe runs late by the same amount the window stays
+    unresponsive. Every tenth probe also counts the lines of the log widget.
+    """
+
+    def __init__(self, master, log_widget=None, interval=PROBE_INTERVAL):
+        """
+        Initializes the LoopProbe.
+
+        Args:
+            master: Widget whose ``after`` schedules the probe.
+            log_widget (tk.Text, optional): Widget whose line count is sampled.
+            interval (int): Milliseconds between two probes (default: PROBE_INTERVAL).
+        """
+        self.master = master
+        self.log_widget = log_widget
+        self.interval = interval
+        self.gaps = []
+        self.widget_lines = []
+        self.last = None
+        self.after_id = None
+
+    def start(self):
+        """
+        Schedules the first probe.
+        """
+        self.last = time.perf_counter()
+        self.after_id = self.master.after(self.interval, self.tick)
+
+    def stop(self):
+        """
+        Cancels the scheduled probe.
+        """
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+
+    def tick(self):
+        """
+        Records the gap since the previous probe and schedules the next one.
+        """
+        now = time.perf_counter()
+        self.gaps.append((now - self.last) * 1000)
+        self.last = now
+        if self.log_widget is not None and len(self.gaps) % 10 == 0:
+            self.widget_lines.append(int(self.log_widget.index('end-1c').split('.')[0]) - 1)
+        self.after_id = self.master.after(self.interval, self.tick)
+
+def timeFrames(pump):
+    """
+    Wraps the frame of a ``UiEventPump`` so the time of every frame is recorded.
+
+    Args:
+        pump (UiEventPump): The pump of a panel.
+
+    Returns:
+        list: Filled with the milliseconds each frame takes.
+    """
+    frames = []
+    apply = pump.pump
+
+    def timed():
+        started = time.perf_counter()
+        try:
+            apply()
+        finally:
+            frames.append((time.perf_counter() - started) * 1000)
+
+    pump.pump = timed
+    return frames
+
+@contextlib.contextmanager
+def virtualDisplay():
+    """
+    Provides an X display, starting Xvfb if none is set.
+
+    Does nothing on Windows and macOS or if ``DISPLAY`` is already set, e.g.
+    under ``xvfb-run``.
+
+    Raises:
+        RuntimeError: If there is no display and Xvfb is not installed.
+    """
+    if os.name != 'posix' or sys.platform == 'darwin' or os.environ.get('DISPLAY'):
+        yield
+        return
+    xvfb = shutil.which('Xvfb')
+    if not xvfb:
+        raise RuntimeError("No display found; install Xvfb or run under xvfb-run")
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen([xvfb, '-displayfd', str(write_fd), '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'],
+                              pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    try:
+        with os.fdopen(read_fd) as pipe:
+            display = pipe.readline().strip()
+        if not display:
+            raise RuntimeError("Xvfb did not start")
+        os.environ['DISPLAY'] = f":{display}"
+        yield
+    finally:
+        os.environ.pop('DISPLAY', None)
+        server.terminate()
+        server.wait()
+
+def runScenario(threads=8, line_rate=200, duration=10.0, videos=500, timeout=60.0):
+    """
+    Runs a playlist batch through the real GUI with fake scraping and downloads.
+
+    Builds ``YouTubeDownloaderGUI``, starts a playlist download on the batch
+    panel and lets ``FakeBatchDownloader`` flood it with updates while the
+    main loop is probed. Needs a display; see ``virtualDisplay``.
+
+    Args:
+        threads (int): Worker threads of the fake downloader (default: 8).
+        line_rate (float): Log lines per second and thread (default: 200).
+        duration (float): Seconds the fake batch runs (default: 10.0).
+        videos (int): Entries of the fake playlist (default: 500).
+        timeout (float): Seconds after ``duration`` before the run is abandoned (default: 60.0).
+
+    Returns:
+        dict: Report with the environment, the configuration, main-loop jitter,
+              stalls, pump frame times and the growth of the log widget.
+    """
+    import tkinter as tk
+    from src.GUI import YouTubeDownloaderGUI
+
+    downloaders = []
+
+    def createDownloader(**options):
+        downloader = FakeBatchDownloader(threads, line_rate, duration, **options)
+        downloaders.append(downloader)
+        return downloader
+
+    root = tk.Tk()
+    with patch('src.BatchDownloader.BatchDownloader', createDownloader), \
+         patch('src.PlaylistScraper.PlaylistScraper', lambda **options: FakePlaylistScraper(videos, **options)):
+        app = YouTubeDownloaderGUI(root)
+        panel = app.batch_panel
+        app.notebook.select(app.batch_tab)
+        panel.url_entry.insert(0, "https://www.youtube.com/playlist?list=PLresponsiveness")
+        panel.mode_var.set("Playlist Download")
+        panel.max_videos_var.set(str(videos))
+        frames = timeFrames(panel.pump)
+        probe = LoopProbe(root, panel.message_screen)
+        timed_out = []
+        deadline = time.monotonic() + duration + timeout
+
+        def checkFinished():
+            done = downloaders and downloaders[0].finished.is_set() and str(panel.download_button['state']) == tk.NORMAL
+            if done or time.monotonic() > deadline:
+                if not done:
+                    timed_out.append(True)
+                    panel.cancelDownload()
+                probe.stop()
+                root.quit()
+            else:
+                root.after(100, checkFinished)
+
+        def begin():
+            probe.start()
+            panel.startBatchDownload()
+            root.after(100, checkFinished)
+
+        root.update()
+        root.after(0, begin)
+        root.mainloop()
+        widget_lines = int(panel.message_screen.index('end-1c').split('.')[0]) - 1
+        max_lines = panel.pump.max_lines
+    root.destroy()
+
+    return {
+        'benchmark': 'responsiveness',
+        'environment': environment(),
+        'config': {
+            'threads': threads,
+            'line_rate': line_rate,
+            'duration_seconds': duration,
+            'videos': videos,
+            'probe_interval_ms': PROBE_INTERVAL,
+            'pump_interval_ms': panel.pump.interval,
+        },
+        **summarizeProbe(probe.gaps),
+        'frames_ms': summarize(frames, digits=2),
+        'log': {
+            'lines_sent': sum(downloader.lines_sent for downloader in downloaders),
+            'widget_lines_max': max(probe.widget_lines + [widget_lines]),
+            'widget_lines_final': widget_lines,
+            'max_lines': max_lines,
+        },
+        'timed_out': bool(timed_out),
+    }
+
+def checkThresholds(report, thresholds=THRESHOLDS):
+    """
+    Checks a report against the latency limits and the log widget size.
+
+    Args:
+        report (dict): Result of ``runScenario``.
+        thresholds (dict): Limits in milliseconds, keyed like ``THRESHOLDS``.
+
+    Returns:
+        list: Violation messages, empty if the GUI stayed responsive.
+    """
+    problems = []
+    if report['timed_out']:
+        problems.append("the batch did not finish in time")
+    jitter = report['jitter_ms']['p99'] or 0
+    if jitter > thresholds['jitter_p99_ms']:
+        problems.append(f"p99 main-loop jitter is {jitter:.1f} ms, limit is {thresholds['jitter_p99_ms']} ms")
+    stall = report['stalls']['max_ms']
+    if stall > thresholds['max_stall_ms']:
+        problems.append(f"the longest stall is {stall:.1f} ms, limit is {thresholds['max_stall_ms']} ms")
+    frame = report['frames_ms']['p99'] or 0
+    if frame > thresholds['frame_p99_ms']:
+        problems.append(f"p99 pump frame takes {frame:.1f} ms, limit is {thresholds['frame_p99_ms']} ms")
+    log = report['log']
+    if log['widget_lines_max'] > log['max_lines']:
+        problems.append(f"the log widget grew to {log['widget_lines_max']} lines, limit is {log['max_lines']}")
+    return problems
+
+def main(argv=None):
+    """
+    Command line entry point of the GUI responsiveness benchmark.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to ``sys.argv``.
+
+    Returns:
+        int: Exit status, 1 if a threshold is exceeded.
+    """
+    parser = argparse.ArgumentParser(description="Measure Tk main-loop latency while a batch floods the GUI with updates.")
+    parser.add_argument('--threads', type=int, default=8, help="Threads sending updates (default: 8)")
+    parser.add_argument('--rate', type=float, default=200, help="Log lines per second and thread (default: 200)")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds the batch runs (default: 10)")
+    parser.add_argument('--videos', type=int, default=500, help="Entries of the fake playlist (default: 500)")
+    parser.add_argument('--max-jitter', type=float, default=THRESHOLDS['jitter_p99_ms'],
+                        help=f"Allowed p99 main-loop jitter in ms (default: {THRESHOLDS['jitter_p99_ms']})")
+    parser.add_argument('--max-stall', type=float, default=THRESHOLDS['max_stall_ms'],
+                        help=f"Allowed longest stall in ms (default: {THRESHOLDS['max_stall_ms']})")
+    parser.add_argument('--max-frame', type=float, default=THRESHOLDS['frame_p99_ms'],
+                        help=f"Allowed p99 pump frame time in ms (default: {THRESHOLDS['frame_p99_ms']})")
+    parser.add_argument('-o', '--output', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    with virtualDisplay():
+        report = runScenario(args.threads, args.rate, args.duration, args.videos)
+    problems = checkThresholds(report, {
+        'jitter_p99_ms': args.max_jitter,
+        'max_stall_ms': args.max_stall,
+        'frame_p99_ms': args.max_frame,
+    })
+    report['problems'] = problems
+    writeReport(report, args.output)
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,225 @@
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+from .common import cpuSeconds, environment, writeReport, isolatedRun, RssSampler
+from .media_server import MediaServer, installExtractor, playlistUrl, channelUrl, entryTitle
+
+# The scrapers' default pause between entries, used to report the sleep time they would add
+DEFAULT_TIMEOUT = 2.0
+
+class SleepCounter:
+    """
+    Stands in for ``time.sleep`` and counts the pauses taken.
+    """
+
+    def __init__(self):
+        """
+        Initializes the SleepCounter.
+        """
+        self.calls = 0
+        self.sleep = time.sleep
+
+    def __call__(self, seconds):
+        """
+        Counts a pause and sleeps for it.
+
+        Args:
+            seconds (float): The requested pause.
+        """
+        self.calls += 1
+        self.sleep(seconds)
+
+def measureScrape(server, scrape, entries, trace_memory=False):
+    """
+    Runs one scraping path and measures it.
+
+    The path runs once for time, CPU, requests, callbacks and the growth of
+    the resident memory. With ``trace_memory`` it runs once more under
+    ``tracemalloc`` for its peak Python allocations; tracing slows it down
+    several times, so it is not part of the timed run.
+
+    Args:
+        server (MediaServer): The running media server.
+        scrape (callable): Called with a progress callback; runs the scraper and returns its result.
+        entries (int): Entries the path lists, used for the per-entry cost.
+        trace_memory (bool): Whether to measure the peak Python allocations (default: False).
+
+    Returns:
+        dict: Wall and CPU time, per-entry cost, listing requests, progress and sleep calls and memory.
+    """
+    progress_calls = []
+    sleeps = SleepCounter()
+    work_dir = tempfile.mkdtemp(prefix='tubeharvester-bench-')
+    try:
+        with isolatedRun(work_dir), patch('time.sleep', sleeps):
+            requests_before = server.stats()
+            cpu_before = cpuSeconds()
+            started = time.perf_counter()
+            with RssSampler() as rss:
+                result = scrape(lambda current, total, percentage: progress_calls.append(percentage))
+            wall = time.perf_counter() - started
+            cpu = cpuSeconds() - cpu_before
+            sleep_calls = sleeps.calls
+            requests_after = server.stats()
+
+            peak_traced = None
+            if trace_memory:
+                tracemalloc.start()
+                scrape(None)
+                peak_traced = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if isinstance(result, dict):
+        returned = sum(len(playlist['videos']) for playlist in result['playlists']) + len(result['standalone_videos'])
+    else:
+        returned = len(result) if isinstance(result, list) else None
+    rss_growth = rss.growthBytes()
+    return {
+        'entries': entries,
+        'returned': returned,
+        'wall_seconds': round(wall, 3),
+        'per_entry_us': round(wall / entries * 1e6, 1),
+        'cpu_seconds': round(cpu, 3),
+        'requests': sum(requests_after[kind] - requests_before[kind] for kind in ('playlist_requests', 'channel_requests')),
+        'progress_calls': len(progress_calls),
+        'sleep_calls': sleep_calls,
+        'sleep_seconds_at_default_timeout': sleep_calls * DEFAULT_TIMEOUT,
+        'rss_growth_mb': round(rss_growth / 1e6, 1) if rss_growth is not None else None,
+        'peak_traced_mb': round(peak_traced / 1e6, 1) if peak_traced is not None else None,
+    }
+
+def sanitizeCost(count=10000):
+    """
+    Measures ``sanitizeFilename`` on the synthetic titles.
+
+    Args:
+        count (int): Titles to sanitize (default: 10000).
+
+    Returns:
+        float: Microseconds per title.
+    """
+    from src.utils import sanitizeFilename
+    titles = [entryTitle(index) for index in range(count)]
+    started = time.perf_counter()
+    for title in titles:
+        sanitizeFilename(title)
+    return round((time.perf_counter() - started) / count * 1e6, 2)
+
+def runSuite(playlist_sizes, channel_shapes, latency=0, trace_memory=False, log=None):
+    """
+    Measures every scraping path on synthetic playlists and channels.
+
+    The scrapers run with a timeout of 0, so the report shows their own
+    overhead; ``sleep_seconds_at_default_timeout`` gives the pauses the
+    default timeout would add on top.
+
+    Args:
+        playlist_sizes (list): Entry counts of the playlists.
+        channel_shapes (list): (playlists, entries) pairs of the channels; the videos tab has ``entries`` videos.
+        latency (float): Seconds added to every server response (default: 0).
+        trace_memory (bool): Whether to measure the peak Python allocations of each path (default: False).
+        log (callable, optional): Called with one summary line per finished case.
+
+    Returns:
+        dict: Report with the environment, the configuration and one entry per case.
+    """
+    from src.PlaylistScraper import PlaylistScraper
+    from src.ChannelScraper import ChannelScraper
+
+    cases = []
+    with MediaServer(latency) as server:
+        installExtractor(server.base_url)
+
+        def record(path, shape, measurement):
+            case = dict(path=path, shape=shape, **measurement)
+            cases.append(case)
+            if log:
+                log(f"{path:<15} {shape:>12}  {case['wall_seconds']:>8.2f}s  {case['per_entry_us']:>8.1f} us/entry  "
+                    f"{case['requests']:>5} requests  RSS +{case['rss_growth_mb'] or 0:.1f} MB")
+
+        for size in playlist_sizes:
+            url = playlistUrl(size, f"p{size}")
+            scraper = PlaylistScraper(timeout=0)
+            record('playlist', str(size), measureScrape(
+                server, lambda progress: scraper.scrapePlaylist(url, size, progress), size, trace_memory))
+            record('playlist_title', str(size), measureScrape(
+                server, lambda progress: scraper.getPlaylistTitle(url), size, trace_memory))
+
+        for playlists, entries in channel_shapes:
+            url = channelUrl(playlists, entries, f"c{playlists}x{entries}")
+            scraper = ChannelScraper(timeout=0)
+            record('channel', f"{playlists}x{entries}", measureScrape(
+                server, lambda progress: scraper.scrapeChannel(url, entries, progress),
+                playlists * entries + entries, trace_memory))
+
+    return {
+        'benchmark': 'scraping',
+        'environment': environment(),
+        'config': {
+            'latency_seconds': latency,
+            'trace_memory': trace_memory,
+            'default_timeout': DEFAULT_TIMEOUT,
+        },
+        'sanitize_us_per_title': sanitizeCost(),
+        'cases': cases,
+    }
+
+def parseShape(text):
+    """
+    Parses a channel shape.
+
+    Args:
+        text (str): '<playlists>x<entries>', e.g. '20x500'.
+
+    Returns:
+        tuple: (playlists, entries).
+
+    Raises:
+        argparse.ArgumentTypeError: If the text is not a shape.
+    """
+    try:
+        playlists, entries = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid channel shape: {text}")
+    return playlists, entries
+
+def main(argv=None):
+    """
+    Command line entry point of the scraping benchmark.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to ``sys.argv``.
+
+    Returns:
+        int: Exit status, 1 if a path returned fewer entries than it lists.
+    """
+    parser = argparse.ArgumentParser(description="Measure PlaylistScraper and ChannelScraper on synthetic listings.")
+    parser.add_argument('--playlists', default='1000,10000,100000',
+                        help="Comma-separated playlist sizes (default: 1000,10000,100000)")
+    parser.add_argument('--channels', default='20x500,200x50',
+                        help="Comma-separated channel shapes <playlists>x<entries> (default: 20x500,200x50)")
+    parser.add_argument('--latency', type=float, default=0, help="Milliseconds added to every response (default: 0)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Run every path again under tracemalloc to measure its peak Python allocations")
+    parser.add_argument('-o', '--output', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = runSuite(
+        [int(value) for value in args.playlists.split(',') if value],
+        [parseShape(value) for value in args.channels.split(',') if value],
+        args.latency / 1000,
+        args.trace_memory,
+        log=lambda line: print(line, file=sys.stderr)
+    )
+    writeReport(report, args.output)
+    incomplete = [case for case in report['cases'] if case['returned'] is not None and case['returned'] < case['entries']]
+    return 1 if incomplete else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed per entry module, in milliseconds. yt-dlp alone
+# takes well over 100 ms, so loading it at startup breaks the GUI budget.
+BUDGETS = {
+    'src.GUI': 120,
+    'src.CLI': 60,
+    'src': 20,
+}
+
+# Modules that must only be loaded on first use, not at startup
+DEFERRED = ('yt_dlp', 'src.Mp4_Converter', 'src.Mp3_Converter', 'src.BatchDownloader',
+            'src.PlaylistScraper', 'src.ChannelScraper')
+
+def parseImportTime(output):
+    """
+    Parses the ``-X importtime`` report of an interpreter.
+
+    Args:
+        output (str): The interpreter's stderr.
+
+    Returns:
+        list: (module, depth, self_us, cumulative_us) tuples in report order.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return imports
+
+def measureImports(module, runs=5):
+    """
+    Imports a module in fresh interpreters and keeps the fastest run.
+
+    Args:
+        module (str): Dotted module name, e.g. 'src.GUI'.
+        runs (int): Number of interpreters to start (default: 5).
+
+    Returns:
+        dict: {'module', 'total_ms', 'imports'} where ``total_ms`` is the
+              module's cumulative import time and ``imports`` the parsed report.
+    """
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+        imports = parseImportTime(result.stderr)
+        total = next(cumulative for name, _, _, cumulative in reversed(imports) if name == module)
+        if best is None or total < best['total_ms'] * 1000:
+            best = {'module': module, 'total_ms': total / 1000, 'imports': imports}
+    return best
+
+def breakdown(imports):
+    """
+    Sums the self time of the report by top-level package.
+
+    Args:
+        imports (list): Parsed report from ``parseImportTime``.
+
+    Returns:
+        list: (package, milliseconds) pairs, slowest first.
+    """
+    totals = defaultdict(int)
+    for name, _, self_us, _ in imports:
+        totals[name.split('.')[0]] += self_us
+    return sorted(((package, us / 1000) for package, us in totals.items()), key=lambda pair: -pair[1])
+
+def checkBudget(measurement, budget_ms):
+    """
+    Checks a measurement against its budget and the deferred modules.
+
+    Args:
+        measurement (dict): Result of ``measureImports``.
+        budget_ms (float): Allowed cumulative import time in milliseconds.
+
+    Returns:
+        list: Violation messages, empty if the module is within budget.
+    """
+    problems = []
+    loaded = {name for name, _, _, _ in measurement['imports']}
+    for name in DEFERRED:
+        if name in loaded:
+            problems.append(f"{measurement['module']} imports {name} at startup")
+    if measurement['total_ms'] > budget_ms:
+        problems.append(f"{measurement['module']} took {measurement['total_ms']:.1f} ms, budget is {budget_ms} ms")
+    return problems
+
+def main(argv=None):
+    """
+    Measures the import time of the entry modules and enforces their budgets.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to ``sys.argv``.
+
+    Returns:
+        int: Exit status, 1 if any module is over budget or loads a deferred module.
+    """
+    parser = argparse.ArgumentParser(description="Measure TubeHarvester startup import time.")
+    parser.add_argument('modules', nargs='*', default=list(BUDGETS), help="Modules to import (default: all budgeted)")
+    parser.add_argument('--runs', type=int, default=5, help="Interpreters started per module; the fastest counts (default: 5)")
+    parser.add_argument('--top', type=int, default=8, help="Packages listed in the breakdown (default: 8)")
+    args = parser.parse_args(argv)
+
+    problems = []
+    for module in args.modules:
+        measurement = measureImports(module, args.runs)
+        budget = BUDGETS.get(module, float('inf'))
+        print(f"{module}: {measurement['total_ms']:.1f} ms (budget {budget} ms)")
+        for package, ms in breakdown(measurement['imports'])[:args.top]:
+            print(f"  {package:<24} {ms:7.1f} ms")
+        problems.extend(checkBudget(measurement, budget))
+
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
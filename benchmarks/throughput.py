@@ -0,0 +1,178 @@
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from .common import summarize, cpuSeconds, peakRssBytes, environment, writeReport, isolatedRun
+from .media_server import MediaServer, installExtractor, itemUrl, parseSize
+
+def benchmarkItems(base_url, item_bytes, count, tag):
+    """
+    Builds the batch items of one run.
+
+    Args:
+        base_url (str): URL of the media server.
+        item_bytes (int): Media size of every item.
+        count (int): Number of items.
+        tag (str): Prefix keeping the item IDs of different runs apart.
+
+    Returns:
+        list: Items for ``BatchDownloader.downloadBatch``.
+    """
+    return [{
+        'url': itemUrl(base_url, item_bytes, f"{tag}-{index}"),
+        'title': f"{tag} item {index}",
+        'duration': 60,
+        'folder': ''
+    } for index in range(count)]
+
+def stageTimes(records):
+    """
+    Groups the per-stage seconds of the downloaded items.
+
+    Args:
+        records (list): Result records reported by ``BatchDownloader``.
+
+    Returns:
+        dict: Latency summary per stage: 'extract', 'download', 'queued' (waiting
+              for a worker or a retry) and 'total' (queued until finished).
+    """
+    downloaded = [record for record in records if record['status'] == 'downloaded']
+    queued = [max(0.0, r['elapsed_seconds'] - r['extract_seconds'] - r['download_seconds']) for r in downloaded]
+    return {
+        'extract': summarize([r['extract_seconds'] for r in downloaded]),
+        'download': summarize([r['download_seconds'] for r in downloaded]),
+        'queued': summarize(queued),
+        'total': summarize([r['elapsed_seconds'] for r in downloaded]),
+    }
+
+def runBatch(server, max_workers, item_bytes, count, tag):
+    """
+    Downloads one batch from the media server and measures it.
+
+    Args:
+        server (MediaServer): The running media server.
+        max_workers (int): ``BatchDownloader`` download workers.
+        item_bytes (int): Media size of every item.
+        count (int): Number of items.
+        tag (str): Prefix keeping the item IDs of different runs apart.
+
+    Returns:
+        dict: Counts, throughput, stage latencies, server requests, CPU and memory of the run.
+    """
+    from src.BatchDownloader import BatchDownloader
+    from src.CircuitBreaker import CircuitBreaker
+
+    records = []
+    downloader = BatchDownloader(
+        max_workers=max_workers,
+        circuit_breaker=CircuitBreaker(),
+        min_free_space=0,
+        result_callback=records.append
+    )
+    videos = benchmarkItems(server.base_url, item_bytes, count, tag)
+    work_dir = tempfile.mkdtemp(prefix='tubeharvester-bench-')
+    try:
+        requests_before = server.stats()
+        cpu_before = cpuSeconds()
+        started = time.perf_counter()
+        with isolatedRun(work_dir):
+            results = downloader.downloadBatch(videos, 'MP4', work_dir)
+        wall = time.perf_counter() - started
+        cpu = cpuSeconds() - cpu_before
+        requests_after = server.stats()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    peak_rss = peakRssBytes()
+    return {
+        'max_workers': max_workers,
+        'item_bytes': item_bytes,
+        'items': count,
+        'successful': results['successful'],
+        'failed': results['failed'],
+        'errors': results['errors'][:5],
+        'wall_seconds': round(wall, 3),
+        'items_per_second': round(results['successful'] / wall, 3),
+        'mb_per_second': round(results['bytes'] / wall / 1e6, 3),
+        'stages': stageTimes(records),
+        'requests': {key: requests_after[key] - requests_before[key] for key in requests_after},
+        'cpu_seconds': round(cpu, 3),
+        'cpu_percent': round(cpu / wall * 100, 1),
+        'peak_rss_mb': round(peak_rss / 1e6, 1) if peak_rss else None,
+    }
+
+def runSuite(worker_counts, item_sizes, count, latency=0, rate=None, link_rate=None, log=None):
+    """
+    Runs a batch for every combination of worker count and item size.
+
+    Args:
+        worker_counts (list): ``max_workers`` values.
+        item_sizes (list): Media sizes in bytes.
+        count (int): Items per batch.
+        latency (float): Seconds added to every server response (default: 0).
+        rate (float, optional): Bytes per second per connection.
+        link_rate (float, optional): Bytes per second over all connections.
+        log (callable, optional): Called with one summary line per finished run.
+
+    Returns:
+        dict: Report with the environment, the configuration and one entry per run.
+    """
+    installExtractor()
+    runs = []
+    with MediaServer(latency, rate, link_rate) as server:
+        for item_bytes in item_sizes:
+            for max_workers in worker_counts:
+                run = runBatch(server, max_workers, item_bytes, count, f"w{max_workers}s{item_bytes}")
+                runs.append(run)
+                if log:
+                    log(f"{max_workers:>3} workers  {item_bytes / 1e6:>8.2f} MB items  "
+                        f"{run['items_per_second']:>7.2f} items/s  {run['mb_per_second']:>8.2f} MB/s  "
+                        f"download p90 {run['stages']['download']['p90'] or 0:.3f}s  "
+                        f"CPU {run['cpu_percent']:>5.1f}%  failed {run['failed']}")
+    return {
+        'benchmark': 'throughput',
+        'environment': environment(),
+        'config': {
+            'items': count,
+            'latency_seconds': latency,
+            'connection_rate': rate,
+            'link_rate': link_rate,
+        },
+        'runs': runs,
+    }
+
+def main(argv=None):
+    """
+    Command line entry point of the throughput benchmark.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to ``sys.argv``.
+
+    Returns:
+        int: Exit status, 1 if any item failed.
+    """
+    parser = argparse.ArgumentParser(description="Measure BatchDownloader throughput against a local media server.")
+    parser.add_argument('--workers', default='1,2,4,8', help="Comma-separated max_workers values (default: 1,2,4,8)")
+    parser.add_argument('--sizes', default='1M,16M', help="Comma-separated item sizes, e.g. 256K,64M (default: 1M,16M)")
+    parser.add_argument('--items', type=int, default=16, help="Items per batch (default: 16)")
+    parser.add_argument('--latency', type=float, default=0, help="Milliseconds added to every response (default: 0)")
+    parser.add_argument('--rate', type=parseSize, help="Bytes per second per connection, e.g. 2M (default: unlimited)")
+    parser.add_argument('--link-rate', type=parseSize, help="Bytes per second over all connections (default: unlimited)")
+    parser.add_argument('-o', '--output', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = runSuite(
+        [int(value) for value in args.workers.split(',')],
+        [parseSize(value) for value in args.sizes.split(',')],
+        args.items,
+        args.latency / 1000,
+        args.rate,
+        args.link_rate,
+        log=lambda line: print(line, file=sys.stderr)
+    )
+    writeReport(report, args.output)
+    return 1 if any(run['failed'] for run in report['runs']) else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+TubeHarvester Benchmark Runner
+
+This script runs the benchmark suites, stores their results with an
+environment fingerprint in a local history file and compares them against
+a baseline run, so slowdowns are caught before a release.
+"""
+
+import os
+import sys
+import argparse
+from collections import defaultdict
+
+def collectStartup():
+    """
+    Measures the import time of the entry modules.
+
+    Returns:
+        dict: 'startup.<module>.import_ms' for every budgeted module.
+    """
+    from benchmarks.startup import BUDGETS, measureImports
+    return {f"startup.{module}.import_ms": measureImports(module, runs=3)['total_ms'] for module in BUDGETS}
+
+def collectThroughput():
+    """
+    Measures BatchDownloader throughput against the local media server.
+
+    Returns:
+        dict: Items per second and p90 download time per worker count.
+    """
+    from benchmarks.throughput import runSuite
+    report = runSuite([1, 4], [1024 ** 2], 8)
+    metrics = {}
+    for run in report['runs']:
+        prefix = f"throughput.w{run['max_workers']}"
+        metrics[f"{prefix}.items_per_second"] = run['items_per_second']
+        metrics[f"{prefix}.download_p90_s"] = run['stages']['download']['p90']
+    return metrics
+
+def collectScraping():
+    """
+    Measures the scrapers and ``sanitizeFilename`` on synthetic listings.
+
+    Returns:
+        dict: Cost per entry per path and shape, and the cost per sanitized title.
+    """
+    from benchmarks.scraping import runSuite
+    report = runSuite([2000], [(10, 100)])
+    metrics = {f"scraping.{case['path']}.{case['shape']}.per_entry_us": case['per_entry_us'] for case in report['cases']}
+    metrics['scraping.sanitize_us_per_title'] = report['sanitize_us_per_title']
+    return metrics
+
+def collectResponsiveness():
+    """
+    Measures GUI main-loop latency during a flooded batch. Needs a display or Xvfb.
+
+    Returns:
+        dict: p99 jitter, longest stall and p99 pump frame time.
+    """
+    from benchmarks.responsiveness import runScenario, virtualDisplay
+    with virtualDisplay():
+        report = runScenario(duration=5)
+    return {
+        'responsiveness.jitter_p99_ms': report['jitter_ms']['p99'],
+        'responsiveness.max_stall_ms': report['stalls']['max_ms'],
+        'responsiveness.frame_p99_ms': report['frames_ms']['p99'],
+    }
+
+# Suite name to the function measuring it; names prefix the metrics
+SUITES = {
+    'startup': collectStartup,
+    'throughput': collectThroughput,
+    'scraping': collectScraping,
+    'responsiveness': collectResponsiveness,
+}
+
+DEFAULT_SUITES = ('startup', 'throughput', 'scraping')
+
+def collect(suites, repeat):
+    """
+    Runs the suites several times and gathers the samples of every metric.
+
+    Args:
+        suites (list): Names from ``SUITES``.
+        repeat (int): Runs per suite.
+
+    Returns:
+        dict: Metric name to its list of samples.
+    """
+    samples = defaultdict(list)
+    for suite in suites:
+        for attempt in range(repeat):
+            print(f"Running {suite} ({attempt + 1}/{repeat})...", file=sys.stderr)
+            for name, value in SUITES[suite]().items():
+                if value is not None:
+                    samples[name].append(value)
+    return dict(samples)
+
+def run_benchmarks(argv=None):
+    """
+    Runs the benchmarks, stores the results and compares them with a baseline.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to ``sys.argv``.
+
+    Returns:
+        int: Exit status, 1 if a metric regressed beyond its noise threshold.
+    """
+    from benchmarks.history import (HISTORY_FILE, MIN_CHANGE, NOISE_FACTOR, fingerprint, createRun, loadHistory,
+                                    appendRun, findBaseline, compareRuns, formatDiff, fingerprintChanges)
+
+    parser = argparse.ArgumentParser(description="Run the TubeHarvester benchmarks and compare them with a baseline.")
+    parser.add_argument('--suites', default=','.join(DEFAULT_SUITES),
+                        help=f"Comma-separated suites out of {', '.join(SUITES)} (default: {','.join(DEFAULT_SUITES)})")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per suite, used to estimate noise (default: 3)")
+    parser.add_argument('--baseline', help="Run ID or label to compare with (default: latest run on this machine)")
+    parser.add_argument('--label', help="Name stored with this run, usable as a later --baseline")
+    parser.add_argument('--history', default=HISTORY_FILE, help="History file (default: .benchmarks/history.jsonl)")
+    parser.add_argument('--min-change', type=float, default=MIN_CHANGE * 100,
+                        help=f"Smallest change in percent that is reported (default: {MIN_CHANGE * 100:g})")
+    parser.add_argument('--noise-factor', type=float, default=NOISE_FACTOR,
+                        help=f"Multiple of the sample spread a change must exceed (default: {NOISE_FACTOR})")
+    parser.add_argument('--no-save', action='store_true', help="Compare only; do not add this run to the history")
+    args = parser.parse_args(argv)
+
+    # Check if we're in the right directory
+    if not os.path.exists('src') or not os.path.exists('benchmarks'):
+        print("Error: Please run this script from the project root directory")
+        return 1
+
+    suites = [suite for suite in args.suites.split(',') if suite]
+    unknown = [suite for suite in suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(unknown)}")
+
+    # Pick the baseline before measuring so a wrong --baseline fails fast
+    try:
+        baseline = findBaseline(loadHistory(args.history), {'fingerprint': fingerprint(), 'suites': suites}, args.baseline)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    run = createRun(suites, collect(suites, args.repeat), args.label)
+
+    if not args.no_save:
+        appendRun(run, args.history)
+    print(f"Run {run['id']} on {run['fingerprint']['cpu']} (Python {run['fingerprint']['python']}, "
+          f"yt-dlp {run['fingerprint']['yt_dlp']}, commit {run['git'] or 'unknown'})")
+
+    if baseline is None:
+        print("No baseline to compare with; this run is the first on this machine.")
+        return 0
+
+    print(f"Baseline {baseline['id']}" + (f" ({baseline['label']})" if baseline.get('label') else "") +
+          f", commit {baseline['git'] or 'unknown'}")
+    for change in fingerprintChanges(baseline, run):
+        print(f"Warning: environment differs, {change}")
+    print("=" * 50)
+    rows = compareRuns(baseline, run, args.min_change / 100, args.noise_factor)
+    print(formatDiff(rows))
+    regressions = [row['metric'] for row in rows if row['verdict'] == 'regression']
+    print("=" * 50)
+    if regressions:
+        print(f"Regressions beyond noise ({len(regressions)}): {', '.join(regressions)}")
+        return 1
+    print("No regressions.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run_benchmarks())
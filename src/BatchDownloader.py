@@ -1,20 +1,47 @@
 import os
+import time
+import functools
+import heapq
+import random
+import itertools
 import threading
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse, parse_qs
 from .Mp4_Converter import Mp4Downloader
 from .Mp3_Converter import Mp3Downloader
+from .ConnectionBudget import ConnectionBudget
+from .StallWatchdog import StallWatchdog, StallError
+from .DownloadErrors import classifyError, RateLimitedError, CancelledError, PostProcessingError
+from .CircuitBreaker import CircuitBreaker
+from .StagingArea import StagingArea, estimateSize
+from .ProgressAggregator import ProgressAggregator
+from .Tracer import Tracer
+from .Metrics import HarvestMetrics
 from .utils import sanitizeFilename
 
 class BatchDownloader:
     """
     Manages concurrent downloads of multiple YouTube videos.
 
-    This class uses a ThreadPoolExecutor to handle multiple downloads in parallel,
+    Items flow through two thread pools: an extraction pool that resolves
+    formats ahead of time and a download pool that transfers resolved items,
     tracking overall progress and allowing for cancellation.
     """
 
-    def __init__(self, max_workers=3, progress_callback=None, log_callback=None):
+    EXPIRY_MARGIN = 300
+    WATCHDOG_INTERVAL = 5
+    STAGING_FOLDER = '.staging'
+    MAX_ERRORS = 50
+
+    def __init__(self, max_workers=3, progress_callback=None, log_callback=None,
+                 concurrent_fragments=4, http_chunk_size=None, max_connections=None,
+                 prefetch_workers=2, prefetch_depth=2, info_max_age=1800,
+                 stall_timeout=60, min_speed=0, item_deadline=None, max_stall_restarts=2,
+                 max_retries=3, retry_backoff=2, max_retry_delay=300, circuit_breaker=None,
+                 staging_dir=None, min_free_space=1024 ** 3, max_in_flight=None, result_callback=None,
+                 stats_callback=None, progress_interval=0.5):
         """
         Initializes the BatchDownloader with thread management.
 
@@ -22,10 +49,57 @@ class BatchDownloader:
             max_workers (int): Maximum number of concurrent downloads (default: 3).
             progress_callback (callable, optional): Called with overall progress percentage.
             log_callback (callable, optional): Called with log messages.
+            concurrent_fragments (int): Fragments fetched in parallel per item stream (default: 4).
+            http_chunk_size (int, optional): Size in bytes of ranged HTTP chunks.
+            max_connections (int, optional): Process-wide cap on open download connections.
+            prefetch_workers (int): Threads resolving formats ahead of the downloads (default: 2).
+            prefetch_depth (int): Resolved items kept ready beyond the idle workers (default: 2).
+            info_max_age (float): Seconds after which resolved info is extracted again (default: 1800).
+            stall_timeout (float): Seconds without progress before a transfer is restarted (default: 60).
+            min_speed (float): Throughput in bytes/s below which a transfer is restarted (default: 0, off).
+            item_deadline (float, optional): Seconds an item may take over all its attempts.
+            max_stall_restarts (int): Restarts allowed per item after stalls (default: 2).
+            max_retries (int): Retries allowed per item after transient or rate-limit errors (default: 3).
+            retry_backoff (float): Delay in seconds before the first retry, doubled each time (default: 2).
+            max_retry_delay (float): Upper bound in seconds for a retry delay (default: 300).
+            circuit_breaker (CircuitBreaker, optional): Breaker gating every request. Defaults to the shared one.
+            staging_dir (str, optional): Directory for in-progress downloads. Defaults to ``.staging`` in the base path.
+            min_free_space (int): Free bytes to keep on disk; downloads pause below it (default: 1 GiB).
+            max_in_flight (int, optional): Items taken from the job at once, counting queued, extracting,
+                downloading and delayed ones. Defaults to twice the workers, or more if the look-ahead needs it.
+            result_callback (callable, optional): Called with the result record of each item as it finishes.
+            stats_callback (callable, optional): Called with byte progress, throughput and ETA
+                (see ``ProgressAggregator.snapshot``).
+            progress_interval (float): Minimum seconds between two progress reports (default: 0.5).
         """
         self.max_workers = max_workers
+        self.prefetch_workers = max(1, prefetch_workers)
+        self.prefetch_depth = max(0, prefetch_depth)
+        self.info_max_age = info_max_age
+        self.stall_timeout = stall_timeout
+        self.min_speed = min_speed
+        self.item_deadline = item_deadline
+        self.max_stall_restarts = max_stall_restarts
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_retry_delay = max_retry_delay
+        self.circuit_breaker = circuit_breaker or CircuitBreaker.getDefault()
+        self.tracer = Tracer.getDefault()
+        self.metrics = HarvestMetrics.getDefault()
+        self.staging_dir = staging_dir
+        self.min_free_space = min_free_space
+        self.staging = None
+        self.transfer_permits = {}  # Breaker permits of downloads whose transfer has not started
+        self.max_in_flight = max_in_flight or max(2 * max_workers, max_workers + self.prefetch_depth)
+        self.concurrent_fragments = concurrent_fragments
+        self.http_chunk_size = http_chunk_size
+        if max_connections:
+            ConnectionBudget.getDefault().setLimit(max_connections)
         self.progress_callback = progress_callback
         self.log_callback = log_callback
+        self.result_callback = result_callback
+        self.stats_callback = stats_callback
+        self.progress = ProgressAggregator(self.reportProgress, progress_interval)
         self.cancel_event = threading.Event()
         self.total_videos = 0
         self.completed_videos = 0
@@ -34,157 +108,757 @@ class BatchDownloader:
 
     def downloadBatch(self, video_list, format_type, base_path, quality="highest"):
         """
-        Downloads a batch of videos concurrently.
+        Downloads a batch of videos through a two-stage pipeline.
+
+        A small extraction pool resolves the formats of upcoming items while the
+        download workers transfer the items already resolved, so the download
+        workers never wait on page fetching or signature deciphering. Resolved
+        info that is about to expire is extracted again before it is handed over.
+        Each item is watched by a ``StallWatchdog``; stalled transfers are
+        aborted and put back at the front of the queue, resuming from their
+        ``.part`` files. Failures are classified: transient and rate-limit
+        errors wait in a delayed queue with exponential backoff, without
+        holding a worker, while permanent and auth errors fail immediately.
+        Every extraction holds a permit from the circuit breaker, and so does
+        every download until its media transfer starts; while it is open
+        because of rate limiting nothing new is started and rate-limited
+        items go back into the queue instead of failing.
+        Items download into a staging directory and are renamed into their
+        folders once complete. Before each download the free disk space, minus
+        the space reserved by running items, is checked against the item's
+        estimated size; downloads pause while the disk is too full.
+        Items whose output file already exists are skipped before any
+        extraction, using one directory listing per target folder.
+        Items are pulled from ``video_list`` only while fewer than
+        ``max_in_flight`` are held, so memory stays bounded by that window and
+        not by the job size, and a generator of any length can be passed.
+        Every finished item is reported to ``result_callback`` as a compact
+        record (see ``resultRecord``); the returned summary only keeps
+        aggregate counts and the first ``MAX_ERRORS`` error messages.
 
         Args:
-            video_list (list): List of dicts: [{'url': str, 'title': str, 'folder': str}, ...].
+            video_list (iterable): Dicts: [{'url': str, 'title': str, 'folder': str}, ...]. May be a lazy
+                iterable; overall progress percentages are only reported when it has a length.
             format_type (str): 'MP4' or 'MP3'.
             base_path (str): Base directory for downloads.
             quality (str): Quality setting (e.g., 'highest').
 
         Returns:
-            dict: Results summary: {'successful': int, 'failed': int, 'errors': [str, ...]}.
+            dict: Results summary: {'successful': int, 'failed': int, 'skipped': int, 'bytes': int,
+                'skipped_bytes': int, 'error_kinds': {kind: int}, 'errors': [str, ...]}. Skipped items were
+                already downloaded and are also counted as successful; their size goes to 'skipped_bytes'
+                rather than 'bytes'.
         """
-        self.total_videos = len(video_list)
+        self.total_videos = len(video_list) if hasattr(video_list, '__len__') else None
         self.completed_videos = 0
         self.cancel_event.clear()
 
         results = {
             'successful': 0,
             'failed': 0,
+            'skipped': 0,
+            'bytes': 0,
+            'skipped_bytes': 0,
+            'error_kinds': {},
             'errors': []
         }
 
-        if not video_list:
+        if self.total_videos == 0:
             if self.log_callback:
                 self.log_callback("No videos to download")
             return results
 
         if self.log_callback:
-            self.log_callback(f"Starting batch download of {self.total_videos} videos in {format_type} format")
+            count = self.total_videos if self.total_videos is not None else "a stream of"
+            self.log_callback(f"Starting batch download of {count} videos in {format_type} format")
 
-        organized_paths = self.createFolderStructure(video_list, base_path, format_type)
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_video = {}
-            for video_info in video_list:
-                if self.cancel_event.is_set():
-                    break
-
-                folder_path = organized_paths.get(video_info.get('folder', ''), base_path)
-                future = executor.submit(
-                    self.downloadSingleVideo,
-                    video_info,
-                    format_type,
-                    folder_path,
-                    quality
+        # Folders are created and listed when their first item is pulled
+        organized_paths = {}
+        existing = {}
+
+        def folderFor(video_info):
+            item_folder = video_info.get('folder', '')
+            if item_folder not in organized_paths:
+                organized_paths.update(self.createFolderStructure([video_info], base_path, format_type))
+                existing.update(self.indexExistingFiles([organized_paths[item_folder]]))
+            return organized_paths[item_folder]
+
+        self.progress.reset()
+        staging = StagingArea(self.staging_dir or os.path.join(base_path, self.STAGING_FOLDER), base_path, self.min_free_space)
+        self.staging = staging
+        # The size check needs the whole job, so it only runs for sized inputs
+        if self.total_videos is not None:
+            durations = [video_info.get('duration') or 0 for video_info in video_list]
+            self.progress.reset(self.total_videos, sum(durations), sum(1 for d in durations if d))
+            job_bytes = sum(estimateSize(video_info, format_type) for video_info in video_list)
+            if not staging.hasRoom(job_bytes) and self.log_callback:
+                self.log_callback(
+                    f"Low disk space: the batch needs about {job_bytes / 1024 ** 3:.1f} GB but "
+                    f"{staging.freeBytes() / 1024 ** 3:.1f} GB are free; downloads will pause when space runs out"
                 )
-                future_to_video[future] = video_info
 
-            for future in as_completed(future_to_video):
-                if self.cancel_event.is_set():
+        def stagingKey(video_info):
+            return staging.itemKey(video_info, folderFor(video_info))
+
+        def workFolder(video_info):
+            return staging.itemDir(stagingKey(video_info))
+
+        source = iter(video_list)
+        source_done = False
+        pending = deque()
+        extracting = {}
+        resolved = deque()
+        downloading = {}
+        started = {}
+        permits = {}  # Circuit breaker permit held by each future
+        timings = {}
+        watchdogs = {}
+        delayed = []
+        retries = {}
+        sequence = itertools.count()
+        breaker = self.circuit_breaker
+        disk_paused = False
+
+        def inFlight():
+            return len(pending) + len(extracting) + len(resolved) + len(downloading) + len(delayed)
+
+        def skipIfDownloaded(video_info):
+            # Items without a title are checked once extraction has named them
+            if not video_info.get('title') or not self.isAlreadyDownloaded(video_info, format_type, folderFor(video_info), existing):
+                return False
+            results['skipped'] += 1
+            record = self.resultRecord(video_info, format_type, folderFor(video_info), 'skipped')
+            self.metrics.observeResult(record, format_type)
+            self.progress.finish(duration=video_info.get('duration'))
+            self.recordResult(results, video_info, True, record=record)
+            return True
+
+        def refill():
+            # Buffer the next item to extract, skipping finished ones without a request
+            nonlocal source_done
+            skipped = 0
+            while not pending and not source_done and inFlight() < self.max_in_flight:
+                video_info = next(source, None)
+                if video_info is None:
+                    source_done = True
+                elif skipIfDownloaded(video_info):
+                    skipped += 1
+                else:
+                    timings[id(video_info)] = {'queued_at': time.monotonic(), 'extract': 0.0, 'download': 0.0, 'attempts': 0}
+                    pending.append(video_info)
+            if skipped and self.log_callback:
+                self.log_callback(f"Skipping {skipped} videos that are already downloaded")
+
+        def finish(video_info, success, error_msg="", error=None):
+            # Per-item state goes as soon as the item is done, keeping memory bounded
+            retries.pop(id(video_info), None)
+            watchdogs.pop(id(video_info), None)
+            record = self.resultRecord(
+                video_info, format_type, folderFor(video_info), 'downloaded' if success else 'failed',
+                timings.pop(id(video_info), None), None if success else error or Exception(error_msg)
+            )
+            self.metrics.observeResult(record, format_type)
+            self.progress.finish(stagingKey(video_info), video_info.get('duration'))
+            self.recordResult(results, video_info, success, error_msg, record)
+
+        def addElapsed(future, video_info, stage):
+            seconds = time.monotonic() - started.pop(future)
+            if stage == 'extract':
+                self.metrics.extract_seconds.observe(seconds)
+            else:
+                self.metrics.download_seconds.observe(seconds, format=format_type)
+            timing = timings.get(id(video_info))
+            if timing:
+                timing[stage] += seconds
+                if stage == 'download':
+                    timing['attempts'] += 1
+
+        def retryLater(video_info, error):
+            failure = classifyError(error)
+            attempt = retries.get(id(video_info), 0) + 1
+            if not failure.retryable or attempt > self.max_retries:
+                return False
+            retries[id(video_info)] = attempt
+            delay = self.retryDelay(attempt, failure)
+            heapq.heappush(delayed, (time.monotonic() + delay, next(sequence), video_info))
+            self.tracer.instant('retry scheduled', 'batch', title=video_info['title'] or video_info['url'], kind=failure.kind, delay=delay)
+            self.metrics.retries.inc(kind=failure.kind)
+            if self.log_callback:
+                self.log_callback(f"Retrying {video_info['title'] or video_info['url']} in {delay:.0f}s ({failure.kind}: {failure})")
+            return True
+
+        def endRequest(error, permit):
+            # A download returns its permit once its transfer starts; later failures still count
+            if permit:
+                return breaker.release(error, permit)
+            return error is not None and breaker.record(error)
+
+        def pausedByBreaker(error, permit):
+            if endRequest(error, permit):
+                self.tracer.instant('circuit breaker open', 'batch', seconds=breaker.retryIn())
+                self.metrics.breaker_trips.inc()
+                if self.log_callback:
+                    self.log_callback(f"Rate limited: pausing requests for {breaker.retryIn():.0f}s")
+            return breaker.isOpen() and isinstance(classifyError(error), RateLimitedError)
+
+        def reportQueues():
+            depths = {'pending': len(pending), 'extracting': len(extracting), 'resolved': len(resolved),
+                      'downloading': len(downloading), 'delayed': len(delayed)}
+            for stage, depth in depths.items():
+                self.metrics.queue_depth.set(depth, stage=stage)
+            self.metrics.active_workers.set(min(len(extracting), self.prefetch_workers), pool='extract')
+            self.metrics.active_workers.set(len(downloading), pool='download')
+
+        def diskHasRoom(info):
+            nonlocal disk_paused
+            room = staging.hasRoom(estimateSize(info, format_type))
+            if room == disk_paused and self.log_callback:
+                free = staging.freeBytes() / 1024 ** 3
+                if room:
+                    self.log_callback(f"Disk space available again ({free:.1f} GB free), resuming downloads")
+                else:
+                    self.log_callback(f"Low disk space ({free:.1f} GB free): pausing downloads")
+            disk_paused = not room
+            return room
+
+        # Named pools label the worker timelines of an exported trace
+        with ThreadPoolExecutor(max_workers=self.prefetch_workers, thread_name_prefix='extract') as extractor, \
+             ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='download') as executor:
+            while not self.cancel_event.is_set():
+                # Retries whose delay has passed go back to the extraction stage
+                while delayed and delayed[0][0] <= time.monotonic():
+                    pending.appendleft(heapq.heappop(delayed)[2])
+
+                # Hand resolved items to idle download workers
+                while resolved and len(downloading) < self.max_workers:
+                    video_info, prepared, resolved_at = resolved[0]
+                    stale = self.isInfoStale(prepared[1], resolved_at)
+                    if not stale and not diskHasRoom(prepared[1]):
+                        break
+                    permit = breaker.tryAcquire()
+                    if not permit:
+                        break
+                    resolved.popleft()
+                    if stale:
+                        logging.info(f"Resolved info expired, extracting again: {video_info['title']}")
+                        future = extractor.submit(self.prepareVideo, video_info, format_type, workFolder(video_info), quality)
+                        extracting[future] = video_info
+                        started[future] = time.monotonic()
+                        permits[future] = permit
+                        continue
+                    watchdog = watchdogs.get(id(video_info)) or self.createWatchdog()
+                    if watchdog:
+                        watchdogs[id(video_info)] = watchdog
+                        watchdog.start()
+                        prepared[0].watchdog = watchdog
+                    info = prepared[1] if isinstance(prepared[1], dict) else {}
+                    self.progress.begin(stagingKey(video_info), info.get('duration') or video_info.get('duration'))
+                    prepared[0].progress_listener = functools.partial(self.itemProgress, stagingKey(video_info))
+                    self.transfer_permits[stagingKey(video_info)] = permit
+                    future = executor.submit(
+                        self.downloadSingleVideo,
+                        video_info,
+                        format_type,
+                        folderFor(video_info),
+                        quality,
+                        prepared
+                    )
+                    downloading[future] = (video_info, prepared, resolved_at)
+                    started[future] = time.monotonic()
+                    staging.reserve(stagingKey(video_info), estimateSize(prepared[1], format_type))
+
+                # Keep the look-ahead window filled
+                idle_workers = self.max_workers - len(downloading)
+                refill()
+                while pending and len(extracting) + len(resolved) < self.prefetch_depth + idle_workers:
+                    permit = breaker.tryAcquire()
+                    if not permit:
+                        break
+                    video_info = pending.popleft()
+                    future = extractor.submit(self.prepareVideo, video_info, format_type, workFolder(video_info), quality)
+                    extracting[future] = video_info
+                    started[future] = time.monotonic()
+                    permits[future] = permit
+                    refill()
+
+                reportQueues()
+                if not (pending or resolved or extracting or downloading or delayed):
                     break
 
-                video_info = future_to_video[future]
-                try:
-                    success, error_msg = future.result()
-                    with self.lock:
-                        self.completed_videos += 1
-                        if success:
-                            results['successful'] += 1
-                        else:
-                            results['failed'] += 1
-                            results['errors'].append(f"{video_info['title']}: {error_msg}")
+                timeouts = []
+                if watchdogs and downloading:
+                    timeouts.append(self.WATCHDOG_INTERVAL)
+                if delayed:
+                    timeouts.append(max(0, delayed[0][0] - time.monotonic()))
+                if breaker.retryIn() > 0:
+                    timeouts.append(breaker.retryIn())
+                if disk_paused:
+                    timeouts.append(self.WATCHDOG_INTERVAL)
+                timeout = min(timeouts) if timeouts else None
+                if extracting or downloading:
+                    done, _ = wait(list(extracting) + list(downloading), timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    # Only delayed retries or paused items are left; sleep without holding a worker
+                    done = set()
+                    self.cancel_event.wait(timeout if timeout is not None else self.WATCHDOG_INTERVAL)
+
+                # Flag transfers that receive nothing at all; their next hook call or read timeout aborts them
+                for video_info, _, _ in downloading.values():
+                    if id(video_info) in watchdogs:
+                        watchdogs[id(video_info)].check()
+
+                for future in done:
+                    if future in extracting:
+                        video_info = extracting.pop(future)
+                        permit = permits.pop(future)
+                        addElapsed(future, video_info, 'extract')
+                        try:
+                            prepared = future.result()
+                        except Exception as e:
+                            if pausedByBreaker(e, permit):
+                                pending.appendleft(video_info)
+                            elif not retryLater(video_info, e):
+                                finish(video_info, False, str(e), e)
+                            continue
+                        breaker.release(permit=permit)
+                        if skipIfDownloaded(video_info):
+                            retries.pop(id(video_info), None)
+                            timings.pop(id(video_info), None)
                             if self.log_callback:
-                                self.log_callback(f"Failed: {video_info['title']} - {error_msg}")
-
-                        overall_progress = (self.completed_videos / self.total_videos) * 100
-                        if self.progress_callback:
-                            self.progress_callback(int(overall_progress))
-
-                        progress_percent = int(overall_progress)
-                        if progress_percent > self.last_progress_update and (progress_percent % 5 == 0 or progress_percent == 100):
-                            self.last_progress_update = progress_percent
-                            if self.log_callback:
-                                bar_length = 20
-                                filled_length = int(bar_length * self.completed_videos // self.total_videos)
-                                bar = '[' + '=' * filled_length + '>' + ' ' * (bar_length - filled_length - 1) + ']'
-                                self.log_callback(f"Download progress: {bar} {progress_percent}% ({self.completed_videos}/{self.total_videos} videos)")
-
-                except Exception as e:
-                    with self.lock:
-                        self.completed_videos += 1
-                        results['failed'] += 1
-                        results['errors'].append(f"{video_info['title']}: {str(e)}")
-                        if self.log_callback:
-                            self.log_callback(f"Error: {video_info['title']} - {str(e)}")
-
-                        overall_progress = (self.completed_videos / self.total_videos) * 100
-                        if self.progress_callback:
-                            self.progress_callback(int(overall_progress))
+                                self.log_callback(f"Skipping {video_info['title']}, it is already downloaded")
+                            continue
+                        resolved.append((video_info, prepared, time.monotonic()))
+                    else:
+                        video_info, prepared, resolved_at = downloading.pop(future)
+                        permit = self.transfer_permits.pop(stagingKey(video_info), None)
+                        addElapsed(future, video_info, 'download')
+                        staging.release(stagingKey(video_info))
+                        try:
+                            success, error = future.result()
+                            error_msg = "" if success else str(error)
+                            endRequest(None if success else error, permit)
+                        except StallError as e:
+                            endRequest(e, permit)
+                            watchdog = watchdogs.get(id(video_info))
+                            if watchdog and watchdog.attempts <= self.max_stall_restarts:
+                                self.tracer.instant('stall restart', 'batch', title=video_info['title'])
+                                self.metrics.stall_restarts.inc()
+                                if self.log_callback:
+                                    self.log_callback(f"Stalled: {video_info['title']} ({e}), restarting")
+                                resolved.appendleft((video_info, prepared, resolved_at))
+                                continue
+                            success, error_msg, error = False, f"Stalled: {e}", e
+                        except Exception as e:
+                            if pausedByBreaker(e, permit):
+                                resolved.appendleft((video_info, prepared, resolved_at))
+                                continue
+                            if retryLater(video_info, e):
+                                continue
+                            success, error_msg, error = False, str(e), e
+                        finish(video_info, success, error_msg, error)
+
+            # Drop work that has not started yet
+            for future in list(extracting) + list(downloading):
+                future.cancel()
+
+        # Return the permits of work interrupted by cancellation
+        for permit in list(permits.values()) + list(self.transfer_permits.values()):
+            breaker.release(Exception("Batch download cancelled"), permit)
+        self.transfer_permits.clear()
+        self.metrics.resetPipeline()
+        staging.cleanup()
+        self.staging = None
 
         if self.cancel_event.is_set():
             if self.log_callback:
                 self.log_callback("Batch download cancelled")
         else:
             if self.log_callback:
-                self.log_callback(f"Batch download completed: {results['successful']} successful, {results['failed']} failed")
+                self.log_callback(
+                    f"Batch download completed: {results['successful']} successful "
+                    f"({results['skipped']} already downloaded), {results['failed']} failed"
+                )
 
         return results
 
+    def recordResult(self, results, video_info, success, error_msg="", record=None):
+        """
+        Records the outcome of one item and reports the overall progress.
+
+        Args:
+            results (dict): The results summary being built by ``downloadBatch``.
+            video_info (dict): The item that finished.
+            success (bool): Whether the item was downloaded.
+            error_msg (str): The error message if it failed.
+            record (dict, optional): The item's result record, passed on to ``result_callback``.
+        """
+        if record and self.result_callback:
+            self.result_callback(record)
+
+        with self.lock:
+            self.completed_videos += 1
+            if record:
+                # Files that were already present did not cost a transfer
+                total = 'skipped_bytes' if record['status'] == 'skipped' else 'bytes'
+                results[total] += record['bytes'] or 0
+                if record['error_kind']:
+                    kinds = results['error_kinds']
+                    kinds[record['error_kind']] = kinds.get(record['error_kind'], 0) + 1
+            if success:
+                results['successful'] += 1
+            else:
+                results['failed'] += 1
+                # Only the first messages are kept; the result records carry every error
+                if len(results['errors']) < self.MAX_ERRORS:
+                    results['errors'].append(f"{video_info['title'] or video_info['url']}: {error_msg}")
+                if self.log_callback:
+                    self.log_callback(f"Failed: {video_info['title'] or video_info['url']} - {error_msg}")
+
+            if not self.total_videos:
+                return
+
+            # The progress bar is byte-weighted by ProgressAggregator; the log counts items
+            overall_progress = (self.completed_videos / self.total_videos) * 100
+            progress_percent = int(overall_progress)
+            if progress_percent > self.last_progress_update and (progress_percent % 5 == 0 or progress_percent == 100):
+                self.last_progress_update = progress_percent
+                if self.log_callback:
+                    bar_length = 20
+                    filled_length = int(bar_length * self.completed_videos // self.total_videos)
+                    bar = '[' + '=' * filled_length + '>' + ' ' * (bar_length - filled_length - 1) + ']'
+                    self.log_callback(f"Download progress: {bar} {progress_percent}% ({self.completed_videos}/{self.total_videos} videos)")
+
+    def reportProgress(self, snapshot):
+        """
+        Forwards a ``ProgressAggregator`` snapshot to the progress and stats callbacks.
+
+        Args:
+            snapshot (dict): Byte progress, throughput and ETA of the batch.
+        """
+        if self.progress_callback and snapshot['percent'] is not None:
+            self.progress_callback(int(snapshot['percent']))
+        if self.stats_callback:
+            self.stats_callback(snapshot)
+
+    def resultRecord(self, video_info, format_type, folder_path, status, timing=None, error=None):
+        """
+        Builds the compact record reported for one finished item.
+
+        Args:
+            video_info (dict): Video information: {'url': str, 'title': str}.
+            format_type (str): 'MP4' or 'MP3'.
+            folder_path (str): Final folder of the item.
+            status (str): 'downloaded', 'skipped' or 'failed'.
+            timing (dict, optional): Seconds spent per stage, collected by ``downloadBatch``.
+            error (Exception, optional): The error the item failed with.
+
+        Returns:
+            dict: {'id', 'title', 'url', 'status', 'path', 'bytes', 'attempts', 'extract_seconds',
+                'download_seconds', 'elapsed_seconds', 'error_kind', 'error'}. 'path' and 'bytes'
+                are None for failed items.
+        """
+        url = video_info.get('url', '')
+        path = size = None
+        if status != 'failed':
+            path = os.path.join(folder_path, self.outputName(video_info, format_type))
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                pass
+        timing = timing or {}
+        return {
+            'id': parse_qs(urlparse(url).query).get('v', [''])[0] or None,
+            'title': video_info.get('title'),
+            'url': url,
+            'status': status,
+            'path': path,
+            'bytes': size,
+            'attempts': timing.get('attempts', 0),
+            'extract_seconds': round(timing.get('extract', 0.0), 3),
+            'download_seconds': round(timing.get('download', 0.0), 3),
+            'elapsed_seconds': round(time.monotonic() - timing['queued_at'], 3) if 'queued_at' in timing else 0.0,
+            'error_kind': classifyError(error).kind if error else None,
+            'error': str(error) if error else None,
+        }
+
+    def outputName(self, video_info, format_type):
+        """
+        Gets the file name an item is saved as.
+
+        Args:
+            video_info (dict): Video information: {'url': str, 'title': str}.
+            format_type (str): 'MP4' or 'MP3'.
+
+        Returns:
+            str: ``<sanitized title>.mp4`` or ``<sanitized title>.mp3``.
+        """
+        return f"{sanitizeFilename(video_info['title'])}.{format_type.lower()}"
+
+    def indexExistingFiles(self, folders):
+        """
+        Lists the files already present in the target folders.
+
+        Each folder is read with a single ``os.scandir`` call, so checking
+        thousands of items costs one directory listing per folder.
+
+        Args:
+            folders (iterable): Target folder paths.
+
+        Returns:
+            dict: Map of folder path to the set of file names it contains.
+        """
+        index = {}
+        for folder in set(folders):
+            try:
+                with os.scandir(folder) as entries:
+                    index[folder] = {entry.name for entry in entries if entry.is_file()}
+            except OSError:
+                index[folder] = set()
+        return index
+
+    def isAlreadyDownloaded(self, video_info, format_type, folder_path, index):
+        """
+        Checks whether the output file of an item already exists.
+
+        Args:
+            video_info (dict): Video information: {'url': str, 'title': str}.
+            format_type (str): 'MP4' or 'MP3'.
+            folder_path (str): Final folder of the item.
+            index (dict): Folder index returned by ``indexExistingFiles``.
+
+        Returns:
+            bool: True if ``<folder>/<sanitized title>.mp4|.mp3`` exists.
+        """
+        return self.outputName(video_info, format_type) in index.get(folder_path, ())
+
     def cancelDownload(self):
         """
         Cancels the current batch download operation.
+
+        Items that have not started are dropped, and running transfers are
+        aborted at their next progress update. Their partial downloads stay in
+        the staging directory, so the next batch resumes them.
         """
         self.cancel_event.set()
         if self.log_callback:
             self.log_callback("Cancelling batch download...")
 
-    def downloadSingleVideo(self, video_info, format_type, folder_path, quality):
+    def itemProgress(self, key, d):
+        """
+        Feeds one item's progress to the aggregator until the batch is cancelled.
+
+        The first update also returns the item's circuit breaker permit, so a
+        long transfer does not hold one of the few permits a recovering
+        breaker grants.
+
+        Args:
+            key (str): The item's staging key.
+            d (dict): Dictionary with download progress information.
+
+        Raises:
+            CancelledError: If the batch was cancelled, to abort the transfer.
+        """
+        if self.cancel_event.is_set():
+            raise CancelledError("Batch download cancelled")
+        permit = self.transfer_permits.pop(key, None)
+        if permit:
+            # Bytes are arriving, so the requests the permit covered went through
+            self.circuit_breaker.release(permit=permit)
+        self.progress.update(key, d)
+
+    def createDownloader(self, video_info, format_type, folder_path, quality):
+        """
+        Creates and configures the converter for one item.
+
+        Args:
+            video_info (dict): Video information: {'url': str, 'title': str}.
+            format_type (str): 'MP4' or 'MP3'.
+            folder_path (str): Path to save the file.
+            quality (str): Quality setting.
+
+        Returns:
+            Mp4Downloader or Mp3Downloader: The configured converter.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if format_type.upper() == 'MP4':
+            downloader = Mp4Downloader(
+                concurrent_fragments=self.concurrent_fragments,
+                http_chunk_size=self.http_chunk_size
+            )
+            downloader.setUrl(video_info['url'])
+            downloader.setPath(folder_path)
+            # Resolution mapping could be improved here
+            # Pass the quality parameter to set the resolution
+            if quality and quality.lower() != "highest":
+                try:
+                    # Extract numeric value from quality (e.g., "720p" -> 720)
+                    resolution = ''.join(filter(str.isdigit, quality))
+                    if resolution:
+                        downloader.resolution = resolution
+                except:
+                    pass  # Use default resolution if parsing fails
+            return downloader
+
+        if format_type.upper() == 'MP3':
+            downloader = Mp3Downloader(
+                concurrent_fragments=self.concurrent_fragments,
+                http_chunk_size=self.http_chunk_size
+            )
+            downloader.setUrl(video_info['url'])
+            downloader.setPath(folder_path)
+            return downloader
+
+        raise ValueError(f"Unsupported format: {format_type}")
+
+    def prepareVideo(self, video_info, format_type, folder_path, quality):
+        """
+        Runs the extraction stage for one item.
+
+        Items listed without a title, such as plain URLs from the command line,
+        take their title and duration from the extracted info.
+
+        Args:
+            video_info (dict): Video information: {'url': str, 'title': str}.
+            format_type (str): 'MP4' or 'MP3'.
+            folder_path (str): Path to save the file.
+            quality (str): Quality setting.
+
+        Returns:
+            tuple: (downloader, info) ready to be passed to ``downloadSingleVideo``.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        with self.tracer.span('item.extract', 'batch', title=video_info['title'] or video_info['url']):
+            downloader = self.createDownloader(video_info, format_type, folder_path, quality)
+            info = downloader.resolveInfo()
+            if isinstance(info, dict):
+                if not video_info.get('title'):
+                    video_info['title'] = sanitizeFilename(info.get('title') or info.get('id') or 'video')
+                if not video_info.get('duration'):
+                    video_info['duration'] = info.get('duration') or 0
+            return downloader, info
+
+    def createWatchdog(self):
+        """
+        Creates the stall watchdog for one item.
+
+        Returns:
+            StallWatchdog: A new watchdog, or None if stall detection is disabled.
+        """
+        if not (self.stall_timeout or self.min_speed or self.item_deadline):
+            return None
+        return StallWatchdog(
+            stall_timeout=self.stall_timeout,
+            min_speed=self.min_speed,
+            deadline=self.item_deadline
+        )
+
+    def retryDelay(self, attempt, failure):
+        """
+        Computes how long a failed item waits before it is tried again.
+
+        Args:
+            attempt (int): The retry number, starting at 1.
+            failure (DownloadFailure): The classified error.
+
+        Returns:
+            float: Delay in seconds with up to 25% random jitter.
+        """
+        delay = min(self.max_retry_delay, self.retry_backoff * 2 ** (attempt - 1))
+        if failure.retry_after:
+            delay = max(delay, failure.retry_after)
+        return delay + random.uniform(0, delay / 4)
+
+    def isInfoStale(self, info, resolved_at):
+        """
+        Checks whether resolved info is too old to start a download with.
+
+        Stream URLs carry an ``expire`` timestamp; info is considered stale when
+        that moment is close or when it has simply been waiting too long.
+
+        Args:
+            info (dict): Info returned by the extraction stage.
+            resolved_at (float): ``time.monotonic()`` value when it was resolved.
+
+        Returns:
+            bool: True if the item should be extracted again.
+        """
+        if time.monotonic() - resolved_at > self.info_max_age:
+            return True
+        if not isinstance(info, dict):
+            return False
+
+        urls = [info.get('url')] + [f.get('url') for f in info.get('requested_formats') or []]
+        for url in filter(None, urls):
+            expire = parse_qs(urlparse(url).query).get('expire', [''])[0]
+            if expire.isdigit() and int(expire) - time.time() < self.EXPIRY_MARGIN:
+                return True
+        return False
+
+    def downloadSingleVideo(self, video_info, format_type, folder_path, quality, prepared=None):
         """
         Downloads a single video using the appropriate converter.
 
+        During a batch the converter writes into the item's staging directory
+        and the finished files are moved into ``folder_path`` afterwards.
+        Failed items keep their staging directory so a retry resumes there,
+        except after a failed merge or conversion: its complete intermediates
+        are moved into ``folder_path``, where ``tubeharvester-repair`` finds them.
+
         Args:
             video_info (dict): Video information: {'url': str, 'title': str}.
             format_type (str): 'MP4' or 'MP3'.
             folder_path (str): Path to save the file.
             quality (str): Quality setting.
+            prepared (tuple, optional): (downloader, info) from ``prepareVideo``.
 
         Returns:
-            tuple: (success: bool, error_message: str).
+            tuple: (success: bool, error: Exception or None). ``error`` is the exception the
+                item failed with, so its classification is kept.
+
+        Raises:
+            DownloadFailure: If the classified error is retryable (including stalls).
         """
         try:
             sanitized_title = sanitizeFilename(video_info['title'])
-            
-            if format_type.upper() == 'MP4':
-                downloader = Mp4Downloader()
-                downloader.setUrl(video_info['url'])
-                downloader.setPath(folder_path)
-                # Resolution mapping could be improved here
-                # Pass the quality parameter to set the resolution
-                if quality and quality.lower() != "highest":
-                    try:
-                        # Extract numeric value from quality (e.g., "720p" -> 720)
-                        resolution = ''.join(filter(str.isdigit, quality))
-                        if resolution:
-                            downloader.resolution = resolution
-                    except:
-                        pass  # Use default resolution if parsing fails
-                downloader.downloadVideo(custom_title=sanitized_title)
-
-            elif format_type.upper() == 'MP3':
-                downloader = Mp3Downloader()
-                downloader.setUrl(video_info['url'])
-                downloader.setPath(folder_path)
-                downloader.downloadAsMp3(custom_title=sanitized_title)
 
+            staging = self.staging
+            key = staging.itemKey(video_info, folder_path) if staging else None
+
+            if prepared:
+                # Prepared during a batch, so the converter already targets the staging directory
+                downloader, info = prepared
             else:
-                raise ValueError(f"Unsupported format: {format_type}")
+                work_path = staging.itemDir(key) if staging else folder_path
+                downloader = self.createDownloader(video_info, format_type, work_path, quality)
+                info = None
+
+            with self.tracer.span('item.download', 'batch', title=video_info['title'], format=format_type):
+                if format_type.upper() == 'MP4':
+                    downloader.downloadVideo(custom_title=sanitized_title, info=info)
+                else:
+                    downloader.downloadAsMp3(custom_title=sanitized_title, info=info)
 
-            return True, ""
+            if staging:
+                with self.tracer.span('item.commit', 'batch', title=video_info['title']):
+                    staging.commit(key, folder_path)
+            return True, None
 
         except Exception as e:
-            return False, str(e)
+            failure = classifyError(e)
+            if failure.retryable:
+                if failure is e:
+                    raise
+                raise failure from e
+            if isinstance(failure, PostProcessingError) and staging:
+                try:
+                    staging.commit(key, folder_path)
+                except OSError as move_error:
+                    logging.warning(f"Could not move the kept files of {video_info['title']}: {move_error}")
+            return False, e
 
     def createFolderStructure(self, video_list, base_path, format_type):
         """
@@ -0,0 +1,469 @@
+import os
+import sys
+import time
+import argparse
+import threading
+from .utils import sanitizeFilename
+
+# Scrapers and BatchDownloader pull in yt-dlp; they are imported by the commands
+# that need them so that --help and argument errors return immediately.
+
+def formatBytes(size):
+    """
+    Formats a byte count for the progress line.
+
+    Args:
+        size (float): Number of bytes.
+
+    Returns:
+        str: The size with a binary unit, e.g. '1.5 MiB'.
+    """
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if size < 1024 or unit == 'GiB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+def formatDuration(seconds):
+    """
+    Formats a number of seconds as H:MM:SS or M:SS.
+
+    Args:
+        seconds (float): Duration in seconds.
+
+    Returns:
+        str: The formatted duration.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class TerminalProgress:
+    """
+    Compact progress display for a terminal.
+
+    Log messages are printed on their own lines. On a terminal, the batch
+    progress, item count, throughput and ETA are kept on one status line
+    that is redrawn in place below them; when the output is redirected only
+    the log lines are written.
+    """
+
+    def __init__(self, stream=None):
+        """
+        Initializes the TerminalProgress.
+
+        Args:
+            stream (file, optional): Output stream. Defaults to ``sys.stderr``.
+        """
+        self.stream = stream or sys.stderr
+        self.interactive = self.stream.isatty()
+        self.lock = threading.Lock()
+        self.status = ""
+
+    def log(self, message):
+        """
+        Prints a log message above the status line.
+
+        Args:
+            message (str): The message to print.
+        """
+        with self.lock:
+            self.clearStatus()
+            self.stream.write(f"{message}\n")
+            self.writeStatus()
+
+    def fetchProgress(self, current, total, percentage):
+        """
+        Shows the progress of scraping a playlist or channel.
+
+        Args:
+            current (int): Items processed so far.
+            total (int): Total items.
+            percentage (int): Progress percentage (0-100).
+        """
+        self.setStatus(f"Fetching [{percentage:3.0f}%] {current}/{total}")
+
+    def stats(self, snapshot):
+        """
+        Shows the batch progress reported by ``BatchDownloader``'s stats callback.
+
+        Args:
+            snapshot (dict): See ``ProgressAggregator.snapshot``.
+        """
+        parts = []
+        if snapshot.get('percent') is not None:
+            parts.append(f"[{snapshot['percent']:5.1f}%]")
+        total = snapshot.get('total_items')
+        parts.append(f"{snapshot['done_items']}/{total} items" if total is not None else f"{snapshot['done_items']} items")
+        parts.append(formatBytes(snapshot.get('done_bytes') or 0))
+        if snapshot.get('speed'):
+            parts.append(f"{formatBytes(snapshot['speed'])}/s")
+        if snapshot.get('eta') is not None:
+            parts.append(f"ETA {formatDuration(snapshot['eta'])}")
+        self.setStatus("  ".join(parts))
+
+    def setStatus(self, text):
+        """
+        Replaces the status line.
+
+        Args:
+            text (str): New status text.
+        """
+        if not self.interactive:
+            return
+        with self.lock:
+            self.clearStatus()
+            self.status = text
+            self.writeStatus()
+
+    def clearStatus(self):
+        """
+        Erases the status line from the terminal. The caller holds the lock.
+        """
+        if self.interactive and self.status:
+            self.stream.write("\r\x1b[2K")
+
+    def writeStatus(self):
+        """
+        Draws the status line without a newline. The caller holds the lock.
+        """
+        if self.interactive and self.status:
+            self.stream.write(self.status)
+        self.stream.flush()
+
+    def close(self):
+        """
+        Ends the status line so following output starts on a new line.
+        """
+        with self.lock:
+            if self.interactive and self.status:
+                self.stream.write("\n")
+                self.stream.flush()
+            self.status = ""
+
+def playlistItems(url, max_videos, display):
+    """
+    Scrapes a playlist into batch items.
+
+    Args:
+        url (str): The playlist URL.
+        max_videos (int): Maximum number of videos.
+        display (TerminalProgress): Receives log messages and fetch progress.
+
+    Returns:
+        list: Items for ``BatchDownloader.downloadBatch``.
+    """
+    from .PlaylistScraper import PlaylistScraper
+    scraper = PlaylistScraper(timeout=2.0, log_callback=display.log)
+    display.log(f"Scraping playlist: {url}")
+    videos = scraper.scrapePlaylist(url, max_videos, display.fetchProgress)
+    folder = f"Playlists/{sanitizeFilename(scraper.getPlaylistTitle(url))}"
+    return [{
+        'url': video['url'],
+        'title': sanitizeFilename(video['title']),
+        'duration': video.get('duration', 0),
+        'folder': folder
+    } for video in videos]
+
+def channelItems(url, max_videos, display):
+    """
+    Scrapes a channel's playlists and standalone videos into batch items.
+
+    Args:
+        url (str): The channel URL.
+        max_videos (int): Maximum number of videos per playlist.
+        display (TerminalProgress): Receives log messages and fetch progress.
+
+    Returns:
+        list: Items for ``BatchDownloader.downloadBatch``.
+    """
+    from .ChannelScraper import ChannelScraper
+    scraper = ChannelScraper(timeout=2.0, log_callback=display.log)
+    display.log(f"Scraping channel: {url}")
+    channel_info = scraper.scrapeChannel(url, max_videos, display.fetchProgress)
+    display.log(f"Found {len(channel_info['playlists'])} playlists and {len(channel_info['standalone_videos'])} standalone videos")
+
+    channel_name = sanitizeFilename(channel_info['channel_name'])
+    items = []
+    for playlist in channel_info['playlists']:
+        for video in playlist['videos']:
+            items.append({
+                'url': video['url'],
+                'title': sanitizeFilename(video['title']),
+                'duration': video.get('duration', 0),
+                'folder': f"{channel_name}/{sanitizeFilename(playlist['title'])}"
+            })
+    for video in channel_info['standalone_videos']:
+        items.append({
+            'url': video['url'],
+            'title': sanitizeFilename(video['title']),
+            'duration': video.get('duration', 0),
+            'folder': f"{channel_name}/Random"
+        })
+    return items
+
+def videoItems(urls):
+    """
+    Yields single videos as untitled batch items.
+
+    No request is made here: ``BatchDownloader`` fills in each title in its
+    extraction stage, so looking one up never holds up the scheduler.
+
+    Args:
+        urls (list): Video URLs.
+
+    Yields:
+        dict: One item per URL, with ``title`` set to None.
+    """
+    for url in urls:
+        yield {'url': url, 'title': None, 'duration': 0, 'folder': ''}
+
+def readBatchFile(path):
+    """
+    Reads the URLs of a batch file.
+
+    Args:
+        path (str): Text file with one URL per line; blank lines and lines starting with '#' are ignored.
+
+    Returns:
+        list: The URLs in file order.
+    """
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def runBatch(items, args, display):
+    """
+    Downloads batch items and prints a summary.
+
+    The batch runs on a worker thread so Ctrl+C cancels it cleanly: running
+    transfers stop at their next progress update, and their partial
+    downloads are kept for the next run. A second Ctrl+C exits at once,
+    without waiting for running merges or conversions.
+
+    Args:
+        items (iterable): Items for ``BatchDownloader.downloadBatch``.
+        args (argparse.Namespace): Parsed command line arguments.
+        display (TerminalProgress): Progress display.
+
+    Returns:
+        int: Exit status; 1 if any item failed, 130 if cancelled.
+    """
+    from .BatchDownloader import BatchDownloader
+    downloader = BatchDownloader(
+        max_workers=args.workers,
+        log_callback=display.log,
+        stats_callback=display.stats
+    )
+    outcome = {}
+    finished = threading.Event()
+
+    def download():
+        try:
+            outcome['results'] = downloader.downloadBatch(items, args.format, args.output, args.quality)
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            finished.set()
+
+    started = time.monotonic()
+    threading.Thread(target=download, daemon=True).start()
+    cancelled = False
+    # Wait on an event rather than join(), which may report an interrupted thread as finished
+    while not finished.is_set():
+        try:
+            finished.wait(0.2)
+        except KeyboardInterrupt:
+            if cancelled:
+                display.close()
+                return 130
+            cancelled = True
+            downloader.cancelDownload()
+    display.close()
+
+    if 'error' in outcome:
+        display.log(f"Error during batch download: {outcome['error']}")
+        return 1
+    results = outcome['results']
+    display.log(f"Batch download completed in {formatDuration(time.monotonic() - started)}: "
+                f"{results['successful']} successful ({results['skipped']} already present), "
+                f"{results['failed']} failed, {formatBytes(results['bytes'])} transferred")
+    for error in results['errors'][:5]:
+        display.log(f"  - {error}")
+    if results['failed'] > 5:
+        display.log(f"  ... and {results['failed'] - 5} more errors")
+    if cancelled:
+        return 130
+    return 1 if results['failed'] else 0
+
+def buildParser():
+    """
+    Builds the argument parser of ``tubeharvester-cli``.
+
+    Returns:
+        argparse.ArgumentParser: Parser with the video, playlist, channel and batch-file commands.
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-o', '--output', default=os.path.join(os.path.expanduser('~'), 'Downloads'),
+                        help="Base directory; files go to Videos/ or Music/ below it (default: ~/Downloads)")
+    common.add_argument('-f', '--format', type=str.upper, choices=['MP4', 'MP3'], default='MP4',
+                        help="Output format (default: MP4)")
+    common.add_argument('-q', '--quality', default='highest', help="Maximum resolution, e.g. 720p (default: highest)")
+    common.add_argument('-w', '--workers', type=int, default=3, help="Concurrent downloads (default: 3)")
+    common.add_argument('--trace', metavar='FILE',
+                        help="Write a Chrome trace of the run's stages to FILE (open it in ui.perfetto.dev)")
+    common.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running")
+    common.add_argument('--metrics-file', metavar='FILE',
+                        help="Rewrite Prometheus metrics to FILE every 15 seconds, e.g. for node_exporter's textfile collector")
+    common.add_argument('--resource-log', metavar='FILE',
+                        help="Sample memory, threads, open files, FFmpeg processes and disk space to the CSV FILE "
+                             "and write a summary next to it")
+    common.add_argument('--resource-interval', type=float, default=10, metavar='SECONDS',
+                        help="Seconds between two resource samples (default: 10)")
+    common.add_argument('--top-allocations', type=int, default=0, metavar='N',
+                        help="Trace Python allocations and report the N sites that grew most (slower; default: off)")
+
+    parser = argparse.ArgumentParser(prog='tubeharvester-cli', description="Download YouTube videos, playlists and channels without the GUI.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    video = commands.add_parser('video', parents=[common], help="Download one or more videos")
+    video.add_argument('urls', nargs='+', metavar='URL', help="Video URL")
+
+    playlist = commands.add_parser('playlist', parents=[common], help="Download a playlist")
+    playlist.add_argument('url', metavar='URL', help="Playlist URL")
+    playlist.add_argument('--max-videos', type=int, default=200, help="Maximum videos to download (default: 200)")
+
+    channel = commands.add_parser('channel', parents=[common], help="Download the playlists and videos of a channel")
+    channel.add_argument('url', metavar='URL', help="Channel URL")
+    channel.add_argument('--max-videos', type=int, default=1000, help="Maximum videos per playlist (default: 1000)")
+
+    batch = commands.add_parser('batch-file', parents=[common], help="Download the video URLs listed in a file")
+    batch.add_argument('file', help="Text file with one URL per line; '#' starts a comment line")
+    return parser
+
+def startMetrics(args, display):
+    """
+    Starts the metrics exporters requested on the command line.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+        display (TerminalProgress): Progress display.
+
+    Returns:
+        callable: Stops the exporters, writing the metrics file a last time.
+
+    Raises:
+        OSError: If the port cannot be bound or the file cannot be written.
+    """
+    from .Metrics import HarvestMetrics, TextfileExporter
+    registry = HarvestMetrics.getDefault().registry
+    server = exporter = None
+    try:
+        if args.metrics_port is not None:
+            server = registry.serve(args.metrics_port)
+            display.log(f"Serving metrics on http://127.0.0.1:{server.server_address[1]}/metrics")
+        if args.metrics_file:
+            exporter = TextfileExporter(registry, args.metrics_file).start()
+    except OSError:
+        if server:
+            server.shutdown()
+            server.server_close()
+        raise
+
+    def stop():
+        if exporter:
+            exporter.stop()
+        if server:
+            server.shutdown()
+            server.server_close()
+    return stop
+
+def runCommand(args, display):
+    """
+    Collects the items of the chosen command and downloads them.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+        display (TerminalProgress): Progress display.
+
+    Returns:
+        int: Exit status, 1 if any item failed and 130 if cancelled.
+    """
+    try:
+        if args.command == 'playlist':
+            items = playlistItems(args.url, args.max_videos, display)
+        elif args.command == 'channel':
+            items = channelItems(args.url, args.max_videos, display)
+        elif args.command == 'batch-file':
+            items = videoItems(readBatchFile(args.file))
+        else:
+            items = videoItems(args.urls)
+    except KeyboardInterrupt:
+        display.close()
+        return 130
+    except Exception as e:
+        display.close()
+        display.log(f"Error: {e}")
+        return 1
+
+    if isinstance(items, list):
+        display.close()
+        if not items:
+            display.log("No videos found")
+            return 1
+        display.log(f"Found {len(items)} videos")
+    return runBatch(items, args, display)
+
+def main(argv=None):
+    """
+    Command line entry point: downloads videos, playlists or channels without Tk.
+
+    With ``--trace`` the stages of the run are recorded and written as a
+    Chrome trace when it ends. ``--metrics-port`` and ``--metrics-file``
+    export the health metrics while it runs, and ``--resource-log``
+    samples its resource use.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to ``sys.argv``.
+
+    Returns:
+        int: Exit status, 1 if any item failed and 130 if cancelled.
+    """
+    args = buildParser().parse_args(argv)
+    display = TerminalProgress()
+    stop_metrics = None
+    if args.metrics_port is not None or args.metrics_file:
+        try:
+            stop_metrics = startMetrics(args, display)
+        except OSError as e:
+            display.log(f"Error exporting metrics: {e}")
+            return 1
+    sampler = None
+    if args.resource_log:
+        from .ResourceSampler import ResourceSampler
+        sampler = ResourceSampler(args.resource_log, args.resource_interval, args.output, args.top_allocations, display.log)
+        try:
+            sampler.start()
+        except OSError as e:
+            display.log(f"Error writing resource samples: {e}")
+            if stop_metrics:
+                stop_metrics()
+            return 1
+    tracer = None
+    if args.trace:
+        from .Tracer import Tracer
+        tracer = Tracer.getDefault()
+        tracer.enable()
+
+    try:
+        return runCommand(args, display)
+    finally:
+        if tracer:
+            events = tracer.exportChromeTrace(args.trace)
+            display.log(f"Trace with {events} events written to {args.trace}")
+        if sampler:
+            sampler.stop()
+        if stop_metrics:
+            stop_metrics()
+
+if __name__ == '__main__':
+    raise SystemExit(main())
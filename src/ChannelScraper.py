@@ -3,6 +3,9 @@ import time
 import logging
 from .PlaylistScraper import PlaylistScraper
 from .CookieManager import CookieManager
+from .CircuitBreaker import CircuitBreaker
+from .Tracer import Tracer
+from .Metrics import HarvestMetrics
 from .utils import sanitizeFilename
 
 class ChannelScraper:
@@ -24,6 +27,9 @@ class ChannelScraper:
         self.timeout = timeout
         self.log_callback = log_callback
         self.cookie_manager = CookieManager(log_callback=self.log_callback)
+        self.circuit_breaker = CircuitBreaker.getDefault()
+        self.tracer = Tracer.getDefault()
+        self.metrics = HarvestMetrics.getDefault()
 
     def scrapeChannel(self, url, max_videos_per_playlist=200, progress_callback=None):
         """
@@ -76,7 +82,8 @@ class ChannelScraper:
                     if progress_callback:
                         progress_callback(completed, total_tasks, int((completed / total_tasks) * 100))
 
-                    time.sleep(self.timeout)
+                    with self.tracer.span('sleep', 'scrape'):
+                        time.sleep(self.timeout)
 
                 except Exception as e:
                     logging.warning(f"Failed to scrape playlist {playlist.get('title')}: {e}")
@@ -133,7 +140,8 @@ class ChannelScraper:
                 ydl_opts['cookiefile'] = cookie_file
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+                with self.circuit_breaker.guard(), self.tracer.span('extract_info', 'scrape', url=url), self.metrics.timeScrape('channel_name'):
+                    info = ydl.extract_info(url, download=False)
                 return info.get('channel', 'Unknown Channel')
 
         except Exception as e:
@@ -164,7 +172,8 @@ class ChannelScraper:
                 ydl_opts['cookiefile'] = cookie_file
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(playlists_url, download=False)
+                with self.circuit_breaker.guard(), self.tracer.span('extract_info', 'scrape', url=playlists_url), self.metrics.timeScrape('channel_playlists'):
+                    info = ydl.extract_info(playlists_url, download=False)
 
                 if 'entries' in info:
                     for entry in info['entries']:
@@ -173,7 +182,8 @@ class ChannelScraper:
                                 'title': entry['title'],
                                 'url': entry['url']
                             })
-                            time.sleep(self.timeout)
+                            with self.tracer.span('sleep', 'scrape'):
+                                time.sleep(self.timeout)
 
         except Exception as e:
             logging.warning(f"Could not extract playlists: {e}")
@@ -205,7 +215,8 @@ class ChannelScraper:
                 ydl_opts['cookiefile'] = cookie_file
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(videos_url, download=False)
+                with self.circuit_breaker.guard(), self.tracer.span('extract_info', 'scrape', url=videos_url), self.metrics.timeScrape('channel_videos'):
+                    info = ydl.extract_info(videos_url, download=False)
 
                 if 'entries' in info:
                     for entry in info['entries'][:max_videos]:
@@ -219,6 +230,7 @@ class ChannelScraper:
                                     'title': sanitizeFilename(entry['title']),
                                     'duration': entry.get('duration', 0)
                                 })
+            self.metrics.scraped_entries.inc(len(videos), source='channel_videos')
 
         except Exception as e:
             logging.warning(f"Could not extract standalone videos: {e}")
@@ -0,0 +1,242 @@
+import time
+import threading
+from contextlib import contextmanager
+from .DownloadErrors import classifyError, RateLimitedError
+
+class CircuitBreaker:
+    """
+    Pauses all YouTube requests in the process while the site is rate limiting.
+
+    The breaker is closed in normal operation. When ``failure_threshold``
+    rate-limit or bot-check errors arrive within ``window`` seconds it opens
+    and refuses every request for ``cooldown`` seconds. After that a single
+    probe request is let through (half-open). If the probe succeeds the
+    breaker closes again but only admits a few concurrent requests, doubling
+    the allowance with every success until traffic is back to normal. If the
+    probe is rate limited too, the breaker reopens with a doubled cooldown.
+    Requests admitted before the breaker opened may still finish while it is
+    half-open; only the probe's outcome decides how it leaves that state.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    PERMIT = 'permit'  # Permit of an ordinary request
+    PROBE = 'probe'  # Permit of the single request sent while half-open
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, failure_threshold=3, window=60, cooldown=60, max_cooldown=900,
+                 full_allowance=8, clock=time.monotonic):
+        """
+        Initializes the CircuitBreaker.
+
+        Args:
+            failure_threshold (int): Rate-limit errors within the window that trip the breaker (default: 3).
+            window (float): Length in seconds of the failure counting window (default: 60).
+            cooldown (float): Seconds the breaker stays open before probing (default: 60).
+            max_cooldown (float): Upper bound for the cooldown after failed probes (default: 900).
+            full_allowance (int): Concurrent requests at which recovery is complete (default: 8).
+            clock (callable): Monotonic time source, replaceable in tests.
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.window = window
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.full_allowance = full_allowance
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.state = self.CLOSED
+        self.failures = []
+        self.opened_at = None
+        self.probing = False
+        self.allowance = None  # None means unlimited
+        self.in_flight = 0
+
+    @classmethod
+    def getDefault(cls):
+        """
+        Gets the breaker shared by the scrapers and downloaders.
+
+        Returns:
+            CircuitBreaker: The shared breaker instance.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def tryAcquire(self):
+        """
+        Asks for permission to send one request without blocking.
+
+        Returns:
+            str: ``PERMIT`` or ``PROBE`` if the request may start, to be passed to ``release``
+                when it ends; False otherwise.
+        """
+        with self.condition:
+            return self._tryAcquire()
+
+    def acquire(self):
+        """
+        Blocks until a request may start.
+
+        Returns:
+            str: The permit to pass to ``release``.
+        """
+        with self.condition:
+            permit = self._tryAcquire()
+            while not permit:
+                self.condition.wait(self._retryIn() or None)
+                permit = self._tryAcquire()
+            return permit
+
+    def _tryAcquire(self):
+        """Grants a permit if the current state allows it. Caller holds the lock."""
+        if self.state == self.OPEN:
+            if self.clock() < self.opened_at + self.cooldown:
+                return False
+            self.state = self.HALF_OPEN
+            self.probing = False
+
+        if self.state == self.HALF_OPEN:
+            if self.probing:
+                return False
+            self.probing = True
+            self.in_flight += 1
+            return self.PROBE
+        if self.allowance is not None and self.in_flight >= self.allowance:
+            return False
+
+        self.in_flight += 1
+        return self.PERMIT
+
+    def release(self, error=None, permit=PERMIT):
+        """
+        Ends a request and records its outcome.
+
+        Args:
+            error (BaseException, optional): The error the request failed with, if any.
+            permit (str): The permit returned by ``tryAcquire`` or ``acquire`` (default: ``PERMIT``).
+
+        Returns:
+            bool: True if this outcome tripped the breaker open.
+        """
+        rate_limited = error is not None and isinstance(classifyError(error), RateLimitedError)
+        with self.condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            tripped = self._recordOutcome(error, rate_limited, permit == self.PROBE)
+            self.condition.notify_all()
+            return tripped
+
+    def record(self, error):
+        """
+        Records the outcome of work whose permit was already released.
+
+        ``BatchDownloader`` releases a download's permit once the media transfer
+        starts; a rate-limit error during the transfer still counts.
+
+        Args:
+            error (BaseException, optional): The error the work failed with, if any.
+
+        Returns:
+            bool: True if this outcome tripped the breaker open.
+        """
+        rate_limited = error is not None and isinstance(classifyError(error), RateLimitedError)
+        with self.condition:
+            tripped = self._recordOutcome(error, rate_limited, False)
+            self.condition.notify_all()
+            return tripped
+
+    def _recordOutcome(self, error, rate_limited, probe):
+        """Counts the outcome of a request. Caller holds the lock."""
+        if self.state == self.HALF_OPEN and not probe:
+            # Admitted before the breaker opened; only the probe decides the state
+            return False
+        if rate_limited:
+            return self._recordFailure()
+        if error is None:
+            self._recordSuccess()
+        elif self.state == self.HALF_OPEN:
+            # The probe failed for an unrelated reason; let another one through
+            self.probing = False
+        return False
+
+    def _recordFailure(self):
+        """Counts a rate-limit error. Caller holds the lock."""
+        now = self.clock()
+        if self.state == self.HALF_OPEN:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            return self._open(now)
+        if self.state == self.OPEN:
+            return False
+
+        self.failures = [t for t in self.failures if now - t <= self.window] + [now]
+        if len(self.failures) >= self.failure_threshold:
+            return self._open(now)
+        return False
+
+    def _recordSuccess(self):
+        """Counts a successful request. Caller holds the lock."""
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self.probing = False
+            self.failures = []
+            self.allowance = 2
+        elif self.allowance is not None:
+            self.allowance *= 2
+            if self.allowance >= self.full_allowance:
+                self.allowance = None
+                self.cooldown = self.base_cooldown
+
+    def _open(self, now):
+        """Moves to the open state. Caller holds the lock."""
+        self.state = self.OPEN
+        self.opened_at = now
+        self.probing = False
+        self.failures = []
+        return True
+
+    def retryIn(self):
+        """
+        Gets the time until the breaker lets a probe through.
+
+        Returns:
+            float: Seconds to wait, or 0 if the breaker is not open.
+        """
+        with self.condition:
+            return self._retryIn()
+
+    def _retryIn(self):
+        """Seconds until the cooldown ends. Caller holds the lock."""
+        if self.state != self.OPEN:
+            return 0
+        return max(0, self.opened_at + self.cooldown - self.clock())
+
+    def isOpen(self):
+        """
+        Checks whether requests are currently paused.
+
+        Returns:
+            bool: True while the breaker is open or waiting for its probe.
+        """
+        with self.condition:
+            return self.state != self.CLOSED
+
+    @contextmanager
+    def guard(self):
+        """
+        Context manager around ``acquire``/``release`` for blocking callers.
+
+        Exceptions raised inside the block are recorded and re-raised.
+        """
+        permit = self.acquire()
+        try:
+            yield
+        except BaseException as e:
+            self.release(e, permit)
+            raise
+        self.release(permit=permit)
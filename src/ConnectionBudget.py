@@ -0,0 +1,103 @@
+import threading
+from contextlib import contextmanager
+
+class ConnectionBudget:
+    """
+    Caps the total number of download connections open in the process.
+
+    Every transfer leases a number of connections before it starts and returns
+    them when it finishes, so the product of batch workers, parallel streams and
+    fragments per stream can never exceed the configured limit.
+    """
+
+    DEFAULT_LIMIT = 16
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, limit=DEFAULT_LIMIT):
+        """
+        Initializes the ConnectionBudget.
+
+        Args:
+            limit (int): Maximum number of concurrently open connections (default: 16).
+        """
+        self.limit = max(1, int(limit))
+        self.in_use = 0
+        self.condition = threading.Condition()
+
+    @classmethod
+    def getDefault(cls):
+        """
+        Gets the process-wide budget shared by all downloaders.
+
+        Returns:
+            ConnectionBudget: The shared budget instance.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def setLimit(self, limit):
+        """
+        Changes the connection limit and wakes up waiters to check it again.
+
+        Args:
+            limit (int): The new maximum number of connections.
+        """
+        with self.condition:
+            self.limit = max(1, int(limit))
+            self.condition.notify_all()
+
+    def acquire(self, requested, minimum=1):
+        """
+        Leases up to ``requested`` connections, blocking until ``minimum`` are free.
+
+        A minimum above the limit is lowered to the limit, also when ``setLimit``
+        shrinks it while the caller waits.
+
+        Args:
+            requested (int): Number of connections the transfer would like to use.
+            minimum (int): Number of connections required to start (default: 1).
+
+        Returns:
+            int: Number of connections granted, between ``minimum`` and ``requested``.
+        """
+        requested = max(1, int(requested))
+        minimum = max(1, min(int(minimum), requested))
+        with self.condition:
+            while self.limit - self.in_use < min(minimum, self.limit):
+                self.condition.wait()
+            granted = min(requested, self.limit - self.in_use)
+            self.in_use += granted
+            return granted
+
+    def release(self, granted):
+        """
+        Returns previously leased connections to the budget.
+
+        Args:
+            granted (int): Number of connections returned by ``acquire``.
+        """
+        with self.condition:
+            self.in_use = max(0, self.in_use - granted)
+            self.condition.notify_all()
+
+    @contextmanager
+    def lease(self, requested, minimum=1):
+        """
+        Context manager around ``acquire``/``release``.
+
+        Args:
+            requested (int): Number of connections the transfer would like to use.
+            minimum (int): Number of connections required to start (default: 1).
+
+        Yields:
+            int: Number of connections granted.
+        """
+        granted = self.acquire(requested, minimum)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
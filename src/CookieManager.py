@@ -1,9 +1,7 @@
 import subprocess
 import shutil
 from pathlib import Path
-import logging
-
-logging.basicConfig(level=logging.INFO)
+from .Tracer import Tracer
 
 class CookieManager:
     """
@@ -31,6 +29,7 @@ class CookieManager:
             log_callback (callable, optional): Called with log messages.
         """
         self.log_callback = log_callback
+        self.tracer = Tracer.getDefault()
 
     def getCookieFile(self):
         """
@@ -39,19 +38,23 @@ class CookieManager:
         Returns:
             str: Path to the cookie file or None if extraction fails.
         """
-        cookie_path = Path(self.COOKIE_FILE)
-        if cookie_path.exists():
+        with self.tracer.span('cookies.lookup', 'cookies') as span:
+            cookie_path = Path(self.COOKIE_FILE)
+            if cookie_path.exists():
+                span.set(source='file')
+                if self.log_callback:
+                    self.log_callback(f"Using existing cookie file: {self.COOKIE_FILE}")
+                return str(cookie_path)
+
             if self.log_callback:
-                self.log_callback(f"Using existing cookie file: {self.COOKIE_FILE}")
-            return str(cookie_path)
-        
-        if self.log_callback:
-            self.log_callback("Cookie file not found. Attempting extraction from browsers.")
-        
-        if self.extractCookies():
-            return str(cookie_path)
-        
-        return None
+                self.log_callback("Cookie file not found. Attempting extraction from browsers.")
+
+            if self.extractCookies():
+                span.set(source='browser')
+                return str(cookie_path)
+
+            span.set(source=None)
+            return None
 
     def extractCookies(self):
         """
@@ -72,17 +75,18 @@ class CookieManager:
 
             try:
                 # Use --user-agent for consistency with downloader options
-                result = subprocess.run(
-                    [
-                        "yt-dlp",
-                        "--cookies-from-browser", name,
-                        "--cookies", self.COOKIE_FILE,
-                        "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                    ],
-                    capture_output=True,
-                    timeout=15,
-                    text=True
-                )
+                with self.tracer.span('cookies.extract', 'cookies', browser=name):
+                    result = subprocess.run(
+                        [
+                            "yt-dlp",
+                            "--cookies-from-browser", name,
+                            "--cookies", self.COOKIE_FILE,
+                            "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                        ],
+                        capture_output=True,
+                        timeout=15,
+                        text=True
+                    )
 
                 if result.returncode == 0 and Path(self.COOKIE_FILE).exists():
                     if Path(self.COOKIE_FILE).stat().st_size > 0:
@@ -0,0 +1,177 @@
+import errno
+import socket
+import http.client
+import urllib.error
+import yt_dlp
+
+class DownloadFailure(Exception):
+    """
+    Base class of the classified download errors.
+
+    ``retryable`` tells the batch whether trying the item again later may
+    succeed; errors that are not retryable fail the item immediately.
+    """
+
+    kind = 'unknown'
+    retryable = False
+
+    def __init__(self, message, retry_after=None):
+        """
+        Initializes the DownloadFailure.
+
+        Args:
+            message (str): Description of the failure.
+            retry_after (float, optional): Seconds the server asked us to wait.
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class PermanentError(DownloadFailure):
+    """The video cannot be downloaded (removed, blocked, unsupported)."""
+    kind = 'permanent'
+
+class AuthError(DownloadFailure):
+    """The video needs a signed-in account or different cookies."""
+    kind = 'auth'
+
+class RateLimitedError(DownloadFailure):
+    """The site is throttling requests; retry after a longer pause."""
+    kind = 'rate_limited'
+    retryable = True
+
+class TransientError(DownloadFailure):
+    """A network failure that is likely to go away on its own."""
+    kind = 'transient'
+    retryable = True
+
+class DiskFullError(DownloadFailure):
+    """The disk ran out of space; retry once the batch has room again."""
+    kind = 'disk_full'
+    retryable = True
+
+class PostProcessingError(DownloadFailure):
+    """The download finished but FFmpeg post-processing failed."""
+    kind = 'postprocessing'
+
+class CancelledError(DownloadFailure):
+    """The batch was cancelled while the item was downloading."""
+    kind = 'cancelled'
+
+DISK_FULL_ERRNOS = (errno.ENOSPC, getattr(errno, 'EDQUOT', errno.ENOSPC))
+DISK_FULL_PATTERNS = ["no space left on device", "disk quota exceeded", "not enough space on the disk"]
+RATE_LIMIT_PATTERNS = ["http error 429", "too many requests", "rate-limit", "rate limit", "not a bot"]
+AUTH_PATTERNS = ["sign in", "private video", "members-only", "members only", "login required", "requires authentication"]
+PERMANENT_PATTERNS = [
+    "video unavailable", "is unavailable", "has been removed", "copyright", "not available in your country",
+    "unsupported url", "does not exist", "unsupported format", "url is not set"
+]
+TRANSIENT_PATTERNS = [
+    "timed out", "connection reset", "connection refused", "connection aborted", "remote end closed",
+    "temporary failure", "incompleteread", "incomplete read", "network is unreachable", "http error 5",
+    "unable to download video data", "unable to download webpage"
+]
+NETWORK_EXCEPTIONS = (socket.timeout, TimeoutError, ConnectionError, http.client.HTTPException, urllib.error.URLError)
+
+def iterErrorChain(error):
+    """
+    Iterates over an exception and the errors it wraps.
+
+    yt-dlp stores the original error in ``DownloadError.exc_info`` and the
+    converters chain errors with ``raise ... from``; both links are followed.
+
+    Args:
+        error (BaseException): The outermost exception.
+
+    Yields:
+        BaseException: Each exception in the chain, outermost first.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        yield error
+        seen.add(id(error))
+        exc_info = getattr(error, 'exc_info', None)
+        if isinstance(exc_info, tuple) and len(exc_info) > 1 and isinstance(exc_info[1], BaseException):
+            error = exc_info[1]
+        else:
+            error = error.__cause__ or error.__context__
+
+def getHttpStatus(error):
+    """
+    Gets the HTTP status code carried by an exception, if any.
+
+    Args:
+        error (BaseException): The exception to inspect.
+
+    Returns:
+        int: The status code, or None.
+    """
+    status = getattr(error, 'status', None) or getattr(error, 'code', None)
+    return status if isinstance(status, int) else None
+
+def getRetryAfter(error):
+    """
+    Reads the Retry-After header of an HTTP error.
+
+    Args:
+        error (BaseException): The exception to inspect.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or not a number.
+    """
+    headers = getattr(error, 'headers', None)
+    if headers is None and getattr(error, 'response', None) is not None:
+        headers = getattr(error.response, 'headers', None)
+    value = headers.get('Retry-After') if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def classifyError(error):
+    """
+    Maps an exception raised while downloading to a DownloadFailure.
+
+    HTTP status codes and exception types are checked first, then the error
+    messages produced by yt-dlp. Errors that match nothing are returned as a
+    plain, non-retryable DownloadFailure so unknown bugs are not retried.
+
+    Args:
+        error (BaseException): The exception that ended the download.
+
+    Returns:
+        DownloadFailure: The classified error.
+    """
+    chain = list(iterErrorChain(error))
+    message = str(error)
+
+    for e in chain:
+        if isinstance(e, DownloadFailure):
+            return e
+
+    for e in chain:
+        if isinstance(e, OSError) and e.errno in DISK_FULL_ERRNOS:
+            return DiskFullError(message)
+        if isinstance(e, yt_dlp.utils.PostProcessingError):
+            return PostProcessingError(message)
+        status = getHttpStatus(e)
+        if status == 429:
+            return RateLimitedError(message, retry_after=getRetryAfter(e))
+        if status == 401:
+            return AuthError(message)
+        if status in (404, 410):
+            return PermanentError(message)
+        if status and status >= 500:
+            return TransientError(message)
+
+    text = ' '.join(str(e) for e in chain).lower()
+    for cls, patterns in ((DiskFullError, DISK_FULL_PATTERNS), (RateLimitedError, RATE_LIMIT_PATTERNS),
+                          (AuthError, AUTH_PATTERNS), (PermanentError, PERMANENT_PATTERNS),
+                          (TransientError, TRANSIENT_PATTERNS)):
+        if any(pattern in text for pattern in patterns):
+            return cls(message)
+
+    if any(isinstance(e, NETWORK_EXCEPTIONS) for e in chain):
+        return TransientError(message)
+    if isinstance(error, (ValueError, TypeError, KeyError)):
+        return PermanentError(message)
+    return DownloadFailure(message)
@@ -1,14 +1,19 @@
 import os
+import logging
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Text
 import threading
-from .Mp4_Converter import Mp4Downloader
-from .Mp3_Converter import Mp3Downloader
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from .BatchDownloader import BatchDownloader
-from .CookieManager import CookieManager
+from .UiEventPump import UiEventPump
+from .ResolutionProbe import ResolutionProbe
 from .utils import sanitizeFilename
 
+# The converters, scrapers and BatchDownloader pull in yt-dlp and its extractor
+# registry; they are imported where they are first used so the window appears
+# without waiting for them. runGui preloads them once the window is drawn.
+PRELOAD_DELAY = 250
+
 
 class SingleDownloadPanel(ttk.Frame):
     """
@@ -47,7 +52,8 @@ class SingleDownloadPanel(ttk.Frame):
         
         # url input field configuration
         ttk.Label(url_path_frame, text="YouTube URL:").grid(row=0, column=0, sticky="w", pady=2)
-        self.url_entry = ttk.Entry(url_path_frame, width=60)
+        self.url_var = tk.StringVar(self.master)
+        self.url_entry = ttk.Entry(url_path_frame, width=60, textvariable=self.url_var)
         self.url_entry.grid(row=0, column=1, columnspan=2, sticky="ew", pady=2)
 
         # download path input field with browse button
@@ -130,19 +136,28 @@ class SingleDownloadPanel(ttk.Frame):
         self.message_screen.pack(expand=True, fill=tk.BOTH, pady=5)
         self.message_screen.config(state=tk.DISABLED)
 
+        # Worker threads reach the widgets only through the pump
+        self.pump = UiEventPump(self.master, self.message_screen)
+        self.pump.register('progress', self.applyProgress)
+        self.pump.start()
+
+        # Resolutions are probed once the URL stops changing, not on a polling timer
+        self.probe = ResolutionProbe(self.extractInfo, self.showResolutions, self.showProbeError)
         self.updateFormatColor()
         self.last_checked_url = ""
-        self.master.after(1000, self.autoFetchResolutions)
+        self.url_var.trace_add('write', self.onUrlChanged)
 
-    def autoFetchResolutions(self):
+    def onUrlChanged(self, *args):
         """
-        Periodically checks the URL field to trigger resolution fetching.
+        Schedules a resolution probe whenever the URL field is edited.
+
+        Args:
+            *args: Variable trace arguments supplied by Tkinter (ignored).
         """
-        current_url = self.url_entry.get()
-        if current_url and current_url != self.last_checked_url:
+        current_url = self.url_var.get().strip()
+        if current_url != self.last_checked_url:
             self.last_checked_url = current_url
-            threading.Thread(target=self.fetchResolutions, daemon=True).start()
-        self.master.after(1000, self.autoFetchResolutions)
+            self.probe.request(current_url)
 
     def browsePath(self):
         """
@@ -156,63 +171,114 @@ class SingleDownloadPanel(ttk.Frame):
     def fetchResolutions(self):
         """
         Fetches available resolutions for the current YouTube URL.
+
+        Runs on a worker thread; the results are applied through the pump.
         """
         url = self.last_checked_url
         if not url:
             return
 
         try:
-            downloader = Mp4Downloader(log_callback=self.logMessage)
-            downloader.setUrl(url)
-            
-            # Use options to get all available formats for resolution selection
-            opts = {
-                'noplaylist': True, 
-                'quiet': True,
-                'no_warnings': True,
-                'extractor_args': {
-                    'youtube': {
-                        'skip': ['translated_subs'],
-                    }
-                },
-                'format': 'bestvideo+bestaudio/best',
-            }
-            cookie_file = downloader.cookie_manager.getCookieFile()
-            if cookie_file:
-                opts['cookiefile'] = cookie_file
-            
-            import yt_dlp
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-            
-            formats = info.get('formats', [])
-            
-            # Get all available resolutions from video formats
-            video_formats = [f for f in formats if f.get('height') and f.get('vcodec') != 'none']
-            resolutions = sorted(list(set([f['height'] for f in video_formats])), reverse=True)
-            
-            # Also include audio-only formats if available
-            audio_formats = [f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') != 'none']
-            if audio_formats:
-                resolutions.append('Audio Only')
-            
-            if not resolutions:
-                messagebox.showinfo("Info", "No video resolutions found.")
-                return
+            info = self.probe.resolve(url)
+        except Exception as e:
+            self.showProbeError(url, e)
+            return
+        self.showResolutions(url, info)
+
+    def extractInfo(self, url):
+        """
+        Extracts the info of a URL with all formats available for resolution selection.
 
-            self.resolution_var.set(resolutions[0])
-            menu = self.resolution_menu['menu']
-            menu.delete(0, 'end')
-            for res in resolutions:
-                if res == 'Audio Only':
-                    menu.add_command(label=f"{res}", command=lambda value=res: self.resolution_var.set(value))
-                else:
-                    menu.add_command(label=f"{res}p", command=lambda value=res: self.resolution_var.set(value))
-            
-            self.logMessage(f"Resolutions fetched successfully: {', '.join(map(str, resolutions))}")
+        Called by the probe on a worker thread. The result is cached and reused
+        by the download. No format is selected yet, so the MP4 and MP3 downloads
+        can each select their own formats from it.
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to fetch resolutions: {e}")
+        Args:
+            url (str): The YouTube video URL.
+
+        Returns:
+            dict: The info extracted by yt-dlp.
+        """
+        from .Mp4_Converter import Mp4Downloader
+        downloader = Mp4Downloader(log_callback=self.logMessage)
+        downloader.setUrl(url)
+
+        # Use options to get all available formats for resolution selection
+        opts = {
+            'noplaylist': True, 
+            'quiet': True,
+            'no_warnings': True,
+            'extractor_args': {
+                'youtube': {
+                    'skip': ['translated_subs'],
+                }
+            },
+        }
+        cookie_file = downloader.cookie_manager.getCookieFile()
+        if cookie_file:
+            opts['cookiefile'] = cookie_file
+
+        import yt_dlp
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            # Without processing, a later format selection does not inherit this one's
+            # requested_formats, e.g. an MP3 download fetching the video stream too
+            info = ydl.extract_info(url, download=False, process=False)
+            # Follow links to the video page, e.g. from short links
+            while info.get('_type') in ('url', 'url_transparent'):
+                info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+            return info
+
+    def showResolutions(self, url, info):
+        """
+        Queues the resolutions found in probed info for the resolution menu.
+
+        Args:
+            url (str): The probed URL.
+            info (dict): The info extracted by yt-dlp.
+        """
+        formats = info.get('formats', [])
+
+        # Get all available resolutions from video formats
+        video_formats = [f for f in formats if f.get('height') and f.get('vcodec') != 'none']
+        resolutions = sorted(list(set([f['height'] for f in video_formats])), reverse=True)
+
+        # Also include audio-only formats if available
+        audio_formats = [f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') != 'none']
+        if audio_formats:
+            resolutions.append('Audio Only')
+
+        if not resolutions:
+            self.pump.call(messagebox.showinfo, "Info", "No video resolutions found.")
+            return
+
+        self.pump.call(self.setResolutions, resolutions)
+        self.logMessage(f"Resolutions fetched successfully: {', '.join(map(str, resolutions))}")
+
+    def showProbeError(self, url, error):
+        """
+        Queues an error dialog for a failed probe.
+
+        Args:
+            url (str): The probed URL.
+            error (Exception): The extraction error.
+        """
+        self.pump.call(messagebox.showerror, "Error", f"Failed to fetch resolutions: {error}")
+
+    def setResolutions(self, resolutions):
+        """
+        Fills the resolution menu and selects the highest resolution.
+
+        Args:
+            resolutions (list): Heights in descending order, optionally followed by 'Audio Only'.
+        """
+        self.resolution_var.set(resolutions[0])
+        menu = self.resolution_menu['menu']
+        menu.delete(0, 'end')
+        for res in resolutions:
+            if res == 'Audio Only':
+                menu.add_command(label=f"{res}", command=lambda value=res: self.resolution_var.set(value))
+            else:
+                menu.add_command(label=f"{res}p", command=lambda value=res: self.resolution_var.set(value))
 
     def startDownload(self):
         """
@@ -223,31 +289,72 @@ class SingleDownloadPanel(ttk.Frame):
 
         url = self.url_entry.get()
         path = self.path_display.get() or self.default_download_path
+        format_type = self.format_var.get()
 
-        if self.format_var.get() == "MP4":
+        if format_type == "MP4":
             resolution = self.resolution_var.get()
             if not resolution:
                 messagebox.showerror("Error", "Please fetch and select a resolution.")
                 return
+            from .Mp4_Converter import Mp4Downloader
             self.downloader = Mp4Downloader(self.updateProgress, self.logMessage)
             self.downloader.setUrl(url)
             self.downloader.setPath(path)
             self.downloader.resolution = int(resolution)
-            download_thread = threading.Thread(target=self.downloader.downloadVideo)
-        elif self.format_var.get() == "MP3":
+        elif format_type == "MP3":
+            from .Mp3_Converter import Mp3Downloader
             self.downloader = Mp3Downloader(url, path, self.updateProgress, self.logMessage)
-            download_thread = threading.Thread(target=self.downloader.downloadAsMp3)
+        download_thread = threading.Thread(target=self.runDownload, args=(self.downloader, format_type, url))
         download_thread.start()
 
+    def runDownload(self, downloader, format_type, url):
+        """
+        Runs a download on the worker thread, reusing the probed info of the URL.
+
+        The info comes from the probe cache, or from the probe still running for
+        the same video, so the transfer starts without another extraction.
+
+        Args:
+            downloader: The configured Mp4Downloader or Mp3Downloader.
+            format_type (str): 'MP4' or 'MP3'.
+            url (str): The YouTube video URL.
+        """
+        try:
+            info = self.probe.resolve(url)
+        except Exception:
+            # The downloader extracts again and reports the error itself
+            info = None
+
+        from .DownloadErrors import DownloadFailure
+        try:
+            if format_type == "MP3":
+                downloader.downloadAsMp3(info=info)
+            else:
+                if info is not None:
+                    # Select the formats of the chosen resolution from the probed formats
+                    info = downloader.resolveInfo(info=info)
+                downloader.downloadVideo(info=info)
+        except DownloadFailure as e:
+            # The downloader already reported the error through log_callback
+            logging.info(f"Download failed ({e.kind}): {url}")
+
     def updateProgress(self, percentage):
         """
-        Updates the progress bar UI.
+        Queues a progress update; safe to call from any thread.
+
+        Args:
+            percentage (int): Progress percentage (0-100).
+        """
+        self.pump.post('progress', percentage)
+
+    def applyProgress(self, percentage):
+        """
+        Updates the progress bar UI with the latest queued percentage.
 
         Args:
             percentage (int): Progress percentage (0-100).
         """
         self.progress['value'] = percentage
-        self.progress.update()
         if percentage == 100:
             self.master.after(3000, self.clearProgressBar)
 
@@ -256,19 +363,15 @@ class SingleDownloadPanel(ttk.Frame):
         Resets the progress bar to zero.
         """
         self.progress['value'] = 0
-        self.progress.update()
 
     def logMessage(self, message):
         """
-        Appends a message to the status display area.
+        Queues a message for the status display area; safe to call from any thread.
 
         Args:
             message (str): The message to log.
         """
-        self.message_screen.config(state=tk.NORMAL)
-        self.message_screen.insert(tk.END, message + "\n")
-        self.message_screen.see(tk.END)
-        self.message_screen.config(state=tk.DISABLED)
+        self.pump.log(message)
 
     def updateFormatColor(self):
         """
@@ -285,6 +388,8 @@ class BatchDownloadPanel(ttk.Frame):
     all videos in the desired format and quality.
     """
 
+    PROBE_SAMPLE = 3  # Videos whose formats fill the quality menu
+
     def __init__(self, parent, colors):
         """
         Initializes the BatchDownloadPanel.
@@ -312,7 +417,8 @@ class BatchDownloadPanel(ttk.Frame):
         url_path_frame.pack(fill=tk.X, pady=5)
 
         ttk.Label(url_path_frame, text="Playlist/Channel URL:").grid(row=0, column=0, sticky="w", pady=2)
-        self.url_entry = ttk.Entry(url_path_frame, width=60)
+        self.url_var = tk.StringVar(self.master)
+        self.url_entry = ttk.Entry(url_path_frame, width=60, textvariable=self.url_var)
         self.url_entry.grid(row=0, column=1, columnspan=2, sticky="ew", pady=2)
 
         ttk.Label(url_path_frame, text="Base Path:").grid(row=1, column=0, sticky="w", pady=2)
@@ -392,6 +498,9 @@ class BatchDownloadPanel(ttk.Frame):
         
         self.progress = ttk.Progressbar(self.download_progress_frame, orient='horizontal', length=400, mode='determinate')
         self.progress.pack(fill=tk.X, pady=2)
+
+        self.download_status_label = ttk.Label(self.download_progress_frame, text="", font=('Courier', 9))
+        self.download_status_label.pack(anchor='w')
         
         # Hide download progress initially
         self.download_progress_frame.grid_remove() # Use grid_remove instead of pack_forget
@@ -407,21 +516,30 @@ class BatchDownloadPanel(ttk.Frame):
         self.message_screen.pack(expand=True, fill=tk.BOTH, pady=5)
         self.message_screen.config(state=tk.DISABLED)
 
-        self.message_screen.config(state=tk.DISABLED)
+        # Worker threads reach the widgets only through the pump
+        self.pump = UiEventPump(self.master, self.message_screen)
+        self.pump.register('progress', self.applyProgress)
+        self.pump.register('fetch', self.applyFetchProgress)
+        self.pump.register('stats', self.applyTransferStats)
+        self.pump.start()
 
+        # Probes sample a few items and are cached per source URL
+        self.probe = ResolutionProbe(self.sampleFormats, self.showQualityOptions, self.showProbeError, key=str.strip)
         self.updateFormatColor()
         self.last_checked_url = ""
-        self.master.after(1000, self.autoFetchResolutions)
+        self.url_var.trace_add('write', self.onUrlChanged)
 
-    def autoFetchResolutions(self):
+    def onUrlChanged(self, *args):
         """
-        Periodically checks the URL field to trigger resolution fetching.
+        Schedules a resolution probe whenever the URL field is edited.
+
+        Args:
+            *args: Variable trace arguments supplied by Tkinter (ignored).
         """
-        current_url = self.url_entry.get()
-        if current_url and current_url != self.last_checked_url:
+        current_url = self.url_var.get().strip()
+        if current_url != self.last_checked_url:
             self.last_checked_url = current_url
-            threading.Thread(target=self.fetchResolutions, daemon=True).start()
-        self.master.after(1000, self.autoFetchResolutions)
+            self.probe.request(current_url)
 
     def browsePath(self):
         """
@@ -434,64 +552,155 @@ class BatchDownloadPanel(ttk.Frame):
 
     def fetchResolutions(self):
         """
-        Fetches available resolutions from the first video in playlist/channel.
+        Fetches available resolutions from the first videos in playlist/channel.
+
+        Runs on a worker thread; the results are applied through the pump.
         """
         url = self.last_checked_url
         if not url:
             return
 
         try:
-            from .Mp4_Converter import Mp4Downloader
-            import yt_dlp
-            
-            downloader = Mp4Downloader(log_callback=self.logMessage)
-            
-            opts = {
-                'noplaylist': True,
-                'quiet': True,
-                'no_warnings': True,
-                'extractor_args': {
-                    'youtube': {
-                        'skip': ['translated_subs'],
-                    }
-                },
-            }
-            cookie_file = downloader.cookie_manager.getCookieFile()
-            if cookie_file:
-                opts['cookiefile'] = cookie_file
-            
-            # For playlists, get first video URL to check formats
-            fetch_url = url
-            if 'list=' in url:
-                with yt_dlp.YoutubeDL({'extract_flat': True, 'quiet': True}) as ydl:
-                    playlist_info = ydl.extract_info(url, download=False)
-                    if playlist_info and 'entries' in playlist_info and playlist_info['entries']:
-                        first_entry = playlist_info['entries'][0]
-                        if first_entry:
-                            fetch_url = f"https://www.youtube.com/watch?v={first_entry.get('id', '')}"
-            
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(fetch_url, download=False)
-            
-            formats = info.get('formats', [])
-            video_formats = [f for f in formats if f.get('height') and f.get('vcodec') != 'none']
-            resolutions = sorted(list(set([f['height'] for f in video_formats])), reverse=True)
-            
-            if not resolutions:
-                self.logMessage("No video resolutions found. Using preset values.")
-                return
+            info = self.probe.resolve(url)
+        except Exception as e:
+            self.showProbeError(url, e)
+            return
+        self.showQualityOptions(url, info)
 
-            # Update quality menu with actual resolutions
-            menu = self.quality_menu["menu"]
-            menu.delete(0, "end")
-            menu.add_command(label="Highest", command=lambda: self.quality_var.set("Highest"))
-            for res in resolutions:
-                menu.add_command(label=f"{res}p", command=lambda value=f"{res}p": self.quality_var.set(value))
-            
-            self.logMessage(f"Resolutions fetched: {', '.join([f'{r}p' for r in resolutions])}")
+    @staticmethod
+    def videoEntries(listing, limit):
+        """
+        Finds the first video entries of a flat listing.
 
-        except Exception as e:
-            self.logMessage(f"Could not fetch resolutions: {e}")
+        A channel root URL lists its tabs (videos, shorts, live) as nested
+        playlists, so nested entries are searched in order. Tab and playlist
+        links are skipped, as their IDs are not video IDs.
+
+        Args:
+            listing (dict): Info extracted with ``extract_flat``.
+            limit (int): Maximum number of entries to return.
+
+        Returns:
+            list: Up to ``limit`` flat video entries.
+        """
+        videos = []
+        for entry in listing.get('entries') or []:
+            if len(videos) >= limit:
+                break
+            if not entry:
+                continue
+            if entry.get('entries') is not None:
+                videos.extend(BatchDownloadPanel.videoEntries(entry, limit - len(videos)))
+            elif entry.get('_type') == 'url' and entry.get('ie_key') == 'Youtube' and entry.get('id'):
+                videos.append(entry)
+        return videos
+
+    def sampleFormats(self, url):
+        """
+        Collects the formats of the first few videos of a playlist or channel.
+
+        Lists only the first ``PROBE_SAMPLE`` items without resolving them, so
+        a channel is never enumerated, then extracts those videos in parallel.
+        Called by the probe on a worker thread.
+
+        Args:
+            url (str): The playlist, channel or video URL.
+
+        Returns:
+            dict: {'formats': list, 'sampled': int} with the formats of all sampled videos.
+
+        Raises:
+            Exception: The extraction error if no video could be sampled.
+        """
+        import yt_dlp
+        from .Mp4_Converter import Mp4Downloader
+
+        downloader = Mp4Downloader(log_callback=self.logMessage)
+        opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extractor_args': {
+                'youtube': {
+                    'skip': ['translated_subs'],
+                }
+            },
+        }
+        cookie_file = downloader.cookie_manager.getCookieFile()
+        if cookie_file:
+            opts['cookiefile'] = cookie_file
+
+        # Only the first page of the listing is requested
+        list_opts = dict(opts, extract_flat='in_playlist', lazy_playlist=True,
+                         playlist_items=f'1:{self.PROBE_SAMPLE}')
+        with yt_dlp.YoutubeDL(list_opts) as ydl:
+            listing = ydl.extract_info(url, download=False)
+        if listing.get('formats'):
+            return {'formats': listing['formats'], 'sampled': 1}
+
+        video_urls = [
+            f"https://www.youtube.com/watch?v={entry['id']}"
+            for entry in self.videoEntries(listing, self.PROBE_SAMPLE)
+        ]
+        if not video_urls:
+            return {'formats': [], 'sampled': 0}
+
+        def extract(video_url):
+            with yt_dlp.YoutubeDL(dict(opts, noplaylist=True)) as ydl:
+                return ydl.extract_info(video_url, download=False)
+
+        formats, error, sampled = [], None, 0
+        with ThreadPoolExecutor(max_workers=len(video_urls)) as executor:
+            for future in [executor.submit(extract, video_url) for video_url in video_urls]:
+                try:
+                    formats.extend(future.result().get('formats') or [])
+                    sampled += 1
+                except Exception as e:
+                    error = e
+        if not sampled:
+            raise error
+        return {'formats': formats, 'sampled': sampled}
+
+    def showQualityOptions(self, url, info):
+        """
+        Queues the resolutions found in the sampled formats for the quality menu.
+
+        Args:
+            url (str): The probed URL.
+            info (dict): Result of ``sampleFormats``.
+        """
+        formats = info.get('formats', [])
+        video_formats = [f for f in formats if f.get('height') and f.get('vcodec') != 'none']
+        resolutions = sorted(list(set([f['height'] for f in video_formats])), reverse=True)
+
+        if not resolutions:
+            self.logMessage("No video resolutions found. Using preset values.")
+            return
+
+        self.pump.call(self.setQualityOptions, resolutions)
+        self.logMessage(f"Resolutions fetched: {', '.join([f'{r}p' for r in resolutions])}")
+
+    def showProbeError(self, url, error):
+        """
+        Logs a failed probe; the quality menu keeps its preset values.
+
+        Args:
+            url (str): The probed URL.
+            error (Exception): The extraction error.
+        """
+        self.logMessage(f"Could not fetch resolutions: {error}")
+
+    def setQualityOptions(self, resolutions):
+        """
+        Replaces the quality menu with the resolutions actually available.
+
+        Args:
+            resolutions (list): Heights in descending order.
+        """
+        menu = self.quality_menu["menu"]
+        menu.delete(0, "end")
+        menu.add_command(label="Highest", command=lambda: self.quality_var.set("Highest"))
+        for res in resolutions:
+            menu.add_command(label=f"{res}p", command=lambda value=f"{res}p": self.quality_var.set(value))
 
     def updateFormatColor(self):
         """
@@ -583,9 +792,7 @@ class BatchDownloadPanel(ttk.Frame):
         """
         try:
             self.batch_downloader = None
-            self.fetch_progress_frame.grid()
-            self.fetch_progress['value'] = 0
-            self.fetch_status_label.config(text="")
+            self.pump.call(self.showFetchProgress)
 
             if mode == "Playlist Download":
                 self.logMessage(f"Scraping playlist: {url}")
@@ -609,6 +816,7 @@ class BatchDownloadPanel(ttk.Frame):
                     video_list.append({
                         'url': video['url'],
                         'title': sanitizeFilename(video['title']),
+                        'duration': video.get('duration', 0),
                         'folder': f"Playlists/{playlist_title}"
                     })
 
@@ -636,6 +844,7 @@ class BatchDownloadPanel(ttk.Frame):
                         video_list.append({
                             'url': video['url'],
                             'title': sanitizeFilename(video['title']),
+                            'duration': video.get('duration', 0),
                             'folder': f"{channel_name}/{sanitizeFilename(playlist['title'])}"
                         })
 
@@ -643,17 +852,19 @@ class BatchDownloadPanel(ttk.Frame):
                     video_list.append({
                         'url': video['url'],
                         'title': sanitizeFilename(video['title']),
+                        'duration': video.get('duration', 0),
                         'folder': f"{channel_name}/Random"
                     })
 
-            self.fetch_progress_frame.grid_remove()
-            self.download_progress_frame.grid()
+            self.pump.call(self.showDownloadProgress)
             self.logMessage("Data fetching complete. Starting downloads...")
 
+            from .BatchDownloader import BatchDownloader
             self.batch_downloader = BatchDownloader(
                 max_workers=3,
                 progress_callback=self.updateProgress,
-                log_callback=self.logMessage
+                log_callback=self.logMessage,
+                stats_callback=self.updateTransferStats
             )
 
             results = self.batch_downloader.downloadBatch(
@@ -665,38 +876,79 @@ class BatchDownloadPanel(ttk.Frame):
                 self.logMessage("Errors encountered:")
                 for error in results['errors'][:5]:
                     self.logMessage(f"  - {error}")
-                if len(results['errors']) > 5:
-                    self.logMessage(f"  ... and {len(results['errors']) - 5} more errors")
+                if results['failed'] > 5:
+                    self.logMessage(f"  ... and {results['failed'] - 5} more errors")
+                kinds = ", ".join(f"{kind} {count}" for kind, count in sorted(results.get('error_kinds', {}).items()))
+                if kinds:
+                    self.logMessage(f"Failures by type: {kinds}")
 
         except Exception as e:
             self.logMessage(f"Error during batch download: {str(e)}")
 
         finally:
-            self.fetch_progress_frame.grid_remove()
-            self.download_progress_frame.grid_remove()
-            self.download_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
+            self.pump.call(self.resetControls)
             self.batch_downloader = None
 
+    def showFetchProgress(self):
+        """
+        Shows the emptied fetch progress bar while a source is scraped.
+        """
+        self.fetch_progress_frame.grid()
+        self.fetch_progress['value'] = 0
+        self.fetch_status_label.config(text="")
+
+    def showDownloadProgress(self):
+        """
+        Swaps the fetch progress bar for the download progress bar.
+        """
+        self.fetch_progress_frame.grid_remove()
+        self.download_progress_frame.grid()
+
+    def resetControls(self):
+        """
+        Hides the progress bars and re-enables the download button after a batch.
+        """
+        self.fetch_progress_frame.grid_remove()
+        self.download_progress_frame.grid_remove()
+        self.download_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+
     def updateFetchProgress(self, current, total, percentage):
         """
-        Updates the UI for data fetching progress.
+        Queues a data fetching progress update; safe to call from any thread.
 
         Args:
             current (int): Current item index.
             total (int): Total items.
             percentage (int): Percentage complete.
         """
+        self.pump.post('fetch', (current, total, percentage))
+
+    def applyFetchProgress(self, update):
+        """
+        Updates the UI for data fetching progress.
+
+        Args:
+            update (tuple): (current, total, percentage) as queued by ``updateFetchProgress``.
+        """
+        current, total, percentage = update
         self.fetch_progress['value'] = percentage
         bar_width = 20
         filled = int((percentage / 100) * bar_width)
         bar = '=' * filled + '>' + ' ' * (bar_width - filled - 1)
         status_text = f"[{bar}] {percentage}% ({current}/{total} items)"
         self.fetch_status_label.config(text=status_text)
-        self.fetch_progress.update()
-        self.fetch_status_label.update()
 
     def updateProgress(self, percentage):
+        """
+        Queues a download progress update; safe to call from any thread.
+
+        Args:
+            percentage (int): Percentage complete.
+        """
+        self.pump.post('progress', percentage)
+
+    def applyProgress(self, percentage):
         """
         Updates the UI for download progress.
 
@@ -704,19 +956,39 @@ class BatchDownloadPanel(ttk.Frame):
             percentage (int): Percentage complete.
         """
         self.progress['value'] = percentage
-        self.progress.update()
+
+    def updateTransferStats(self, stats):
+        """
+        Queues a throughput and ETA update; safe to call from any thread.
+
+        Args:
+            stats (dict): Snapshot from ``ProgressAggregator.snapshot``.
+        """
+        self.pump.post('stats', stats)
+
+    def applyTransferStats(self, stats):
+        """
+        Shows the batch throughput and remaining time below the progress bar.
+
+        Args:
+            stats (dict): Snapshot from ``ProgressAggregator.snapshot``.
+        """
+        parts = [f"{stats['done_items']}/{stats['total_items'] or '?'} videos"]
+        if stats['speed']:
+            parts.append(f"{stats['speed'] / 1024 ** 2:.1f} MB/s")
+        if stats['eta'] is not None:
+            minutes, seconds = divmod(int(stats['eta']), 60)
+            parts.append(f"ETA {minutes // 60}:{minutes % 60:02d}:{seconds:02d}")
+        self.download_status_label.config(text="  ".join(parts))
 
     def logMessage(self, message):
         """
-        Logs a message to the status display.
+        Queues a message for the status display; safe to call from any thread.
 
         Args:
             message (str): The message to log.
         """
-        self.message_screen.config(state=tk.NORMAL)
-        self.message_screen.insert(tk.END, message + "\n")
-        self.message_screen.see(tk.END)
-        self.message_screen.config(state=tk.DISABLED)
+        self.pump.log(message)
 
     def displayStartupInfo(self):
         """
@@ -910,13 +1182,43 @@ class YouTubeDownloaderGUI:
         self.batch_panel = BatchDownloadPanel(self.batch_tab, colors=self.colors)
         self.batch_panel.pack(expand=True, fill=tk.BOTH)
 
+def preloadDownloaders():
+    """
+    Imports the download modules, and with them yt-dlp, on a background thread.
+
+    Started once the window is drawn, so the first fetch or download does not
+    pay for the import while startup does not wait for it either.
+
+    Returns:
+        threading.Thread: The started import thread.
+    """
+    def load():
+        from . import Mp4_Converter, Mp3_Converter, BatchDownloader
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
 def runGui():
     """
     Initializes and runs the TubeHarvester GUI application.
+
+    If ``TUBEHARVESTER_RESOURCE_LOG`` is set, the resource use of the
+    session is sampled to that file until the window is closed.
     """
-    root = tk.Tk()
-    app = YouTubeDownloaderGUI(root)
-    root.mainloop()
+    from .ResourceSampler import ResourceSampler
+    logging.basicConfig(level=logging.INFO)
+    sampler = ResourceSampler.fromEnvironment(str(Path.home() / "Downloads"), logging.info)
+    if sampler:
+        sampler.start()
+    try:
+        root = tk.Tk()
+        app = YouTubeDownloaderGUI(root)
+        root.after(PRELOAD_DELAY, preloadDownloaders)
+        root.mainloop()
+    finally:
+        if sampler:
+            sampler.stop()
 
 if __name__ == "__main__":
     runGui()
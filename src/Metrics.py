@@ -0,0 +1,533 @@
+import os
+import time
+import bisect
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Bucket bounds in seconds for extraction, transfer and post-processing times
+TIME_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# Bucket bounds in bytes per second for the throughput of finished downloads
+THROUGHPUT_BUCKETS = tuple(2 ** power for power in range(16, 28, 2))
+
+def formatValue(value):
+    """
+    Formats a sample value for the Prometheus text format.
+
+    Args:
+        value (float): The value.
+
+    Returns:
+        str: '+Inf', an integer without a decimal point, or the float's repr.
+    """
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def formatLabels(names, values, extra=None):
+    """
+    Formats a label set for the Prometheus text format.
+
+    Args:
+        names (tuple): Label names.
+        values (tuple): Label values in the same order.
+        extra (tuple, optional): One more (name, value) pair, e.g. a histogram's 'le'.
+
+    Returns:
+        str: '{name="value",...}', or '' without labels.
+    """
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+class Metric:
+    """
+    Base of the metric types: a named family of samples keyed by label values.
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labels=()):
+        """
+        Initializes the Metric.
+
+        Args:
+            name (str): Metric name, e.g. 'tubeharvester_items_total'.
+            documentation (str): The HELP text.
+            labels (tuple): Label names every sample must set (default: none).
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def key(self, labels):
+        """
+        Orders label values by the metric's label names.
+
+        Args:
+            labels (dict): Label name to value.
+
+        Returns:
+            tuple: The label values.
+
+        Raises:
+            ValueError: If the labels do not match the metric's label names.
+        """
+        if len(labels) != len(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        try:
+            return tuple(str(labels[name]) for name in self.labels)
+        except KeyError:
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+
+    def get(self, **labels):
+        """
+        Gets the current value of one sample, mainly for tests.
+
+        Args:
+            **labels: The sample's labels.
+
+        Returns:
+            The sample value, or None if it was never set.
+        """
+        with self.lock:
+            return self.values.get(self.key(labels))
+
+    def samples(self):
+        """
+        Lists the lines of the metric's samples.
+
+        Returns:
+            list: Lines in the Prometheus text format.
+        """
+        with self.lock:
+            values = sorted(self.values.items())
+        return [f"{self.name}{formatLabels(self.labels, key)} {formatValue(value)}" for key, value in values]
+
+    def expose(self):
+        """
+        Renders the metric with its HELP and TYPE lines.
+
+        Returns:
+            str: The metric family in the Prometheus text format.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return '\n'.join(lines + self.samples())
+
+class Counter(Metric):
+    """
+    Value that only goes up, e.g. finished items or downloaded bytes.
+    """
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """
+        Adds to the counter.
+
+        Args:
+            amount (float): Non-negative increment (default: 1).
+            **labels: The sample's labels.
+
+        Raises:
+            ValueError: If the amount is negative.
+        """
+        if amount < 0:
+            raise ValueError(f"Counter {self.name} cannot decrease")
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """
+    Value that goes up and down, e.g. queue depth or busy workers.
+    """
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        """
+        Sets the gauge.
+
+        Args:
+            value (float): The new value.
+            **labels: The sample's labels.
+        """
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets, e.g. extraction latency.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=TIME_BUCKETS):
+        """
+        Initializes the Histogram.
+
+        Args:
+            name (str): Metric name without the '_bucket', '_sum' and '_count' suffixes.
+            documentation (str): The HELP text.
+            labels (tuple): Label names every sample must set (default: none).
+            buckets (tuple): Increasing upper bounds; '+Inf' is added (default: TIME_BUCKETS).
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """
+        Records one observation.
+
+        Args:
+            value (float): The observed value.
+            **labels: The sample's labels.
+        """
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            state['counts'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def samples(self):
+        """
+        Lists the cumulative bucket, sum and count lines of every label set.
+
+        Returns:
+            list: Lines in the Prometheus text format.
+        """
+        with self.lock:
+            values = sorted((key, dict(state, counts=list(state['counts']))) for key, state in self.values.items())
+        lines = []
+        for key, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state['counts']):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{formatLabels(self.labels, key, ('le', formatValue(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{formatLabels(self.labels, key)} {formatValue(state['sum'])}")
+            lines.append(f"{self.name}_count{formatLabels(self.labels, key)} {state['count']}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Holds metrics and renders them in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty MetricsRegistry.
+        """
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def register(self, metric):
+        """
+        Adds a metric, or returns the one already registered under its name.
+
+        Args:
+            metric (Metric): The metric to add.
+
+        Returns:
+            Metric: The registered metric.
+
+        Raises:
+            ValueError: If another type of metric has the name.
+        """
+        with self.lock:
+            existing = self.metrics.setdefault(metric.name, metric)
+        if type(existing) is not type(metric):
+            raise ValueError(f"Metric {metric.name} is already registered as a {existing.kind}")
+        return existing
+
+    def counter(self, name, documentation, labels=()):
+        """
+        Registers a counter.
+
+        Returns:
+            Counter: The registered counter.
+        """
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        """
+        Registers a gauge.
+
+        Returns:
+            Gauge: The registered gauge.
+        """
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=TIME_BUCKETS):
+        """
+        Registers a histogram.
+
+        Returns:
+            Histogram: The registered histogram.
+        """
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def exposition(self):
+        """
+        Renders all metrics.
+
+        Returns:
+            str: The Prometheus text format (version 0.0.4), ending with a newline.
+        """
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+        return ''.join(metric.expose() + '\n' for metric in metrics)
+
+    def writeTextfile(self, path):
+        """
+        Writes all metrics to a file, replacing it atomically.
+
+        node_exporter's textfile collector may read the file at any time, so
+        the metrics go to a temporary file in the same directory first.
+
+        Args:
+            path (str): Output file, which should end in '.prom'.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(prefix='.metrics-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.exposition())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def serve(self, port, host='127.0.0.1'):
+        """
+        Serves the metrics over HTTP on a background thread.
+
+        Args:
+            port (int): Port to listen on; 0 picks a free one.
+            host (str): Address to bind (default: '127.0.0.1', local scrapers only).
+
+        Returns:
+            ThreadingHTTPServer: The running server; ``server_address`` holds the bound port
+                and ``shutdown()`` stops it.
+        """
+        # http.server pulls in the email package; only the endpoint needs it
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.debug(f"Metrics request: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+class TextfileExporter:
+    """
+    Rewrites a metrics file periodically on a background thread.
+    """
+
+    def __init__(self, registry, path, interval=15):
+        """
+        Initializes the TextfileExporter.
+
+        Args:
+            registry (MetricsRegistry): The metrics to write.
+            path (str): Output file, e.g. in node_exporter's textfile directory.
+            interval (float): Seconds between two writes (default: 15).
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """
+        Writes the file once and keeps rewriting it until ``stop`` is called.
+
+        Returns:
+            TextfileExporter: This exporter.
+        """
+        self.registry.writeTextfile(self.path)
+        self.thread = threading.Thread(target=self.run, name='metrics-textfile', daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        """
+        Rewrites the file every interval; write errors are logged and retried next time.
+        """
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.registry.writeTextfile(self.path)
+            except OSError as e:
+                logging.warning(f"Could not write metrics to {self.path}: {e}")
+
+    def stop(self):
+        """
+        Stops the rewriting and writes the final values.
+        """
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.registry.writeTextfile(self.path)
+
+class HarvestMetrics:
+    """
+    The health metrics of batch downloads and scraping.
+
+    ``BatchDownloader``, the downloaders and the scrapers update one shared
+    instance as they work. Counters and histograms accumulate over the life
+    of the process, so a long-running sync can be watched through
+    ``registry.serve`` or a ``TextfileExporter`` for node_exporter.
+    Updating a metric takes one short lock, so it stays on all the time.
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, registry=None):
+        """
+        Initializes the HarvestMetrics and registers them.
+
+        Args:
+            registry (MetricsRegistry, optional): Registry to add the metrics to. Defaults to a new one.
+        """
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+        self.items = registry.counter(
+            'tubeharvester_items_total', "Batch items finished, by outcome (downloaded, skipped, failed) and format.",
+            ('outcome', 'format'))
+        self.errors = registry.counter(
+            'tubeharvester_item_errors_total', "Failed batch items by error class.", ('kind',))
+        self.retries = registry.counter(
+            'tubeharvester_retries_total', "Retries scheduled after transient or rate-limit errors, by error class.",
+            ('kind',))
+        self.stall_restarts = registry.counter(
+            'tubeharvester_stall_restarts_total', "Transfers restarted after stalling.")
+        self.breaker_trips = registry.counter(
+            'tubeharvester_circuit_breaker_trips_total', "Times rate limiting paused all requests.")
+        self.bytes = registry.counter(
+            'tubeharvester_downloaded_bytes_total', "Bytes of finished downloads, by format.", ('format',))
+        self.extract_seconds = registry.histogram(
+            'tubeharvester_extract_seconds', "Time to resolve the formats of a batch item.")
+        self.download_seconds = registry.histogram(
+            'tubeharvester_download_seconds', "Time of one download attempt, including post-processing.", ('format',))
+        self.throughput = registry.histogram(
+            'tubeharvester_download_throughput_bytes_per_second', "Average throughput of finished downloads.",
+            ('format',), THROUGHPUT_BUCKETS)
+        self.postprocess_seconds = registry.histogram(
+            'tubeharvester_postprocess_seconds', "Time of yt-dlp post-processors such as FFmpeg merges.",
+            ('postprocessor',))
+        self.queue_depth = registry.gauge(
+            'tubeharvester_queue_depth', "Batch items per pipeline stage "
+            "(pending, extracting, resolved, downloading, delayed).", ('stage',))
+        self.active_workers = registry.gauge(
+            'tubeharvester_active_workers', "Busy threads per pool (extract, download).", ('pool',))
+        self.scrape_requests = registry.counter(
+            'tubeharvester_scrape_requests_total', "Listing requests of the scrapers, by source and outcome.",
+            ('source', 'outcome'))
+        self.scrape_seconds = registry.histogram(
+            'tubeharvester_scrape_seconds', "Time of one listing request of the scrapers.", ('source',))
+        self.scraped_entries = registry.counter(
+            'tubeharvester_scraped_entries_total', "Videos found by the scrapers, by source.", ('source',))
+        self.open_postprocessors = {}
+
+    @classmethod
+    def getDefault(cls):
+        """
+        Gets the metrics shared by the scrapers and downloaders.
+
+        Returns:
+            HarvestMetrics: The shared instance.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def observeResult(self, record, format_type):
+        """
+        Counts a finished batch item.
+
+        Args:
+            record (dict): The item's result record (see ``BatchDownloader.resultRecord``).
+            format_type (str): 'MP4' or 'MP3'.
+        """
+        self.items.inc(outcome=record['status'], format=format_type)
+        if record['error_kind']:
+            self.errors.inc(kind=record['error_kind'])
+        if record['status'] == 'downloaded' and record['bytes']:
+            self.bytes.inc(record['bytes'], format=format_type)
+            if record['download_seconds'] > 0:
+                self.throughput.observe(record['bytes'] / record['download_seconds'], format=format_type)
+
+    def resetPipeline(self):
+        """
+        Sets the queue depths and busy workers to zero once a batch ends.
+        """
+        for stage in ('pending', 'extracting', 'resolved', 'downloading', 'delayed'):
+            self.queue_depth.set(0, stage=stage)
+        for pool in ('extract', 'download'):
+            self.active_workers.set(0, pool=pool)
+
+    @contextmanager
+    def timeScrape(self, source):
+        """
+        Times and counts one listing request of a scraper.
+
+        Args:
+            source (str): What is listed, e.g. 'playlist' or 'channel_videos'.
+        """
+        started = time.monotonic()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'ok'
+        finally:
+            self.scrape_requests.inc(source=source, outcome=outcome)
+            self.scrape_seconds.observe(time.monotonic() - started, source=source)
+
+    def postprocessorHook(self, d):
+        """
+        Times yt-dlp post-processors. Meant for the ``postprocessor_hooks`` yt-dlp option.
+
+        Args:
+            d (dict): Post-processor status with 'status' and 'postprocessor'.
+        """
+        key = (threading.get_ident(), d.get('postprocessor'))
+        if d['status'] == 'started':
+            self.open_postprocessors[key] = time.monotonic()
+        elif d['status'] == 'finished':
+            started = self.open_postprocessors.pop(key, None)
+            if started is not None:
+                self.postprocess_seconds.observe(time.monotonic() - started, postprocessor=d.get('postprocessor'))
@@ -2,10 +2,13 @@ import os
 import logging
 import yt_dlp
 from .CookieManager import CookieManager
+from .ConnectionBudget import ConnectionBudget
+from .DownloadErrors import classifyError, PostProcessingError
+from .PostProcessRepair import retryPostProcessing, markUnconverted
+from .Tracer import Tracer
+from .Metrics import HarvestMetrics
 from .utils import sanitizeFilename
 
-logging.basicConfig(level=logging.INFO)
-
 class Mp3Downloader:
     """
     Handles the downloading of YouTube videos and converting them to MP3 files.
@@ -14,7 +17,8 @@ class Mp3Downloader:
     audio content using yt-dlp. It also supports progress and log callbacks.
     """
 
-    def __init__(self, url=None, save_path=None, progress_callback=None, log_callback=None):
+    def __init__(self, url=None, save_path=None, progress_callback=None, log_callback=None,
+                 concurrent_fragments=4, http_chunk_size=None, buffer_size=None):
         """
         Initializes the Mp3Downloader with URL, save path, and callback functions.
 
@@ -23,12 +27,24 @@ class Mp3Downloader:
             save_path (str, optional): The path where the downloaded MP3 file will be saved.
             progress_callback (callable, optional): Called with the percentage of download progress.
             log_callback (callable, optional): Called with log messages.
+            concurrent_fragments (int): Fragments fetched in parallel for DASH/HLS audio (default: 4).
+            http_chunk_size (int, optional): Size in bytes of ranged HTTP chunks. Defaults to yt-dlp's choice.
+            buffer_size (int, optional): Initial download buffer size in bytes. Defaults to yt-dlp's choice.
         """
         self.url = url
         self.save_path = save_path if save_path else self.getDefaultDownloadPath()
         self.progress_callback = progress_callback
         self.log_callback = log_callback
+        self.concurrent_fragments = concurrent_fragments
+        self.http_chunk_size = http_chunk_size
+        self.buffer_size = buffer_size
+        self.watchdog = None  # Optional StallWatchdog fed by the progress hook
+        self.progress_listener = None  # Optional callable receiving every raw progress dict
+        self.postprocess_retries = 2  # Conversion retries reusing the downloaded audio
+        self.downloaded_path = None  # Audio file of the last finished transfer
         self.cookie_manager = CookieManager(log_callback=self.log_callback)
+        self.tracer = Tracer.getDefault()
+        self.metrics = HarvestMetrics.getDefault()
 
     def setUrl(self, url):
         """
@@ -59,42 +75,74 @@ class Mp3Downloader:
         home_directory = os.path.expanduser('~')
         return os.path.join(home_directory, 'Downloads')
 
-    def downloadAsMp3(self, custom_title=None):
+    def getCommonOptions(self):
+        """
+        Builds the yt-dlp options shared by extraction and download.
+
+        Returns:
+            dict: The common yt-dlp options.
+        """
+        cookie_file = self.cookie_manager.getCookieFile()
+
+        # Common options for modern YouTube handling
+        common_opts = {
+            'extractor_args': {
+                'youtube': {
+                    'skip': ['translated_subs'],
+                }
+            },
+            'noplaylist': True,
+            'quiet': False,
+            'no_warnings': False,
+            'compat_opts': ['no-live-chat'],
+            'postprocessor_hooks': [self.tracer.postprocessorHook, self.metrics.postprocessorHook],
+        }
+        if cookie_file:
+            common_opts['cookiefile'] = cookie_file
+        return common_opts
+
+    def resolveInfo(self):
+        """
+        Extracts the video info and resolves the best audio format.
+
+        The result can be passed to ``downloadAsMp3`` later so the download
+        starts transferring without another extraction.
+
+        Returns:
+            dict: The resolved info extracted by yt-dlp.
+        """
+        options = self.getCommonOptions()
+        options['format'] = 'bestaudio/best'
+        with yt_dlp.YoutubeDL(options) as ydl, self.tracer.span('extract_info', 'extract', url=self.url):
+            return ydl.extract_info(self.url, download=False)
+
+    def downloadAsMp3(self, custom_title=None, info=None):
         """
         Downloads the audio from a YouTube video as an MP3 file.
 
+        The downloaded audio is kept until the conversion succeeds, and a
+        failed conversion is retried on it without downloading again.
+
         Args:
             custom_title (str, optional): Custom title for the file. Defaults to video title.
+            info (dict, optional): Info previously returned by ``resolveInfo``. Skips extraction.
 
         Returns:
             str: The path where the MP3 file was saved.
 
         Raises:
-            Exception: If the download or conversion fails.
+            DownloadFailure: The classified error if the download or conversion fails.
         """
+        title = None
         try:
-            cookie_file = self.cookie_manager.getCookieFile()
-            
-            # Common options for modern YouTube handling
-            common_opts = {
-                'extractor_args': {
-                    'youtube': {
-                        'skip': ['translated_subs'],
-                    }
-                },
-                'noplaylist': True,
-                'quiet': False,
-                'no_warnings': False,
-                'compat_opts': ['no-live-chat'],
-            }
-            if cookie_file:
-                common_opts['cookiefile'] = cookie_file
-
+            common_opts = self.getCommonOptions()
+            prefetched = info is not None
 
             # First extraction to get title
-            with yt_dlp.YoutubeDL(common_opts) as ydl:
-                info = ydl.extract_info(self.url, download=False)
-                title = sanitizeFilename(custom_title or info.get('title', 'Unknown Title'))
+            if not prefetched:
+                with yt_dlp.YoutubeDL(common_opts) as ydl, self.tracer.span('extract_info', 'extract', url=self.url):
+                    info = ydl.extract_info(self.url, download=False)
+            title = sanitizeFilename(custom_title or info.get('title', 'Unknown Title'))
 
             if self.log_callback:
                 self.log_callback(f"Download started: \"{title}\" - Format: MP3. Saved at: \"{self.save_path}\"")
@@ -111,9 +159,31 @@ class Mp3Downloader:
                 'progress_hooks': [self.progressHook],
                 'keepvideo': False,
             })
+            if self.watchdog:
+                options.update(self.watchdog.transferOptions())
+
+            # A plain HTTP(S) audio file opens one connection; only trust an audio-only selection
+            plain = info.get('vcodec') == 'none' and info.get('protocol') in ('http', 'https')
+            with ConnectionBudget.getDefault().lease(1 if plain else self.concurrent_fragments) as granted:
+                options.update(self.getTransferOptions(granted))
+                with yt_dlp.YoutubeDL(options) as ydl:
+                    def run(attempt):
+                        # On a retry yt-dlp finds the kept audio file and only converts it
+                        if prefetched or attempt:
+                            ydl.process_ie_result(info, download=True)
+                        else:
+                            ydl.download([self.url])
 
-            with yt_dlp.YoutubeDL(options) as ydl:
-                ydl.download([self.url])
+                    self.downloaded_path = None
+                    with self.tracer.span('download', 'download', format='MP3', connections=granted):
+                        try:
+                            retryPostProcessing(run, self.postprocess_retries, self.log_callback)
+                        except Exception as e:
+                            if isinstance(classifyError(e), PostProcessingError) and self.downloaded_path \
+                                    and os.path.exists(self.downloaded_path):
+                                # Tag the kept audio so tubeharvester-repair can tell it from finished files
+                                markUnconverted(self.downloaded_path)
+                            raise
 
             if self.log_callback:
                 self.log_callback(f"Download complete at {self.save_path}")
@@ -130,13 +200,34 @@ class Mp3Downloader:
                 logging.error(f"yt-dlp error: {e}")
                 if self.log_callback:
                     self.log_callback(f"yt-dlp error: {e}")
-            raise
+            raise classifyError(e) from e
             
         except Exception as e:
             logging.error(f"Unexpected error: {e}")
             if self.log_callback:
                 self.log_callback(f"Unexpected error: {e}")
-            raise
+            # A read that timed out on a silent connection is the watchdog's stall
+            failure = (self.watchdog and self.watchdog.check()) or classifyError(e)
+            if failure is e:
+                raise
+            raise failure from e
+
+    def getTransferOptions(self, concurrent_fragments):
+        """
+        Builds the yt-dlp options controlling fragment concurrency and chunking.
+
+        Args:
+            concurrent_fragments (int): Number of fragments to fetch in parallel.
+
+        Returns:
+            dict: yt-dlp options to merge into the download options.
+        """
+        options = {'concurrent_fragment_downloads': max(1, concurrent_fragments)}
+        if self.http_chunk_size:
+            options['http_chunk_size'] = self.http_chunk_size
+        if self.buffer_size:
+            options['buffersize'] = self.buffer_size
+        return options
 
     def progressHook(self, d):
         """
@@ -144,7 +235,14 @@ class Mp3Downloader:
 
         Args:
             d (dict): Dictionary with download progress information.
+
+        Raises:
+            StallError: If the watchdog decided to abort the transfer.
         """
+        if self.watchdog:
+            self.watchdog.progressHook(d)
+        if self.progress_listener:
+            self.progress_listener(d)
         if d['status'] == 'downloading':
             total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
             downloaded_bytes = d.get('downloaded_bytes', 0)
@@ -153,5 +251,6 @@ class Mp3Downloader:
                 if self.progress_callback:
                     self.progress_callback(int(percentage))
         elif d['status'] == 'finished':
+            self.downloaded_path = d.get('filename')
             if self.progress_callback:
                 self.progress_callback(100)
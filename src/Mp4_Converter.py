@@ -1,9 +1,19 @@
 import os
+import re
 import yt_dlp
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from .CookieManager import CookieManager
+from .ConnectionBudget import ConnectionBudget
+from .SegmentedDownloader import SegmentedDownloader
+from .DownloadErrors import classifyError
+from .PostProcessRepair import retryPostProcessing
+from .Tracer import Tracer
+from .Metrics import HarvestMetrics
 from .utils import sanitizeFilename
 
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+
 class Mp4Downloader:
     """
     Handles the downloading of YouTube videos as MP4 files.
@@ -12,13 +22,16 @@ class Mp4Downloader:
     and manage the download process using yt-dlp.
     """
 
-    def __init__(self, progress_callback=None, log_callback=None):
+    def __init__(self, progress_callback=None, log_callback=None, concurrent_fragments=4, http_chunk_size=None, buffer_size=None):
         """
         Initializes the Mp4Downloader with callback functions.
 
         Args:
             progress_callback (callable, optional): Called with the percentage of download progress.
             log_callback (callable, optional): Called with log messages.
+            concurrent_fragments (int): Fragments fetched in parallel per DASH/HLS stream (default: 4).
+            http_chunk_size (int, optional): Size in bytes of ranged HTTP chunks. Defaults to yt-dlp's choice.
+            buffer_size (int, optional): Initial download buffer size in bytes. Defaults to yt-dlp's choice.
         """
         self.url = None
         self.path = self.getDefaultDownloadPath()
@@ -26,7 +39,17 @@ class Mp4Downloader:
         self.log_callback = log_callback
         self.video_title = None
         self.resolution = "1080"  # Default target
+        self.parallel_streams = True  # Fetch DASH video and audio concurrently
+        self.concurrent_fragments = concurrent_fragments
+        self.http_chunk_size = http_chunk_size
+        self.buffer_size = buffer_size
+        self.segmented_threshold = 50 * 1024 * 1024  # Single files at least this big use Range segments
+        self.watchdog = None  # Optional StallWatchdog fed by the progress hook
+        self.progress_listener = None  # Optional callable receiving every raw progress dict
+        self.postprocess_retries = 2  # Merge retries reusing the downloaded streams
         self.cookie_manager = CookieManager(log_callback=self.log_callback)
+        self.tracer = Tracer.getDefault()
+        self.metrics = HarvestMetrics.getDefault()
 
     @staticmethod
     def getDefaultDownloadPath():
@@ -57,24 +80,22 @@ class Mp4Downloader:
         self.path = path or self.getDefaultDownloadPath()
         os.makedirs(self.path, exist_ok=True)
 
-    def downloadVideo(self, custom_title=None):
+    def buildOptions(self, custom_title=None):
         """
-        Downloads the video from YouTube in MP4 format.
+        Builds the yt-dlp options used for format resolution and download.
 
         Args:
             custom_title (str, optional): Custom title for the file. Defaults to video title.
 
-        Raises:
-            ValueError: If the URL is not set.
+        Returns:
+            dict: The yt-dlp options.
         """
-        if not self.url:
-            raise ValueError("URL is not set.")
-
         cookie_file = self.cookie_manager.getCookieFile()
         ydl_opts = {
             'format': f'bestvideo[height<={self.resolution}]+bestaudio/best[height<={self.resolution}]/best',
             'outtmpl': os.path.join(self.path, f"{custom_title or '%(title)s'}.%(ext)s"),
             'progress_hooks': [self.progressHook],
+            'postprocessor_hooks': [self.tracer.postprocessorHook, self.metrics.postprocessorHook],
             'noplaylist': True,
             'merge_output_format': 'mp4',
             'extractor_args': {
@@ -87,10 +108,85 @@ class Mp4Downloader:
         }
         if cookie_file:
             ydl_opts['cookiefile'] = cookie_file
+        if self.watchdog:
+            ydl_opts.update(self.watchdog.transferOptions())
+        return ydl_opts
+
+    def resolveInfo(self, info=None):
+        """
+        Extracts the video info and resolves the formats for the current resolution.
+
+        The result can be passed to ``downloadVideo`` later so the download
+        starts transferring without another extraction.
+
+        Args:
+            info (dict, optional): Info extracted earlier, e.g. by a resolution probe.
+                Only the formats are selected again, without network access.
+
+        Returns:
+            dict: The resolved info extracted by yt-dlp.
+
+        Raises:
+            ValueError: If the URL is not set.
+        """
+        if not self.url:
+            raise ValueError("URL is not set.")
+
+        with yt_dlp.YoutubeDL(self.buildOptions()) as ydl:
+            if info is not None:
+                return ydl.process_ie_result(info, download=False)
+            with self.tracer.span('extract_info', 'extract', url=self.url):
+                return ydl.extract_info(self.url, download=False)
+
+    def downloadVideo(self, custom_title=None, info=None):
+        """
+        Downloads the video from YouTube in MP4 format.
+
+        When the selected format is a separate video and audio pair, both
+        streams are fetched concurrently and merged as soon as they finish.
+        A failed merge is retried on the kept streams without downloading
+        them again.
+
+        Args:
+            custom_title (str, optional): Custom title for the file. Defaults to video title.
+            info (dict, optional): Info previously returned by ``resolveInfo``. Skips extraction.
+
+        Raises:
+            ValueError: If the URL is not set.
+            DownloadFailure: The classified error if the download fails. A ``StallError``
+                means the watchdog aborted the transfer; the ``.part`` files are kept.
+        """
+        if not self.url:
+            raise ValueError("URL is not set.")
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url, download=True)
+            with yt_dlp.YoutubeDL(self.buildOptions(custom_title)) as ydl:
+                if info is None:
+                    with self.tracer.span('extract_info', 'extract', url=self.url):
+                        info = ydl.extract_info(self.url, download=False)
+                requested_formats = info.get('requested_formats') or []
+                streams = len(requested_formats) if self.parallel_streams and len(requested_formats) > 1 else 1
+                wanted = [self.connectionsFor(fmt) for fmt in requested_formats or [info]]
+
+                # Lease the connections of every stream before any transfer starts
+                budget = ConnectionBudget.getDefault()
+                with budget.lease(sum(wanted) if streams > 1 else max(wanted), minimum=streams) as granted, \
+                     self.tracer.span('download', 'download', format='MP4', streams=streams, connections=granted):
+                    if streams > 1 and granted >= streams:
+                        shares = self.splitConnections(wanted, granted)
+                        # The fragment setting is shared, so it must fit the smallest fragmented share
+                        fragmented = [share for share, want in zip(shares, wanted) if want > 1]
+                        ydl.params.update(self.getTransferOptions(min(fragmented, default=1)))
+                        self.downloadStreams(ydl, info, shares)
+                    elif self.canSegment(info, granted):
+                        self.fetchFormat(ydl, info, ydl.prepare_filename(info), granted)
+                    else:
+                        ydl.params.update(self.getTransferOptions(granted))
+                        # On a retry yt-dlp finds the kept streams and only merges them
+                        retryPostProcessing(
+                            lambda attempt: ydl.process_ie_result(info, download=True),
+                            self.postprocess_retries, self.log_callback
+                        )
                 self.video_title = sanitizeFilename(info.get('title', 'Unknown'))
                 
             if self.log_callback:
@@ -98,6 +194,168 @@ class Mp4Downloader:
 
         except Exception as e:
             self.handleError(e)
+            # A read that timed out on a silent connection is the watchdog's stall
+            failure = (self.watchdog and self.watchdog.check()) or classifyError(e)
+            if failure is e:
+                raise
+            raise failure from e
+
+    def downloadStreams(self, ydl, info, connections=None):
+        """
+        Downloads the separate streams of a merged format concurrently and merges them.
+
+        Each stream is written to its own ``<name>.f<format_id>.<ext>`` file using
+        the same yt-dlp instance, so all transfer options apply to both streams.
+        The merge then runs through ``process_info``, which finds the streams on
+        disk and applies the fixups and configured post-processors as a normal
+        download would. yt-dlp only removes the stream files after a successful merge.
+
+        Args:
+            ydl (yt_dlp.YoutubeDL): The configured yt-dlp instance.
+            info (dict): Resolved video info containing ``requested_formats``.
+            connections (list, optional): Connections available to each stream (default: 1 each).
+
+        Returns:
+            str: Path of the merged output file.
+
+        Raises:
+            yt_dlp.DownloadError: If a stream fails to download.
+            yt_dlp.utils.PostProcessingError: If the merge still fails after its retries.
+        """
+        output_path = os.path.splitext(ydl.prepare_filename(info))[0] + f".{info.get('ext') or 'mp4'}"
+        if os.path.exists(output_path):
+            if self.log_callback:
+                self.log_callback(f"Already downloaded: {output_path}")
+            return output_path
+
+        # yt-dlp names the streams the same way, so process_info finds them on disk
+        base_path = os.path.splitext(output_path)[0]
+        requested_formats = info['requested_formats']
+
+        connections = connections or [1] * len(requested_formats)
+
+        def fetchStream(fmt, stream_connections):
+            stream_path = f"{base_path}.f{fmt['format_id']}.{fmt['ext']}"
+            stream_info = dict(info)
+            del stream_info['requested_formats']
+            stream_info.update(fmt)
+            self.fetchFormat(ydl, stream_info, stream_path, stream_connections)
+            return stream_path
+
+        with ThreadPoolExecutor(max_workers=len(requested_formats)) as executor:
+            list(executor.map(fetchStream, requested_formats, connections))
+
+        retryPostProcessing(lambda attempt: ydl.process_info(dict(info)), self.postprocess_retries, self.log_callback)
+        return output_path
+
+    def canSegment(self, info, connections):
+        """
+        Checks whether a single-file format should use the segmented downloader.
+
+        Args:
+            info (dict): Format or video info with ``url``, ``protocol`` and ``filesize``.
+            connections (int): Connections available for the transfer.
+
+        Returns:
+            bool: True for large plain HTTP(S) files when more than one connection is available.
+        """
+        return (
+            connections > 1
+            and bool(info.get('url'))
+            and info.get('protocol') in ('http', 'https')
+            and (info.get('filesize') or 0) >= self.segmented_threshold
+        )
+
+    def connectionsFor(self, fmt):
+        """
+        Gets the number of connections the transfer of one format opens.
+
+        Args:
+            fmt (dict): Format or video info with ``protocol``, ``url`` and ``filesize``.
+
+        Returns:
+            int: 1 for plain HTTP(S) files below ``segmented_threshold``, otherwise
+                ``concurrent_fragments`` (fragmented protocols and Range segments).
+        """
+        if fmt.get('protocol') in ('http', 'https') and not self.canSegment(fmt, self.concurrent_fragments):
+            return 1
+        return max(1, self.concurrent_fragments)
+
+    @staticmethod
+    def splitConnections(wanted, granted):
+        """
+        Splits leased connections over streams that are fetched in parallel.
+
+        Args:
+            wanted (list): Connections each stream would open.
+            granted (int): Connections leased, at least one per stream.
+
+        Returns:
+            list: Connections per stream, at least 1 and at most what it wanted.
+        """
+        shares = [1] * len(wanted)
+        spare = granted - len(wanted)
+        while spare > 0 and shares != wanted:
+            for index, want in enumerate(wanted):
+                if spare > 0 and shares[index] < want:
+                    shares[index] += 1
+                    spare -= 1
+        return shares
+
+    def fetchFormat(self, ydl, info, path, connections=1):
+        """
+        Downloads one format to ``path``, splitting large files into Range segments.
+
+        Args:
+            ydl (yt_dlp.YoutubeDL): The configured yt-dlp instance.
+            info (dict): Info of the single format to download.
+            path (str): Destination file path.
+            connections (int): Connections available for the transfer (default: 1).
+
+        Raises:
+            yt_dlp.DownloadError: If the download fails.
+        """
+        if not self.canSegment(info, connections):
+            with self.tracer.span('transfer', 'download', format_id=info.get('format_id'), bytes=info.get('filesize')):
+                success, _ = ydl.dl(path, info)
+            if not success:
+                raise yt_dlp.DownloadError(f"Failed to download stream {info.get('format_id')}")
+            return
+
+        if os.path.exists(path):
+            return
+        part_path = path + '.part'
+        # Requests go through ydl, which applies its proxy, cookies, source address and socket timeout
+        downloader = SegmentedDownloader(
+            connections=connections,
+            headers=info.get('http_headers'),
+            progress_hooks=[self.progressHook],
+            ydl=ydl
+        )
+        try:
+            with self.tracer.span('transfer', 'download', format_id=info.get('format_id'), bytes=info.get('filesize'),
+                                  segmented=True):
+                downloader.download(info['url'], part_path, info.get('filesize'))
+        except Exception as e:
+            raise yt_dlp.DownloadError(f"Failed to download stream {info.get('format_id')}: {e}") from e
+        os.replace(part_path, path)
+
+    def getTransferOptions(self, concurrent_fragments):
+        """
+        Builds the yt-dlp options controlling fragment concurrency and chunking.
+
+        Args:
+            concurrent_fragments (int): Number of fragments to fetch in parallel.
+
+        Returns:
+            dict: yt-dlp options to merge into the download options.
+        """
+        options = {'concurrent_fragment_downloads': max(1, concurrent_fragments)}
+        if self.http_chunk_size:
+            options['http_chunk_size'] = self.http_chunk_size
+        if self.buffer_size:
+            options['buffersize'] = self.buffer_size
+        return options
 
     def fetchVideoInfo(self):
         """
@@ -122,7 +380,7 @@ class Mp4Downloader:
         cookie_file = self.cookie_manager.getCookieFile()
         if cookie_file:
             opts['cookiefile'] = cookie_file
-        with yt_dlp.YoutubeDL(opts) as ydl:
+        with yt_dlp.YoutubeDL(opts) as ydl, self.tracer.span('extract_info', 'extract', url=self.url):
             return ydl.extract_info(self.url, download=False)
 
     def progressHook(self, d):
@@ -131,9 +389,21 @@ class Mp4Downloader:
 
         Args:
             d (dict): Dictionary with download progress information.
+
+        Raises:
+            StallError: If the watchdog decided to abort the transfer.
         """
+        if self.watchdog:
+            self.watchdog.progressHook(d)
+        if self.progress_listener:
+            self.progress_listener(d)
         if d['status'] == 'downloading' and self.progress_callback:
-            p = d.get('_percent_str', '0%').replace('%','')
+            total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+            if total_bytes > 0:
+                self.progress_callback(int(d.get('downloaded_bytes', 0) / total_bytes * 100))
+                return
+            # No byte counts: fall back to yt-dlp's formatted percentage without its color codes
+            p = ANSI_ESCAPE.sub('', d.get('_percent_str', '0%')).replace('%','')
             try:
                 self.progress_callback(int(float(p)))
             except ValueError:
@@ -3,6 +3,9 @@ import time
 import logging
 from urllib.parse import urlparse, parse_qs
 from .CookieManager import CookieManager
+from .CircuitBreaker import CircuitBreaker
+from .Tracer import Tracer
+from .Metrics import HarvestMetrics
 from .utils import sanitizeFilename
 
 class PlaylistScraper:
@@ -24,6 +27,9 @@ class PlaylistScraper:
         self.timeout = timeout
         self.log_callback = log_callback
         self.cookie_manager = CookieManager(log_callback=self.log_callback)
+        self.circuit_breaker = CircuitBreaker.getDefault()
+        self.tracer = Tracer.getDefault()
+        self.metrics = HarvestMetrics.getDefault()
 
     def isYoutubeMix(self, playlist_id):
         """
@@ -104,12 +110,14 @@ class PlaylistScraper:
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 try:
-                    playlist_info = ydl.extract_info(normalized_url, download=False)
+                    with self.circuit_breaker.guard(), self.tracer.span('extract_info', 'scrape', url=normalized_url), self.metrics.timeScrape('playlist'):
+                        playlist_info = ydl.extract_info(normalized_url, download=False)
                 except yt_dlp.DownloadError as e:
                     if is_mix and 'v' in query_params:
                         video_id = query_params['v'][0]
                         watch_url = f"https://www.youtube.com/watch?v={video_id}&list={playlist_id}"
-                        playlist_info = ydl.extract_info(watch_url, download=False)
+                        with self.circuit_breaker.guard(), self.tracer.span('extract_info', 'scrape', url=watch_url), self.metrics.timeScrape('playlist'):
+                            playlist_info = ydl.extract_info(watch_url, download=False)
                     else:
                         raise e
 
@@ -131,9 +139,11 @@ class PlaylistScraper:
                                 percentage = int((len(videos) / total) * 100)
                                 progress_callback(len(videos), total, percentage)
 
-                            time.sleep(self.timeout)
+                            with self.tracer.span('sleep', 'scrape'):
+                                time.sleep(self.timeout)
                 else:
                     logging.warning(f"No entries found in playlist: {normalized_url}")
+            self.metrics.scraped_entries.inc(len(videos), source='playlist')
 
         except Exception as e:
             logging.error(f"Error scraping playlist: {e}")
@@ -170,13 +180,15 @@ class PlaylistScraper:
 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 try:
-                    info = ydl.extract_info(normalized_url, download=False)
+                    with self.circuit_breaker.guard(), self.tracer.span('extract_info', 'scrape', url=normalized_url), self.metrics.timeScrape('playlist_title'):
+                        info = ydl.extract_info(normalized_url, download=False)
                     return sanitizeFilename(info.get('title', 'Unknown Playlist'))
                 except yt_dlp.DownloadError as e:
                     if is_mix and 'v' in query_params:
                         video_id = query_params['v'][0]
                         watch_url = f"https://www.youtube.com/watch?v={video_id}&list={playlist_id}"
-                        info = ydl.extract_info(watch_url, download=False)
+                        with self.circuit_breaker.guard(), self.tracer.span('extract_info', 'scrape', url=watch_url), self.metrics.timeScrape('playlist_title'):
+                            info = ydl.extract_info(watch_url, download=False)
                         return sanitizeFilename(info.get('title', 'Unknown Playlist'))
                     else:
                         raise e
@@ -0,0 +1,247 @@
+import os
+import re
+import logging
+import argparse
+import yt_dlp
+from yt_dlp.postprocessor import FFmpegMergerPP, FFmpegExtractAudioPP
+from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessor
+from .DownloadErrors import classifyError, PostProcessingError
+
+STREAM_PATTERN = re.compile(r'^(?P<base>.+)\.f(?P<format_id>[0-9A-Za-z_-]+)\.(?P<ext>[0-9A-Za-z]+)$')
+UNCONVERTED_TAG = 'unconverted'
+UNCONVERTED_PATTERN = re.compile(rf'^(?P<base>.+)\.{UNCONVERTED_TAG}\.(?P<ext>[0-9A-Za-z]+)$')
+AUDIO_SOURCE_EXTS = ('webm', 'm4a', 'opus', 'ogg', 'aac')
+SKIPPED_SUFFIXES = ('.part', '.ytdl', '.temp', '.orig')
+
+def retryPostProcessing(run, retries, log_callback=None):
+    """
+    Calls ``run`` again when only its post-processing step failed.
+
+    yt-dlp keeps the downloaded source files when FFmpeg fails, so a retry
+    finds them on disk and repeats the conversion without downloading again.
+
+    Args:
+        run (callable): Called with the attempt number, starting at 0.
+        retries (int): Extra attempts allowed after a post-processing failure.
+        log_callback (callable, optional): Called with log messages.
+
+    Returns:
+        The return value of ``run``.
+
+    Raises:
+        Exception: The last error, or any error that is not a post-processing failure.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return run(attempt)
+        except Exception as e:
+            if not isinstance(classifyError(e), PostProcessingError):
+                raise
+            if attempt >= retries:
+                message = "Post-processing failed; the downloaded files were kept for tubeharvester-repair"
+            else:
+                message = f"Post-processing failed, retrying without downloading again ({attempt + 1}/{retries}): {e}"
+            logging.warning(message)
+            if log_callback:
+                log_callback(message)
+            if attempt >= retries:
+                raise
+
+def markUnconverted(path):
+    """
+    Renames audio kept after a failed conversion so the repair command recognizes it.
+
+    Args:
+        path (str): The downloaded audio file.
+
+    Returns:
+        str: The new path, ``<title>.unconverted.<ext>``.
+    """
+    stem, ext = os.path.splitext(path)
+    marked = f"{stem}.{UNCONVERTED_TAG}{ext}"
+    os.replace(path, marked)
+    return marked
+
+class PostProcessRepair:
+    """
+    Re-runs FFmpeg post-processing on intermediates left in an output tree.
+
+    A download whose merge or audio conversion failed leaves its raw streams
+    next to the expected output. For MP4 folders these are the
+    ``<title>.f<format_id>.<ext>`` stream files, which are merged into
+    ``<title>.mp4``. For MP3 folders these are the audio files renamed by
+    ``markUnconverted``, which are converted into ``<title>.mp3``. Other
+    files are never touched, and the sources are only deleted once their
+    output has been written.
+    """
+
+    def __init__(self, log_callback=None, audio_quality='192'):
+        """
+        Initializes the PostProcessRepair.
+
+        Args:
+            log_callback (callable, optional): Called with log messages.
+            audio_quality (str): MP3 bitrate in kbit/s used for conversions (default: '192').
+        """
+        self.log_callback = log_callback
+        self.audio_quality = audio_quality
+
+    def findIntermediates(self, root, format_type='MP4'):
+        """
+        Finds leftover intermediates below ``root``.
+
+        Args:
+            root (str): Output folder to scan recursively.
+            format_type (str): 'MP4' to find unmerged streams, 'MP3' to find unconverted audio.
+
+        Returns:
+            list: ``(output_path, source_paths)`` tuples, one per output to rebuild.
+
+        Raises:
+            ValueError: If the format type is not supported.
+        """
+        if format_type not in ('MP4', 'MP3'):
+            raise ValueError(f"Unsupported format: {format_type}")
+
+        jobs = []
+        for directory, _, files in os.walk(root):
+            names = set(files)
+            candidates = sorted(name for name in files if not any(s in name for s in SKIPPED_SUFFIXES))
+            if format_type == 'MP4':
+                groups = {}
+                for name in candidates:
+                    match = STREAM_PATTERN.match(name)
+                    if match:
+                        groups.setdefault(match.group('base'), []).append(os.path.join(directory, name))
+                for base, streams in sorted(groups.items()):
+                    # A single stream means the other one never finished downloading
+                    if len(streams) > 1 and f"{base}.mp4" not in names:
+                        jobs.append((os.path.join(directory, f"{base}.mp4"), streams))
+            else:
+                for name in candidates:
+                    # Only audio this tool kept after a failed conversion; finished downloads look alike
+                    match = UNCONVERTED_PATTERN.match(name)
+                    if match and match.group('ext').lower() in AUDIO_SOURCE_EXTS \
+                            and f"{match.group('base')}.mp3" not in names:
+                        jobs.append((os.path.join(directory, f"{match.group('base')}.mp3"), [os.path.join(directory, name)]))
+        return jobs
+
+    def repairTree(self, root, format_type='MP4'):
+        """
+        Rebuilds every output whose post-processing failed below ``root``.
+
+        Args:
+            root (str): Output folder to scan recursively.
+            format_type (str): 'MP4' or 'MP3'.
+
+        Returns:
+            dict: Summary with counts of 'repaired' and 'failed' outputs and the 'errors' list.
+        """
+        results = {'repaired': 0, 'failed': 0, 'errors': []}
+        jobs = self.findIntermediates(root, format_type)
+        if not jobs:
+            self.log(f"No leftover intermediates found in {root}")
+            return results
+
+        with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+            for output_path, sources in jobs:
+                try:
+                    if format_type == 'MP4':
+                        self.mergeStreams(ydl, output_path, sources)
+                    else:
+                        self.convertAudio(ydl, sources[0], output_path)
+                    results['repaired'] += 1
+                    self.log(f"Repaired: {output_path}")
+                except Exception as e:
+                    results['failed'] += 1
+                    results['errors'].append(f"{os.path.basename(output_path)}: {e}")
+                    self.log(f"Repair failed for {output_path}: {e}")
+        return results
+
+    def mergeStreams(self, ydl, output_path, stream_paths):
+        """
+        Merges kept stream files into ``output_path`` and removes them.
+
+        ffprobe is used to find out which streams carry video and audio,
+        because the format info of the original download is gone.
+
+        Args:
+            ydl (yt_dlp.YoutubeDL): yt-dlp instance the post-processors report to.
+            output_path (str): The merged file to write.
+            stream_paths (list): Paths of the downloaded streams.
+
+        Raises:
+            yt_dlp.utils.PostProcessingError: If ffprobe or FFmpeg fails.
+        """
+        probe = FFmpegPostProcessor(ydl)
+        requested_formats = []
+        for path in stream_paths:
+            codec_types = {s.get('codec_type') for s in probe.get_metadata_object(path).get('streams', [])}
+            requested_formats.append({
+                'filepath': path,
+                'protocol': 'https',
+                'vcodec': 'unknown' if 'video' in codec_types else 'none',
+                'acodec': 'unknown' if 'audio' in codec_types else 'none',
+            })
+
+        FFmpegMergerPP(ydl).run({
+            'filepath': output_path,
+            'requested_formats': requested_formats,
+            '__files_to_merge': stream_paths,
+        })
+        for path in stream_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def convertAudio(self, ydl, source_path, output_path):
+        """
+        Converts a kept audio download to MP3 and removes the source.
+
+        Args:
+            ydl (yt_dlp.YoutubeDL): yt-dlp instance the post-processors report to.
+            source_path (str): Path of the audio file renamed by ``markUnconverted``.
+            output_path (str): The MP3 file to write.
+
+        Raises:
+            yt_dlp.utils.PostProcessingError: If FFmpeg fails.
+        """
+        extractor = FFmpegExtractAudioPP(ydl, preferredcodec='mp3', preferredquality=self.audio_quality)
+        ext = os.path.splitext(source_path)[1][1:]
+        files_to_delete, information = extractor.run({'filepath': source_path, 'ext': ext})
+        os.replace(information['filepath'], output_path)
+        for path in files_to_delete:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def log(self, message):
+        """
+        Sends a message to the log callback and the logger.
+
+        Args:
+            message (str): The message to log.
+        """
+        logging.info(message)
+        if self.log_callback:
+            self.log_callback(message)
+
+def main(argv=None):
+    """
+    Command line entry point: repairs the outputs in one folder.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to ``sys.argv``.
+
+    Returns:
+        int: Exit status, 1 if any output could not be repaired.
+    """
+    parser = argparse.ArgumentParser(description="Re-run failed FFmpeg post-processing on leftover downloads.")
+    parser.add_argument('folder', help="Output folder to scan recursively")
+    parser.add_argument('--format', choices=['MP4', 'MP3'], default='MP4', help="Format the folder was downloaded as")
+    args = parser.parse_args(argv)
+
+    results = PostProcessRepair(log_callback=print).repairTree(args.folder, args.format)
+    print(f"Repaired {results['repaired']}, failed {results['failed']}")
+    return 1 if results['failed'] else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+import time
+import threading
+
+class ProgressAggregator:
+    """
+    Combines the byte progress of all running items into one batch progress.
+
+    Download workers report every yt-dlp progress hook call through
+    ``update``. Overall progress is weighted by bytes rather than by items:
+    running items count with their real or estimated size, and items that
+    have not started count with their duration times the bytes per second of
+    media seen so far, or with the average item size when no duration is
+    known. Throughput is smoothed with an exponential moving average and used
+    for the ETA. Emissions to the callback are throttled to one per
+    ``interval`` seconds so a GUI is not flooded from many worker threads.
+    """
+
+    def __init__(self, callback=None, interval=0.5, smoothing=0.3, clock=time.monotonic):
+        """
+        Initializes the ProgressAggregator.
+
+        Args:
+            callback (callable, optional): Called with the dict returned by ``snapshot``.
+            interval (float): Minimum seconds between two emissions (default: 0.5).
+            smoothing (float): Weight of the newest speed sample, between 0 and 1 (default: 0.3).
+            clock (callable): Monotonic time source, replaceable in tests.
+        """
+        self.callback = callback
+        self.interval = interval
+        self.smoothing = smoothing
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, total_items=None, total_duration=0, timed_items=0):
+        """
+        Starts a new batch.
+
+        Args:
+            total_items (int, optional): Items in the batch, or None if unknown.
+            total_duration (float): Summed duration in seconds of the items that have one.
+            timed_items (int): Number of items with a known duration.
+        """
+        with self.lock:
+            self.total_items = total_items
+            self.total_duration = total_duration
+            self.timed_items = timed_items
+            self.active = {}
+            self.done_items = 0
+            self.done_bytes = 0
+            self.finished_duration = 0
+            self.finished_timed = 0
+            self.timed_bytes = 0
+            self.timed_duration = 0
+            self.unsized_items = 0
+            self.transferred = 0
+            self.speed = None
+            self.last_sample = (self.clock(), 0)
+            self.last_emit = None
+
+    def begin(self, key, duration=None):
+        """
+        Registers an item whose download is starting.
+
+        Args:
+            key (str): Identifier of the item.
+            duration (float, optional): Media duration in seconds, if known.
+        """
+        with self.lock:
+            if key not in self.active:
+                self.active[key] = {'duration': duration or 0, 'streams': {}}
+
+    def update(self, key, d):
+        """
+        Records one progress hook call of an item. Called from worker threads.
+
+        Streams are tracked by file name, so the separate video and audio
+        downloads of one item add up instead of replacing each other.
+
+        Args:
+            key (str): Identifier of the item.
+            d (dict): The yt-dlp progress dictionary.
+        """
+        if d.get('status') not in ('downloading', 'finished'):
+            return
+        downloaded = d.get('downloaded_bytes') or 0
+        total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+        if d['status'] == 'finished':
+            total = total or downloaded
+        with self.lock:
+            item = self.active.setdefault(key, {'duration': 0, 'streams': {}})
+            filename = d.get('filename') or d.get('tmpfilename') or ''
+            previous = item['streams'].get(filename, (0, 0))[0]
+            # A restarted stream starts from a lower count; only growth is transferred data
+            self.transferred += max(0, downloaded - previous)
+            item['streams'][filename] = (downloaded, total)
+        self.emit()
+
+    def finish(self, key=None, duration=None):
+        """
+        Marks an item as done, whether it succeeded, failed or was skipped.
+
+        Args:
+            key (str, optional): Identifier of the item; items never begun count with the average size.
+            duration (float, optional): Media duration of an item that was never begun.
+        """
+        with self.lock:
+            item = self.active.pop(key, None) or {'duration': duration or 0, 'streams': {}}
+            self.done_items += 1
+            if item['duration']:
+                self.finished_duration += item['duration']
+                self.finished_timed += 1
+            size = sum(max(downloaded, total) for downloaded, total in item['streams'].values())
+            if size:
+                self.done_bytes += size
+                if item['duration']:
+                    self.timed_bytes += size
+                    self.timed_duration += item['duration']
+            else:
+                self.unsized_items += 1
+        self.emit(force=True)
+
+    def snapshot(self):
+        """
+        Computes the current batch progress.
+
+        Returns:
+            dict: {'percent': float or None, 'done_bytes': int, 'total_bytes': int or None,
+                'speed': float or None (bytes/s), 'eta': float or None (seconds),
+                'done_items': int, 'total_items': int or None}.
+        """
+        with self.lock:
+            now = self.clock()
+            last_time, last_transferred = self.last_sample
+            # Samples closer together than half the interval are too noisy to use
+            if now > last_time and now - last_time >= self.interval / 2:
+                sample = (self.transferred - last_transferred) / (now - last_time)
+                self.speed = sample if self.speed is None else \
+                    self.smoothing * sample + (1 - self.smoothing) * self.speed
+                self.last_sample = (now, self.transferred)
+
+            known_items = self.done_items - self.unsized_items
+            known_bytes = self.done_bytes
+            timed_bytes, timed_duration = self.timed_bytes, self.timed_duration
+            active_done = active_total = 0
+            started_duration = started_timed = 0
+            unknown_active = []
+            for item in self.active.values():
+                downloaded = sum(d for d, _ in item['streams'].values())
+                total = sum(max(d, t) for d, t in item['streams'].values())
+                active_done += downloaded
+                if item['duration']:
+                    started_duration += item['duration']
+                    started_timed += 1
+                if total:
+                    active_total += total
+                    known_items += 1
+                    known_bytes += total
+                    if item['duration']:
+                        timed_bytes += total
+                        timed_duration += item['duration']
+                else:
+                    unknown_active.append(item['duration'])
+
+            average = known_bytes / known_items if known_items else None
+            rate = timed_bytes / timed_duration if timed_duration else None
+
+            def expected(duration):
+                return duration * rate if duration and rate else average
+
+            percent = total_bytes = eta = None
+            if self.total_items is not None and average is not None:
+                remaining = max(0, self.total_items - self.done_items - len(self.active))
+                remaining_timed = max(0, min(remaining, self.timed_items - self.finished_timed - started_timed))
+                remaining_duration = max(0, self.total_duration - self.finished_duration - started_duration)
+                pending_bytes = (remaining - remaining_timed) * average
+                pending_bytes += remaining_duration * rate if rate else remaining_timed * average
+                done_bytes = self.done_bytes + self.unsized_items * average + active_done
+                total_bytes = int(self.done_bytes + self.unsized_items * average + active_total
+                                  + sum(expected(d) for d in unknown_active) + pending_bytes)
+                percent = min(100.0, done_bytes / total_bytes * 100) if total_bytes else 100.0
+                if self.speed:
+                    eta = max(0, total_bytes - done_bytes) / self.speed
+            elif self.total_items:
+                percent = self.done_items / self.total_items * 100
+
+            return {
+                'percent': percent,
+                'done_bytes': self.done_bytes + active_done,
+                'total_bytes': total_bytes,
+                'speed': self.speed,
+                'eta': eta,
+                'done_items': self.done_items,
+                'total_items': self.total_items,
+            }
+
+    def emit(self, force=False):
+        """
+        Sends a snapshot to the callback unless one was sent less than ``interval`` ago.
+
+        Args:
+            force (bool): Emit even if the interval has not passed, e.g. when an item finishes.
+        """
+        if not self.callback:
+            return
+        with self.lock:
+            now = self.clock()
+            if not force and self.last_emit is not None and now - self.last_emit < self.interval:
+                return
+            self.last_emit = now
+        self.callback(self.snapshot())
@@ -0,0 +1,187 @@
+import copy
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlparse, parse_qs
+
+def videoId(url):
+    """
+    Gets the YouTube video ID of a URL.
+
+    Args:
+        url (str): A watch, youtu.be, shorts, live or embed URL.
+
+    Returns:
+        str: The video ID, or None if the URL names no video.
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower().split(':')[0]
+    if host.endswith('youtu.be'):
+        return parsed.path.strip('/').split('/')[0] or None
+    if not host.endswith('youtube.com'):
+        return None
+    video = parse_qs(parsed.query).get('v', [''])[0]
+    if video:
+        return video
+    parts = parsed.path.strip('/').split('/')
+    if len(parts) >= 2 and parts[0] in ('shorts', 'live', 'embed'):
+        return parts[1] or None
+    return None
+
+class ResolutionProbe:
+    """
+    Resolves the info of the URL typed into a download panel.
+
+    URL changes are debounced: a probe only starts once the URL has been
+    unchanged for ``delay`` seconds, and a newer URL cancels the pending one.
+    A probe that is already extracting cannot be interrupted, but its result
+    is dropped if the URL changed meanwhile, so stale resolutions never reach
+    the menu. Probes for the same key (the video ID unless ``key`` is given)
+    share one extraction, and results are cached by key so the download
+    reuses them instead of extracting again.
+    """
+
+    def __init__(self, extract, on_result=None, on_error=None, delay=0.5, max_age=1800, max_entries=32, key=None):
+        """
+        Initializes the ResolutionProbe.
+
+        Args:
+            extract (callable): Called with a URL on a worker thread; returns the yt-dlp info.
+            on_result (callable, optional): Called with (url, info) when the current URL is resolved.
+            on_error (callable, optional): Called with (url, error) when the current URL fails.
+            delay (float): Seconds the URL must stay unchanged before probing (default: 0.5).
+            max_age (float): Seconds after which cached info is extracted again (default: 1800).
+            max_entries (int): Number of videos kept in the cache (default: 32).
+            key (callable, optional): Maps a URL to its cache key. Defaults to the video ID.
+        """
+        self.extract = extract
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay = delay
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.key = key
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.in_flight = {}
+        self.generation = 0
+        self.timer = None
+
+    def cacheKey(self, url):
+        """
+        Gets the key under which the info of a URL is cached.
+
+        Args:
+            url (str): The video URL.
+
+        Returns:
+            str: The video ID, or the stripped URL if it has none.
+        """
+        if self.key:
+            return self.key(url)
+        return videoId(url) or url.strip()
+
+    def request(self, url):
+        """
+        Schedules a probe for a URL, replacing any probe not started yet.
+
+        Args:
+            url (str): The URL currently entered, or an empty string.
+        """
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            if not url.strip():
+                return
+            self.timer = threading.Timer(self.delay, self.probe, (generation, url))
+            self.timer.daemon = True
+            self.timer.start()
+
+    def cancel(self):
+        """
+        Cancels the pending probe and drops the result of a running one.
+        """
+        self.request('')
+
+    def probe(self, generation, url):
+        """
+        Resolves a URL and reports the result if it is still the current one.
+
+        Args:
+            generation (int): Request counter value when the probe was scheduled.
+            url (str): The URL to resolve.
+        """
+        if generation != self.generation:
+            return
+        try:
+            info = self.resolve(url)
+        except Exception as e:
+            if generation == self.generation and self.on_error:
+                self.on_error(url, e)
+            return
+        if generation == self.generation and self.on_result:
+            self.on_result(url, info)
+
+    def cached(self, url):
+        """
+        Gets the cached info of a URL without extracting.
+
+        Args:
+            url (str): The video URL.
+
+        Returns:
+            dict: A copy of the cached info, or None if it is missing or too old.
+        """
+        key = self.cacheKey(url)
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.max_age:
+                return None
+            self.cache.move_to_end(key)
+        return copy.deepcopy(entry[0])
+
+    def resolve(self, url):
+        """
+        Gets the info of a URL from the cache, a running probe or a new extraction.
+
+        Blocks until the info is available, so it must not run on the GUI thread.
+
+        Args:
+            url (str): The video URL.
+
+        Returns:
+            dict: A copy of the info; callers may let yt-dlp modify it.
+
+        Raises:
+            Exception: Whatever ``extract`` raised.
+        """
+        info = self.cached(url)
+        if info is not None:
+            return info
+
+        key = self.cacheKey(url)
+        with self.lock:
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.in_flight[key] = Future()
+
+        if owner:
+            try:
+                info = self.extract(url)
+                with self.lock:
+                    self.cache[key] = (info, time.monotonic())
+                    self.cache.move_to_end(key)
+                    while len(self.cache) > self.max_entries:
+                        self.cache.popitem(last=False)
+                future.set_result(info)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    self.in_flight.pop(key, None)
+        return copy.deepcopy(future.result())
@@ -0,0 +1,394 @@
+import os
+import re
+import csv
+import json
+import time
+import shutil
+import logging
+import threading
+import tracemalloc
+
+# Names of the child processes counted as FFmpeg work
+FFMPEG_NAMES = ('ffmpeg', 'ffprobe')
+
+def rssBytes():
+    """
+    Gets the resident memory of this process.
+
+    Returns:
+        int: Bytes, or None where ``/proc`` is not available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def openFileCount():
+    """
+    Counts the open file descriptors of this process.
+
+    Returns:
+        int: Open descriptors, or None where neither ``/proc`` nor ``/dev/fd`` lists them.
+    """
+    for fd_dir in ('/proc/self/fd', '/dev/fd'):
+        try:
+            # Listing the directory opens one descriptor itself
+            return len(os.listdir(fd_dir)) - 1
+        except OSError:
+            continue
+    return None
+
+def childProcesses(names=FFMPEG_NAMES):
+    """
+    Counts the running descendants of this process with one of the given names.
+
+    Args:
+        names (tuple): Process names to count (default: FFMPEG_NAMES).
+
+    Returns:
+        int: Matching descendants, or None where ``/proc`` is not available.
+    """
+    try:
+        pids = [entry for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return None
+    parents = {}
+    commands = {}
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command is in parentheses and may contain spaces
+        command = stat[stat.find('(') + 1:stat.rfind(')')]
+        parents[int(pid)] = int(stat[stat.rfind(')') + 2:].split()[1])
+        commands[int(pid)] = command
+    own = os.getpid()
+    count = 0
+    for pid, command in commands.items():
+        if not command.startswith(names):
+            continue
+        ancestor = parents.get(pid)
+        while ancestor and ancestor != own:
+            ancestor = parents.get(ancestor)
+        if ancestor == own:
+            count += 1
+    return count
+
+def existingParent(path):
+    """
+    Finds the nearest existing directory of a path, so disk usage can be read before it is created.
+
+    Args:
+        path (str): A file or directory path.
+
+    Returns:
+        str: The path itself or its nearest existing parent.
+    """
+    path = os.path.abspath(path)
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return path
+
+def threadGroups():
+    """
+    Counts live threads by name with the numbers removed, e.g. 'download_0' and 'download_1' as 'download'.
+
+    Returns:
+        dict: Name to thread count.
+    """
+    groups = {}
+    for thread in threading.enumerate():
+        name = re.sub(r'[-_]?\d+', '', thread.name) or thread.name
+        groups[name] = groups.get(name, 0) + 1
+    return groups
+
+class ResourceSampler:
+    """
+    Records the resource use of a long job at a fixed interval.
+
+    A background thread samples the resident memory, live threads, open
+    file descriptors, FFmpeg child processes and the output disk, and
+    appends one CSV row per sample. With ``top_allocations`` it also runs
+    ``tracemalloc`` and reports the code locations whose allocations grew
+    the most, which slows Python code down noticeably. ``stop`` writes a
+    JSON summary next to the CSV file.
+    """
+
+    COLUMNS = ('elapsed_seconds', 'rss_bytes', 'traced_bytes', 'threads', 'open_fds', 'ffmpeg_processes',
+               'disk_free_bytes', 'disk_used_bytes')
+
+    ENV_VAR = 'TUBEHARVESTER_RESOURCE_LOG'
+    INTERVAL_ENV_VAR = 'TUBEHARVESTER_RESOURCE_INTERVAL'
+    ALLOCATIONS_ENV_VAR = 'TUBEHARVESTER_TOP_ALLOCATIONS'
+
+    def __init__(self, path, interval=10, disk_path=None, top_allocations=0, log_callback=None):
+        """
+        Initializes the ResourceSampler.
+
+        Args:
+            path (str): CSV file for the samples; the summary goes to the same name with '.summary.json'.
+            interval (float): Seconds between two samples (default: 10).
+            disk_path (str, optional): Directory on the output disk. Defaults to the current directory.
+            top_allocations (int): Allocation sites reported in the summary; 0 leaves tracemalloc off (default: 0).
+            log_callback (callable, optional): Called with the summary lines at the end.
+        """
+        self.path = path
+        self.interval = interval
+        self.disk_path = disk_path or os.getcwd()
+        self.top_allocations = top_allocations
+        self.log_callback = log_callback
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.file = None
+        self.writer = None
+        self.started = None
+        self.samples = 0
+        self.elapsed = 0
+        self.series = {}
+        self.peak_threads = {}
+        self.first_snapshot = None
+        self.started_tracemalloc = False
+
+    @classmethod
+    def fromEnvironment(cls, disk_path=None, log_callback=None):
+        """
+        Creates a sampler if ``TUBEHARVESTER_RESOURCE_LOG`` names a file.
+
+        ``TUBEHARVESTER_RESOURCE_INTERVAL`` sets the interval in seconds and
+        ``TUBEHARVESTER_TOP_ALLOCATIONS`` the allocation sites to report.
+
+        Args:
+            disk_path (str, optional): Directory on the output disk.
+            log_callback (callable, optional): Called with the summary lines at the end.
+
+        Returns:
+            ResourceSampler: The configured sampler, or None if the variable is not set.
+        """
+        path = os.environ.get(cls.ENV_VAR)
+        if not path:
+            return None
+        try:
+            interval = float(os.environ.get(cls.INTERVAL_ENV_VAR, 10))
+            top_allocations = int(os.environ.get(cls.ALLOCATIONS_ENV_VAR, 0))
+        except ValueError as e:
+            logging.warning(f"Ignoring invalid resource sampler setting: {e}")
+            interval, top_allocations = 10, 0
+        return cls(path, interval, disk_path, top_allocations, log_callback)
+
+    def summaryPath(self):
+        """
+        Gets the file the summary is written to.
+
+        Returns:
+            str: The CSV path with its extension replaced by '.summary.json'.
+        """
+        return os.path.splitext(self.path)[0] + '.summary.json'
+
+    def start(self):
+        """
+        Writes the CSV header and the first sample and starts sampling.
+
+        Returns:
+            ResourceSampler: This sampler.
+
+        Raises:
+            OSError: If the CSV file cannot be created.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.file = open(self.path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.COLUMNS)
+        if self.top_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracemalloc = True
+            self.first_snapshot = self.snapshot()
+        self.started = time.monotonic()
+        self.sample()
+        self.thread = threading.Thread(target=self.run, name='resource-sampler', daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        """
+        Samples every interval until stopped.
+        """
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except OSError as e:
+                logging.warning(f"Could not record resource sample: {e}")
+
+    def sample(self):
+        """
+        Records one sample and appends it to the CSV file.
+
+        Returns:
+            dict: The sample by column name; values that cannot be read on this platform are None.
+        """
+        try:
+            usage = shutil.disk_usage(existingParent(self.disk_path))
+            disk_free, disk_used = usage.free, usage.used
+        except OSError:
+            disk_free = disk_used = None
+        row = {
+            'elapsed_seconds': round(time.monotonic() - self.started, 1),
+            'rss_bytes': rssBytes(),
+            'traced_bytes': tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+            'threads': threading.active_count(),
+            'open_fds': openFileCount(),
+            'ffmpeg_processes': childProcesses(),
+            'disk_free_bytes': disk_free,
+            'disk_used_bytes': disk_used,
+        }
+        if 'threads' not in self.series or row['threads'] > self.series['threads']['max']:
+            self.peak_threads = threadGroups()
+        self.record(row)
+        self.writer.writerow(['' if row[column] is None else row[column] for column in self.COLUMNS])
+        self.file.flush()
+        return row
+
+    def record(self, row):
+        """
+        Adds a sample to the running start, end, minimum and maximum of every column.
+
+        Only these are kept, so a job sampled for days does not grow the sampler's own memory.
+
+        Args:
+            row (dict): The sample by column name.
+        """
+        self.samples += 1
+        self.elapsed = row['elapsed_seconds']
+        for column in self.COLUMNS[1:]:
+            value = row[column]
+            if value is None:
+                continue
+            series = self.series.get(column)
+            if series is None:
+                self.series[column] = {'start': value, 'end': value, 'min': value, 'max': value}
+            else:
+                series['end'] = value
+                series['min'] = min(series['min'], value)
+                series['max'] = max(series['max'], value)
+
+    def snapshot(self):
+        """
+        Takes a tracemalloc snapshot without the allocations of tracemalloc and the sampler.
+
+        Returns:
+            tracemalloc.Snapshot: The filtered snapshot.
+        """
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def topAllocations(self):
+        """
+        Lists the code locations whose allocations grew the most since the start.
+
+        Returns:
+            list: Up to ``top_allocations`` dicts with 'location', 'size_diff_bytes', 'size_bytes'
+                  and 'count_diff'; empty while tracemalloc is off.
+        """
+        if not self.top_allocations or self.first_snapshot is None or not tracemalloc.is_tracing():
+            return []
+        stats = sorted(self.snapshot().compare_to(self.first_snapshot, 'lineno'), key=lambda stat: -stat.size_diff)
+        stats = [stat for stat in stats if stat.size_diff > 0][:self.top_allocations]
+        return [{
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_diff_bytes': stat.size_diff,
+            'size_bytes': stat.size,
+            'count_diff': stat.count_diff,
+        } for stat in stats]
+
+    def summary(self):
+        """
+        Summarizes the samples taken so far.
+
+        Returns:
+            dict: Duration and sample count, then start, end and peak per resource, the memory
+                  growth per hour, thread counts by name at the thread peak and the top allocations.
+        """
+        def series(column):
+            return dict(self.series[column]) if column in self.series else None
+
+        memory = series('rss_bytes')
+        growth = memory['end'] - memory['start'] if memory else None
+        return {
+            'duration_seconds': self.elapsed,
+            'samples': self.samples,
+            'interval_seconds': self.interval,
+            'rss_bytes': memory,
+            'rss_growth_bytes_per_hour': round(growth * 3600 / self.elapsed) if growth is not None and self.elapsed else None,
+            'traced_bytes': series('traced_bytes'),
+            'threads': series('threads'),
+            'threads_by_name_at_peak': self.peak_threads,
+            'open_fds': series('open_fds'),
+            'ffmpeg_processes': series('ffmpeg_processes'),
+            'disk_free_bytes': series('disk_free_bytes'),
+            'disk_used_bytes': series('disk_used_bytes'),
+            'top_allocations': self.topAllocations(),
+        }
+
+    def stop(self):
+        """
+        Takes a last sample, stops sampling and writes the summary.
+
+        Returns:
+            dict: The summary (see ``summary``).
+        """
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.sample()
+        self.file.close()
+        summary = self.summary()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        with open(self.summaryPath(), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        if self.log_callback:
+            for line in self.formatSummary(summary):
+                self.log_callback(line)
+        return summary
+
+    def formatSummary(self, summary):
+        """
+        Renders the main figures of a summary for the log.
+
+        Args:
+            summary (dict): Result of ``summary``.
+
+        Returns:
+            list: Log lines.
+        """
+        def megabytes(value):
+            return f"{value / 1e6:.0f} MB"
+
+        lines = [f"Resource samples: {summary['samples']} over {summary['duration_seconds']:.0f}s written to {self.path}"]
+        memory = summary['rss_bytes']
+        if memory:
+            lines.append(f"  Memory: {megabytes(memory['start'])} -> {megabytes(memory['end'])}, "
+                         f"peak {megabytes(memory['max'])}")
+        threads = summary['threads']
+        lines.append(f"  Threads: {threads['start']} -> {threads['end']}, peak {threads['max']}")
+        for key, label in (('open_fds', 'Open files'), ('ffmpeg_processes', 'FFmpeg processes')):
+            if summary[key]:
+                lines.append(f"  {label}: peak {summary[key]['max']}")
+        disk = summary['disk_free_bytes']
+        if disk:
+            lines.append(f"  Disk free: {megabytes(disk['start'])} -> {megabytes(disk['end'])}, lowest {megabytes(disk['min'])}")
+        for allocation in summary['top_allocations']:
+            lines.append(f"  Allocation growth: {allocation['location']} +{allocation['size_diff_bytes'] / 1e3:.0f} kB")
+        return lines
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
@@ -0,0 +1,441 @@
+import os
+import json
+import time
+import logging
+import threading
+import http.client
+import urllib.request
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import RequestError
+
+class Segment:
+    """
+    A byte range of the target file handled by one connection at a time.
+
+    ``end`` is exclusive and may shrink while the segment is being fetched when
+    another worker steals its tail.
+    """
+
+    def __init__(self, start, end):
+        """
+        Initializes the Segment.
+
+        Args:
+            start (int): First byte offset of the range.
+            end (int): Offset one past the last byte of the range.
+        """
+        self.start = start
+        self.position = start
+        self.written = start  # Bytes before this offset are on disk
+        self.end = end
+        self.active = False
+        self.attempts = 0
+
+    def remaining(self):
+        """
+        Gets the number of bytes still to be fetched.
+
+        Returns:
+            int: Remaining bytes in the range.
+        """
+        return max(0, self.end - self.position)
+
+class SegmentedDownloader:
+    """
+    Downloads a single file over several HTTP Range connections.
+
+    The file is preallocated and every segment writes its bytes at their final
+    offset, so segments can complete in any order. Failed segments are retried
+    independently from their last written byte, and idle connections split the
+    largest remaining segment (work stealing) so one slow connection cannot
+    hold up the whole transfer.
+
+    The byte ranges still missing are saved next to the file in a
+    ``.segments`` state file. A later call for the same path, such as a
+    stall restart or a retry of the batch item, resumes from them instead
+    of fetching the file again. Without a state file, an existing file is
+    taken as a prefix written by a single connection and is continued.
+    """
+
+    CHUNK_SIZE = 256 * 1024
+    MIN_SEGMENT_SIZE = 1024 * 1024
+    TIMEOUT = 20
+    STATE_SUFFIX = '.segments'
+
+    def __init__(self, connections=4, max_retries=3, timeout=TIMEOUT, headers=None,
+                 progress_hooks=None, min_segment_size=MIN_SEGMENT_SIZE, ydl=None):
+        """
+        Initializes the SegmentedDownloader.
+
+        Args:
+            connections (int): Number of parallel Range connections (default: 4).
+            max_retries (int): Retries allowed per segment before failing (default: 3).
+            timeout (float): Socket timeout in seconds for each connection (default: 20).
+            headers (dict, optional): HTTP headers sent with every request.
+            progress_hooks (list, optional): yt-dlp style hooks called with progress dicts.
+            min_segment_size (int): Smallest range worth splitting off (default: 1 MiB).
+            ydl (yt_dlp.YoutubeDL, optional): Instance whose ``urlopen`` sends the requests, so its
+                proxy, cookies, source address and socket timeout apply. Without it, plain urllib
+                with ``timeout`` is used.
+        """
+        self.connections = max(1, connections)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.progress_hooks = list(progress_hooks or [])
+        self.min_segment_size = max(1, min_segment_size)
+        self.ydl = ydl
+        self.lock = threading.Lock()
+        self.segments = []
+        self.downloaded_bytes = 0
+        self.total_bytes = 0
+        self.filename = None
+
+    def download(self, url, path, total_size=None):
+        """
+        Downloads ``url`` to ``path`` using parallel Range requests.
+
+        Falls back to a single plain request when the server does not honour
+        Range requests or the size cannot be determined. Bytes already
+        downloaded to ``path`` by an earlier call are kept.
+
+        Args:
+            url (str): The direct media URL.
+            path (str): Destination file path.
+            total_size (int, optional): Size of the file in bytes, if already known.
+
+        Returns:
+            int: Size of the downloaded file in bytes.
+
+        Raises:
+            IOError: If a segment keeps failing after all retries.
+        """
+        self.filename = path
+        size, supports_ranges = self.probe(url, total_size)
+        if not size or not supports_ranges or self.connections == 1:
+            return self.downloadSingle(url, path, size)
+
+        self.total_bytes = size
+        self.segments = self.loadState(path, size)
+        if self.segments is None:
+            existing = os.path.getsize(path) if os.path.exists(path) else 0
+            self.segments = self.planSegments(size, existing if existing < size else 0)
+        self.downloaded_bytes = size - sum(s.remaining() for s in self.segments)
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            self.preallocate(fd, size)
+            # From here on the file has holes, so only the state file tells what is missing
+            self.saveState()
+            errors = []
+            workers = [
+                threading.Thread(target=self.worker, args=(url, fd, errors), daemon=True)
+                for _ in range(min(self.connections, len(self.segments)))
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            os.close(fd)
+            self.saveState()
+
+        if errors:
+            raise errors[0]
+
+        os.remove(self.statePath())
+        self.reportProgress('finished')
+        return self.downloaded_bytes
+
+    def probe(self, url, total_size=None):
+        """
+        Determines the file size and whether the server accepts Range requests.
+
+        Args:
+            url (str): The direct media URL.
+            total_size (int, optional): Size already known from the format info.
+
+        Returns:
+            tuple: (size: int or None, supports_ranges: bool).
+        """
+        try:
+            with self.openUrl(url, dict(self.headers, Range='bytes=0-0')) as response:
+                if response.status != 206:
+                    return total_size, False
+                content_range = response.headers.get('Content-Range', '')
+                if '/' in content_range and content_range.rsplit('/', 1)[1].isdigit():
+                    return int(content_range.rsplit('/', 1)[1]), True
+                return total_size, total_size is not None
+        except Exception as e:
+            logging.warning(f"Range probe failed, using a single connection: {e}")
+            return total_size, False
+
+    def openUrl(self, url, headers):
+        """
+        Sends a GET request through yt-dlp when available, otherwise through urllib.
+
+        Args:
+            url (str): The direct media URL.
+            headers (dict): HTTP headers of the request.
+
+        Returns:
+            The response object, usable as a context manager.
+        """
+        if self.ydl is not None:
+            return self.ydl.urlopen(Request(url, headers=headers))
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout)
+
+    def planSegments(self, size, offset=0):
+        """
+        Splits the file into one segment per connection.
+
+        Args:
+            size (int): Total size in bytes.
+            offset (int): Bytes at the start of the file that are already downloaded (default: 0).
+
+        Returns:
+            list: List of Segment objects covering the file from ``offset``.
+        """
+        count = max(1, min(self.connections, (size - offset) // self.min_segment_size))
+        step = -(-(size - offset) // count)
+        return [Segment(start, min(start + step, size)) for start in range(offset, size, step)]
+
+    def statePath(self):
+        """
+        Gets the path of the state file listing the missing byte ranges.
+
+        Returns:
+            str: The download path with ``STATE_SUFFIX`` appended.
+        """
+        return self.filename + self.STATE_SUFFIX
+
+    def loadState(self, path, size):
+        """
+        Reads the missing byte ranges saved by an interrupted segmented download.
+
+        Args:
+            path (str): Destination file path.
+            size (int): Total size the server reports now.
+
+        Returns:
+            list: Segments still to fetch, or None if there is no usable state for this file.
+        """
+        try:
+            with open(self.statePath(), 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('size') != size or not os.path.exists(path):
+            return None
+        return [Segment(start, end) for start, end in state['ranges']]
+
+    def saveState(self):
+        """
+        Writes the byte ranges not yet on disk to the state file.
+
+        A failed write is only logged; the next attempt then downloads the file again.
+        """
+        with self.lock:
+            ranges = [[s.written, s.end] for s in self.segments if s.written < s.end]
+            temp_path = self.statePath() + '.tmp'
+            try:
+                with open(temp_path, 'w') as f:
+                    json.dump({'size': self.total_bytes, 'ranges': ranges}, f)
+                os.replace(temp_path, self.statePath())
+            except OSError as e:
+                logging.warning(f"Could not save download state for {self.filename}: {e}")
+
+    def preallocate(self, fd, size):
+        """
+        Reserves the full file size on disk before writing.
+
+        Args:
+            fd (int): Open file descriptor.
+            size (int): Total size in bytes.
+        """
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError:
+                pass
+        os.ftruncate(fd, size)
+
+    def nextSegment(self):
+        """
+        Picks the next segment for an idle worker, stealing work if necessary.
+
+        Returns:
+            Segment: A segment to fetch, or None when nothing is left.
+        """
+        with self.lock:
+            for segment in self.segments:
+                if not segment.active and segment.remaining() > 0:
+                    segment.active = True
+                    return segment
+
+            # Work stealing: split the tail off the largest active segment
+            victim = max(
+                (s for s in self.segments if s.active),
+                key=lambda s: s.remaining(),
+                default=None
+            )
+            if victim is None or victim.remaining() < 2 * self.min_segment_size:
+                return None
+
+            split = victim.position + victim.remaining() // 2
+            stolen = Segment(split, victim.end)
+            stolen.active = True
+            victim.end = split
+            self.segments.append(stolen)
+            return stolen
+
+    def worker(self, url, fd, errors):
+        """
+        Fetches segments until none are left or another worker has failed.
+
+        Args:
+            url (str): The direct media URL.
+            fd (int): Open file descriptor of the preallocated file.
+            errors (list): Shared list collecting fatal errors.
+        """
+        while not errors:
+            segment = self.nextSegment()
+            if segment is None:
+                return
+            try:
+                self.fetchSegment(url, fd, segment)
+            except Exception as e:
+                errors.append(e)
+                return
+            finally:
+                with self.lock:
+                    segment.active = False
+                self.saveState()
+
+    def fetchSegment(self, url, fd, segment):
+        """
+        Downloads one segment, retrying from the last written byte on failure.
+
+        Args:
+            url (str): The direct media URL.
+            fd (int): Open file descriptor of the preallocated file.
+            segment (Segment): The segment to fetch.
+
+        Raises:
+            IOError: If the segment still fails after ``max_retries`` retries.
+        """
+        while segment.remaining() > 0:
+            try:
+                headers = dict(self.headers, Range=f"bytes={segment.position}-{segment.end - 1}")
+                with self.openUrl(url, headers) as response:
+                    if response.status != 206:
+                        raise IOError(f"Server ignored range request (HTTP {response.status})")
+                    while segment.remaining() > 0:
+                        chunk = response.read(min(self.CHUNK_SIZE, segment.remaining()))
+                        if not chunk:
+                            break
+                        with self.lock:
+                            # The tail may have been stolen while this chunk was in flight
+                            chunk = chunk[:segment.remaining()]
+                            offset = segment.position
+                            segment.position += len(chunk)
+                            self.downloaded_bytes += len(chunk)
+                        self.writeAt(fd, chunk, offset)
+                        with self.lock:
+                            segment.written = offset + len(chunk)
+                        self.reportProgress('downloading')
+                if segment.remaining() > 0:
+                    raise IOError("Connection closed before the segment was complete")
+            except (OSError, http.client.HTTPException, RequestError) as e:
+                # Only network errors are retried; errors raised by progress hooks propagate
+                segment.attempts += 1
+                if segment.attempts > self.max_retries:
+                    raise IOError(f"Segment {segment.start}-{segment.end} failed: {e}") from e
+                logging.warning(f"Retrying segment at byte {segment.position} ({segment.attempts}/{self.max_retries}): {e}")
+                # A hook may abort here; a connection that timed out never reached one
+                self.reportProgress('downloading')
+                time.sleep(min(2 ** segment.attempts * 0.1, 5))
+
+    def writeAt(self, fd, data, offset):
+        """
+        Writes ``data`` at ``offset`` without moving a shared file position.
+
+        Args:
+            fd (int): Open file descriptor.
+            data (bytes): Bytes to write.
+            offset (int): Absolute position in the file.
+        """
+        if hasattr(os, 'pwrite'):
+            while data:
+                written = os.pwrite(fd, data, offset)
+                data = data[written:]
+                offset += written
+        else:
+            with self.lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                os.write(fd, data)
+
+    def downloadSingle(self, url, path, total_size=None):
+        """
+        Downloads the file over a single plain connection.
+
+        An existing file is continued with an open-ended Range request. If the
+        server answers with the whole file instead, it is written again from
+        the start.
+
+        Args:
+            url (str): The direct media URL.
+            path (str): Destination file path.
+            total_size (int, optional): Size of the file in bytes, if known.
+
+        Returns:
+            int: Size of the downloaded file in bytes.
+        """
+        if os.path.exists(self.statePath()):
+            # A segmented attempt left holes; its bytes cannot be continued in order
+            os.remove(self.statePath())
+            os.remove(path)
+        offset = os.path.getsize(path) if os.path.exists(path) else 0
+        if total_size and offset >= total_size:
+            self.total_bytes = self.downloaded_bytes = offset
+            self.reportProgress('finished')
+            return offset
+
+        headers = dict(self.headers, Range=f"bytes={offset}-") if offset else self.headers
+        with self.openUrl(url, headers) as response:
+            if response.status != 206:
+                offset = 0
+            with open(path, 'ab' if offset else 'wb') as f:
+                self.total_bytes = offset + int(response.headers.get('Content-Length') or 0)
+                self.downloaded_bytes = offset
+                while True:
+                    chunk = response.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    self.downloaded_bytes += len(chunk)
+                    self.reportProgress('downloading')
+        self.reportProgress('finished')
+        return self.downloaded_bytes
+
+    def reportProgress(self, status):
+        """
+        Calls the progress hooks with a yt-dlp style status dictionary.
+
+        Args:
+            status (str): 'downloading' or 'finished'.
+        """
+        if not self.progress_hooks:
+            return
+        total = self.total_bytes or None
+        percent = (self.downloaded_bytes / total * 100) if total else 0
+        d = {
+            'status': status,
+            'filename': self.filename,
+            'downloaded_bytes': self.downloaded_bytes,
+            'total_bytes': total,
+            '_percent_str': f"{percent:.1f}%",
+        }
+        for hook in self.progress_hooks:
+            hook(d)
@@ -0,0 +1,244 @@
+import os
+import errno
+import shutil
+import hashlib
+import threading
+from urllib.parse import urlparse, parse_qs
+from .utils import sanitizeFilename
+
+# Fallback transfer rates in bytes/s when the format info carries no size or bitrate
+VIDEO_BYTES_PER_SECOND = 5_000_000 // 8
+AUDIO_BYTES_PER_SECOND = 160_000 // 8
+INCOMPLETE_SUFFIXES = ('.part', '.ytdl')
+
+def estimateSize(info, format_type='MP4'):
+    """
+    Estimates the disk space one item needs while it is downloaded.
+
+    Uses the exact or approximate sizes of the selected formats when yt-dlp
+    knows them, and falls back to the bitrate or a typical rate times the
+    duration. The result is doubled because the downloaded streams and the
+    merged or converted output exist side by side until post-processing ends.
+
+    Args:
+        info (dict): Resolved info, or a scraped item with only a ``duration``.
+        format_type (str): 'MP4' or 'MP3', used for the fallback rate.
+
+    Returns:
+        int: Estimated peak bytes, or 0 if nothing is known about the item.
+    """
+    if not isinstance(info, dict):
+        return 0
+    formats = info.get('requested_formats') or [info]
+    total = 0
+    for fmt in formats:
+        size = fmt.get('filesize') or fmt.get('filesize_approx')
+        if not size and fmt.get('tbr') and info.get('duration'):
+            size = fmt['tbr'] * 1000 / 8 * info['duration']
+        total += size or 0
+    if not total and info.get('duration'):
+        rate = AUDIO_BYTES_PER_SECOND if format_type.upper() == 'MP3' else VIDEO_BYTES_PER_SECOND
+        total = rate * info['duration']
+    return int(total * 2)
+
+class StagingArea:
+    """
+    Holds in-progress downloads outside the final folders.
+
+    Every item downloads into its own directory below the staging root, so
+    ``.part`` files, separate streams and intermediates never appear in the
+    output tree. A finished item is moved into its final folder with an atomic
+    rename (or a copy followed by a rename when the staging root is on another
+    disk). The area also tracks the free space of both locations, minus the
+    bytes reserved by items still downloading, so the batch can pause before
+    the disk fills up.
+    """
+
+    def __init__(self, root, output_path, min_free_bytes=1024 ** 3):
+        """
+        Initializes the StagingArea.
+
+        Args:
+            root (str): Staging directory; a fast scratch disk or a folder next to the output.
+            output_path (str): Root of the output tree the items are moved into.
+            min_free_bytes (int): Free space to keep on both disks (default: 1 GiB).
+        """
+        self.root = root
+        self.output_path = output_path
+        self.min_free_bytes = min_free_bytes
+        self.lock = threading.Lock()
+        self.reservations = {}
+
+    def itemKey(self, video_info, folder_path):
+        """
+        Builds the stable staging directory name of an item.
+
+        The same item always maps to the same directory, so a retried download
+        resumes from the ``.part`` files of the previous attempt.
+
+        Args:
+            video_info (dict): Video information: {'url': str, 'title': str}.
+            folder_path (str): Final folder of the item.
+
+        Returns:
+            str: Directory name below the staging root.
+        """
+        url = video_info.get('url', '')
+        parsed = urlparse(url)
+        # Untitled items are named during extraction, so the key never depends on the title
+        video_id = parse_qs(parsed.query).get('v', [''])[0] or sanitizeFilename(parsed.path.rstrip('/').rsplit('/', 1)[-1])
+        digest = hashlib.sha1(f"{folder_path}\n{url}".encode('utf-8')).hexdigest()[:8]
+        return f"{video_id}-{digest}"
+
+    def itemDir(self, key):
+        """
+        Creates and returns the staging directory of an item.
+
+        Args:
+            key (str): Name returned by ``itemKey``.
+
+        Returns:
+            str: Absolute path of the item's staging directory.
+        """
+        path = os.path.join(self.root, key)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def commit(self, key, folder_path):
+        """
+        Moves the finished files of an item into its final folder.
+
+        Args:
+            key (str): Name returned by ``itemKey``.
+            folder_path (str): Final folder of the item.
+
+        Returns:
+            list: Final paths of the moved files.
+        """
+        item_dir = os.path.join(self.root, key)
+        os.makedirs(folder_path, exist_ok=True)
+        moved = []
+        for name in sorted(os.listdir(item_dir)):
+            source = os.path.join(item_dir, name)
+            if not os.path.isfile(source) or name.endswith(INCOMPLETE_SUFFIXES):
+                continue
+            target = os.path.join(folder_path, name)
+            self.moveFile(source, target)
+            moved.append(target)
+        shutil.rmtree(item_dir, ignore_errors=True)
+        self.release(key)
+        return moved
+
+    def moveFile(self, source, target):
+        """
+        Moves one file so that ``target`` only ever appears complete.
+
+        Args:
+            source (str): File in the staging area.
+            target (str): Destination path.
+        """
+        try:
+            os.replace(source, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Different filesystems: copy next to the target, then rename into place
+            temp_path = target + '.staging'
+            shutil.copyfile(source, temp_path)
+            os.replace(temp_path, target)
+            os.remove(source)
+
+    def reserve(self, key, size):
+        """
+        Reserves disk space for an item that is about to download.
+
+        Args:
+            key (str): Name returned by ``itemKey``.
+            size (int): Estimated peak bytes of the item.
+        """
+        with self.lock:
+            self.reservations[key] = size
+
+    def release(self, key):
+        """
+        Drops the reservation of an item.
+
+        Args:
+            key (str): Name returned by ``itemKey``.
+        """
+        with self.lock:
+            self.reservations.pop(key, None)
+
+    def reservedBytes(self):
+        """
+        Gets the reserved bytes that in-flight items have not written yet.
+
+        Returns:
+            int: Outstanding reserved bytes.
+        """
+        with self.lock:
+            reservations = dict(self.reservations)
+        outstanding = 0
+        for key, size in reservations.items():
+            item_dir = os.path.join(self.root, key)
+            written = 0
+            if os.path.isdir(item_dir):
+                with os.scandir(item_dir) as entries:
+                    written = sum(entry.stat().st_size for entry in entries if entry.is_file())
+            outstanding += max(0, size - written)
+        return outstanding
+
+    def freeBytes(self):
+        """
+        Gets the free space available to the batch.
+
+        Returns:
+            int: Free bytes on the fuller of the staging and output disks.
+        """
+        return min(diskFree(self.root), diskFree(self.output_path))
+
+    def hasRoom(self, size):
+        """
+        Checks whether an item of ``size`` bytes can start without filling the disk.
+
+        Args:
+            size (int): Estimated peak bytes of the item.
+
+        Returns:
+            bool: True if at least ``min_free_bytes`` would remain afterwards.
+        """
+        return self.freeBytes() - self.reservedBytes() - size >= self.min_free_bytes
+
+    def cleanup(self):
+        """
+        Removes empty item directories and the staging root if nothing is left.
+
+        Directories of failed items still hold their partial downloads and are
+        kept, so a later batch resumes them.
+        """
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            try:
+                os.rmdir(os.path.join(self.root, name))
+            except OSError:
+                pass
+        try:
+            os.rmdir(self.root)
+        except OSError:
+            pass
+
+def diskFree(path):
+    """
+    Gets the free space of the disk holding ``path``.
+
+    Args:
+        path (str): A file or directory path; it does not need to exist yet.
+
+    Returns:
+        int: Free bytes available to the current user.
+    """
+    path = os.path.abspath(path)
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return shutil.disk_usage(path).free
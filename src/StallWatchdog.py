@@ -0,0 +1,223 @@
+import time
+import threading
+from collections import deque
+from .DownloadErrors import TransientError, iterErrorChain
+
+class StallError(TransientError):
+    """
+    Raised from a progress hook to abort a transfer the watchdog gave up on.
+    """
+
+    kind = 'stalled'
+
+    def __init__(self, message, retryable=True):
+        """
+        Initializes the StallError.
+
+        Args:
+            message (str): Why the transfer was aborted.
+            retryable (bool): Whether restarting the transfer may help (default: True).
+        """
+        super().__init__(message)
+        self.retryable = retryable
+
+def findStallError(error):
+    """
+    Finds a StallError behind an exception raised by yt-dlp or a downloader.
+
+    Args:
+        error (BaseException): The exception that ended the transfer.
+
+    Returns:
+        StallError: The stall error, or None if the failure was not a stall.
+    """
+    for e in iterErrorChain(error):
+        if isinstance(e, StallError):
+            return e
+    return None
+
+class StallWatchdog:
+    """
+    Watches the progress of one item and aborts transfers that stop moving.
+
+    The watchdog is fed by the yt-dlp progress hooks. A transfer is aborted
+    when no bytes arrive for ``stall_timeout`` seconds, when throughput over
+    the last ``speed_window`` seconds collapses below ``min_speed`` or below
+    ``collapse_ratio`` of the best window seen, or when the item exceeds its
+    overall ``deadline``. The abort happens by raising ``StallError`` from the
+    next hook call, which leaves the ``.part`` file in place so the restarted
+    transfer resumes from it, through yt-dlp's own resume or the state file
+    of ``SegmentedDownloader``. A connection that delivers nothing never calls
+    the hook, so ``transferOptions`` also limits every socket read to
+    ``stall_timeout``; the converters report the timed out read as the stall.
+    """
+
+    SOCKET_TIMEOUT = 20  # yt-dlp's own read timeout, used without a stall timeout
+
+    def __init__(self, stall_timeout=60, min_speed=0, speed_window=30, collapse_ratio=0.05,
+                 deadline=None, clock=time.monotonic):
+        """
+        Initializes the StallWatchdog.
+
+        Args:
+            stall_timeout (float): Seconds without new bytes before aborting (default: 60).
+            min_speed (float): Lowest acceptable throughput in bytes/s over a window (default: 0, off).
+            speed_window (float): Length in seconds of the throughput window (default: 30).
+            collapse_ratio (float): Fraction of the best window speed treated as a collapse (default: 0.05).
+            deadline (float, optional): Seconds the item may take over all attempts.
+            clock (callable): Monotonic time source, replaceable in tests.
+        """
+        self.stall_timeout = stall_timeout
+        self.min_speed = min_speed
+        self.speed_window = speed_window
+        self.collapse_ratio = collapse_ratio
+        self.deadline = deadline
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.started_at = None
+        self.attempts = 0
+        self.resetWindow(self.clock())
+
+    def start(self):
+        """
+        Starts watching a new attempt, keeping the item's deadline running.
+        """
+        now = self.clock()
+        with self.lock:
+            if self.started_at is None:
+                self.started_at = now
+            self.attempts += 1
+            self.resetWindow(now)
+
+    def resetWindow(self, now):
+        """
+        Clears the per-attempt progress state.
+
+        Args:
+            now (float): Current clock value.
+        """
+        self.attempt_started_at = now
+        self.last_progress_at = now
+        self.file_bytes = {}
+        self.transferred = 0
+        self.samples = deque([(now, 0)])
+        self.peak_speed = 0
+        self.abort_error = None
+
+    def progressHook(self, d):
+        """
+        Records a yt-dlp progress update and aborts the transfer if it stalled.
+
+        Args:
+            d (dict): Dictionary with download progress information.
+
+        Raises:
+            StallError: If the transfer should be aborted.
+        """
+        if d.get('status') == 'downloading':
+            now = self.clock()
+            downloaded = d.get('downloaded_bytes') or 0
+            with self.lock:
+                # The first report of a file is its baseline, so resumed bytes don't count as speed
+                previous = self.file_bytes.get(d.get('filename'), downloaded)
+                self.file_bytes[d.get('filename')] = downloaded
+                if downloaded > previous:
+                    self.transferred += downloaded - previous
+                    self.last_progress_at = now
+                self.samples.append((now, self.transferred))
+                # Keep one sample at or before the start of the window
+                while len(self.samples) > 2 and self.samples[1][0] <= now - self.speed_window:
+                    self.samples.popleft()
+
+        error = self.check()
+        if error:
+            raise error
+
+    def socketTimeout(self):
+        """
+        Gets how long a socket read may block before the transfer has stalled.
+
+        Returns:
+            float: The stall timeout, or yt-dlp's default when stalls are not checked.
+        """
+        return self.stall_timeout or self.SOCKET_TIMEOUT
+
+    def transferOptions(self):
+        """
+        Builds the yt-dlp options that abort transfers receiving nothing.
+
+        A hung read times out after ``socketTimeout`` seconds. If yt-dlp retries
+        it, ``retrySleep`` aborts the transfer first. The ``socket_timeout`` is
+        only read when yt-dlp opens its first connection, so these options
+        belong in the options the ``YoutubeDL`` instance is created with.
+
+        Returns:
+            dict: yt-dlp options to merge into the download options.
+        """
+        return {
+            'socket_timeout': self.socketTimeout(),
+            'retry_sleep_functions': {'http': self.retrySleep, 'fragment': self.retrySleep},
+        }
+
+    def retrySleep(self, n):
+        """
+        Aborts a failed transfer before yt-dlp retries it, if the watchdog gave up on it.
+
+        Args:
+            n (int): Number of retries so far.
+
+        Returns:
+            float: Seconds to wait before the retry (always 0).
+
+        Raises:
+            StallError: If the transfer should be aborted.
+        """
+        error = self.check()
+        if error:
+            raise error
+        return 0
+
+    def windowSpeed(self, now):
+        """
+        Gets the throughput over the last full window.
+
+        Args:
+            now (float): Current clock value.
+
+        Returns:
+            float: Bytes per second, or None until a full window has elapsed.
+        """
+        first_time, first_bytes = self.samples[0]
+        elapsed = now - first_time
+        if now - self.attempt_started_at < self.speed_window or elapsed <= 0:
+            return None
+        return (self.samples[-1][1] - first_bytes) / elapsed
+
+    def check(self):
+        """
+        Checks the stall, throughput and deadline limits.
+
+        Also called periodically from outside the transfer so a connection that
+        delivers nothing at all is flagged without waiting for a hook call.
+
+        Returns:
+            StallError: The reason to abort, or None while the transfer is healthy.
+        """
+        now = self.clock()
+        with self.lock:
+            if self.abort_error:
+                return self.abort_error
+
+            if self.deadline and self.started_at is not None and now - self.started_at > self.deadline:
+                self.abort_error = StallError(f"exceeded the {self.deadline:g}s deadline", retryable=False)
+            elif self.stall_timeout and now - self.last_progress_at > self.stall_timeout:
+                self.abort_error = StallError(f"no data for {now - self.last_progress_at:.0f}s")
+            else:
+                speed = self.windowSpeed(now)
+                if speed is not None:
+                    self.peak_speed = max(self.peak_speed, speed)
+                    if self.min_speed and speed < self.min_speed:
+                        self.abort_error = StallError(f"throughput {speed / 1024:.1f} KiB/s below minimum")
+                    elif self.collapse_ratio and speed < self.peak_speed * self.collapse_ratio:
+                        self.abort_error = StallError(f"throughput collapsed to {speed / 1024:.1f} KiB/s")
+            return self.abort_error
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import atexit
+import threading
+
+class NullSpan:
+    """
+    Span returned while tracing is off; entering and leaving it does nothing.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        """
+        Ignores the arguments.
+        """
+
+NULL_SPAN = NullSpan()
+
+class Span:
+    """
+    Times one stage on the current thread and records it when the stage ends.
+    """
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name, category, args):
+        """
+        Initializes the Span.
+
+        Args:
+            tracer (Tracer): The tracer receiving the span.
+            name (str): Name shown on the timeline, e.g. 'extract_info'.
+            category (str): Group of the span, e.g. 'download'.
+            args (dict): Details shown with the span.
+        """
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+    def set(self, **args):
+        """
+        Adds details learned while the stage runs, e.g. the bytes transferred.
+
+        Args:
+            **args: Details shown with the span.
+        """
+        self.args.update(args)
+
+class Tracer:
+    """
+    Records how long cookie lookup, extraction, transfers, post-processing
+    and sleeps take on every thread and exports them as a Chrome trace.
+
+    Tracing is off by default and ``span`` then returns a shared no-op
+    span, so instrumented code pays one attribute check per stage. When on,
+    every span becomes a complete ('X') event of the Chrome trace-event
+    format, which chrome://tracing and https://ui.perfetto.dev show as one
+    timeline per thread. Setting the ``TUBEHARVESTER_TRACE`` environment
+    variable to a file path turns on the shared tracer and writes the trace
+    there when the process exits.
+    """
+
+    ENV_VAR = 'TUBEHARVESTER_TRACE'
+    MAX_EVENTS = 1000000
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, enabled=False, max_events=MAX_EVENTS):
+        """
+        Initializes the Tracer.
+
+        Args:
+            enabled (bool): Whether spans are recorded from the start (default: False).
+            max_events (int): Events kept before new ones are dropped (default: 1000000).
+        """
+        self.enabled = enabled
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.events = []
+        self.threads = {}
+        self.open_postprocessors = {}
+        self.dropped = 0
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+
+    @classmethod
+    def getDefault(cls):
+        """
+        Gets the tracer shared by the scrapers and downloaders.
+
+        The first call enables it if ``TUBEHARVESTER_TRACE`` is set and
+        exports the trace to that path at exit.
+
+        Returns:
+            Tracer: The shared tracer instance.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                path = os.environ.get(cls.ENV_VAR)
+                if path:
+                    cls._default.enable()
+                    atexit.register(cls._default.exportChromeTrace, path)
+            return cls._default
+
+    def enable(self):
+        """
+        Starts recording spans.
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stops recording spans; recorded events are kept.
+        """
+        self.enabled = False
+
+    def clear(self):
+        """
+        Discards all recorded events.
+        """
+        with self.lock:
+            self.events = []
+            self.open_postprocessors.clear()
+            self.dropped = 0
+
+    def span(self, name, category='stage', **args):
+        """
+        Creates a span to use as a context manager around a stage.
+
+        Args:
+            name (str): Name shown on the timeline.
+            category (str): Group of the span (default: 'stage').
+            **args: Details shown with the span.
+
+        Returns:
+            Span: A recording span, or ``NULL_SPAN`` while tracing is off.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def record(self, name, category, start_ns, end_ns, args=None):
+        """
+        Records a finished span of the current thread.
+
+        Args:
+            name (str): Name shown on the timeline.
+            category (str): Group of the span.
+            start_ns (int): ``time.perf_counter_ns`` value at the start.
+            end_ns (int): ``time.perf_counter_ns`` value at the end.
+            args (dict, optional): Details shown with the span.
+        """
+        self.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start_ns - self.origin) / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'args': args or {},
+        })
+
+    def instant(self, name, category='event', **args):
+        """
+        Records a point in time on the current thread, e.g. a retry being scheduled.
+
+        Args:
+            name (str): Name shown on the timeline.
+            category (str): Group of the event (default: 'event').
+            **args: Details shown with the event.
+        """
+        if not self.enabled:
+            return
+        self.append({
+            'name': name,
+            'cat': category,
+            'ph': 'i',
+            's': 't',
+            'ts': (time.perf_counter_ns() - self.origin) / 1000,
+            'args': args,
+        })
+
+    def append(self, event):
+        """
+        Adds an event for the current thread, remembering the thread's name.
+
+        Args:
+            event (dict): Trace event without 'pid' and 'tid'.
+        """
+        thread = threading.current_thread()
+        event['pid'] = self.pid
+        event['tid'] = thread.ident
+        with self.lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.threads.setdefault(thread.ident, thread.name)
+            self.events.append(event)
+
+    def postprocessorHook(self, d):
+        """
+        Turns yt-dlp post-processor progress into spans, e.g. FFmpeg merges and MP3 transcodes.
+
+        Meant for the ``postprocessor_hooks`` yt-dlp option.
+
+        Args:
+            d (dict): Post-processor status with 'status' and 'postprocessor'.
+        """
+        if not self.enabled:
+            return
+        key = (threading.get_ident(), d.get('postprocessor'))
+        if d['status'] == 'started':
+            self.open_postprocessors[key] = time.perf_counter_ns()
+        elif d['status'] == 'finished':
+            start_ns = self.open_postprocessors.pop(key, None)
+            if start_ns is not None:
+                info = d.get('info_dict') or {}
+                self.record(f"postprocess.{d.get('postprocessor')}", 'postprocess', start_ns, time.perf_counter_ns(),
+                            {'id': info.get('id')})
+
+    def chromeTrace(self):
+        """
+        Builds the Chrome trace-event document of the recorded events.
+
+        Returns:
+            dict: {'traceEvents': [...], 'displayTimeUnit': 'ms', 'otherData': {...}} with a
+                  name for the process and every thread.
+        """
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+            dropped = self.dropped
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0, 'args': {'name': 'TubeHarvester'}}]
+        metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+                     for tid, name in threads.items()]
+        return {
+            'traceEvents': metadata + sorted(events, key=lambda event: event['ts']),
+            'displayTimeUnit': 'ms',
+            'otherData': {'dropped_events': dropped},
+        }
+
+    def exportChromeTrace(self, path):
+        """
+        Writes the recorded events as a Chrome trace-event JSON file.
+
+        Args:
+            path (str): Output file, e.g. 'trace.json'.
+
+        Returns:
+            int: Number of span and instant events written.
+        """
+        trace = self.chromeTrace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        return sum(1 for event in trace['traceEvents'] if event['ph'] != 'M')
@@ -0,0 +1,139 @@
+import threading
+import tkinter as tk
+from collections import deque
+
+class UiEventPump:
+    """
+    Moves updates from worker threads to Tk widgets on the main thread.
+
+    Tk widgets must only be touched by the thread running the main loop, and
+    redrawing them on every yt-dlp progress tick makes the window stutter.
+    Workers therefore only queue their updates here. A ``master.after`` timer
+    drains the queue at a fixed frame rate: all queued log lines are written
+    with a single ``Text.insert``, only the latest value of each progress
+    channel is applied, and queued calls run in order. The log is trimmed to
+    ``max_lines`` so long sessions stay fast.
+    """
+
+    def __init__(self, master, log_widget=None, interval=50, max_lines=2000):
+        """
+        Initializes the UiEventPump.
+
+        Args:
+            master: Widget whose ``after`` schedules the pump.
+            log_widget (tk.Text, optional): Read-only text widget receiving log lines.
+            interval (int): Milliseconds between two frames (default: 50).
+            max_lines (int): Lines kept in the log widget (default: 2000).
+        """
+        self.master = master
+        self.log_widget = log_widget
+        self.interval = interval
+        self.max_lines = max_lines
+        self.lock = threading.Lock()
+        self.lines = deque(maxlen=max_lines)
+        self.latest = {}
+        self.calls = deque()
+        self.handlers = {}
+        self.after_id = None
+
+    def register(self, channel, handler):
+        """
+        Sets the main-thread handler of a channel.
+
+        Args:
+            channel (str): Channel name, e.g. 'progress'.
+            handler (callable): Called with the latest value posted to the channel.
+        """
+        self.handlers[channel] = handler
+
+    def post(self, channel, value):
+        """
+        Queues a value for a channel, replacing any value not applied yet.
+
+        Args:
+            channel (str): A channel set up with ``register``.
+            value: Value passed to the channel's handler.
+        """
+        with self.lock:
+            self.latest[channel] = value
+
+    def log(self, message):
+        """
+        Queues a line for the log widget.
+
+        Args:
+            message (str): The message to log.
+        """
+        with self.lock:
+            self.lines.append(message)
+
+    def call(self, func, *args):
+        """
+        Queues a call to run on the main thread, after the pending channel values.
+
+        Args:
+            func (callable): Function touching the widgets.
+            *args: Arguments passed to ``func``.
+        """
+        with self.lock:
+            self.calls.append((func, args))
+
+    def start(self):
+        """
+        Schedules the next frame unless one is already scheduled.
+        """
+        if self.after_id is None:
+            self.after_id = self.master.after(self.interval, self.tick)
+
+    def stop(self):
+        """
+        Cancels the scheduled frame.
+        """
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+
+    def tick(self):
+        """
+        Runs one frame and schedules the next one.
+        """
+        self.after_id = None
+        try:
+            self.pump()
+        finally:
+            self.start()
+
+    def pump(self):
+        """
+        Applies everything queued since the last frame. Must run on the main thread.
+        """
+        with self.lock:
+            lines = list(self.lines)
+            self.lines.clear()
+            latest, self.latest = self.latest, {}
+            calls = list(self.calls)
+            self.calls.clear()
+
+        if lines and self.log_widget is not None:
+            self.appendLines(lines)
+        for channel, value in latest.items():
+            self.handlers[channel](value)
+        for func, args in calls:
+            func(*args)
+
+    def appendLines(self, lines):
+        """
+        Writes lines to the log widget in one insert and trims old ones.
+
+        Args:
+            lines (list): Messages to append.
+        """
+        widget = self.log_widget
+        widget.config(state=tk.NORMAL)
+        widget.insert(tk.END, "\n".join(lines) + "\n")
+        # The widget always ends with an empty line after the last newline
+        excess = int(widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+        if excess > 0:
+            widget.delete('1.0', f'{excess + 1}.0')
+        widget.see(tk.END)
+        widget.config(state=tk.DISABLED)
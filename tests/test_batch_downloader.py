@@ -1,8 +1,18 @@
 import pytest
 import os
+import time
+import shutil
 import tempfile
+import threading
 from unittest.mock import Mock, patch, MagicMock
 from src.BatchDownloader import BatchDownloader
+from src.StallWatchdog import StallError
+from src.DownloadErrors import TransientError, AuthError, RateLimitedError, CancelledError
+from src.CircuitBreaker import CircuitBreaker
+from src.ConnectionBudget import ConnectionBudget
+from src.Mp4_Converter import Mp4Downloader
+from src.Metrics import HarvestMetrics
+from src.PostProcessRepair import PostProcessRepair
 
 
 class TestBatchDownloader:
@@ -238,38 +248,715 @@ class TestBatchDownloader:
         assert os.path.exists(expected_videos_path)
         assert os.path.exists(expected_playlist_path)
 
-    @patch('threading.Event')
-    @patch('concurrent.futures.ThreadPoolExecutor')
-    def testDownloadBatchCancellation(self, mock_executor_class, mock_event_class):
+    def testDownloadBatchCancellation(self):
         """Test batch download cancellation during execution."""
-        # Mock event
-        mock_event = Mock()
-        mock_event.is_set.side_effect = [False, False, True, True, True, True]  # Need more values for the mock
-        mock_event_class.return_value = mock_event
-
-        # Mock executor with context manager methods
-        mock_executor = Mock()
-        mock_executor_class.return_value = mock_executor
-        mock_future = Mock()
-        mock_future.result.return_value = (True, "")  # Success
-        mock_executor.__enter__ = Mock(return_value=mock_executor)
-        mock_executor.__exit__ = Mock(return_value=None)
-        mock_executor.submit.return_value = mock_future
+        video_list = [
+            {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''},
+            {'url': 'https://youtube.com/watch?v=2', 'title': 'Video 2', 'folder': ''},
+            {'url': 'https://youtube.com/watch?v=3', 'title': 'Video 3', 'folder': ''}
+        ]
+
+        log_callback = Mock()
+        downloader = BatchDownloader(max_workers=1, log_callback=log_callback, prefetch_workers=1, prefetch_depth=0)
+
+        def cancelAfterFirst(*args):
+            downloader.cancel_event.set()
+            return True, ""
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=cancelAfterFirst) as mock_download:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        # Should have cancelled after first video
+        assert mock_download.call_count == 1
+        assert result['successful'] == 1
+        log_callback.assert_called_with("Batch download cancelled")
 
+    def testCancelAbortsRunningTransfer(self):
+        """Test that cancelling aborts a running transfer at its next progress update."""
+        converter = Mock()
+        aborted = []
+
+        def downloadVideo(custom_title=None, info=None):
+            try:
+                for downloaded in range(1, 200):
+                    converter.progress_listener({'status': 'downloading', 'filename': 'v.part',
+                                                 'downloaded_bytes': downloaded * 1024, 'total_bytes': 200 * 1024})
+                    time.sleep(0.05)
+            except CancelledError as e:
+                aborted.append(e)
+                raise
+
+        converter.downloadVideo.side_effect = downloadVideo
+        downloader = BatchDownloader(max_workers=1, prefetch_workers=1, stall_timeout=0)
+        timer = threading.Timer(0.2, downloader.cancelDownload)
+        started = time.monotonic()
+
+        with patch.object(downloader, 'prepareVideo', return_value=(converter, {})):
+            timer.start()
+            result = downloader.downloadBatch([{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}],
+                                              'MP4', self.test_base_path, 'highest')
+
+        assert len(aborted) == 1
+        assert time.monotonic() - started < 2
+        assert result['successful'] == 0
+
+    @patch('yt_dlp.YoutubeDL')
+    def testDefaultWorkersDownloadDashItemsConcurrently(self, mock_ydl_class):
+        """Test that three default workers fetching two plain streams each all hold connections at once."""
+        info = {'title': 'Video', 'duration': 60, 'requested_formats': [
+            {'format_id': '137', 'ext': 'mp4', 'url': 'https://media.example/v', 'protocol': 'https', 'filesize': 30 * 1024 * 1024},
+            {'format_id': '140', 'ext': 'm4a', 'url': 'https://media.example/a', 'protocol': 'https', 'filesize': 3 * 1024 * 1024},
+        ]}
+        barrier = threading.Barrier(3, timeout=5)
+        downloader = BatchDownloader()
+        video_list = [{'url': f'https://youtube.com/watch?v={index}', 'title': f'Video {index}', 'folder': ''}
+                      for index in range(3)]
+
+        with patch.object(ConnectionBudget, '_default', ConnectionBudget()), \
+             patch.object(Mp4Downloader, 'resolveInfo', side_effect=lambda: dict(info)), \
+             patch.object(Mp4Downloader, 'downloadStreams', side_effect=lambda *args: barrier.wait()):
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 3
+        shutil.rmtree(os.path.join(self.test_base_path, 'Videos'))
+
+    def testDownloadBatchPassesResolvedInfoToDownloadStage(self):
+        """Test that the download stage receives the info resolved by the extraction stage."""
         video_list = [
             {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''},
             {'url': 'https://youtube.com/watch?v=2', 'title': 'Video 2', 'folder': ''}
         ]
+        downloader = BatchDownloader(max_workers=1)
+
+        def prepare(video_info, format_type, folder_path, quality):
+            return Mock(), {'id': video_info['url'][-1]}
+
+        with patch.object(downloader, 'prepareVideo', side_effect=prepare), \
+             patch.object(downloader, 'downloadSingleVideo', return_value=(True, "")) as mock_download:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 2
+        resolved_ids = sorted(call.args[4][1]['id'] for call in mock_download.call_args_list)
+        assert resolved_ids == ['1', '2']
+
+    def testDownloadBatchPrefetchesWhileDownloading(self):
+        """Test that upcoming items are extracted while earlier ones download."""
+        video_list = [
+            {'url': f'https://youtube.com/watch?v={i}', 'title': f'Video {i}', 'folder': ''}
+            for i in range(4)
+        ]
+        downloader = BatchDownloader(max_workers=1, prefetch_workers=1, prefetch_depth=2)
+        download_started = threading.Event()
+        extracted_during_download = []
+
+        def prepare(video_info, format_type, folder_path, quality):
+            if download_started.is_set():
+                extracted_during_download.append(video_info['title'])
+            return Mock(), {}
+
+        def download(*args):
+            download_started.set()
+            time.sleep(0.1)
+            return True, ""
+
+        with patch.object(downloader, 'prepareVideo', side_effect=prepare), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=download):
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 4
+        assert extracted_during_download
+
+    def testDownloadBatchExtractionFailureIsRecorded(self):
+        """Test that an extraction failure fails only that item."""
+        video_list = [
+            {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''},
+            {'url': 'https://youtube.com/watch?v=2', 'title': 'Video 2', 'folder': ''}
+        ]
+        downloader = BatchDownloader(max_workers=1)
+
+        def prepare(video_info, format_type, folder_path, quality):
+            if video_info['title'] == 'Video 1':
+                raise Exception("Video unavailable")
+            return Mock(), {}
+
+        with patch.object(downloader, 'prepareVideo', side_effect=prepare), \
+             patch.object(downloader, 'downloadSingleVideo', return_value=(True, "")):
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 1
+        assert result['failed'] == 1
+        assert result['errors'] == ["Video 1: Video unavailable"]
+
+    def testDownloadBatchReextractsStaleInfo(self):
+        """Test that expired info is resolved again before downloading."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        downloader = BatchDownloader(max_workers=1)
+        expired = {'url': f'https://example.com/v?expire={int(time.time())}'}
+        fresh = {'url': f'https://example.com/v?expire={int(time.time()) + 21600}'}
+
+        with patch.object(downloader, 'prepareVideo', side_effect=[(Mock(), expired), (Mock(), fresh)]) as mock_prepare, \
+             patch.object(downloader, 'downloadSingleVideo', return_value=(True, "")) as mock_download:
+            downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert mock_prepare.call_count == 2
+        assert mock_download.call_args.args[4][1] is fresh
 
+    def testDownloadBatchRestartsStalledItem(self):
+        """Test that a stalled transfer is restarted with the same prepared item."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
         log_callback = Mock()
         downloader = BatchDownloader(max_workers=1, log_callback=log_callback)
+        prepared = (Mock(), {})
 
-        with patch.object(downloader, 'downloadSingleVideo') as mock_download:
-            mock_download.return_value = (True, "")
+        with patch.object(downloader, 'prepareVideo', return_value=prepared) as mock_prepare, \
+             patch.object(downloader, 'downloadSingleVideo',
+                          side_effect=[StallError("no data for 60s"), (True, "")]) as mock_download:
             result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
 
-        # Should have cancelled after first video
-        log_callback.assert_called_with("Batch download cancelled")
+        assert result['successful'] == 1
+        assert mock_prepare.call_count == 1
+        assert mock_download.call_count == 2
+        assert mock_download.call_args.args[4] is prepared
+        assert prepared[0].watchdog.attempts == 2
+        log_callback.assert_any_call("Stalled: Video 1 (no data for 60s), restarting")
+
+    def testDownloadBatchGivesUpAfterStallRestarts(self):
+        """Test that an item fails once its stall restarts are used up."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        downloader = BatchDownloader(max_workers=1, max_stall_restarts=1)
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=StallError("no data")) as mock_download:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert mock_download.call_count == 2
+        assert result['failed'] == 1
+        assert result['errors'] == ["Video 1: Stalled: no data"]
+
+    def testDownloadSingleVideoRaisesRetryableStall(self):
+        """Test that retryable stalls propagate while deadline aborts fail the item."""
+        prepared_downloader = Mock()
+        video_info = {'url': 'https://youtube.com/watch?v=1', 'title': 'Test Video'}
+
+        prepared_downloader.downloadVideo.side_effect = StallError("no data")
+        with pytest.raises(StallError):
+            self.downloader.downloadSingleVideo(video_info, 'MP4', self.test_base_path, 'highest', (prepared_downloader, {}))
+
+        prepared_downloader.downloadVideo.side_effect = StallError("exceeded the 600s deadline", retryable=False)
+        success, error = self.downloader.downloadSingleVideo(
+            video_info, 'MP4', self.test_base_path, 'highest', (prepared_downloader, {})
+        )
+        assert success is False
+        assert "deadline" in str(error)
+
+    def testDownloadBatchRetriesTransientFailure(self):
+        """Test that transient failures are retried through the extraction stage."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        log_callback = Mock()
+        downloader = BatchDownloader(max_workers=1, log_callback=log_callback, retry_backoff=0.01)
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})) as mock_prepare, \
+             patch.object(downloader, 'downloadSingleVideo',
+                          side_effect=[TransientError("Read timed out"), (True, "")]) as mock_download:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 1
+        assert mock_prepare.call_count == 2
+        assert mock_download.call_count == 2
+        assert any("Retrying Video 1" in call.args[0] for call in log_callback.call_args_list)
+
+    def testDownloadBatchRetriesTransientExtractionFailure(self):
+        """Test that extraction failures from flaky networks are retried."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        downloader = BatchDownloader(max_workers=1, retry_backoff=0.01)
+
+        with patch.object(downloader, 'prepareVideo',
+                          side_effect=[ConnectionResetError("reset by peer"), (Mock(), {})]), \
+             patch.object(downloader, 'downloadSingleVideo', return_value=(True, "")):
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 1
+        assert result['failed'] == 0
+
+    def testDownloadBatchFailsFastOnAuthError(self):
+        """Test that auth errors are not retried."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        downloader = BatchDownloader(max_workers=1, retry_backoff=0.01)
+
+        with patch.object(downloader, 'prepareVideo', side_effect=AuthError("Private video")) as mock_prepare:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert mock_prepare.call_count == 1
+        assert result['errors'] == ["Video 1: Private video"]
+
+    def testDownloadBatchGivesUpAfterMaxRetries(self):
+        """Test that an item fails once its retries are used up."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        downloader = BatchDownloader(max_workers=1, max_retries=2, retry_backoff=0.01)
+
+        with patch.object(downloader, 'prepareVideo', side_effect=TransientError("timed out")) as mock_prepare:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert mock_prepare.call_count == 3
+        assert result['failed'] == 1
+
+    def testDelayedRetryDoesNotHoldWorker(self):
+        """Test that other items download while a failed item waits for its retry."""
+        video_list = [
+            {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''},
+            {'url': 'https://youtube.com/watch?v=2', 'title': 'Video 2', 'folder': ''}
+        ]
+        downloader = BatchDownloader(max_workers=1, retry_backoff=0.3)
+        order = []
+
+        def download(video_info, *args):
+            order.append(video_info['title'])
+            if order.count('Video 1') == 1 and video_info['title'] == 'Video 1':
+                raise TransientError("timed out")
+            return True, ""
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=download):
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 2
+        assert order == ['Video 1', 'Video 2', 'Video 1']
+
+    def testRetryDelayBackoff(self):
+        """Test exponential backoff, the cap and Retry-After."""
+        downloader = BatchDownloader(retry_backoff=2, max_retry_delay=10)
+
+        assert 2 <= downloader.retryDelay(1, TransientError("x")) <= 2.5
+        assert 8 <= downloader.retryDelay(3, TransientError("x")) <= 10
+        assert 10 <= downloader.retryDelay(6, TransientError("x")) <= 12.5
+        assert downloader.retryDelay(1, TransientError("x", retry_after=60)) >= 60
+
+    def testDownloadBatchRequeuesRateLimitedItems(self):
+        """Test that items hit by a tripped breaker are requeued instead of failed."""
+        video_list = [
+            {'url': f'https://youtube.com/watch?v={i}', 'title': f'Video {i}', 'folder': ''}
+            for i in range(3)
+        ]
+        log_callback = Mock()
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=0.1)
+        downloader = BatchDownloader(max_workers=1, log_callback=log_callback, circuit_breaker=breaker,
+                                     prefetch_depth=0)
+        errors = [RateLimitedError("HTTP Error 429: Too Many Requests")] * 2
+
+        def download(video_info, *args):
+            if errors:
+                raise errors.pop()
+            return True, ""
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=download) as mock_download:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 3
+        assert result['failed'] == 0
+        assert mock_download.call_count == 5
+        assert not breaker.isOpen()
+        assert any("Rate limited" in call.args[0] for call in log_callback.call_args_list)
+
+    def testBreakerReceivesTheOriginalError(self):
+        """Test that a failed download reports its own exception to the breaker, not just its message."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        breaker = CircuitBreaker()
+        downloader = BatchDownloader(max_workers=1, circuit_breaker=breaker)
+        error = AuthError("Sign in to confirm your age")
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', return_value=(False, error)), \
+             patch.object(breaker, 'release', wraps=breaker.release) as mock_release:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['error_kinds'] == {'auth': 1}
+        assert mock_release.call_args_list[-1].args[0] is error
+
+    def testDownloadReleasesPermitWhenTransferStarts(self):
+        """Test that a download holds its breaker permit only until bytes arrive, and a later 429 still counts."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0.1)
+        downloader = BatchDownloader(max_workers=1, circuit_breaker=breaker, max_retries=1, retry_backoff=0.01)
+        in_flight = []
+
+        def download(video_info, format_type, folder_path, quality, prepared):
+            in_flight.append(breaker.in_flight)
+            prepared[0].progress_listener({'status': 'downloading', 'downloaded_bytes': 1, 'total_bytes': 10})
+            in_flight.append(breaker.in_flight)
+            if len(in_flight) == 2:
+                raise RateLimitedError("HTTP Error 429: Too Many Requests")
+            return True, None
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=download), \
+             patch.object(breaker, 'record', wraps=breaker.record) as mock_record:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 1
+        assert in_flight[:2] == [1, 0]
+        assert mock_record.call_count == 1
+        assert isinstance(mock_record.call_args.args[0], RateLimitedError)
+        assert breaker.in_flight == 0
+
+    def testDownloadBatchWaitsWhileBreakerIsOpen(self):
+        """Test that nothing is started while the breaker is open."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0.3)
+        breaker.tryAcquire()
+        breaker.release(RateLimitedError("HTTP Error 429: Too Many Requests"))
+        downloader = BatchDownloader(max_workers=1, circuit_breaker=breaker)
+
+        start = time.monotonic()
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', return_value=(True, "")):
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 1
+        assert time.monotonic() - start >= 0.25
+
+    @patch('src.BatchDownloader.Mp4Downloader')
+    def testDownloadBatchStagesDownloads(self, mock_mp4_downloader_class):
+        """Test that items download into the staging area and are moved when complete."""
+        paths = []
+
+        def createDownloader(**kwargs):
+            downloader = Mock()
+            downloader.setPath.side_effect = paths.append
+            downloader.resolveInfo.return_value = {}
+
+            def download(custom_title=None, info=None):
+                assert os.path.basename(os.path.dirname(paths[-1])) == BatchDownloader.STAGING_FOLDER
+                with open(os.path.join(paths[-1], f"{custom_title}.mp4"), 'wb') as f:
+                    f.write(b'video')
+                open(os.path.join(paths[-1], f"{custom_title}.f140.m4a.part"), 'wb').close()
+
+            downloader.downloadVideo.side_effect = download
+            return downloader
+
+        mock_mp4_downloader_class.side_effect = createDownloader
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': 'Playlist'}]
+
+        result = self.downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        final_folder = os.path.join(self.test_base_path, 'Videos', 'Playlist')
+        assert result['successful'] == 1
+        assert os.listdir(final_folder) == ['Video_1.mp4']
+        assert not os.path.exists(os.path.join(self.test_base_path, BatchDownloader.STAGING_FOLDER))
+        shutil.rmtree(os.path.join(self.test_base_path, 'Videos'))
+
+    @pytest.mark.parametrize('format_type, intermediates, root, output', [
+        ('MP4', ['Video_1.f137.mp4', 'Video_1.f140.m4a'], 'Videos', 'Video_1.mp4'),
+        ('MP3', ['Video_1.unconverted.webm'], 'Music', 'Video_1.mp3'),
+    ])
+    def testFailedPostProcessingLeavesIntermediatesForRepair(self, format_type, intermediates, root, output):
+        """Test that a failed merge or conversion moves its intermediates where tubeharvester-repair looks."""
+        import yt_dlp
+        paths = []
+
+        def createDownloader(**kwargs):
+            downloader = Mock()
+            downloader.setPath.side_effect = paths.append
+            downloader.resolveInfo.return_value = {}
+
+            def download(custom_title=None, info=None):
+                for name in intermediates:
+                    with open(os.path.join(paths[-1], name), 'wb') as f:
+                        f.write(b'stream')
+                raise yt_dlp.utils.PostProcessingError("Conversion failed!")
+
+            downloader.downloadVideo.side_effect = download
+            downloader.downloadAsMp3.side_effect = download
+            return downloader
+
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': 'Playlist'}]
+        with patch('src.BatchDownloader.Mp4Downloader', side_effect=createDownloader), \
+             patch('src.BatchDownloader.Mp3Downloader', side_effect=createDownloader):
+            result = self.downloader.downloadBatch(video_list, format_type, self.test_base_path, 'highest')
+
+        final_folder = os.path.join(self.test_base_path, root, 'Playlist')
+        jobs = PostProcessRepair().findIntermediates(os.path.join(self.test_base_path, root), format_type)
+        assert result['failed'] == 1
+        assert result['error_kinds'] == {'postprocessing': 1}
+        assert sorted(os.listdir(final_folder)) == intermediates
+        assert jobs == [(os.path.join(final_folder, output), [os.path.join(final_folder, name) for name in intermediates])]
+        assert not os.path.exists(os.path.join(self.test_base_path, BatchDownloader.STAGING_FOLDER))
+        shutil.rmtree(os.path.join(self.test_base_path, root))
+
+    def testDownloadBatchPausesWhenDiskIsFull(self):
+        """Test that downloads wait while the disk is below the free-space threshold."""
+        video_list = [{'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''}]
+        log_callback = Mock()
+        downloader = BatchDownloader(max_workers=1, log_callback=log_callback)
+        downloader.WATCHDOG_INTERVAL = 0.05
+
+        with patch('src.BatchDownloader.StagingArea.hasRoom', side_effect=[True, False, False, True]), \
+             patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', return_value=(True, "")) as mock_download:
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 1
+        assert mock_download.call_count == 1
+        messages = [call.args[0] for call in log_callback.call_args_list]
+        assert sum("pausing downloads" in m for m in messages) == 1
+        assert any("resuming downloads" in m for m in messages)
+
+    def testDownloadBatchSkipsExistingFiles(self):
+        """Test that finished items are skipped before any extraction."""
+        folder = os.path.join(self.test_base_path, 'Music', 'Playlist')
+        os.makedirs(folder)
+        with open(os.path.join(folder, 'Video_1.mp3'), 'wb') as f:
+            f.write(b'x' * 5)
+        video_list = [
+            {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': 'Playlist'},
+            {'url': 'https://youtube.com/watch?v=2', 'title': 'Video 2', 'folder': 'Playlist'}
+        ]
+        log_callback = Mock()
+        downloader = BatchDownloader(max_workers=1, log_callback=log_callback)
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})) as mock_prepare, \
+             patch.object(downloader, 'downloadSingleVideo', return_value=(True, "")):
+            result = downloader.downloadBatch(video_list, 'MP3', self.test_base_path, 'highest')
+
+        assert result['successful'] == 2
+        assert result['skipped'] == 1
+        assert result['skipped_bytes'] == 5
+        assert result['bytes'] == 0
+        assert [call.args[0]['title'] for call in mock_prepare.call_args_list] == ['Video 2']
+        log_callback.assert_any_call("Skipping 1 videos that are already downloaded")
+        shutil.rmtree(os.path.join(self.test_base_path, 'Music'))
+
+    def testDownloadBatchSkipsUntitledItemsOnceNamed(self):
+        """Test that an untitled item is checked against existing files after its extraction."""
+        os.makedirs(os.path.join(self.test_base_path, 'Music'))
+        open(os.path.join(self.test_base_path, 'Music', 'Video_1.mp3'), 'wb').close()
+        video_list = [{'url': 'https://youtu.be/1', 'title': None, 'duration': 0, 'folder': ''}]
+
+        def prepareVideo(video_info, format_type, folder_path, quality):
+            video_info['title'] = 'Video_1'
+            return Mock(), {}
+
+        with patch.object(self.downloader, 'prepareVideo', side_effect=prepareVideo), \
+             patch.object(self.downloader, 'downloadSingleVideo') as mock_download:
+            result = self.downloader.downloadBatch(video_list, 'MP3', self.test_base_path, 'highest')
+
+        assert result['skipped'] == 1
+        assert result['successful'] == 1
+        mock_download.assert_not_called()
+        shutil.rmtree(os.path.join(self.test_base_path, 'Music'))
+
+    def testDownloadBatchBoundsItemsInFlight(self):
+        """Test that a lazy job is pulled only as slots in the window free up."""
+        finished = []
+        held = []
+
+        def videos():
+            for i in range(20):
+                held.append(i + 1 - len(finished))
+                yield {'url': f'https://youtube.com/watch?v={i}', 'title': f'Video {i}', 'folder': ''}
+
+        def download(video_info, *args):
+            finished.append(video_info['title'])
+            return True, ""
+
+        progress_callback = Mock()
+        downloader = BatchDownloader(max_workers=2, prefetch_workers=1, prefetch_depth=1,
+                                     max_in_flight=3, progress_callback=progress_callback)
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=download):
+            result = downloader.downloadBatch(videos(), 'MP4', self.test_base_path, 'highest')
+
+        assert result['successful'] == 20
+        assert len(finished) == 20
+        assert max(held) <= 3
+        # Without a length there is no percentage to report
+        progress_callback.assert_not_called()
+
+    def testDownloadBatchReportsResultRecords(self):
+        """Test that each finished item is reported as a record while errors stay bounded."""
+        video_list = [
+            {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''},
+            {'url': 'https://youtube.com/watch?v=2', 'title': 'Video 2', 'folder': ''},
+            {'url': 'https://youtube.com/watch?v=3', 'title': 'Video 3', 'folder': ''}
+        ]
+        result_callback = Mock()
+        downloader = BatchDownloader(max_workers=1, result_callback=result_callback)
+        downloader.MAX_ERRORS = 1
+        folder = os.path.join(self.test_base_path, 'Videos')
+
+        def download(video_info, format_type, folder_path, quality, prepared):
+            if video_info['title'] != 'Video 1':
+                return False, Exception("Video unavailable")
+            with open(os.path.join(folder_path, 'Video_1.mp4'), 'wb') as f:
+                f.write(b'x' * 10)
+            return True, ""
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=download):
+            result = downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        records = {call.args[0]['id']: call.args[0] for call in result_callback.call_args_list}
+        assert records['1']['status'] == 'downloaded'
+        assert records['1']['path'] == os.path.join(folder, 'Video_1.mp4')
+        assert records['1']['bytes'] == 10
+        assert records['1']['attempts'] == 1
+        assert records['1']['error_kind'] is None
+        assert records['2']['status'] == 'failed'
+        assert records['2']['error_kind'] == 'permanent'
+        assert records['2']['error'] == "Video unavailable"
+        assert result['failed'] == 2
+        assert len(result['errors']) == 1
+        assert result['error_kinds'] == {'permanent': 2}
+        assert result['bytes'] == 10
+        shutil.rmtree(folder)
+
+    def testDownloadBatchUpdatesMetrics(self):
+        """Test that outcomes, error classes, bytes, stage times and retries reach the metrics."""
+        video_list = [
+            {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': ''},
+            {'url': 'https://youtube.com/watch?v=2', 'title': 'Video 2', 'folder': ''}
+        ]
+        downloader = BatchDownloader(max_workers=1, retry_backoff=0.01)
+        downloader.metrics = metrics = HarvestMetrics()
+        folder = os.path.join(self.test_base_path, 'Videos')
+        outcomes = {'Video 1': [TransientError("Read timed out"), (True, "")], 'Video 2': [(False, Exception("Video unavailable"))]}
+
+        def download(video_info, format_type, folder_path, quality, prepared):
+            outcome = outcomes[video_info['title']].pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            if outcome[0]:
+                with open(os.path.join(folder_path, 'Video_1.mp4'), 'wb') as f:
+                    f.write(b'x' * 10)
+            return outcome
+
+        with patch.object(downloader, 'prepareVideo', return_value=(Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=download):
+            downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        assert metrics.items.get(outcome='downloaded', format='MP4') == 1
+        assert metrics.items.get(outcome='failed', format='MP4') == 1
+        assert metrics.errors.get(kind='permanent') == 1
+        assert metrics.retries.get(kind='transient') == 1
+        assert metrics.bytes.get(format='MP4') == 10
+        assert metrics.extract_seconds.get()['count'] == 3
+        assert metrics.download_seconds.get(format='MP4')['count'] == 3
+        assert metrics.queue_depth.get(stage='pending') == 0
+        assert metrics.active_workers.get(pool='download') == 0
+        shutil.rmtree(folder)
+
+    def testDownloadBatchReportsByteProgress(self):
+        """Test that progress hook calls of the workers reach the byte-weighted progress."""
+        video_list = [
+            {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1', 'folder': '', 'duration': 60},
+            {'url': 'https://youtube.com/watch?v=2', 'title': 'Video 2', 'folder': '', 'duration': 600}
+        ]
+        progress_callback = Mock()
+        stats_callback = Mock()
+        downloader = BatchDownloader(max_workers=1, prefetch_workers=1, progress_callback=progress_callback,
+                                     stats_callback=stats_callback, progress_interval=0)
+
+        def download(video_info, format_type, folder_path, quality, prepared):
+            if video_info['title'] == 'Video 1':
+                prepared[0].progress_listener({'status': 'finished', 'downloaded_bytes': 1000,
+                                               'total_bytes': 1000, 'filename': 'Video_1.mp4'})
+            return True, ""
+
+        with patch.object(downloader, 'prepareVideo', side_effect=lambda *args: (Mock(), {})), \
+             patch.object(downloader, 'downloadSingleVideo', side_effect=download):
+            downloader.downloadBatch(video_list, 'MP4', self.test_base_path, 'highest')
+
+        percents = [call.args[0] for call in progress_callback.call_args_list]
+        # After the short video the long one still holds ten times its bytes
+        assert 9 in percents
+        assert percents[-1] == 100
+        assert stats_callback.call_args[0][0]['done_items'] == 2
+
+    def testIndexExistingFilesScansEachFolderOnce(self):
+        """Test that the index lists every target folder with a single scandir call."""
+        open(os.path.join(self.test_base_path, 'Video_1.mp4'), 'wb').close()
+        missing = os.path.join(self.test_base_path, 'missing')
+
+        with patch('src.BatchDownloader.os.scandir', wraps=os.scandir) as mock_scandir:
+            index = self.downloader.indexExistingFiles([self.test_base_path, self.test_base_path, missing])
+
+        assert mock_scandir.call_count == 2
+        assert index[missing] == set()
+        video_info = {'url': 'https://youtube.com/watch?v=1', 'title': 'Video 1'}
+        assert self.downloader.isAlreadyDownloaded(video_info, 'MP4', self.test_base_path, index)
+        assert not self.downloader.isAlreadyDownloaded(video_info, 'MP3', self.test_base_path, index)
+
+    def testDownloadSingleVideoRaisesRetryableFailure(self):
+        """Test that retryable failures propagate while permanent ones are returned."""
+        prepared_downloader = Mock()
+        video_info = {'url': 'https://youtube.com/watch?v=1', 'title': 'Test Video'}
+
+        reset = ConnectionResetError("reset by peer")
+        prepared_downloader.downloadVideo.side_effect = reset
+        with pytest.raises(TransientError) as raised:
+            self.downloader.downloadSingleVideo(video_info, 'MP4', self.test_base_path, 'highest', (prepared_downloader, {}))
+        assert raised.value.__cause__ is reset
+
+        prepared_downloader.downloadVideo.side_effect = AuthError("Sign in to confirm your age")
+        success, error = self.downloader.downloadSingleVideo(
+            video_info, 'MP4', self.test_base_path, 'highest', (prepared_downloader, {})
+        )
+        assert success is False
+        assert isinstance(error, AuthError)
+        assert str(error) == "Sign in to confirm your age"
+
+    def testIsInfoStale(self):
+        """Test staleness by age and by stream URL expiry."""
+        now = time.monotonic()
+        future_expire = int(time.time()) + 21600
+
+        assert self.downloader.isInfoStale({'url': f'https://x/?expire={future_expire}'}, now) is False
+        assert self.downloader.isInfoStale({'url': f'https://x/?expire={int(time.time())}'}, now) is True
+        assert self.downloader.isInfoStale(
+            {'requested_formats': [{'url': f'https://x/?expire={int(time.time()) + 60}'}]}, now
+        ) is True
+        assert self.downloader.isInfoStale({}, now - self.downloader.info_max_age - 1) is True
+
+    @patch('src.BatchDownloader.Mp4Downloader')
+    def testPrepareVideoResolvesInfo(self, mock_mp4_downloader_class):
+        """Test that the extraction stage configures the converter and resolves info."""
+        mock_mp4_downloader = Mock()
+        mock_mp4_downloader.resolveInfo.return_value = {'id': 'abc'}
+        mock_mp4_downloader_class.return_value = mock_mp4_downloader
+        video_info = {'url': 'https://youtube.com/watch?v=1', 'title': 'Test Video'}
+
+        prepared = self.downloader.prepareVideo(video_info, 'MP4', self.test_base_path, '720p')
+
+        assert prepared == (mock_mp4_downloader, {'id': 'abc'})
+        assert mock_mp4_downloader.resolution == '720'
+        mock_mp4_downloader.setUrl.assert_called_with('https://youtube.com/watch?v=1')
+
+    @patch('src.BatchDownloader.Mp3Downloader')
+    def testPrepareVideoNamesUntitledItems(self, mock_mp3_downloader_class):
+        """Test that the extraction stage fills in the title and duration of plain URL items."""
+        mock_mp3_downloader_class.return_value.resolveInfo.return_value = {'id': 'a', 'title': 'Video A', 'duration': 60}
+        video_info = {'url': 'https://youtu.be/a', 'title': None, 'duration': 0, 'folder': ''}
+
+        self.downloader.prepareVideo(video_info, 'MP3', self.test_base_path, 'highest')
+
+        assert video_info['title'] == 'Video_A'
+        assert video_info['duration'] == 60
+
+    @patch('src.BatchDownloader.Mp4Downloader')
+    def testDownloadSingleVideoUsesPreparedInfo(self, mock_mp4_downloader_class):
+        """Test that prepared items are downloaded without creating a new converter."""
+        prepared_downloader = Mock()
+        video_info = {'url': 'https://youtube.com/watch?v=1', 'title': 'Test Video'}
+
+        success, error = self.downloader.downloadSingleVideo(
+            video_info, 'MP4', self.test_base_path, 'highest', (prepared_downloader, {'id': 'abc'})
+        )
+
+        assert success is True
+        mock_mp4_downloader_class.assert_not_called()
+        prepared_downloader.downloadVideo.assert_called_once_with(custom_title='Test_Video', info={'id': 'abc'})
 
     @patch('src.BatchDownloader.Mp4Downloader')
     def testDownloadSingleVideoMp4(self, mock_mp4_downloader_class):
@@ -283,7 +970,7 @@ class TestBatchDownloader:
         success, error = self.downloader.downloadSingleVideo(video_info, 'MP4', folder_path, 'highest')
 
         assert success is True
-        assert error == ""
+        assert error is None
 
         # Verify downloader was configured correctly
         mock_mp4_downloader.setUrl.assert_called_with('https://youtube.com/watch?v=1')
@@ -302,13 +989,24 @@ class TestBatchDownloader:
         success, error = self.downloader.downloadSingleVideo(video_info, 'MP3', folder_path, 'highest')
 
         assert success is True
-        assert error == ""
+        assert error is None
 
         # Verify downloader was configured correctly
         mock_mp3_downloader.setUrl.assert_called_with('https://youtube.com/watch?v=1')
         mock_mp3_downloader.setPath.assert_called_with(folder_path)
         mock_mp3_downloader.downloadAsMp3.assert_called_once()
 
+    @patch('src.BatchDownloader.Mp4Downloader')
+    def testDownloadSingleVideoPassesTransferOptions(self, mock_mp4_downloader_class):
+        """Test that fragment concurrency and chunk size are forwarded to the converter."""
+        downloader = BatchDownloader(concurrent_fragments=6, http_chunk_size=2097152)
+        video_info = {'url': 'https://youtube.com/watch?v=1', 'title': 'Test Video'}
+        folder_path = os.path.join(self.test_base_path, 'test')
+
+        downloader.downloadSingleVideo(video_info, 'MP4', folder_path, 'highest')
+
+        mock_mp4_downloader_class.assert_called_with(concurrent_fragments=6, http_chunk_size=2097152)
+
     def testDownloadSingleVideoInvalidFormat(self):
         """Test single video download with invalid format."""
         video_info = {'url': 'https://youtube.com/watch?v=1', 'title': 'Test Video'}
@@ -317,7 +1015,7 @@ class TestBatchDownloader:
         success, error = self.downloader.downloadSingleVideo(video_info, 'AVI', folder_path, 'highest')
 
         assert success is False
-        assert "Unsupported format: AVI" in error
+        assert "Unsupported format: AVI" in str(error)
 
     @patch('src.BatchDownloader.Mp4Downloader')
     def testDownloadSingleVideoException(self, mock_mp4_downloader_class):
@@ -332,4 +1030,4 @@ class TestBatchDownloader:
         success, error = self.downloader.downloadSingleVideo(video_info, 'MP4', folder_path, 'highest')
 
         assert success is False
-        assert error == "Network error"
+        assert str(error) == "Network error"
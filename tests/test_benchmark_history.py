@@ -0,0 +1,105 @@
+import pytest
+from benchmarks.history import (loadHistory, appendRun, findBaseline, relativeSpread, compareRuns,
+                                formatDiff, fingerprintChanges)
+
+
+def makeRun(run_id, metrics, suites=('scraping',), fingerprint_hash='abc', label=None, python='3.11.7'):
+    """Build a history record without measuring the environment."""
+    return {
+        'id': run_id,
+        'timestamp': 0,
+        'label': label,
+        'git': None,
+        'fingerprint': {'hash': fingerprint_hash, 'cpu': 'Test CPU', 'cpu_count': 4, 'machine': 'x86_64',
+                        'implementation': 'CPython', 'python': python, 'yt_dlp': '2026.08.19'},
+        'suites': list(suites),
+        'metrics': metrics,
+    }
+
+
+class TestBenchmarkHistory:
+    """Test the benchmark history store and the baseline comparison."""
+
+    def setup_method(self):
+        """Create a baseline with steady scraping samples."""
+        self.baseline = makeRun('20260101-000000', {
+            'scraping.playlist.2000.per_entry_us': [1000, 1010, 990],
+            'scraping.sanitize_us_per_title': [2.0, 2.0, 2.0],
+        }, label='v1')
+
+    def testHistoryRoundTrip(self, tmp_path):
+        """Test that appended runs are read back oldest first."""
+        path = str(tmp_path / 'history' / 'runs.jsonl')
+        assert loadHistory(path) == []
+
+        appendRun(self.baseline, path)
+        appendRun(makeRun('20260102-000000', {}), path)
+
+        assert [run['id'] for run in loadHistory(path)] == ['20260101-000000', '20260102-000000']
+
+    def testFindBaseline(self):
+        """Test selecting by label or ID and the default of the latest run on the same machine."""
+        other_machine = makeRun('20260103-000000', {}, fingerprint_hash='def')
+        other_suite = makeRun('20260104-000000', {}, suites=('startup',))
+        history = [self.baseline, other_machine, other_suite]
+        current = makeRun('20260105-000000', {})
+
+        assert findBaseline(history, current) is self.baseline
+        assert findBaseline(history, current, 'v1') is self.baseline
+        assert findBaseline(history, current, '20260103-000000') is other_machine
+        assert findBaseline([], current) is None
+        with pytest.raises(ValueError):
+            findBaseline(history, current, 'v9')
+
+    def testRelativeSpread(self):
+        """Test the median absolute deviation relative to the median."""
+        assert relativeSpread([100, 110, 90]) == pytest.approx(0.1)
+        assert relativeSpread([5]) == 0.0
+
+    def testCompareRunsFlagsRegressionsBeyondNoise(self):
+        """Test that slower costs are regressions and changes within the noise are not."""
+        current = makeRun('20260102-000000', {
+            'scraping.playlist.2000.per_entry_us': [1200, 1190, 1210],
+            'scraping.sanitize_us_per_title': [2.06, 2.0, 2.1],
+        })
+
+        rows = {row['metric']: row for row in compareRuns(self.baseline, current)}
+
+        assert rows['scraping.playlist.2000.per_entry_us']['verdict'] == 'regression'
+        assert rows['scraping.playlist.2000.per_entry_us']['change'] == pytest.approx(0.2)
+        assert rows['scraping.sanitize_us_per_title']['verdict'] == 'unchanged'
+
+    def testCompareRunsNoisySamplesWidenThreshold(self):
+        """Test that a change smaller than three times the spread is not reported."""
+        current = makeRun('20260102-000000', {'scraping.playlist.2000.per_entry_us': [1150, 900, 1400]})
+
+        row = compareRuns(self.baseline, current)[0]
+
+        assert row['threshold'] > 0.5
+        assert row['verdict'] == 'unchanged'
+
+    def testCompareRunsDirectionAndCoverage(self):
+        """Test higher-is-better metrics, new and missing metrics, and suites not in both runs."""
+        baseline = makeRun('a', {'throughput.w4.items_per_second': [10.0], 'throughput.w1.items_per_second': [4.0],
+                                 'startup.src.GUI.import_ms': [40.0]}, suites=('throughput', 'startup'))
+        current = makeRun('b', {'throughput.w4.items_per_second': [8.0], 'throughput.w8.items_per_second': [12.0]},
+                          suites=('throughput',))
+
+        rows = {row['metric']: row['verdict'] for row in compareRuns(baseline, current)}
+
+        assert rows == {
+            'throughput.w1.items_per_second': 'missing',
+            'throughput.w4.items_per_second': 'regression',
+            'throughput.w8.items_per_second': 'new',
+        }
+
+    def testFormatDiffAndFingerprintChanges(self):
+        """Test the diff table and the list of environment differences."""
+        current = makeRun('b', {'scraping.playlist.2000.per_entry_us': [800]}, python='3.12.1')
+
+        table = formatDiff(compareRuns(self.baseline, current)).splitlines()
+
+        assert table[0].split() == ['metric', 'baseline', 'current', 'change', 'noise', 'verdict']
+        assert table[1].split() == ['scraping.playlist.2000.per_entry_us', '1000', '800', '-20.0%', '±5.0%', 'improvement']
+        assert table[2].split() == ['scraping.sanitize_us_per_title', '2', '-', '-', '-', 'missing']
+        assert fingerprintChanges(self.baseline, current) == ["python: 3.11.7 -> 3.12.1"]
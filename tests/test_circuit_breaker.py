@@ -0,0 +1,131 @@
+import pytest
+from src.CircuitBreaker import CircuitBreaker
+from src.DownloadErrors import RateLimitedError, TransientError
+
+
+class TestCircuitBreaker:
+    """Test CircuitBreaker functionality."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, clock):
+        """Create a breaker driven by the fake clock."""
+        self.clock = clock
+        self.breaker = CircuitBreaker(failure_threshold=3, window=60, cooldown=30,
+                                      max_cooldown=100, full_allowance=8, clock=self.clock)
+
+    def fail(self, count=1):
+        """Run requests that end with a rate-limit error."""
+        tripped = False
+        for _ in range(count):
+            permit = self.breaker.tryAcquire()
+            assert permit
+            tripped = self.breaker.release(RateLimitedError("HTTP Error 429: Too Many Requests"), permit)
+        return tripped
+
+    def testTripsAtThreshold(self):
+        """Test that the breaker opens after enough rate-limit errors."""
+        assert self.fail(2) is False
+        assert not self.breaker.isOpen()
+
+        assert self.fail() is True
+        assert self.breaker.isOpen()
+        assert not self.breaker.tryAcquire()
+        assert self.breaker.retryIn() == 30
+
+    def testOldFailuresLeaveTheWindow(self):
+        """Test that failures spread over more than the window do not trip."""
+        self.fail(2)
+        self.clock.advance(61)
+
+        assert self.fail() is False
+        assert not self.breaker.isOpen()
+
+    def testOtherErrorsDoNotCount(self):
+        """Test that non rate-limit errors leave the breaker closed."""
+        for _ in range(5):
+            assert self.breaker.tryAcquire()
+            self.breaker.release(TransientError("Read timed out"))
+
+        assert not self.breaker.isOpen()
+
+    def testSingleProbeAfterCooldown(self):
+        """Test that only one probe is let through once the cooldown is over."""
+        self.fail(3)
+        self.clock.advance(30)
+
+        assert self.breaker.tryAcquire()
+        assert not self.breaker.tryAcquire()
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+
+    def testFailedProbeDoublesCooldown(self):
+        """Test that a rate-limited probe reopens the breaker for longer."""
+        self.fail(3)
+        self.clock.advance(30)
+
+        assert self.fail() is True
+        assert self.breaker.retryIn() == 60
+
+        self.clock.advance(60)
+        self.fail()
+        assert self.breaker.retryIn() == 100
+
+    def testSuccessfulProbeRampsUp(self):
+        """Test that traffic resumes gradually after a successful probe."""
+        self.fail(3)
+        self.clock.advance(30)
+        permit = self.breaker.tryAcquire()
+        assert permit == CircuitBreaker.PROBE
+        self.breaker.release(permit=permit)
+
+        assert not self.breaker.isOpen()
+        assert self.breaker.tryAcquire()
+        assert self.breaker.tryAcquire()
+        assert not self.breaker.tryAcquire()
+
+        self.breaker.release()
+        self.breaker.release()
+        assert self.breaker.allowance is None
+        assert self.breaker.cooldown == 30
+
+    def testOnlyTheProbeClosesTheBreaker(self):
+        """Test that requests admitted before the trip do not decide the half-open state."""
+        late = [self.breaker.tryAcquire() for _ in range(3)]
+        self.fail(3)
+        self.clock.advance(30)
+        probe = self.breaker.tryAcquire()
+
+        self.breaker.release(permit=late.pop())
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        self.breaker.release(RateLimitedError("HTTP Error 429: Too Many Requests"), late.pop())
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        self.breaker.release(TransientError("Read timed out"), late.pop())
+        assert not self.breaker.tryAcquire()
+
+        self.breaker.release(permit=probe)
+        assert self.breaker.state == CircuitBreaker.CLOSED
+        assert self.breaker.in_flight == 0
+
+    def testRecordCountsWithoutAPermit(self):
+        """Test that outcomes recorded after the permit was returned count, except while half-open."""
+        for _ in range(3):
+            self.breaker.record(RateLimitedError("HTTP Error 429: Too Many Requests"))
+        assert self.breaker.isOpen()
+        assert self.breaker.in_flight == 0
+
+        self.clock.advance(30)
+        probe = self.breaker.tryAcquire()
+        assert self.breaker.record(RateLimitedError("HTTP Error 429: Too Many Requests")) is False
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+
+        self.breaker.release(permit=probe)
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def testGuardRecordsErrors(self):
+        """Test that the guard context manager records and re-raises errors."""
+        for _ in range(3):
+            with pytest.raises(RateLimitedError):
+                with self.breaker.guard():
+                    raise RateLimitedError("Sign in to confirm you're not a bot")
+
+        assert self.breaker.isOpen()
+        assert self.breaker.in_flight == 0
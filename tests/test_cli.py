@@ -0,0 +1,201 @@
+import io
+import json
+import sys
+import time
+import _thread
+import threading
+import subprocess
+import pytest
+from unittest.mock import Mock, patch
+from src.CLI import main, buildParser, readBatchFile, TerminalProgress, formatBytes, formatDuration
+
+
+class FakeTerminal(io.StringIO):
+    """StringIO that reports itself as a terminal."""
+
+    def isatty(self):
+        return True
+
+
+class TestCli:
+    """Test the headless command line interface."""
+
+    def setup_method(self):
+        """Prepare a batch result returned by the mocked BatchDownloader."""
+        self.results = {'successful': 2, 'failed': 0, 'skipped': 0, 'bytes': 2048, 'skipped_bytes': 0, 'error_kinds': {}, 'errors': []}
+
+    def testImportsNeitherTkNorYtDlp(self):
+        """Test that parsing arguments loads no GUI toolkit and no extractor."""
+        code = ("import sys; from src.CLI import buildParser; buildParser().parse_args(['video', 'u']); "
+                "print('tkinter' in sys.modules, 'yt_dlp' in sys.modules)")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+        assert output.split() == ['False', 'False']
+
+    def testParserFlags(self):
+        """Test defaults and the worker, format and quality flags."""
+        args = buildParser().parse_args(['playlist', 'https://youtube.com/playlist?list=PL1'])
+        assert (args.format, args.quality, args.workers, args.max_videos) == ('MP4', 'highest', 3, 200)
+
+        args = buildParser().parse_args(['channel', 'https://youtube.com/@c', '-f', 'mp3', '-q', '720p', '-w', '5'])
+        assert (args.format, args.quality, args.workers) == ('MP3', '720p', 5)
+
+    def testReadBatchFile(self, tmp_path):
+        """Test that blank lines and comments are ignored."""
+        batch_file = tmp_path / "urls.txt"
+        batch_file.write_text("# videos\nhttps://youtu.be/a\n\n  https://youtu.be/b  \n")
+
+        assert readBatchFile(str(batch_file)) == ["https://youtu.be/a", "https://youtu.be/b"]
+
+    @patch('src.BatchDownloader.BatchDownloader')
+    @patch('src.PlaylistScraper.PlaylistScraper')
+    def testPlaylistCommandRunsBatch(self, mock_scraper_class, mock_batch_class, tmp_path):
+        """Test that a playlist is scraped and handed to BatchDownloader with the flags."""
+        scraper = mock_scraper_class.return_value
+        scraper.scrapePlaylist.return_value = [{'url': 'https://youtu.be/a', 'title': 'Video A', 'duration': 60}]
+        scraper.getPlaylistTitle.return_value = "My List"
+        mock_batch_class.return_value.downloadBatch.return_value = self.results
+
+        status = main(['playlist', 'https://youtube.com/playlist?list=PL1', '-o', str(tmp_path), '-w', '2', '-q', '480p'])
+
+        assert status == 0
+        assert mock_batch_class.call_args[1]['max_workers'] == 2
+        items, format_type, base_path, quality = mock_batch_class.return_value.downloadBatch.call_args[0]
+        assert items == [{'url': 'https://youtu.be/a', 'title': 'Video_A', 'duration': 60, 'folder': 'Playlists/My_List'}]
+        assert (format_type, base_path, quality) == ('MP4', str(tmp_path), '480p')
+
+    @patch('src.BatchDownloader.BatchDownloader')
+    @patch('src.PlaylistScraper.PlaylistScraper')
+    def testTraceFlagWritesChromeTrace(self, mock_scraper_class, mock_batch_class, tmp_path):
+        """Test that --trace records the run's stages and writes them after the batch."""
+        from src.Tracer import Tracer
+
+        def downloadBatch(items, format_type, base_path, quality):
+            with Tracer.getDefault().span('item.download', 'batch'):
+                return self.results
+
+        mock_scraper_class.return_value.scrapePlaylist.return_value = [{'url': 'https://youtu.be/a', 'title': 'A', 'duration': 60}]
+        mock_scraper_class.return_value.getPlaylistTitle.return_value = "My List"
+        mock_batch_class.return_value.downloadBatch.side_effect = downloadBatch
+        trace_path = tmp_path / "trace.json"
+
+        with patch.object(Tracer, '_default', Tracer()):
+            status = main(['playlist', 'https://youtube.com/playlist?list=PL1', '-o', str(tmp_path), '--trace', str(trace_path)])
+
+        assert status == 0
+        events = json.loads(trace_path.read_text())['traceEvents']
+        assert 'item.download' in [event['name'] for event in events]
+
+    @patch('src.BatchDownloader.BatchDownloader')
+    @patch('src.PlaylistScraper.PlaylistScraper')
+    def testMetricsFileWrittenAfterRun(self, mock_scraper_class, mock_batch_class, tmp_path):
+        """Test that --metrics-file holds the values reached when the run ends."""
+        from src.Metrics import HarvestMetrics
+
+        def downloadBatch(items, format_type, base_path, quality):
+            HarvestMetrics.getDefault().items.inc(outcome='downloaded', format=format_type)
+            return self.results
+
+        mock_scraper_class.return_value.scrapePlaylist.return_value = [{'url': 'https://youtu.be/a', 'title': 'A', 'duration': 60}]
+        mock_scraper_class.return_value.getPlaylistTitle.return_value = "My List"
+        mock_batch_class.return_value.downloadBatch.side_effect = downloadBatch
+        metrics_path = tmp_path / "tubeharvester.prom"
+
+        with patch.object(HarvestMetrics, '_default', HarvestMetrics()):
+            status = main(['playlist', 'https://youtube.com/playlist?list=PL1', '-o', str(tmp_path),
+                           '--metrics-file', str(metrics_path)])
+
+        assert status == 0
+        assert 'tubeharvester_items_total{outcome="downloaded",format="MP4"} 1' in metrics_path.read_text()
+
+    @patch('src.BatchDownloader.BatchDownloader')
+    @patch('src.PlaylistScraper.PlaylistScraper')
+    def testResourceLogWritesSamplesAndSummary(self, mock_scraper_class, mock_batch_class, tmp_path):
+        """Test that --resource-log samples the run and writes a summary when it ends."""
+        mock_scraper_class.return_value.scrapePlaylist.return_value = [{'url': 'https://youtu.be/a', 'title': 'A', 'duration': 60}]
+        mock_scraper_class.return_value.getPlaylistTitle.return_value = "My List"
+        mock_batch_class.return_value.downloadBatch.return_value = self.results
+        log_path = tmp_path / "resources.csv"
+
+        status = main(['playlist', 'https://youtube.com/playlist?list=PL1', '-o', str(tmp_path),
+                       '--resource-log', str(log_path), '--resource-interval', '60'])
+
+        assert status == 0
+        assert len(log_path.read_text().splitlines()) == 3
+        assert json.loads((tmp_path / "resources.summary.json").read_text())['samples'] == 2
+
+    @patch('src.BatchDownloader.BatchDownloader')
+    @patch('yt_dlp.YoutubeDL')
+    def testVideoCommandLeavesTitlesToTheBatch(self, mock_ydl_class, mock_batch_class, tmp_path):
+        """Test that videos are passed as untitled lazy items and failures set the exit status."""
+        seen = []
+
+        def downloadBatch(items, format_type, base_path, quality):
+            assert not isinstance(items, list)
+            seen.extend(items)
+            return dict(self.results, failed=1, errors=['a: boom'])
+
+        mock_batch_class.return_value.downloadBatch.side_effect = downloadBatch
+
+        status = main(['video', 'https://youtu.be/a', '-f', 'MP3', '-o', str(tmp_path)])
+
+        assert status == 1
+        assert seen == [{'url': 'https://youtu.be/a', 'title': None, 'duration': 0, 'folder': ''}]
+        mock_ydl_class.assert_not_called()
+
+    @patch('src.BatchDownloader.BatchDownloader')
+    @patch('src.PlaylistScraper.PlaylistScraper')
+    def testSecondInterruptExitsWithoutWaiting(self, mock_scraper_class, mock_batch_class, tmp_path):
+        """Test that Ctrl+C cancels the batch and a second Ctrl+C returns while an item still runs."""
+        finished = threading.Event()
+        mock_scraper_class.return_value.scrapePlaylist.return_value = [{'url': 'https://youtu.be/a', 'title': 'A', 'duration': 60}]
+        mock_scraper_class.return_value.getPlaylistTitle.return_value = "My List"
+        mock_batch_class.return_value.downloadBatch.side_effect = lambda *args: finished.wait(10)
+
+        def interruptTwice():
+            for _ in range(2):
+                time.sleep(0.3)
+                _thread.interrupt_main()
+
+        threading.Thread(target=interruptTwice, daemon=True).start()
+        started = time.monotonic()
+        try:
+            status = main(['playlist', 'https://youtube.com/playlist?list=PL1', '-o', str(tmp_path)])
+        finally:
+            finished.set()
+
+        assert status == 130
+        assert time.monotonic() - started < 5
+        mock_batch_class.return_value.cancelDownload.assert_called_once_with()
+
+    def testTerminalProgressKeepsStatusLineBelowLogs(self):
+        """Test that log lines are printed above a status line redrawn in place."""
+        stream = FakeTerminal()
+        display = TerminalProgress(stream)
+
+        display.stats({'percent': 50.0, 'done_items': 1, 'total_items': 2, 'done_bytes': 1536,
+                       'speed': 2 * 1024 ** 2, 'eta': 65})
+        display.log("Download complete")
+        display.close()
+
+        output = stream.getvalue()
+        status = "[ 50.0%]  1/2 items  1.5 KiB  2.0 MiB/s  ETA 1:05"
+        assert output == f"{status}\r\x1b[2KDownload complete\n{status}\n"
+
+    def testTerminalProgressOnlyLogsWhenRedirected(self):
+        """Test that no status line is written when the output is not a terminal."""
+        stream = io.StringIO()
+        display = TerminalProgress(stream)
+
+        display.fetchProgress(1, 2, 50)
+        display.log("Found 2 videos")
+        display.close()
+
+        assert stream.getvalue() == "Found 2 videos\n"
+
+    def testFormatHelpers(self):
+        """Test the byte and duration formatting of the status line."""
+        assert formatBytes(512) == "512 B"
+        assert formatBytes(3 * 1024 ** 3) == "3.0 GiB"
+        assert formatDuration(59) == "0:59"
+        assert formatDuration(3725) == "1:02:05"
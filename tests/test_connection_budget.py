@@ -0,0 +1,93 @@
+import pytest
+import threading
+import time
+from src.ConnectionBudget import ConnectionBudget
+
+
+class TestConnectionBudget:
+    """Test ConnectionBudget functionality."""
+
+    def setup_method(self):
+        """Create a small budget instance."""
+        self.budget = ConnectionBudget(limit=4)
+
+    def testAcquireGrantsRequested(self):
+        """Test that a request within the limit is fully granted."""
+        assert self.budget.acquire(3) == 3
+        assert self.budget.in_use == 3
+
+    def testAcquireClampsToFreeConnections(self):
+        """Test that a request larger than the free budget is clamped."""
+        self.budget.acquire(3)
+        assert self.budget.acquire(4) == 1
+        assert self.budget.in_use == 4
+
+    def testReleaseReturnsConnections(self):
+        """Test that released connections become available again."""
+        granted = self.budget.acquire(4)
+        self.budget.release(granted)
+        assert self.budget.in_use == 0
+
+    def testLeaseContextManager(self):
+        """Test that leases are released when the block exits."""
+        with self.budget.lease(2) as granted:
+            assert granted == 2
+            assert self.budget.in_use == 2
+        assert self.budget.in_use == 0
+
+    def testAcquireBlocksUntilMinimumIsFree(self):
+        """Test that acquire waits for the minimum number of connections."""
+        self.budget.acquire(3)
+        result = {}
+
+        def waiter():
+            result['granted'] = self.budget.acquire(4, minimum=2)
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        assert 'granted' not in result
+
+        self.budget.release(3)
+        thread.join(timeout=1)
+        assert result['granted'] == 4
+
+    def testWaiterFollowsLoweredLimit(self):
+        """Test that a waiter whose minimum is above a lowered limit still gets connections."""
+        self.budget.acquire(3)
+        result = {}
+
+        def waiter():
+            result['granted'] = self.budget.acquire(4, minimum=4)
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        self.budget.setLimit(2)
+        self.budget.release(3)
+        thread.join(timeout=1)
+
+        assert not thread.is_alive()
+        assert result['granted'] == 2
+
+    def testTotalNeverExceedsLimit(self):
+        """Test that concurrent leases never exceed the limit."""
+        peak = []
+
+        def worker():
+            with self.budget.lease(3):
+                peak.append(self.budget.in_use)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) <= 4
+        assert self.budget.in_use == 0
+
+    def testGetDefaultIsShared(self):
+        """Test that the default budget is a process-wide singleton."""
+        assert ConnectionBudget.getDefault() is ConnectionBudget.getDefault()
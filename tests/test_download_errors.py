@@ -0,0 +1,94 @@
+import errno
+import pytest
+import socket
+import urllib.error
+import yt_dlp
+from src.DownloadErrors import (
+    DownloadFailure, PermanentError, AuthError, RateLimitedError, TransientError,
+    PostProcessingError, DiskFullError, classifyError, iterErrorChain
+)
+from src.StallWatchdog import StallError
+
+
+class TestDownloadErrors:
+    """Test error classification."""
+
+    def testPrivateVideoIsAuth(self):
+        """Test that sign-in requirements are classified as auth errors."""
+        failure = classifyError(yt_dlp.DownloadError("ERROR: [youtube] abc: Private video. Sign in if you've been granted access"))
+        assert isinstance(failure, AuthError)
+        assert failure.retryable is False
+
+    def testUnavailableVideoIsPermanent(self):
+        """Test that removed videos fail fast."""
+        failure = classifyError(yt_dlp.DownloadError("ERROR: [youtube] abc: Video unavailable"))
+        assert isinstance(failure, PermanentError)
+        assert failure.retryable is False
+
+    def testBotCheckIsRateLimited(self):
+        """Test that the bot check is treated as throttling rather than auth."""
+        failure = classifyError(yt_dlp.DownloadError("ERROR: Sign in to confirm you're not a bot"))
+        assert isinstance(failure, RateLimitedError)
+        assert failure.retryable is True
+
+    def testHttp429UsesRetryAfter(self):
+        """Test that HTTP 429 carries the Retry-After header."""
+        http_error = urllib.error.HTTPError('https://x', 429, 'Too Many Requests', {'Retry-After': '120'}, None)
+        wrapped = yt_dlp.DownloadError("ERROR: unable to download", exc_info=(type(http_error), http_error, None))
+
+        failure = classifyError(wrapped)
+
+        assert isinstance(failure, RateLimitedError)
+        assert failure.retry_after == 120.0
+
+    def testNetworkErrorsAreTransient(self):
+        """Test that socket level failures are retryable."""
+        assert isinstance(classifyError(socket.timeout("read")), TransientError)
+        assert isinstance(classifyError(ConnectionResetError("peer")), TransientError)
+        assert isinstance(classifyError(yt_dlp.DownloadError("ERROR: Read timed out.")), TransientError)
+
+    def testServerErrorIsTransient(self):
+        """Test that HTTP 5xx responses are retryable."""
+        http_error = urllib.error.HTTPError('https://x', 503, 'Service Unavailable', {}, None)
+        assert isinstance(classifyError(http_error), TransientError)
+
+    def testDiskFullIsRetryable(self):
+        """Test that a full disk is recognised by errno and by message."""
+        failure = classifyError(OSError(errno.ENOSPC, "No space left on device"))
+        assert isinstance(failure, DiskFullError)
+        assert failure.retryable
+
+        wrapped = classifyError(yt_dlp.DownloadError("ERROR: unable to write data: [Errno 28] No space left on device"))
+        assert isinstance(wrapped, DiskFullError)
+
+    def testPostProcessingError(self):
+        """Test that FFmpeg failures are classified separately."""
+        failure = classifyError(yt_dlp.utils.PostProcessingError("Conversion failed!"))
+        assert isinstance(failure, PostProcessingError)
+        assert failure.retryable is False
+
+    def testUnknownErrorsAreNotRetried(self):
+        """Test that unrecognised errors fail without retries."""
+        failure = classifyError(Exception("Something odd"))
+        assert type(failure) is DownloadFailure
+        assert failure.retryable is False
+        assert isinstance(classifyError(ValueError("Unsupported format: AVI")), PermanentError)
+
+    def testClassifiedErrorsPassThrough(self):
+        """Test that already classified errors, including stalls, are returned unchanged."""
+        stall = StallError("no data")
+        wrapped = yt_dlp.DownloadError("ERROR: no data", exc_info=(StallError, stall, None))
+        assert classifyError(wrapped) is stall
+        assert stall.retryable is True
+
+    def testIterErrorChainFollowsCause(self):
+        """Test that chained errors are visited once each."""
+        try:
+            try:
+                raise socket.timeout("read")
+            except socket.timeout as e:
+                raise IOError("stream failed") from e
+        except IOError as chained:
+            chain = list(iterErrorChain(chained))
+
+        assert [type(e) for e in chain] == [OSError, socket.timeout]
@@ -27,7 +27,8 @@ class TestSingleDownloadPanel:
         self.panel = SingleDownloadPanel(self.root, self.colors)
 
     def teardown_method(self):
-        """Destroy Tk root window."""
+        """Cancel pending probes and destroy Tk root window."""
+        self.panel.probe.cancel()
         if self.root:
             self.root.destroy()
 
@@ -53,8 +54,11 @@ class TestSingleDownloadPanel:
         # Set the last checked URL so the method will execute
         self.panel.last_checked_url = "https://youtube.com/watch?v=test"
         self.panel.fetchResolutions()
+        self.panel.pump.pump()
 
         mock_messagebox.showinfo.assert_called_with("Info", "No video resolutions found.")
+        # The cached info must stay unselected so MP3 downloads do not inherit a video selection
+        mock_ydl.extract_info.assert_called_once_with("https://youtube.com/watch?v=test", download=False, process=False)
 
     @patch('src.GUI.messagebox')
     @patch('yt_dlp.YoutubeDL')
@@ -69,10 +73,11 @@ class TestSingleDownloadPanel:
         # Set the last checked URL so the method will execute
         self.panel.last_checked_url = "https://youtube.com/watch?v=test"
         self.panel.fetchResolutions()
+        self.panel.pump.pump()
 
         mock_messagebox.showerror.assert_called_with("Error", "Failed to fetch resolutions: Network error")
 
-    @patch('src.GUI.Mp4Downloader')
+    @patch('src.Mp4_Converter.Mp4Downloader')
     @patch('threading.Thread')
     def testStartDownloadMp4(self, mock_thread_class, mock_downloader_class):
         """Test starting MP4 download."""
@@ -97,7 +102,7 @@ class TestSingleDownloadPanel:
         # Verify thread was started
         mock_thread.start.assert_called_once()
 
-    @patch('src.GUI.Mp3Downloader')
+    @patch('src.Mp3_Converter.Mp3Downloader')
     @patch('threading.Thread')
     def testStartDownloadMp3(self, mock_thread_class, mock_mp3_downloader_class):
         """Test starting MP3 download."""
@@ -131,10 +136,35 @@ class TestSingleDownloadPanel:
 
         mock_messagebox.assert_called_with("Error", "Please fetch and select a resolution.")
 
+    def testRunDownloadReusesProbedInfo(self):
+        """Test that the download starts from the probed info instead of extracting again."""
+        probed = {'title': 'Test Video', 'formats': []}
+        self.panel.probe.resolve = Mock(return_value=probed)
+        mock_downloader = Mock()
+        mock_downloader.resolveInfo.return_value = {'title': 'Test Video', 'requested_formats': []}
+
+        self.panel.runDownload(mock_downloader, "MP4", "https://youtube.com/watch?v=test")
+
+        self.panel.probe.resolve.assert_called_once_with("https://youtube.com/watch?v=test")
+        mock_downloader.resolveInfo.assert_called_once_with(info=probed)
+        mock_downloader.downloadVideo.assert_called_once_with(info=mock_downloader.resolveInfo.return_value)
+
+    def testRunDownloadCatchesClassifiedErrors(self):
+        """Test that a failed download ends the worker thread without an uncaught exception."""
+        from src.DownloadErrors import AuthError
+        self.panel.probe.resolve = Mock(return_value=None)
+        mock_downloader = Mock()
+        mock_downloader.downloadVideo.side_effect = AuthError("Private video")
+
+        self.panel.runDownload(mock_downloader, "MP4", "https://youtube.com/watch?v=test")
+
+        mock_downloader.downloadVideo.assert_called_once_with(info=None)
+
     def testUpdateProgress(self):
         """Test progress update."""
         self.panel.progress['value'] = 0
         self.panel.updateProgress(50)
+        self.panel.pump.pump()
 
         assert self.panel.progress['value'] == 50
 
@@ -148,6 +178,7 @@ class TestSingleDownloadPanel:
     def testLogMessage(self):
         """Test logging message."""
         self.panel.logMessage("Test message")
+        self.panel.pump.pump()
 
         # Check that message was inserted (text widget should contain the message)
         content = self.panel.message_screen.get("1.0", tk.END).strip()
@@ -191,7 +222,8 @@ class TestBatchDownloadPanel:
         self.panel = BatchDownloadPanel(self.root, self.colors)
 
     def teardown_method(self):
-        """Destroy Tk root window."""
+        """Cancel pending probes and destroy Tk root window."""
+        self.panel.probe.cancel()
         if self.root:
             self.root.destroy()
 
@@ -204,6 +236,50 @@ class TestBatchDownloadPanel:
 
         assert self.panel.path_display.get() == "/test/path"
 
+    @patch('yt_dlp.YoutubeDL')
+    def testFetchResolutionsSamplesFirstItems(self, mock_ydl_class):
+        """Test that only the first items of a channel are listed and their formats are merged."""
+        mock_ydl = MagicMock()
+        mock_ydl.__enter__.return_value = mock_ydl
+        mock_ydl_class.return_value = mock_ydl
+
+        def extractInfo(url, download=False):
+            if url.endswith('@channel'):
+                return {'entries': [{'_type': 'url', 'id': 'a', 'ie_key': 'Youtube'},
+                                    {'_type': 'url', 'id': 'b', 'ie_key': 'Youtube'}]}
+            height = 1080 if url.endswith('a') else 720
+            return {'formats': [{'height': height, 'vcodec': 'avc1'}]}
+
+        mock_ydl.extract_info.side_effect = extractInfo
+        self.panel.last_checked_url = "https://www.youtube.com/@channel"
+        self.panel.fetchResolutions()
+        self.panel.pump.pump()
+
+        list_opts = mock_ydl_class.call_args_list[0][0][0]
+        assert list_opts['playlist_items'] == f'1:{BatchDownloadPanel.PROBE_SAMPLE}'
+        assert list_opts['extract_flat'] == 'in_playlist'
+        assert mock_ydl.extract_info.call_count == 3
+        menu = self.panel.quality_menu['menu']
+        assert [menu.entrycget(i, 'label') for i in range(menu.index('end') + 1)] == ['Highest', '1080p', '720p']
+
+    def testVideoEntriesSearchesNestedTabs(self):
+        """Test that a channel root listing its tabs as nested playlists yields video entries only."""
+        listing = {'_type': 'playlist', 'id': 'UCchannel', 'entries': [
+            {'_type': 'playlist', 'id': 'UCchannel', 'title': 'Videos', 'entries': iter([
+                {'_type': 'url', 'id': 'a', 'ie_key': 'Youtube'},
+                {'_type': 'url', 'id': 'PLlist', 'ie_key': 'YoutubeTab'},
+            ])},
+            {'_type': 'playlist', 'id': 'UCchannel', 'title': 'Shorts', 'entries': [
+                {'_type': 'url', 'id': 'b', 'ie_key': 'Youtube'},
+                {'_type': 'url', 'id': 'c', 'ie_key': 'Youtube'},
+                {'_type': 'url', 'id': 'd', 'ie_key': 'Youtube'},
+            ]},
+        ]}
+
+        entries = BatchDownloadPanel.videoEntries(listing, 3)
+
+        assert [entry['id'] for entry in entries] == ['a', 'b', 'c']
+
     def testUpdateMaxVideosDisplayPlaylist(self):
         """Test max videos display update for playlist mode."""
         self.panel.mode_var.set("Playlist Download")
@@ -221,6 +297,7 @@ class TestBatchDownloadPanel:
     def testStartBatchDownloadNoUrl(self):
         """Test starting batch download without URL."""
         self.panel.startBatchDownload()
+        self.panel.pump.pump()
 
         # Check that the error message was logged
         content = self.panel.message_screen.get("1.0", tk.END).strip()
@@ -332,6 +409,7 @@ class TestBatchDownloadPanel:
     def testLogMessage(self):
         """Test logging message."""
         self.panel.logMessage("Test message")
+        self.panel.pump.pump()
 
         # Check that message was inserted
         content = self.panel.message_screen.get("1.0", tk.END).strip()
@@ -380,7 +458,7 @@ class TestYouTubeDownloaderGUI:
         mock_tk_class.return_value = mock_root
 
         # Import and call runGui (this would normally start the event loop)
-        from src.GUI import runGui
+        from src.GUI import runGui, preloadDownloaders, PRELOAD_DELAY
 
         # We can't actually run the GUI in tests, but we can verify it creates a Tk instance
         # and calls mainloop on it
@@ -395,3 +473,4 @@ class TestYouTubeDownloaderGUI:
             mock_tk_class.assert_called_once()
             mock_gui_class.assert_called_once_with(mock_root)
             mock_mainloop.assert_called_once()
+            mock_root.after.assert_called_once_with(PRELOAD_DELAY, preloadDownloaders)
@@ -0,0 +1,131 @@
+import os
+import pytest
+import urllib.error
+import urllib.request
+from src.Metrics import MetricsRegistry, HarvestMetrics, TextfileExporter
+
+
+class TestMetrics:
+    """Test the metrics registry, its exporters and the harvest metrics."""
+
+    def setup_method(self):
+        """Create an empty registry."""
+        self.registry = MetricsRegistry()
+
+    def testCounterAndGaugeExposition(self):
+        """Test the HELP, TYPE and sample lines, including label escaping."""
+        counter = self.registry.counter('items_total', "Items.", ('outcome',))
+        counter.inc(outcome='downloaded')
+        counter.inc(2, outcome='downloaded')
+        counter.inc(outcome='say "hi"\\n')
+        self.registry.gauge('queue_depth', "Depth.").set(1.5)
+
+        assert self.registry.exposition() == (
+            '# HELP items_total Items.\n'
+            '# TYPE items_total counter\n'
+            'items_total{outcome="downloaded"} 3\n'
+            'items_total{outcome="say \\"hi\\"\\\\n"} 1\n'
+            '# HELP queue_depth Depth.\n'
+            '# TYPE queue_depth gauge\n'
+            'queue_depth 1.5\n'
+        )
+
+    def testHistogramBucketsAreCumulative(self):
+        """Test the bucket, sum and count lines of a histogram."""
+        histogram = self.registry.histogram('extract_seconds', "Extraction.", buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        lines = self.registry.exposition().splitlines()[2:]
+        assert lines == [
+            'extract_seconds_bucket{le="1"} 2',
+            'extract_seconds_bucket{le="5"} 3',
+            'extract_seconds_bucket{le="+Inf"} 4',
+            'extract_seconds_sum 14.5',
+            'extract_seconds_count 4',
+        ]
+
+    def testInvalidUpdatesAndRegistration(self):
+        """Test label mismatches, negative increments and conflicting registrations."""
+        counter = self.registry.counter('items_total', "Items.", ('outcome',))
+
+        with pytest.raises(ValueError):
+            counter.inc(format='MP4')
+        with pytest.raises(ValueError):
+            counter.inc()
+        with pytest.raises(ValueError):
+            counter.inc(-1, outcome='failed')
+        with pytest.raises(ValueError):
+            self.registry.gauge('items_total', "Items.")
+        assert self.registry.counter('items_total', "Items.", ('outcome',)) is counter
+
+    def testWriteTextfileReplacesFile(self, tmp_path):
+        """Test that the file holds the exposition and no temporary file is left behind."""
+        self.registry.counter('items_total', "Items.").inc()
+        path = tmp_path / "tubeharvester.prom"
+        path.write_text("stale")
+
+        self.registry.writeTextfile(str(path))
+
+        assert path.read_text() == self.registry.exposition()
+        assert os.listdir(tmp_path) == ["tubeharvester.prom"]
+
+    def testTextfileExporterWritesUntilStopped(self, tmp_path):
+        """Test that the exporter writes at start and writes the final values at stop."""
+        counter = self.registry.counter('items_total', "Items.")
+        path = tmp_path / "tubeharvester.prom"
+
+        exporter = TextfileExporter(self.registry, str(path), interval=60).start()
+        assert path.read_text().splitlines()[-1] == '# TYPE items_total counter'
+        counter.inc(4)
+        exporter.stop()
+
+        assert path.read_text().splitlines()[-1] == 'items_total 4'
+
+    def testServeExposesMetricsOverHttp(self):
+        """Test the HTTP endpoint on a free local port."""
+        self.registry.counter('items_total', "Items.").inc()
+        server = self.registry.serve(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+                assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+                assert response.read().decode() == self.registry.exposition()
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/other", timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def testHarvestMetricsObserveResult(self):
+        """Test that result records count outcomes, error classes, bytes and throughput."""
+        metrics = HarvestMetrics(self.registry)
+        metrics.observeResult({'status': 'downloaded', 'bytes': 4096, 'download_seconds': 2.0, 'error_kind': None}, 'MP4')
+        metrics.observeResult({'status': 'skipped', 'bytes': 100, 'download_seconds': 0.0, 'error_kind': None}, 'MP4')
+        metrics.observeResult({'status': 'failed', 'bytes': None, 'download_seconds': 1.0, 'error_kind': 'auth'}, 'MP3')
+
+        assert metrics.items.get(outcome='downloaded', format='MP4') == 1
+        assert metrics.items.get(outcome='skipped', format='MP4') == 1
+        assert metrics.items.get(outcome='failed', format='MP3') == 1
+        assert metrics.errors.get(kind='auth') == 1
+        assert metrics.bytes.get(format='MP4') == 4096
+        assert metrics.throughput.get(format='MP4')['sum'] == 2048
+
+    def testHarvestMetricsScrapesAndPostprocessors(self):
+        """Test scrape request timing by outcome and post-processor timing."""
+        metrics = HarvestMetrics(self.registry)
+        with metrics.timeScrape('playlist'):
+            pass
+        with pytest.raises(RuntimeError):
+            with metrics.timeScrape('playlist'):
+                raise RuntimeError("HTTP Error 500")
+        metrics.postprocessorHook({'status': 'started', 'postprocessor': 'Merger'})
+        metrics.postprocessorHook({'status': 'finished', 'postprocessor': 'Merger'})
+        metrics.resetPipeline()
+
+        assert metrics.scrape_requests.get(source='playlist', outcome='ok') == 1
+        assert metrics.scrape_requests.get(source='playlist', outcome='error') == 1
+        assert metrics.scrape_seconds.get(source='playlist')['count'] == 2
+        assert metrics.postprocess_seconds.get(postprocessor='Merger')['count'] == 1
+        assert metrics.queue_depth.get(stage='delayed') == 0
+        assert 'tubeharvester_active_workers{pool="extract"} 0' in self.registry.exposition()
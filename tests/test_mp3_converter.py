@@ -1,8 +1,10 @@
 import pytest
 import os
 import tempfile
+import yt_dlp
 from unittest.mock import Mock, patch, MagicMock
 from src.Mp3_Converter import Mp3Downloader
+from src.ConnectionBudget import ConnectionBudget
 
 
 class TestMp3Downloader:
@@ -111,6 +113,27 @@ class TestMp3Downloader:
         download_call = mock_ydl_download.download.call_args[0][0]
         assert download_call == [self.test_url]
 
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadAsMp3AppliesTransferOptions(self, mock_ydl_class):
+        """Test that fragment concurrency and chunk size reach yt-dlp."""
+        mock_ydl_info = Mock()
+        mock_ydl_info.__enter__ = Mock(return_value=mock_ydl_info)
+        mock_ydl_info.__exit__ = Mock(return_value=None)
+        mock_ydl_info.extract_info.return_value = {'title': 'Test Video'}
+
+        mock_ydl_download = Mock()
+        mock_ydl_download.__enter__ = Mock(return_value=mock_ydl_download)
+        mock_ydl_download.__exit__ = Mock(return_value=None)
+
+        mock_ydl_class.side_effect = [mock_ydl_info, mock_ydl_download]
+
+        downloader = Mp3Downloader(self.test_url, self.test_path, concurrent_fragments=2, http_chunk_size=1048576)
+        downloader.downloadAsMp3()
+
+        download_opts = mock_ydl_class.call_args_list[1][0][0]
+        assert download_opts['concurrent_fragment_downloads'] == 2
+        assert download_opts['http_chunk_size'] == 1048576
+
     @patch('yt_dlp.YoutubeDL')
     def testDownloadAsMp3Failure(self, mock_ydl_class):
         """Test MP3 download failure."""
@@ -130,6 +153,91 @@ class TestMp3Downloader:
         # Verify error was logged
         log_callback.assert_called()
 
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadAsMp3RetriesConversionOnly(self, mock_ydl_class):
+        """Test that a failed conversion is retried on the kept audio file."""
+        mock_ydl_info = Mock()
+        mock_ydl_info.__enter__ = Mock(return_value=mock_ydl_info)
+        mock_ydl_info.__exit__ = Mock(return_value=None)
+        mock_ydl_info.extract_info.return_value = {'title': 'Test Video'}
+
+        error = yt_dlp.utils.PostProcessingError("audio conversion failed")
+        mock_ydl_download = Mock()
+        mock_ydl_download.__enter__ = Mock(return_value=mock_ydl_download)
+        mock_ydl_download.__exit__ = Mock(return_value=None)
+        mock_ydl_download.download.side_effect = yt_dlp.DownloadError(
+            "ERROR: Postprocessing: audio conversion failed", exc_info=(type(error), error, None)
+        )
+
+        mock_ydl_class.side_effect = [mock_ydl_info, mock_ydl_download]
+
+        downloader = Mp3Downloader(self.test_url, self.test_path)
+        downloader.downloadAsMp3()
+
+        assert mock_ydl_download.download.call_count == 1
+        mock_ydl_download.process_ie_result.assert_called_once_with({'title': 'Test Video'}, download=True)
+
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadAsMp3MarksAudioWhenConversionFails(self, mock_ydl_class):
+        """Test that audio kept after the last failed conversion is renamed for the repair command."""
+        audio_path = os.path.join(self.test_path, 'Test Video.webm')
+        error = yt_dlp.utils.PostProcessingError("audio conversion failed")
+        downloader = self.downloader
+        downloader.postprocess_retries = 0
+
+        def download(*args, **kwargs):
+            open(audio_path, 'wb').close()
+            downloader.progressHook({'status': 'finished', 'filename': audio_path})
+            raise yt_dlp.DownloadError("ERROR: Postprocessing: audio conversion failed",
+                                       exc_info=(type(error), error, None))
+
+        mock_ydl_class.return_value.__enter__.return_value.process_ie_result.side_effect = download
+
+        with pytest.raises(Exception, match="audio conversion failed"):
+            downloader.downloadAsMp3(info={'title': 'Test Video'})
+
+        assert os.listdir(self.test_path) == ['Test Video.unconverted.webm']
+
+    @pytest.mark.parametrize('info, connections', [
+        ({'title': 'Test Video', 'vcodec': 'none', 'protocol': 'https'}, 1),
+        ({'title': 'Test Video', 'vcodec': 'none', 'protocol': 'm3u8_native'}, 4),
+        ({'title': 'Test Video', 'vcodec': 'avc1', 'protocol': 'https'}, 4),
+    ])
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadAsMp3LeasesOneConnectionForPlainAudio(self, mock_ydl_class, info, connections):
+        """Test that a resolved plain HTTP(S) audio file leases a single connection."""
+        budget = ConnectionBudget()
+        leased = []
+        mock_ydl_class.return_value.__enter__.return_value.process_ie_result.side_effect = \
+            lambda *args, **kwargs: leased.append(budget.in_use)
+
+        with patch.object(ConnectionBudget, '_default', budget):
+            self.downloader.downloadAsMp3(info=info)
+
+        assert leased == [connections]
+        assert mock_ydl_class.call_args[0][0]['concurrent_fragment_downloads'] == connections
+
+    def testProbedInfoSelectsOnlyTheAudio(self):
+        """Test that info probed without format selection downloads the audio stream alone."""
+        probed = {
+            'id': 'test123', 'title': 'Test Video', 'webpage_url': self.test_url,
+            'extractor': 'youtube', 'extractor_key': 'Youtube',
+            'formats': [
+                {'format_id': 'v', 'url': 'https://example.invalid/v.mp4', 'ext': 'mp4',
+                 'vcodec': 'avc1.64001F', 'acodec': 'none', 'height': 720},
+                {'format_id': 'a', 'url': 'https://example.invalid/a.m4a', 'ext': 'm4a',
+                 'vcodec': 'none', 'acodec': 'mp4a.40.2'},
+            ],
+        }
+        downloads = []
+
+        # yt-dlp selects the formats for real; only the transfer itself is skipped
+        with patch.object(yt_dlp.YoutubeDL, 'process_info', lambda ydl, info: downloads.append(dict(info))):
+            self.downloader.downloadAsMp3(info=probed)
+
+        assert [info['format_id'] for info in downloads] == ['a']
+        assert 'requested_formats' not in downloads[0]
+
     def testProgressHookDownloading(self):
         """Test progress hook during downloading."""
         progress_callback = Mock()
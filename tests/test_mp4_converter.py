@@ -1,8 +1,12 @@
 import pytest
 import os
 import tempfile
+import yt_dlp
 from unittest.mock import Mock, patch, MagicMock
 from src.Mp4_Converter import Mp4Downloader
+from src.ConnectionBudget import ConnectionBudget
+from src.StallWatchdog import StallWatchdog, StallError
+from src.DownloadErrors import DownloadFailure, AuthError, PostProcessingError
 
 
 class TestMp4Downloader:
@@ -95,6 +99,25 @@ class TestMp4Downloader:
         with pytest.raises(ValueError, match="URL is not set"):
             self.downloader.fetchVideoInfo()
 
+    @patch('yt_dlp.YoutubeDL')
+    def testResolveInfoReusesProbedInfo(self, mock_ydl_class):
+        """Test that probed info only has its formats selected again, without extraction."""
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        probed = {'title': 'Test Video', 'formats': []}
+        mock_ydl.process_ie_result.return_value = {'title': 'Test Video', 'requested_formats': []}
+        mock_ydl_class.return_value = mock_ydl
+
+        self.downloader.setUrl(self.test_url)
+        self.downloader.resolution = 720
+        result = self.downloader.resolveInfo(info=probed)
+
+        assert mock_ydl_class.call_args[0][0]['format'].startswith('bestvideo[height<=720]')
+        mock_ydl.process_ie_result.assert_called_once_with(probed, download=False)
+        mock_ydl.extract_info.assert_not_called()
+        assert result == {'title': 'Test Video', 'requested_formats': []}
+
     @patch('yt_dlp.YoutubeDL')
     def testDownloadVideoSuccess(self, mock_ydl_class):
         """Test successful video download."""
@@ -123,12 +146,280 @@ class TestMp4Downloader:
         assert 'javascript_executor' not in opts_capture
         assert opts_capture.get('noplaylist') is True
         
-        # Verify extract_info was called with download=True
-        mock_ydl.extract_info.assert_called_with(self.test_url, download=True)
+        # Verify info was extracted first and then downloaded in one pass
+        mock_ydl.extract_info.assert_called_with(self.test_url, download=False)
+        mock_ydl.process_ie_result.assert_called_once_with(mock_ydl.extract_info.return_value, download=True)
 
         # Verify log callback was called
         log_callback.assert_any_call("Download complete: Test_Video")
 
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoFetchesStreamsConcurrently(self, mock_ydl_class):
+        """Test that separate video and audio streams are fetched in parallel and merged by yt-dlp."""
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        mock_ydl.extract_info.return_value = {
+            'title': 'Test Video',
+            'ext': 'mp4',
+            'requested_formats': [
+                {'format_id': '137', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'none'},
+                {'format_id': '140', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a'},
+            ],
+        }
+        mock_ydl.prepare_filename.return_value = os.path.join(self.test_path, 'Test_Video.mp4')
+        mock_ydl.dl.return_value = (True, True)
+        mock_ydl_class.return_value = mock_ydl
+
+        self.downloader.setUrl(self.test_url)
+        self.downloader.setPath(self.test_path)
+        self.downloader.downloadVideo(custom_title="Test_Video")
+
+        stream_paths = sorted(call[0][0] for call in mock_ydl.dl.call_args_list)
+        assert stream_paths == [
+            os.path.join(self.test_path, 'Test_Video.f137.mp4'),
+            os.path.join(self.test_path, 'Test_Video.f140.m4a'),
+        ]
+        mock_ydl.process_ie_result.assert_not_called()
+
+        # process_info finds the streams on disk and runs the merger, fixups and post-processors
+        mock_ydl.process_info.assert_called_once_with(mock_ydl.extract_info.return_value)
+
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoStreamFailureSkipsMerge(self, mock_ydl_class):
+        """Test that a failed stream aborts the merge."""
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        mock_ydl.extract_info.return_value = {
+            'title': 'Test Video',
+            'ext': 'mp4',
+            'requested_formats': [
+                {'format_id': '137', 'ext': 'mp4'},
+                {'format_id': '140', 'ext': 'm4a'},
+            ],
+        }
+        mock_ydl.prepare_filename.return_value = os.path.join(self.test_path, 'Test_Video.mp4')
+        mock_ydl.dl.side_effect = [(True, True), (False, False)]
+        mock_ydl_class.return_value = mock_ydl
+
+        log_callback = Mock()
+        self.downloader.log_callback = log_callback
+        self.downloader.setUrl(self.test_url)
+        self.downloader.setPath(self.test_path)
+        with pytest.raises(DownloadFailure, match="Failed to download stream"):
+            self.downloader.downloadVideo()
+
+        mock_ydl.process_info.assert_not_called()
+        assert "Failed to download stream" in log_callback.call_args[0][0]
+
+    def mockStreamDownload(self, mock_ydl_class):
+        """Configure a yt-dlp mock that resolves a separate video and audio pair."""
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        mock_ydl.extract_info.return_value = {
+            'title': 'Test Video',
+            'ext': 'mp4',
+            'requested_formats': [
+                {'format_id': '137', 'ext': 'mp4'},
+                {'format_id': '140', 'ext': 'm4a'},
+            ],
+        }
+        mock_ydl.prepare_filename.return_value = os.path.join(self.test_path, 'Test_Video.mp4')
+        mock_ydl.dl.return_value = (True, True)
+        mock_ydl_class.return_value = mock_ydl
+        self.downloader.setUrl(self.test_url)
+        self.downloader.setPath(self.test_path)
+        return mock_ydl
+
+    @staticmethod
+    def mergeError():
+        """Build the error yt-dlp reports when its merger fails."""
+        error = yt_dlp.utils.PostProcessingError("Conversion failed!")
+        return yt_dlp.DownloadError("ERROR: Postprocessing: Conversion failed!", exc_info=(type(error), error, None))
+
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoRetriesMergeWithoutRedownload(self, mock_ydl_class):
+        """Test that a failed merge is retried on the streams already downloaded."""
+        mock_ydl = self.mockStreamDownload(mock_ydl_class)
+        mock_ydl.process_info.side_effect = [self.mergeError(), None]
+
+        self.downloader.downloadVideo(custom_title="Test_Video")
+
+        assert mock_ydl.process_info.call_count == 2
+        assert mock_ydl.dl.call_count == 2
+
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoKeepsStreamsWhenMergeFails(self, mock_ydl_class):
+        """Test that the streams survive a merge that keeps failing."""
+        mock_ydl = self.mockStreamDownload(mock_ydl_class)
+        stream_paths = [os.path.join(self.test_path, name) for name in ('Test_Video.f137.mp4', 'Test_Video.f140.m4a')]
+        for path in stream_paths:
+            open(path, 'wb').close()
+        mock_ydl.process_info.side_effect = self.mergeError()
+
+        with pytest.raises(PostProcessingError):
+            self.downloader.downloadVideo(custom_title="Test_Video")
+
+        assert mock_ydl.process_info.call_count == self.downloader.postprocess_retries + 1
+        assert all(os.path.exists(path) for path in stream_paths)
+
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoReraisesStall(self, mock_ydl_class):
+        """Test that a watchdog abort is raised instead of being swallowed."""
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        mock_ydl.extract_info.return_value = {'title': 'Test Video'}
+        stall = StallError("no data for 60s")
+        mock_ydl.process_ie_result.side_effect = yt_dlp.DownloadError("ERROR: no data", exc_info=(StallError, stall, None))
+        mock_ydl_class.return_value = mock_ydl
+
+        self.downloader.setUrl(self.test_url)
+        self.downloader.setPath(self.test_path)
+
+        with pytest.raises(StallError):
+            self.downloader.downloadVideo()
+
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoRaisesClassifiedError(self, mock_ydl_class):
+        """Test that restricted videos raise instead of being reported as downloaded."""
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        mock_ydl.extract_info.side_effect = yt_dlp.DownloadError("ERROR: Private video. Sign in if you've been granted access")
+        mock_ydl_class.return_value = mock_ydl
+
+        log_callback = Mock()
+        self.downloader.log_callback = log_callback
+        self.downloader.setUrl(self.test_url)
+        self.downloader.setPath(self.test_path)
+
+        with pytest.raises(AuthError):
+            self.downloader.downloadVideo()
+        log_callback.assert_called_with("Video restricted or requires authentication.")
+
+    def testProgressHookFeedsWatchdog(self):
+        """Test that progress updates reach the watchdog."""
+        self.downloader.watchdog = Mock(spec=StallWatchdog)
+        d = {'status': 'downloading', '_percent_str': '10%', 'downloaded_bytes': 10}
+
+        self.downloader.progressHook(d)
+
+        self.downloader.watchdog.progressHook.assert_called_once_with(d)
+
+    def testProgressHookUsesByteCounts(self):
+        """Test that byte counts take precedence over the colored percentage string."""
+        progress_callback = Mock()
+        listener = Mock()
+        self.downloader.progress_callback = progress_callback
+        self.downloader.progress_listener = listener
+        d = {'status': 'downloading', '_percent_str': '\x1b[0;94m 10.0%\x1b[0m',
+             'downloaded_bytes': 250, 'total_bytes_estimate': 1000}
+
+        self.downloader.progressHook(d)
+
+        progress_callback.assert_called_once_with(25)
+        listener.assert_called_once_with(d)
+
+        progress_callback.reset_mock()
+        self.downloader.progressHook({'status': 'downloading', '_percent_str': '\x1b[0;94m 10.0%\x1b[0m'})
+        progress_callback.assert_called_once_with(10)
+
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoAppliesTransferOptions(self, mock_ydl_class):
+        """Test that fragment concurrency and chunk size reach yt-dlp."""
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        mock_ydl.extract_info.return_value = {'title': 'Test Video'}
+        mock_ydl_class.return_value = mock_ydl
+
+        downloader = Mp4Downloader(concurrent_fragments=3, http_chunk_size=1048576)
+        downloader.setUrl(self.test_url)
+        downloader.setPath(self.test_path)
+        downloader.downloadVideo()
+
+        mock_ydl.params.update.assert_called_with({
+            'concurrent_fragment_downloads': 3,
+            'http_chunk_size': 1048576,
+        })
+
+    @patch('src.Mp4_Converter.SegmentedDownloader')
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoUsesSegmentsForLargeSingleFile(self, mock_ydl_class, mock_segmented_class):
+        """Test that large single-file formats are fetched with Range segments."""
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        mock_ydl.extract_info.return_value = {
+            'title': 'Test Video',
+            'url': 'https://media.example/video.mp4',
+            'protocol': 'https',
+            'filesize': 200 * 1024 * 1024,
+            'http_headers': {'User-Agent': 'test'},
+        }
+        output_path = os.path.join(self.test_path, 'Test_Video.mp4')
+        mock_ydl.prepare_filename.return_value = output_path
+        mock_ydl_class.return_value = mock_ydl
+
+        def fakeDownload(url, path, total_size=None):
+            open(path, 'wb').close()
+            return 0
+
+        mock_segmented_class.return_value.download.side_effect = fakeDownload
+
+        self.downloader.setUrl(self.test_url)
+        self.downloader.setPath(self.test_path)
+        self.downloader.downloadVideo()
+
+        mock_ydl.process_ie_result.assert_not_called()
+        mock_segmented_class.return_value.download.assert_called_once_with(
+            'https://media.example/video.mp4', output_path + '.part', 200 * 1024 * 1024
+        )
+        assert os.path.exists(output_path)
+
+    def testCanSegmentRequiresLargeHttpFile(self):
+        """Test segmented download eligibility rules."""
+        large = {'url': 'https://x', 'protocol': 'https', 'filesize': 100 * 1024 * 1024}
+        assert self.downloader.canSegment(large, 4) is True
+        assert self.downloader.canSegment(large, 1) is False
+        assert self.downloader.canSegment(dict(large, protocol='http_dash_segments'), 4) is False
+        assert self.downloader.canSegment(dict(large, filesize=1024), 4) is False
+
+    @pytest.mark.parametrize('video_size, fragmented, leased, shares', [
+        (10 * 1024 * 1024, False, 2, [1, 1]),
+        (100 * 1024 * 1024, False, 5, [4, 1]),
+        (10 * 1024 * 1024, True, 5, [4, 1]),
+    ])
+    @patch('yt_dlp.YoutubeDL')
+    def testDownloadVideoLeasesOnlyOpenedConnections(self, mock_ydl_class, video_size, fragmented, leased, shares):
+        """Test that plain streams lease one connection and fragmented or segmented streams lease several."""
+        mock_ydl = mock_ydl_class.return_value.__enter__.return_value
+        video = {'format_id': '137', 'ext': 'mp4', 'url': 'https://media.example/v', 'filesize': video_size,
+                 'protocol': 'm3u8_native' if fragmented else 'https'}
+        audio = {'format_id': '140', 'ext': 'm4a', 'url': 'https://media.example/a', 'filesize': 1024 * 1024,
+                 'protocol': 'https'}
+        budget = ConnectionBudget()
+        seen = []
+        self.downloader.setUrl(self.test_url)
+        self.downloader.setPath(self.test_path)
+
+        with patch.object(ConnectionBudget, '_default', budget), \
+             patch.object(self.downloader, 'downloadStreams', side_effect=lambda ydl, info, connections: seen.append((budget.in_use, connections))):
+            self.downloader.downloadVideo(info={'title': 'Test Video', 'requested_formats': [video, audio]})
+
+        assert seen == [(leased, shares)]
+        assert mock_ydl.params.update.call_args[0][0]['concurrent_fragment_downloads'] == shares[0]
+        assert budget.in_use == 0
+
+    def testSplitConnections(self):
+        """Test that a short lease is spread over the streams without exceeding what each wants."""
+        assert Mp4Downloader.splitConnections([4, 4], 5) == [3, 2]
+        assert Mp4Downloader.splitConnections([4, 1], 16) == [4, 1]
+        assert Mp4Downloader.splitConnections([4, 4], 2) == [1, 1]
+
     def testDownloadVideoNoUrl(self):
         """Test downloading video without URL set."""
         with pytest.raises(ValueError, match="URL is not set"):
@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import Mock, patch
+import yt_dlp
 from src.PlaylistScraper import PlaylistScraper
+from src.CircuitBreaker import CircuitBreaker
 
 
 class TestPlaylistScraper:
@@ -199,6 +201,34 @@ class TestPlaylistScraper:
         # Should sleep once between the two videos
         mock_sleep.assert_called_with(1.5)
 
+    @patch('time.sleep')
+    @patch('yt_dlp.YoutubeDL')
+    def testBreakerOnlyGuardsRequests(self, mock_ydl_class, mock_sleep):
+        """Test that every request holds a breaker permit and the pauses between entries do not."""
+        breaker = CircuitBreaker()
+        permits = {'request': [], 'sleep': []}
+
+        def extractInfo(url, download=False):
+            permits['request'].append(breaker.in_flight)
+            if len(permits['request']) == 1:
+                raise yt_dlp.DownloadError("The playlist does not exist")
+            return {'entries': [{'id': 'video1', 'title': 'Video 1'}, {'id': 'video2', 'title': 'Video 2'}]}
+
+        mock_ydl = Mock()
+        mock_ydl.__enter__ = Mock(return_value=mock_ydl)
+        mock_ydl.__exit__ = Mock(return_value=None)
+        mock_ydl.extract_info.side_effect = extractInfo
+        mock_ydl_class.return_value = mock_ydl
+        mock_sleep.side_effect = lambda seconds: permits['sleep'].append(breaker.in_flight)
+        self.scraper.circuit_breaker = breaker
+
+        # A mix whose playlist page fails falls back to the watch page
+        videos = self.scraper.scrapePlaylist("https://www.youtube.com/watch?v=abc&list=RDabc")
+
+        assert len(videos) == 2
+        assert permits == {'request': [1, 1], 'sleep': [0, 0]}
+        assert breaker.in_flight == 0
+
     @patch('yt_dlp.YoutubeDL')
     def testScrapePlaylistMissingFields(self, mock_ydl_class):
         """Test playlist scraping with missing fields in entries."""
@@ -0,0 +1,160 @@
+import pytest
+import os
+import shutil
+import tempfile
+import yt_dlp
+from unittest.mock import Mock, patch
+from src.PostProcessRepair import PostProcessRepair, retryPostProcessing, main
+from src.DownloadErrors import TransientError
+
+
+class TestRetryPostProcessing:
+    """Test the post-processing retry helper."""
+
+    def testRetriesPostProcessingFailure(self):
+        """Test that a post-processing failure is retried and the result returned."""
+        run = Mock(side_effect=[yt_dlp.utils.PostProcessingError("Conversion failed!"), "done"])
+        log_callback = Mock()
+
+        assert retryPostProcessing(run, 2, log_callback) == "done"
+        assert [call.args[0] for call in run.call_args_list] == [0, 1]
+        assert "retrying without downloading again" in log_callback.call_args[0][0]
+
+    def testDoesNotRetryOtherErrors(self):
+        """Test that download errors propagate immediately."""
+        run = Mock(side_effect=TransientError("Read timed out"))
+
+        with pytest.raises(TransientError):
+            retryPostProcessing(run, 2)
+        assert run.call_count == 1
+
+    def testGivesUpAfterRetries(self):
+        """Test that the last post-processing error is raised once retries are used up."""
+        run = Mock(side_effect=yt_dlp.utils.PostProcessingError("Conversion failed!"))
+        log_callback = Mock()
+
+        with pytest.raises(yt_dlp.utils.PostProcessingError):
+            retryPostProcessing(run, 1, log_callback)
+        assert run.call_count == 2
+        assert "kept" in log_callback.call_args[0][0]
+
+
+class TestPostProcessRepair:
+    """Test PostProcessRepair functionality."""
+
+    def setup_method(self):
+        """Create a temporary output tree and repair instance."""
+        self.root = tempfile.mkdtemp()
+        self.repair = PostProcessRepair()
+
+    def teardown_method(self):
+        """Remove the temporary output tree."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def touch(self, *parts):
+        """Create an empty file below the output tree."""
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'wb').close()
+        return path
+
+    def testFindsUnmergedStreams(self):
+        """Test that stream pairs without a merged output are found."""
+        video = self.touch('Playlist', 'Song.f137.mp4')
+        audio = self.touch('Playlist', 'Song.f140.m4a')
+        self.touch('Playlist', 'Done.f137.mp4')
+        self.touch('Playlist', 'Done.f140.m4a')
+        self.touch('Playlist', 'Done.mp4')
+        self.touch('Playlist', 'Half.f137.mp4')
+        self.touch('Playlist', 'Half.f140.m4a.part')
+
+        jobs = self.repair.findIntermediates(self.root, 'MP4')
+
+        assert jobs == [(os.path.join(self.root, 'Playlist', 'Song.mp4'), [video, audio])]
+
+    def testFindsUnconvertedAudio(self):
+        """Test that audio marked as unconverted without an MP3 is found."""
+        source = self.touch('Song.unconverted.webm')
+        self.touch('Done.unconverted.webm')
+        self.touch('Done.mp3')
+        self.touch('Song.temp.mp3')
+        self.touch('Plain.webm')
+
+        jobs = self.repair.findIntermediates(self.root, 'MP3')
+
+        assert jobs == [(os.path.join(self.root, 'Song.mp3'), [source])]
+
+    def testInvalidFormat(self):
+        """Test that unsupported formats are rejected."""
+        with pytest.raises(ValueError, match="Unsupported format"):
+            self.repair.findIntermediates(self.root, 'AVI')
+
+    @patch('src.PostProcessRepair.FFmpegMergerPP')
+    @patch('src.PostProcessRepair.FFmpegPostProcessor')
+    def testRepairTreeMergesStreams(self, mock_probe_class, mock_merger_class):
+        """Test that kept streams are merged and removed afterwards."""
+        video = self.touch('Song.f137.mp4')
+        audio = self.touch('Song.f140.m4a')
+        mock_probe_class.return_value.get_metadata_object.side_effect = [
+            {'streams': [{'codec_type': 'video'}]},
+            {'streams': [{'codec_type': 'audio'}]},
+        ]
+
+        results = self.repair.repairTree(self.root, 'MP4')
+
+        assert results['repaired'] == 1
+        merge_info = mock_merger_class.return_value.run.call_args[0][0]
+        assert merge_info['filepath'] == os.path.join(self.root, 'Song.mp4')
+        assert [(f['vcodec'], f['acodec']) for f in merge_info['requested_formats']] == [
+            ('unknown', 'none'), ('none', 'unknown')
+        ]
+        assert not os.path.exists(video)
+        assert not os.path.exists(audio)
+
+    @patch('src.PostProcessRepair.FFmpegMergerPP')
+    @patch('src.PostProcessRepair.FFmpegPostProcessor')
+    def testRepairTreeKeepsStreamsOnFailure(self, mock_probe_class, mock_merger_class):
+        """Test that a failed repair leaves the streams for another attempt."""
+        video = self.touch('Song.f137.mp4')
+        self.touch('Song.f140.m4a')
+        mock_probe_class.return_value.get_metadata_object.return_value = {'streams': []}
+        mock_merger_class.return_value.run.side_effect = yt_dlp.utils.PostProcessingError("Conversion failed!")
+
+        results = self.repair.repairTree(self.root, 'MP4')
+
+        assert results['failed'] == 1
+        assert results['errors'] == ["Song.mp4: Conversion failed!"]
+        assert os.path.exists(video)
+
+    @patch('src.PostProcessRepair.FFmpegExtractAudioPP')
+    def testRepairTreeConvertsAudio(self, mock_extractor_class):
+        """Test that kept audio is converted to MP3 and the source removed."""
+        source = self.touch('Song.unconverted.webm')
+        converted = self.touch('Song.unconverted.mp3')
+        mock_extractor_class.return_value.run.return_value = ([source], {'filepath': converted})
+
+        results = self.repair.repairTree(self.root, 'MP3')
+
+        assert results['repaired'] == 1
+        assert mock_extractor_class.call_args.kwargs['preferredcodec'] == 'mp3'
+        assert mock_extractor_class.return_value.run.call_args[0][0] == {'filepath': source, 'ext': 'webm'}
+        assert os.listdir(self.root) == ['Song.mp3']
+
+    @patch('src.PostProcessRepair.FFmpegExtractAudioPP')
+    def testRepairTreeLeavesFinishedDownloadsAlone(self, mock_extractor_class):
+        """Test that MP3 repair never converts or deletes files it did not mark."""
+        video = self.touch('Videos', 'x.mp4')
+        audio = self.touch('Music', 'y.m4a')
+
+        results = self.repair.repairTree(self.root, 'MP3')
+
+        assert results['repaired'] == 0
+        mock_extractor_class.return_value.run.assert_not_called()
+        assert os.path.exists(video)
+        assert os.path.exists(audio)
+
+    @patch.object(PostProcessRepair, 'repairTree', return_value={'repaired': 1, 'failed': 1, 'errors': []})
+    def testMainReturnsFailureStatus(self, mock_repair_tree):
+        """Test the command line entry point."""
+        assert main([self.root, '--format', 'MP3']) == 1
+        mock_repair_tree.assert_called_once_with(self.root, 'MP3')
@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import Mock
+from src.ProgressAggregator import ProgressAggregator
+
+
+def hook(downloaded, total, filename='video.mp4', status='downloading'):
+    """Build a yt-dlp progress dictionary."""
+    return {'status': status, 'downloaded_bytes': downloaded, 'total_bytes': total, 'filename': filename}
+
+
+class TestProgressAggregator:
+    """Test ProgressAggregator functionality."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, clock):
+        """Create an aggregator driven by the fake clock."""
+        self.clock = clock
+        self.callback = Mock()
+        self.aggregator = ProgressAggregator(self.callback, interval=1, smoothing=0.5, clock=self.clock)
+
+    def testWeightsByBytes(self):
+        """Test that one long video outweighs many finished short ones."""
+        self.aggregator.reset(total_items=4, total_duration=3 * 60 + 3 * 3600, timed_items=4)
+        for i in range(3):
+            self.aggregator.begin(f'short{i}', duration=60)
+            self.aggregator.update(f'short{i}', hook(1000, 1000, status='finished'))
+            self.aggregator.finish(f'short{i}')
+
+        snapshot = self.aggregator.snapshot()
+
+        # The 3-hour video is expected to hold 180 times the bytes of a 1-minute one
+        assert snapshot['percent'] == pytest.approx(3000 / (3000 + 180000) * 100)
+        assert snapshot['total_bytes'] == 183000
+        assert snapshot['done_items'] == 3
+
+    def testAddsStreamsOfOneItem(self):
+        """Test that video and audio streams of one item add up."""
+        self.aggregator.reset(total_items=1)
+        self.aggregator.begin('item')
+        self.aggregator.update('item', hook(800, 800, 'item.f137.mp4'))
+        self.aggregator.update('item', hook(100, 200, 'item.f140.m4a'))
+
+        snapshot = self.aggregator.snapshot()
+
+        assert snapshot['done_bytes'] == 900
+        assert snapshot['percent'] == pytest.approx(90)
+
+    def testSmoothsSpeedAndEstimatesEta(self):
+        """Test the moving average of the throughput and the ETA derived from it."""
+        self.aggregator.reset(total_items=1)
+        self.aggregator.begin('item')
+        self.aggregator.update('item', hook(0, 10000))
+
+        self.clock.advance(1)
+        self.aggregator.update('item', hook(1000, 10000))
+        assert self.aggregator.snapshot()['speed'] == pytest.approx(1000)
+
+        self.clock.advance(1)
+        self.aggregator.update('item', hook(4000, 10000))
+        snapshot = self.aggregator.snapshot()
+
+        assert snapshot['speed'] == pytest.approx(0.5 * 3000 + 0.5 * 1000)
+        assert snapshot['eta'] == pytest.approx(6000 / 2000)
+
+    def testIgnoresRestartedStreamsForSpeed(self):
+        """Test that a stream restarting from a lower count does not count twice."""
+        self.aggregator.begin('item')
+        self.aggregator.update('item', hook(500, 1000))
+        self.aggregator.update('item', hook(200, 1000))
+        self.aggregator.update('item', hook(700, 1000))
+
+        assert self.aggregator.transferred == 1000
+
+    def testThrottlesEmissions(self):
+        """Test that progress hook calls emit at most once per interval, but finishing always emits."""
+        self.aggregator.reset(total_items=2)
+        self.aggregator.begin('item')
+        for _ in range(10):
+            self.aggregator.update('item', hook(100, 1000))
+        assert self.callback.call_count == 1
+
+        self.clock.advance(1)
+        self.aggregator.update('item', hook(200, 1000))
+        assert self.callback.call_count == 2
+
+        self.aggregator.finish('item')
+        assert self.callback.call_count == 3
+        assert self.callback.call_args[0][0]['done_items'] == 1
+
+    def testFallsBackToItemCount(self):
+        """Test that item counts are used until a size is known, and nothing without a total."""
+        self.aggregator.reset(total_items=4)
+        self.aggregator.finish(duration=60)
+        assert self.aggregator.snapshot()['percent'] == pytest.approx(25)
+
+        self.aggregator.reset()
+        self.aggregator.finish()
+        assert self.aggregator.snapshot()['percent'] is None
@@ -0,0 +1,125 @@
+import pytest
+import threading
+from unittest.mock import Mock
+from src.ResolutionProbe import ResolutionProbe, videoId
+
+
+class TestResolutionProbe:
+    """Test ResolutionProbe functionality."""
+
+    def setup_method(self):
+        """Create a probe with a short debounce delay and recording callbacks."""
+        self.results = []
+        self.errors = []
+        self.done = threading.Event()
+        self.extract = Mock(side_effect=lambda url: {'id': videoId(url), 'formats': []})
+
+        def onResult(url, info):
+            self.results.append((url, info))
+            self.done.set()
+
+        def onError(url, error):
+            self.errors.append((url, error))
+            self.done.set()
+
+        self.probe = ResolutionProbe(self.extract, onResult, onError, delay=0.05)
+
+    def teardown_method(self):
+        """Cancel any pending probe."""
+        self.probe.cancel()
+
+    def testVideoId(self):
+        """Test video ID parsing of the common URL shapes."""
+        assert videoId("https://www.youtube.com/watch?v=abc123&t=10") == "abc123"
+        assert videoId("https://youtu.be/abc123?si=x") == "abc123"
+        assert videoId("https://youtube.com/shorts/abc123") == "abc123"
+        assert videoId("https://www.youtube.com/playlist?list=PL1") is None
+        assert videoId("https://example.com/watch?v=abc123") is None
+
+    def testDebouncesRequests(self):
+        """Test that only the last of several quick edits is probed."""
+        for url in ("https://youtu.be/a", "https://youtu.be/ab", "https://youtu.be/abc"):
+            self.probe.request(url)
+
+        assert self.done.wait(2)
+
+        self.extract.assert_called_once_with("https://youtu.be/abc")
+        assert self.results == [("https://youtu.be/abc", {'id': 'abc', 'formats': []})]
+
+    def testDropsSupersededResult(self):
+        """Test that a probe finishing after the URL changed is not reported."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slowExtract(url):
+            if url.endswith("old"):
+                started.set()
+                release.wait(2)
+            return {'id': videoId(url)}
+
+        self.probe.extract = slowExtract
+        self.probe.request("https://youtu.be/old")
+        assert started.wait(2)
+        self.probe.request("https://youtu.be/new")
+        assert self.done.wait(2)
+        release.set()
+
+        # The old probe still fills the cache, but never reaches the callback
+        self.probe.resolve("https://youtu.be/old")
+        assert self.results == [("https://youtu.be/new", {'id': 'new'})]
+
+    def testSharesInFlightExtraction(self):
+        """Test that concurrent lookups of one video share a single extraction."""
+        release = threading.Event()
+
+        def slowExtract(url):
+            release.wait(2)
+            return {'id': videoId(url)}
+
+        self.extract.side_effect = slowExtract
+        results = []
+        urls = ("https://www.youtube.com/watch?v=abc", "https://youtu.be/abc?t=10")
+        threads = [threading.Thread(target=lambda u=url: results.append(self.probe.resolve(u))) for url in urls]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        assert self.extract.call_count == 1
+        assert results == [{'id': 'abc'}, {'id': 'abc'}]
+
+    def testCachesCopiesById(self):
+        """Test that cached info is reused by ID and protected from changes by callers."""
+        first = self.probe.resolve("https://www.youtube.com/watch?v=abc")
+        first['requested_formats'] = ['changed']
+        second = self.probe.resolve("https://youtu.be/abc")
+
+        assert self.extract.call_count == 1
+        assert 'requested_formats' not in second
+        assert self.probe.cached("https://youtu.be/other") is None
+
+    def testExpiresOldEntriesAndSkipsFailures(self):
+        """Test that stale entries are extracted again and failures are not cached."""
+        self.probe.max_age = 0
+        self.probe.resolve("https://youtu.be/abc")
+        self.probe.resolve("https://youtu.be/abc")
+        assert self.extract.call_count == 2
+
+        self.extract.side_effect = Exception("Network error")
+        self.probe.request("https://youtu.be/bad")
+        assert self.done.wait(2)
+
+        assert [str(error) for _, error in self.errors] == ["Network error"]
+        with pytest.raises(Exception, match="Network error"):
+            self.probe.resolve("https://youtu.be/bad")
+        assert self.extract.call_count == 4
+
+    def testUsesCustomKey(self):
+        """Test that a key function caches by source URL instead of video ID."""
+        self.probe.key = str.strip
+        self.probe.resolve("https://www.youtube.com/watch?v=abc&list=PL1")
+        self.probe.resolve("https://www.youtube.com/watch?v=abc&list=PL1 ")
+        self.probe.resolve("https://www.youtube.com/watch?v=abc")
+
+        assert self.extract.call_count == 2
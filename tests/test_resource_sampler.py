@@ -0,0 +1,111 @@
+import os
+import csv
+import json
+import time
+import threading
+import subprocess
+import tracemalloc
+import pytest
+from unittest.mock import Mock, patch
+from src.ResourceSampler import ResourceSampler, rssBytes, openFileCount, childProcesses, existingParent, threadGroups
+
+requires_proc = pytest.mark.skipif(not os.path.exists('/proc/self/statm'), reason="needs /proc")
+
+
+class TestResourceSampler:
+    """Test the resource probes and the background sampler."""
+
+    def setup_method(self):
+        """Prepare a collector for the summary log lines."""
+        self.log_callback = Mock()
+
+    @requires_proc
+    def testProbes(self, tmp_path):
+        """Test that memory and descriptors are read and a new descriptor is counted."""
+        before = openFileCount()
+        with open(tmp_path / "held.txt", 'w'):
+            assert openFileCount() == before + 1
+
+        assert rssBytes() > 0
+
+    @requires_proc
+    def testChildProcessesCountsDescendantsByName(self):
+        """Test that running children are counted by name and finished ones are not."""
+        child = subprocess.Popen(['sleep', '5'])
+        try:
+            assert childProcesses(('sleep',)) == 1
+            assert childProcesses() == 0
+        finally:
+            child.kill()
+            child.wait()
+
+        assert childProcesses(('sleep',)) == 0
+
+    def testThreadGroupsAndExistingParent(self, tmp_path):
+        """Test that numbered thread names are grouped and missing paths fall back to a parent."""
+        release = threading.Event()
+        workers = [threading.Thread(target=release.wait, name=f'download_{index}') for index in range(3)]
+        for worker in workers:
+            worker.start()
+        try:
+            assert threadGroups()['download'] == 3
+        finally:
+            release.set()
+            for worker in workers:
+                worker.join()
+
+        assert existingParent(str(tmp_path / "Videos" / "Playlists")) == str(tmp_path)
+
+    def testSamplerWritesSeriesAndSummary(self, tmp_path):
+        """Test that the CSV holds a header and one row per sample and the summary spans them."""
+        path = tmp_path / "samples" / "resources.csv"
+        sampler = ResourceSampler(str(path), interval=0.05, disk_path=str(tmp_path / "missing"),
+                                  log_callback=self.log_callback)
+
+        with sampler:
+            time.sleep(0.3)
+
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        summary = json.loads((tmp_path / "samples" / "resources.summary.json").read_text())
+        assert len(rows) >= 3
+        assert list(rows[0]) == list(ResourceSampler.COLUMNS)
+        assert rows[0]['traced_bytes'] == ''
+        assert summary['samples'] == len(rows)
+        assert summary['duration_seconds'] == float(rows[-1]['elapsed_seconds'])
+        assert summary['threads']['max'] >= 2
+        assert summary['threads_by_name_at_peak']['resource-sampler'] == 1
+        assert summary['disk_free_bytes']['min'] > 0
+        assert summary['top_allocations'] == []
+        assert self.log_callback.call_args_list[0].args[0].startswith(f"Resource samples: {len(rows)} over")
+
+    def testSamplerReportsAllocationGrowth(self, tmp_path):
+        """Test that allocations made while sampling are attributed to their line."""
+        sampler = ResourceSampler(str(tmp_path / "resources.csv"), interval=60, top_allocations=3)
+
+        sampler.start()
+        retained = [bytes(1000) for _ in range(2000)]
+        summary = sampler.stop()
+
+        top = summary['top_allocations'][0]
+        assert top['location'].startswith(__file__)
+        assert top['size_diff_bytes'] >= 2000 * 1000
+        assert summary['traced_bytes']['end'] > summary['traced_bytes']['start']
+        assert not tracemalloc.is_tracing()
+        assert len(retained) == 2000
+
+    def testFromEnvironment(self, tmp_path):
+        """Test that the environment enables and configures the sampler."""
+        path = str(tmp_path / "resources.csv")
+        with patch.dict(os.environ, clear=True):
+            assert ResourceSampler.fromEnvironment() is None
+
+        settings = {ResourceSampler.ENV_VAR: path, ResourceSampler.INTERVAL_ENV_VAR: '30',
+                    ResourceSampler.ALLOCATIONS_ENV_VAR: '5'}
+        with patch.dict(os.environ, settings):
+            sampler = ResourceSampler.fromEnvironment(str(tmp_path))
+        assert (sampler.path, sampler.interval, sampler.top_allocations, sampler.disk_path) == (path, 30, 5, str(tmp_path))
+
+        with patch.dict(os.environ, dict(settings, **{ResourceSampler.INTERVAL_ENV_VAR: 'often'})):
+            sampler = ResourceSampler.fromEnvironment()
+        assert (sampler.interval, sampler.top_allocations) == (10, 0)
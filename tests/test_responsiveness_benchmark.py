@@ -0,0 +1,102 @@
+import os
+import pytest
+from unittest.mock import Mock
+from benchmarks.responsiveness import (FakeBatchDownloader, FakePlaylistScraper, summarizeProbe,
+                                       timeFrames, checkThresholds, runScenario, THRESHOLDS)
+
+
+def report(jitter=5.0, stall=20.0, frame=3.0, widget_lines=2000, timed_out=False):
+    """Build a minimal report with the figures ``checkThresholds`` reads."""
+    return {
+        'jitter_ms': {'p99': jitter},
+        'stalls': {'max_ms': stall},
+        'frames_ms': {'p99': frame},
+        'log': {'widget_lines_max': widget_lines, 'max_lines': 2000},
+        'timed_out': timed_out,
+    }
+
+
+class TestResponsivenessBenchmark:
+    """Test the GUI responsiveness benchmark."""
+
+    def setup_method(self):
+        """Create a short, fast fake batch."""
+        self.lines = []
+        self.progress = []
+        self.stats = []
+        self.downloader = FakeBatchDownloader(
+            threads=3, line_rate=100, duration=0.2,
+            progress_callback=self.progress.append,
+            log_callback=self.lines.append,
+            stats_callback=self.stats.append,
+            max_workers=3
+        )
+
+    def testFakeDownloaderFloodsCallbacks(self):
+        """Test that every thread sends log, progress and stats updates until the batch ends."""
+        results = self.downloader.downloadBatch([{}] * 4, 'MP4', '/tmp')
+
+        assert results['successful'] == 4
+        assert self.downloader.finished.is_set()
+        assert len(self.lines) == self.downloader.lines_sent > 3
+        assert len(self.progress) == len(self.stats) == len(self.lines)
+        assert all(0 <= percentage <= 100 for percentage in self.progress)
+        assert self.stats[-1]['total_items'] == 4
+
+    def testCancelStopsWorkers(self):
+        """Test that a cancelled batch returns before its duration."""
+        self.downloader.duration = 60
+        self.downloader.cancelDownload()
+
+        self.downloader.downloadBatch([{}], 'MP4', '/tmp')
+
+        assert self.downloader.lines_sent <= 3
+
+    def testFakeScraperReportsProgress(self):
+        """Test that the fake playlist honours the video limit and reports every entry."""
+        calls = []
+
+        videos = FakePlaylistScraper(videos=50, timeout=2.0).scrapePlaylist('url', 20, lambda *update: calls.append(update))
+
+        assert len(videos) == 20
+        assert calls[-1] == (20, 20, 100)
+
+    def testSummarizeProbe(self):
+        """Test that lateness beyond the probe interval becomes jitter and long delays stalls."""
+        summary = summarizeProbe([10, 12, 9, 160, 10], interval=10, stall_ms=100)
+
+        assert summary['jitter_ms']['max'] == 150
+        assert summary['stalls'] == {'count': 1, 'total_ms': 150, 'max_ms': 150}
+
+    def testTimeFramesWrapsPump(self):
+        """Test that every pump frame is timed and still applied."""
+        pump = Mock()
+        apply = pump.pump
+
+        frames = timeFrames(pump)
+        pump.pump()
+
+        apply.assert_called_once()
+        assert len(frames) == 1
+
+    def testCheckThresholds(self):
+        """Test that each exceeded limit is reported."""
+        assert checkThresholds(report()) == []
+
+        problems = checkThresholds(report(jitter=80, stall=400, frame=30, widget_lines=2500, timed_out=True))
+
+        assert problems == [
+            "the batch did not finish in time",
+            f"p99 main-loop jitter is 80.0 ms, limit is {THRESHOLDS['jitter_p99_ms']} ms",
+            f"the longest stall is 400.0 ms, limit is {THRESHOLDS['max_stall_ms']} ms",
+            f"p99 pump frame takes 30.0 ms, limit is {THRESHOLDS['frame_p99_ms']} ms",
+            "the log widget grew to 2500 lines, limit is 2000",
+        ]
+
+    @pytest.mark.skipif(not os.environ.get('DISPLAY'), reason="needs a display, e.g. xvfb-run")
+    def testRunScenarioStaysResponsive(self):
+        """Test a short batch through the real GUI within the default thresholds."""
+        result = runScenario(threads=4, line_rate=200, duration=2, videos=100)
+
+        assert result['log']['lines_sent'] > 0
+        assert checkThresholds(result) == []
@@ -0,0 +1,48 @@
+import argparse
+import pytest
+from benchmarks.media_server import PAGE_SIZE, playlistPage, channelPage
+from benchmarks.scraping import parseShape, runSuite
+
+
+class TestScrapingBenchmark:
+    """Test the synthetic playlist and channel scraping benchmark."""
+
+    def testPlaylistPages(self):
+        """Test that a playlist is served in pages until its last entry."""
+        first = playlistPage('PLBENCH250xa', 0)
+        last = playlistPage('PLBENCH250xa', 2)
+
+        assert len(first['entries']) == PAGE_SIZE and first['next'] is True
+        assert first['entries'][0]['id'] == 'PLBENCH250xa-0'
+        assert len(last['entries']) == 50 and last['next'] is False
+        assert playlistPage('PLother', 0) is None
+
+    def testChannelTabs(self):
+        """Test the home, playlists and videos tabs of a channel."""
+        home = channelPage('UCBENCH3x20xa', 'home', 0)
+        playlists = channelPage('UCBENCH3x20xa', 'playlists', 0)
+        videos = channelPage('UCBENCH3x20xa', 'videos', 0)
+
+        assert home['entries'][0]['url'].endswith('/channel/UCBENCH3x20xa/videos')
+        assert [entry['id'] for entry in playlists['entries']] == [f'PLBENCH20x3x20xa-{index}' for index in range(3)]
+        assert len(videos['entries']) == 20
+        assert channelPage('UCBENCH3x20xa', 'shorts', 0) is None
+
+    def testParseShape(self):
+        """Test channel shapes given on the command line."""
+        assert parseShape('20x500') == (20, 500)
+        with pytest.raises(argparse.ArgumentTypeError):
+            parseShape('20')
+
+    def testRunSuiteScrapesEveryEntry(self):
+        """Test a small run end to end through both scrapers and the extractor plugins."""
+        report = runSuite([150], [(2, 30)])
+
+        cases = {case['path']: case for case in report['cases']}
+        assert cases['playlist']['returned'] == 150
+        assert cases['playlist']['requests'] == 2
+        assert cases['playlist']['sleep_calls'] == 150
+        assert cases['playlist_title']['returned'] is None
+        assert cases['channel']['returned'] == 2 * 30 + 30
+        assert cases['channel']['peak_traced_mb'] is None
+        assert report['sanitize_us_per_title'] > 0
@@ -0,0 +1,221 @@
+import pytest
+import os
+import re
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import yt_dlp
+from unittest.mock import Mock
+from src.SegmentedDownloader import SegmentedDownloader, Segment
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves the fixture file with HTTP Range support and optional fault injection."""
+
+    def do_GET(self):
+        """Serve a full or partial response for the fixture."""
+        server = self.server
+        data = server.fixture_data
+        server.requests.append(self.headers.get('Range'))
+
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range') or '')
+        if not match or not server.supports_ranges:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else len(data) - 1
+        body = data[start:end + 1]
+
+        self.send_response(206)
+        self.send_header('Content-Range', f"bytes {start}-{end}/{len(data)}")
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        with server.fault_lock:
+            fail = server.failures_remaining > 0 and start > 0
+            if fail:
+                server.failures_remaining -= 1
+        if fail:
+            # Send part of the body and drop the connection
+            self.wfile.write(body[:len(body) // 4])
+            return
+
+        delay = server.slow_ranges.get(start, 0)
+        for offset in range(0, len(body), 64 * 1024):
+            self.wfile.write(body[offset:offset + 64 * 1024])
+            if delay:
+                time.sleep(delay)
+
+    def log_message(self, format, *args):
+        """Silence request logging."""
+        pass
+
+
+class TestSegmentedDownloader:
+    """Test SegmentedDownloader against a local HTTP server."""
+
+    def setup_method(self):
+        """Create the fixture file and start the local server."""
+        self.test_dir = tempfile.mkdtemp()
+        self.fixture = os.urandom(4 * 1024 * 1024)
+        self.output_path = os.path.join(self.test_dir, 'output.bin')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+        self.server.daemon_threads = True
+        self.server.fixture_data = self.fixture
+        self.server.requests = []
+        self.server.supports_ranges = True
+        self.server.failures_remaining = 0
+        self.server.fault_lock = threading.Lock()
+        self.server.slow_ranges = {}
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/fixture.bin"
+
+    def teardown_method(self):
+        """Stop the server and remove temporary files."""
+        self.server.shutdown()
+        self.server.server_close()
+        for file in os.listdir(self.test_dir):
+            os.unlink(os.path.join(self.test_dir, file))
+        os.rmdir(self.test_dir)
+
+    def testDownloadMatchesFixture(self):
+        """Test that a segmented download reproduces the file exactly."""
+        downloader = SegmentedDownloader(connections=4, min_segment_size=256 * 1024)
+
+        written = downloader.download(self.url, self.output_path)
+
+        assert written == len(self.fixture)
+        with open(self.output_path, 'rb') as f:
+            assert f.read() == self.fixture
+        assert len([r for r in self.server.requests if r and r != 'bytes=0-0']) >= 4
+
+    def testPlanSegmentsCoversFile(self):
+        """Test that planned segments cover the file without gaps."""
+        downloader = SegmentedDownloader(connections=3, min_segment_size=1)
+        segments = downloader.planSegments(1000)
+
+        assert segments[0].start == 0
+        assert segments[-1].end == 1000
+        for previous, current in zip(segments, segments[1:]):
+            assert previous.end == current.start
+
+    def testFailedSegmentIsRetried(self):
+        """Test that a dropped connection only retries the affected segment."""
+        self.server.failures_remaining = 2
+        downloader = SegmentedDownloader(connections=4, min_segment_size=256 * 1024)
+
+        downloader.download(self.url, self.output_path)
+
+        with open(self.output_path, 'rb') as f:
+            assert f.read() == self.fixture
+        assert self.server.failures_remaining == 0
+
+    def testSegmentFailsAfterMaxRetries(self):
+        """Test that a segment gives up after exhausting its retries."""
+        self.server.failures_remaining = 100
+        downloader = SegmentedDownloader(connections=2, max_retries=1, min_segment_size=256 * 1024)
+
+        with pytest.raises(IOError):
+            downloader.download(self.url, self.output_path)
+
+    def testSlowSegmentIsStolen(self):
+        """Test that idle connections split the tail of a slow segment."""
+        self.server.slow_ranges = {0: 0.05}
+        downloader = SegmentedDownloader(connections=2, min_segment_size=256 * 1024)
+
+        downloader.download(self.url, self.output_path)
+
+        with open(self.output_path, 'rb') as f:
+            assert f.read() == self.fixture
+        assert len(downloader.segments) > 2
+
+    def testFallsBackWithoutRangeSupport(self):
+        """Test single-connection fallback when the server ignores Range."""
+        self.server.supports_ranges = False
+        downloader = SegmentedDownloader(connections=4)
+
+        written = downloader.download(self.url, self.output_path)
+
+        assert written == len(self.fixture)
+        with open(self.output_path, 'rb') as f:
+            assert f.read() == self.fixture
+
+    def testProgressHooksReceiveBytes(self):
+        """Test that progress hooks get yt-dlp style dictionaries."""
+        hook = Mock()
+        downloader = SegmentedDownloader(connections=2, progress_hooks=[hook], min_segment_size=256 * 1024)
+
+        downloader.download(self.url, self.output_path)
+
+        last = hook.call_args[0][0]
+        assert last['status'] == 'finished'
+        assert last['downloaded_bytes'] == len(self.fixture)
+        assert last['total_bytes'] == len(self.fixture)
+
+    def testResumesSegmentsAfterFailure(self):
+        """Test that a new download of the same path only fetches the ranges still missing."""
+        self.server.failures_remaining = 100
+        with pytest.raises(IOError):
+            SegmentedDownloader(connections=2, max_retries=0, min_segment_size=256 * 1024).download(
+                self.url, self.output_path)
+        assert os.path.exists(self.output_path + SegmentedDownloader.STATE_SUFFIX)
+
+        self.server.failures_remaining = 0
+        self.server.requests.clear()
+        SegmentedDownloader(connections=2, min_segment_size=256 * 1024).download(self.url, self.output_path)
+
+        with open(self.output_path, 'rb') as f:
+            assert f.read() == self.fixture
+        assert 'bytes=0-' not in ' '.join(r for r in self.server.requests if r != 'bytes=0-0')
+        assert not os.path.exists(self.output_path + SegmentedDownloader.STATE_SUFFIX)
+
+    def testSingleConnectionContinuesExistingFile(self):
+        """Test that a single-connection download appends to the bytes already on disk."""
+        with open(self.output_path, 'wb') as f:
+            f.write(self.fixture[:1000])
+
+        written = SegmentedDownloader(connections=1).download(self.url, self.output_path)
+
+        assert written == len(self.fixture)
+        assert self.server.requests[-1] == 'bytes=1000-'
+        with open(self.output_path, 'rb') as f:
+            assert f.read() == self.fixture
+
+    def testSingleConnectionRestartsWithoutRangeSupport(self):
+        """Test that an existing file is rewritten when the server sends the whole file."""
+        self.server.supports_ranges = False
+        with open(self.output_path, 'wb') as f:
+            f.write(b'x' * 1000)
+
+        SegmentedDownloader(connections=4).download(self.url, self.output_path)
+
+        with open(self.output_path, 'rb') as f:
+            assert f.read() == self.fixture
+
+    def testRequestsGoThroughYoutubeDL(self):
+        """Test that a yt-dlp instance sends the requests, so its proxy and cookie settings apply."""
+        with yt_dlp.YoutubeDL({'quiet': True, 'proxy': ''}) as ydl:
+            urlopen = Mock(side_effect=ydl.urlopen)
+            ydl.urlopen = urlopen
+            downloader = SegmentedDownloader(connections=2, min_segment_size=256 * 1024, ydl=ydl)
+
+            downloader.download(self.url, self.output_path)
+
+        with open(self.output_path, 'rb') as f:
+            assert f.read() == self.fixture
+        assert urlopen.call_count == len(self.server.requests)
+
+    def testSegmentRemaining(self):
+        """Test remaining byte calculation of a segment."""
+        segment = Segment(100, 200)
+        segment.position = 150
+        assert segment.remaining() == 50
+        segment.end = 120
+        assert segment.remaining() == 0
@@ -0,0 +1,109 @@
+import pytest
+import os
+import errno
+import shutil
+import tempfile
+from unittest.mock import patch
+from src.StagingArea import StagingArea, estimateSize, diskFree
+
+
+class TestStagingArea:
+    """Test StagingArea functionality."""
+
+    def setup_method(self):
+        """Create a temporary output tree and staging area."""
+        self.base_path = tempfile.mkdtemp()
+        self.output_folder = os.path.join(self.base_path, 'Videos')
+        self.staging = StagingArea(os.path.join(self.base_path, '.staging'), self.base_path, min_free_bytes=100)
+        self.video_info = {'url': 'https://www.youtube.com/watch?v=abc123', 'title': 'Video 1'}
+
+    def teardown_method(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.base_path, ignore_errors=True)
+
+    def write(self, path, size):
+        """Create a file of the given size."""
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+
+    def testEstimateSizeUsesFormatSizes(self):
+        """Test that known stream sizes are summed and doubled for post-processing."""
+        info = {'requested_formats': [{'filesize': 1000}, {'filesize_approx': 500}]}
+        assert estimateSize(info) == 3000
+
+    def testEstimateSizeFallsBackToDuration(self):
+        """Test bitrate and duration based estimates."""
+        assert estimateSize({'duration': 10, 'tbr': 800}) == 2 * 10 * 100000
+        assert estimateSize({'duration': 10}, 'MP3') == 2 * 10 * 20000
+        assert estimateSize({'title': 'No duration'}) == 0
+
+    def testItemKeyIsStable(self):
+        """Test that the same item always gets the same staging directory."""
+        key = self.staging.itemKey(self.video_info, self.output_folder)
+
+        assert key == self.staging.itemKey(dict(self.video_info), self.output_folder)
+        assert key.startswith('abc123-')
+        assert key != self.staging.itemKey(self.video_info, os.path.join(self.output_folder, 'Other'))
+
+    def testCommitMovesFinishedFiles(self):
+        """Test that finished files are moved and partial files discarded."""
+        key = self.staging.itemKey(self.video_info, self.output_folder)
+        item_dir = self.staging.itemDir(key)
+        self.write(os.path.join(item_dir, 'Video_1.mp4'), 10)
+        self.write(os.path.join(item_dir, 'Video_1.f140.m4a.part'), 10)
+
+        moved = self.staging.commit(key, self.output_folder)
+
+        assert moved == [os.path.join(self.output_folder, 'Video_1.mp4')]
+        assert os.listdir(self.output_folder) == ['Video_1.mp4']
+        assert not os.path.exists(item_dir)
+
+    def testMoveFileAcrossDisks(self):
+        """Test the copy-then-rename fallback for a staging disk on another filesystem."""
+        os.makedirs(self.output_folder)
+        source = os.path.join(self.base_path, 'source.mp4')
+        target = os.path.join(self.output_folder, 'target.mp4')
+        self.write(source, 10)
+        real_replace = os.replace
+        calls = []
+
+        def replace(src, dst):
+            calls.append(src)
+            if len(calls) == 1:
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            real_replace(src, dst)
+
+        with patch('src.StagingArea.os.replace', side_effect=replace):
+            self.staging.moveFile(source, target)
+
+        assert calls[1] == target + '.staging'
+        assert os.path.getsize(target) == 10
+        assert not os.path.exists(source)
+
+    def testHasRoomCountsReservations(self):
+        """Test that running items reserve the space they have not written yet."""
+        key = self.staging.itemKey(self.video_info, self.output_folder)
+        self.write(os.path.join(self.staging.itemDir(key), 'Video_1.mp4.part'), 300)
+
+        with patch('src.StagingArea.diskFree', return_value=1000):
+            assert self.staging.hasRoom(900)
+            self.staging.reserve(key, 800)
+            assert self.staging.reservedBytes() == 500
+            assert not self.staging.hasRoom(401)
+            assert self.staging.hasRoom(400)
+            self.staging.release(key)
+            assert self.staging.reservedBytes() == 0
+
+    def testCleanupKeepsFailedItems(self):
+        """Test that cleanup only removes empty directories."""
+        self.staging.itemDir('empty')
+        kept = self.staging.itemDir('failed')
+        self.write(os.path.join(kept, 'Video_1.mp4.part'), 10)
+
+        self.staging.cleanup()
+
+        assert os.listdir(self.staging.root) == ['failed']
+
+    def testDiskFreeOfMissingPath(self):
+        """Test that free space is read from the nearest existing parent."""
+        assert diskFree(os.path.join(self.base_path, 'missing', 'folder')) > 0
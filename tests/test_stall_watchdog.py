@@ -0,0 +1,177 @@
+import time
+import pytest
+import threading
+import yt_dlp
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.Mp4_Converter import Mp4Downloader
+from src.StallWatchdog import StallWatchdog, StallError, findStallError
+
+
+class SilentHandler(BaseHTTPRequestHandler):
+    """Sends the response headers and then nothing until the server is released."""
+
+    def do_GET(self):
+        """Announce a body that never arrives."""
+        self.send_response(200)
+        self.send_header('Content-Length', str(1024 * 1024))
+        self.end_headers()
+        self.wfile.flush()
+        self.server.release.wait(30)
+
+    def log_message(self, format, *args):
+        """Silence request logging."""
+        pass
+
+
+class TestStallWatchdog:
+    """Test StallWatchdog functionality."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, clock):
+        """Create a watchdog driven by the fake clock."""
+        self.clock = clock
+        self.watchdog = StallWatchdog(stall_timeout=10, speed_window=5, clock=self.clock)
+        self.watchdog.start()
+
+    def feed(self, downloaded, filename='video.mp4'):
+        """Send a downloading progress update to the watchdog."""
+        self.watchdog.progressHook({
+            'status': 'downloading',
+            'filename': filename,
+            'downloaded_bytes': downloaded
+        })
+
+    def testHealthyTransferPasses(self):
+        """Test that steady progress never aborts."""
+        for second in range(30):
+            self.clock.advance(1)
+            self.feed(second * 100000)
+
+        assert self.watchdog.check() is None
+
+    def testNoDataAborts(self):
+        """Test that a transfer without new bytes is flagged after the stall timeout."""
+        self.feed(1000)
+        self.clock.advance(11)
+
+        error = self.watchdog.check()
+
+        assert isinstance(error, StallError)
+        assert error.retryable is True
+        assert "no data" in str(error)
+
+    def testHookRaisesOnceFlagged(self):
+        """Test that the next hook call raises after an external check flagged a stall."""
+        self.clock.advance(11)
+        self.watchdog.check()
+
+        with pytest.raises(StallError):
+            self.feed(5000)
+
+    def testThroughputCollapseAborts(self):
+        """Test that throughput falling far below its peak aborts the transfer."""
+        downloaded = 0
+        for _ in range(10):
+            self.clock.advance(1)
+            downloaded += 1000000
+            self.feed(downloaded)
+
+        with pytest.raises(StallError, match="collapsed"):
+            for _ in range(10):
+                self.clock.advance(1)
+                downloaded += 1000
+                self.feed(downloaded)
+
+    def testMinimumSpeedAborts(self):
+        """Test that throughput below min_speed aborts the transfer."""
+        watchdog = StallWatchdog(stall_timeout=10, min_speed=10000, speed_window=5, clock=self.clock)
+        watchdog.start()
+
+        with pytest.raises(StallError, match="below minimum"):
+            for second in range(10):
+                self.clock.advance(1)
+                watchdog.progressHook({'status': 'downloading', 'filename': 'a', 'downloaded_bytes': second * 100})
+
+    def testDeadlineSpansAttempts(self):
+        """Test that the deadline keeps running across restarts and is not retryable."""
+        watchdog = StallWatchdog(stall_timeout=0, deadline=60, clock=self.clock)
+        watchdog.start()
+        self.clock.advance(40)
+        watchdog.start()
+        assert watchdog.check() is None
+
+        self.clock.advance(30)
+        error = watchdog.check()
+
+        assert error.retryable is False
+        assert watchdog.attempts == 2
+
+    def testStartClearsAbort(self):
+        """Test that a new attempt starts with a clean window."""
+        self.clock.advance(11)
+        assert self.watchdog.check() is not None
+
+        self.watchdog.start()
+
+        assert self.watchdog.check() is None
+
+    def testResumedBytesAreBaseline(self):
+        """Test that bytes already on disk when resuming do not count as throughput."""
+        self.feed(50000000)
+        self.clock.advance(6)
+        self.feed(50001000)
+
+        assert self.watchdog.transferred == 1000
+
+    def testRetrySleepRaisesOnceFlagged(self):
+        """Test that yt-dlp's retry sleep aborts a flagged transfer and the read timeout follows the stall timeout."""
+        options = self.watchdog.transferOptions()
+        assert options['socket_timeout'] == 10
+        assert options['retry_sleep_functions']['http'](n=0) == 0
+
+        self.clock.advance(11)
+
+        with pytest.raises(StallError, match="no data"):
+            options['retry_sleep_functions']['fragment'](n=1)
+        assert StallWatchdog(stall_timeout=0).socketTimeout() == StallWatchdog.SOCKET_TIMEOUT
+
+    def testSilentConnectionAbortsWithoutHook(self, tmp_path):
+        """Test that a server sending headers and then nothing is aborted as a stall."""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), SilentHandler)
+        server.daemon_threads = True
+        server.release = threading.Event()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+        info = {'id': 'video', 'title': 'Video', 'extractor': 'generic', 'extractor_key': 'Generic', 'webpage_url': url,
+                'formats': [{'url': url, 'format_id': '18', 'ext': 'mp4', 'protocol': 'http'}]}
+        converter = Mp4Downloader()
+        converter.setUrl(url)
+        converter.setPath(str(tmp_path))
+        converter.watchdog = StallWatchdog(stall_timeout=1)
+        converter.watchdog.start()
+
+        started = time.monotonic()
+        try:
+            with pytest.raises(StallError, match="no data"):
+                converter.downloadVideo(info=info)
+        finally:
+            server.release.set()
+            server.shutdown()
+            server.server_close()
+
+        assert time.monotonic() - started < 5
+
+    def testFindStallErrorInsideDownloadError(self):
+        """Test that stalls wrapped by yt-dlp or chained by converters are found."""
+        stall = StallError("no data for 60s")
+        wrapped = yt_dlp.DownloadError("ERROR: no data", exc_info=(StallError, stall, None))
+        try:
+            try:
+                raise stall
+            except StallError as e:
+                raise IOError("stream failed") from e
+        except IOError as chained:
+            assert findStallError(chained) is stall
+
+        assert findStallError(wrapped) is stall
+        assert findStallError(ValueError("other")) is None
@@ -0,0 +1,43 @@
+import pytest
+from benchmarks.startup import parseImportTime, measureImports, breakdown, checkBudget
+
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       300 |        300 |     _tkinter
+import time:      3000 |       3300 |   tkinter
+import time:     40000 |      40000 |   yt_dlp
+import time:      1000 |      44300 | src.GUI
+"""
+
+
+class TestStartupBenchmark:
+    """Test the import-time startup benchmark."""
+
+    def setup_method(self):
+        """Parse a small sample report."""
+        self.imports = parseImportTime(REPORT)
+
+    def testParseImportTime(self):
+        """Test that the header is skipped and nesting depth is kept."""
+        assert self.imports[0] == ('_tkinter', 2, 300, 300)
+        assert self.imports[-1] == ('src.GUI', 0, 1000, 44300)
+
+    def testBreakdownByPackage(self):
+        """Test that self times are summed per top-level package, slowest first."""
+        assert breakdown(self.imports) == [('yt_dlp', 40.0), ('tkinter', 3.0), ('src', 1.0), ('_tkinter', 0.3)]
+
+    def testCheckBudgetFlagsDeferredModules(self):
+        """Test that loading yt-dlp at startup and exceeding the budget are reported."""
+        measurement = {'module': 'src.GUI', 'total_ms': 44.3, 'imports': self.imports}
+
+        assert checkBudget(measurement, 40) == [
+            "src.GUI imports yt_dlp at startup",
+            "src.GUI took 44.3 ms, budget is 40 ms"
+        ]
+
+    @pytest.mark.parametrize('module', ['src.GUI', 'src.CLI'])
+    def testEntryModulesDeferDownloaders(self, module):
+        """Test that the entry modules load neither yt-dlp nor the downloaders at import."""
+        measurement = measureImports(module, runs=1)
+
+        assert checkBudget(measurement, float('inf')) == []
@@ -0,0 +1,66 @@
+import os
+import json
+import pytest
+import urllib.request
+from benchmarks.common import percentile, summarize
+from benchmarks.media_server import MediaServer, itemUrl, parseSize
+from benchmarks.throughput import runSuite
+
+
+class TestThroughputBenchmark:
+    """Test the offline throughput benchmark and its media server."""
+
+    def setup_method(self):
+        """Create a media server with a small response latency."""
+        self.server = MediaServer(latency=0.01)
+
+    def teardown_method(self):
+        """Stop the media server if a test started it."""
+        self.server.stop()
+
+    def testPercentileAndSummary(self):
+        """Test interpolated percentiles and the latency summary."""
+        assert percentile([4, 1, 3, 2], 0.5) == 2.5
+        assert percentile([], 0.9) is None
+        assert summarize([1.0, 2.0, 3.0]) == {'count': 3, 'mean': 2.0, 'p50': 2.0, 'p90': 2.8, 'p99': 2.98, 'max': 3.0}
+
+    def testParseSize(self):
+        """Test byte sizes with binary suffixes."""
+        assert parseSize('512K') == 512 * 1024
+        assert parseSize('1.5M') == 1536 * 1024
+        assert parseSize('100') == 100
+        with pytest.raises(ValueError):
+            parseSize('fast')
+
+    def testServesInfoAndRanges(self):
+        """Test the item info, ranged media responses and request counters."""
+        self.server.start()
+        url = itemUrl(self.server.base_url, 1000, 'a-1').replace('/watch?v=', '/info/') + '.json'
+        with urllib.request.urlopen(url) as response:
+            info = json.load(response)
+        assert info['formats'][0]['filesize'] == 1000
+
+        request = urllib.request.Request(info['formats'][0]['url'], headers={'Range': 'bytes=990-'})
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 206
+            assert response.headers['Content-Range'] == 'bytes 990-999/1000'
+            assert len(response.read()) == 10
+
+        assert self.server.stats() == {
+            'info_requests': 1, 'media_requests': 1, 'playlist_requests': 0, 'channel_requests': 0, 'bytes_sent': 10
+        }
+
+    def testRunSuiteDownloadsEveryItem(self):
+        """Test a small run end to end through BatchDownloader and the extractor plugin."""
+        cwd = os.getcwd()
+
+        report = runSuite([2], [128 * 1024], 3, latency=0.01)
+
+        run = report['runs'][0]
+        assert (run['successful'], run['failed']) == (3, 0)
+        assert run['requests']['info_requests'] == 3
+        assert run['requests']['bytes_sent'] == 3 * 128 * 1024
+        assert run['stages']['download']['count'] == 3
+        assert run['mb_per_second'] > 0
+        assert report['environment']['yt_dlp']
+        assert os.getcwd() == cwd
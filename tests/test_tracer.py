@@ -0,0 +1,113 @@
+import os
+import json
+import threading
+import pytest
+from unittest.mock import patch
+from src.Tracer import Tracer, NULL_SPAN
+
+
+class TestTracer:
+    """Test the span tracer and its Chrome trace export."""
+
+    def setup_method(self):
+        """Create an enabled tracer."""
+        self.tracer = Tracer(enabled=True)
+
+    def spans(self):
+        """Return the recorded complete events."""
+        return [event for event in self.tracer.chromeTrace()['traceEvents'] if event['ph'] == 'X']
+
+    def testDisabledTracerRecordsNothing(self):
+        """Test that a disabled tracer hands out the shared no-op span."""
+        tracer = Tracer()
+
+        with tracer.span('extract_info', 'extract', url='u') as span:
+            span.set(bytes=10)
+        tracer.instant('retry scheduled')
+        tracer.postprocessorHook({'status': 'started', 'postprocessor': 'Merger'})
+
+        assert tracer.span('download') is NULL_SPAN
+        assert tracer.events == []
+
+    def testSpanRecordsCompleteEvent(self):
+        """Test that a span becomes an 'X' event with its args and the thread's ID."""
+        with self.tracer.span('download', 'download', format='MP4') as span:
+            span.set(bytes=2048)
+
+        event, = self.spans()
+        assert (event['name'], event['cat'], event['args']) == ('download', 'download', {'format': 'MP4', 'bytes': 2048})
+        assert event['dur'] >= 0
+        assert (event['pid'], event['tid']) == (os.getpid(), threading.get_ident())
+
+    def testSpanMarksErrors(self):
+        """Test that a failing stage is recorded with the exception's name and the exception propagates."""
+        with pytest.raises(ValueError):
+            with self.tracer.span('item.extract', 'batch'):
+                raise ValueError("boom")
+
+        assert self.spans()[0]['args'] == {'error': 'ValueError'}
+
+    def testThreadNamesAndInstants(self):
+        """Test that every thread gets a name entry and instants are thread-scoped."""
+        def work():
+            with self.tracer.span('transfer', 'download'):
+                pass
+
+        worker = threading.Thread(target=work, name='download_0')
+        worker.start()
+        worker.join()
+        self.tracer.instant('stall restart', 'batch', title='A')
+
+        events = self.tracer.chromeTrace()['traceEvents']
+        names = {event['args']['name'] for event in events if event['name'] == 'thread_name'}
+        instant, = [event for event in events if event['ph'] == 'i']
+        assert names == {'download_0', threading.current_thread().name}
+        assert (instant['name'], instant['s'], instant['args']) == ('stall restart', 't', {'title': 'A'})
+
+    def testPostprocessorHookRecordsSpan(self):
+        """Test that started and finished post-processor statuses become one span."""
+        self.tracer.postprocessorHook({'status': 'started', 'postprocessor': 'Merger', 'info_dict': {'id': 'a'}})
+        self.tracer.postprocessorHook({'status': 'finished', 'postprocessor': 'Merger', 'info_dict': {'id': 'a'}})
+        self.tracer.postprocessorHook({'status': 'finished', 'postprocessor': 'MoveFiles', 'info_dict': {}})
+
+        event, = self.spans()
+        assert (event['name'], event['cat'], event['args']) == ('postprocess.Merger', 'postprocess', {'id': 'a'})
+
+    def testMaxEventsDropsAndCounts(self):
+        """Test that events beyond the limit are dropped and counted."""
+        tracer = Tracer(enabled=True, max_events=2)
+        for _ in range(5):
+            tracer.instant('tick')
+
+        trace = tracer.chromeTrace()
+        assert len([event for event in trace['traceEvents'] if event['ph'] == 'i']) == 2
+        assert trace['otherData'] == {'dropped_events': 3}
+
+        tracer.clear()
+        assert (tracer.events, tracer.dropped) == ([], 0)
+
+    def testExportChromeTrace(self, tmp_path):
+        """Test that the trace is written as JSON sorted by time and the event count is returned."""
+        with self.tracer.span('cookies.lookup', 'cookies'):
+            self.tracer.instant('circuit breaker open', 'batch', seconds=30)
+        path = tmp_path / "trace.json"
+
+        assert self.tracer.exportChromeTrace(str(path)) == 2
+        trace = json.loads(path.read_text())
+        timed = [event for event in trace['traceEvents'] if event['ph'] != 'M']
+        assert [event['name'] for event in timed] == ['cookies.lookup', 'circuit breaker open']
+        assert trace['traceEvents'][0]['name'] == 'process_name'
+
+    def testGetDefaultEnabledByEnvironment(self, tmp_path):
+        """Test that the environment variable enables the shared tracer and registers the export."""
+        path = str(tmp_path / "trace.json")
+        with patch.object(Tracer, '_default', None), patch.dict(os.environ, {Tracer.ENV_VAR: path}), \
+                patch('atexit.register') as mock_register:
+            tracer = Tracer.getDefault()
+
+            assert tracer.enabled
+            assert Tracer.getDefault() is tracer
+            mock_register.assert_called_once_with(tracer.exportChromeTrace, path)
+
+        with patch.object(Tracer, '_default', None), patch.dict(os.environ, clear=True):
+            assert not Tracer.getDefault().enabled
@@ -0,0 +1,79 @@
+import pytest
+import threading
+from unittest.mock import Mock, call
+from src.UiEventPump import UiEventPump
+
+
+class TestUiEventPump:
+    """Test UiEventPump functionality."""
+
+    def setup_method(self):
+        """Create a pump with mocked Tk widgets."""
+        self.master = Mock()
+        self.master.after.return_value = 'after#1'
+        self.log_widget = Mock()
+        self.log_widget.index.return_value = '3.0'
+        self.pump = UiEventPump(self.master, self.log_widget, interval=40, max_lines=100)
+
+    def testCoalescesLogLines(self):
+        """Test that lines queued from several threads are written with one insert."""
+        threads = [threading.Thread(target=self.pump.log, args=(f"line {i}",)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.pump.pump()
+
+        assert self.log_widget.insert.call_count == 1
+        text = self.log_widget.insert.call_args[0][1]
+        assert sorted(text.splitlines()) == ["line 0", "line 1"]
+        self.log_widget.delete.assert_not_called()
+
+    def testTrimsOldLines(self):
+        """Test that the log is cut back to the line cap."""
+        self.log_widget.index.return_value = '104.0'
+
+        self.pump.log("new line")
+        self.pump.pump()
+
+        # 103 lines are present, so the first 3 are removed
+        self.log_widget.delete.assert_called_once_with('1.0', '4.0')
+
+    def testAppliesOnlyLatestValue(self):
+        """Test that only the newest value per channel reaches its handler."""
+        handler = Mock()
+        self.pump.register('progress', handler)
+
+        for percentage in (10, 20, 30):
+            self.pump.post('progress', percentage)
+        self.pump.pump()
+        self.pump.pump()
+
+        handler.assert_called_once_with(30)
+
+    def testRunsCallsInOrderAfterValues(self):
+        """Test that queued calls run once, in order, after the channel values."""
+        order = []
+        self.pump.register('progress', lambda value: order.append(('progress', value)))
+        self.pump.call(order.append, 'first')
+        self.pump.post('progress', 50)
+        self.pump.call(order.append, 'second')
+
+        self.pump.pump()
+        self.pump.pump()
+
+        assert order == [('progress', 50), 'first', 'second']
+
+    def testTickReschedulesItself(self):
+        """Test that the pump runs on a fixed after() timer until stopped."""
+        self.pump.start()
+        self.pump.start()
+        assert self.master.after.call_args_list == [call(40, self.pump.tick)]
+
+        self.pump.tick()
+        assert self.master.after.call_count == 2
+
+        self.pump.stop()
+        self.master.after_cancel.assert_called_once_with('after#1')
+        assert self.pump.after_id is None